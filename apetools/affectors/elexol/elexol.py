@@ -3,6 +3,10 @@
 import socket
 
 
+REPLY_SIZE = 2
+TIMEOUT = 0.5
+
+
 class elexol24(object):
     """
     A class for UDP socket communication with the Elexol24 Ethernet I/O board. 
@@ -36,6 +40,8 @@ class elexol24(object):
         self.pins = pins
         self.clear = clear
         self._socket = None
+        # the last value written to (or read from) each port (None if unknown)
+        self.shadow = dict((port.upper(), None) for port in ports)
         return
 
     @property
@@ -49,7 +55,7 @@ class elexol24(object):
                 self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             # bind to port
                 self._socket.bind((self.HOST, self.UDP_PORT))
-                self._socket.settimeout(0.5)
+                self._socket.settimeout(TIMEOUT)
             
             # set port directions to output by default
                 for port in self.ports:
@@ -115,6 +121,7 @@ class elexol24(object):
             - 'value' : A byte containing binary values to write to the port.  ex: 255 will write all 1's to the port.
         """
         self.trysend(port.upper()+chr(value))
+        self.shadow[port.upper()] = value
 
     # get port value
     def getport(self, port):
@@ -126,12 +133,135 @@ class elexol24(object):
         
         :rtype: Byte
         :return: A byte containing the current status of the desired port.
-        
+        :raise: socket.timeout if the board doesn't answer
         """
-        #self.trysend(port.lower())
-        msg = self.tryrecv(port.lower())
+        values = self.readports(port)
+        if port.upper() not in values:
+            raise socket.timeout("elexol24.getport: no reply for port {0}".format(port))
         # return the value from the device
-        return ord(msg[1])
+        return values[port.upper()]
+
+    def drain(self):
+        """
+        Throws away replies that arrived after their queries timed out
+        """
+        self.socket.settimeout(0)
+        try:
+            while True:
+                self.socket.recv(REPLY_SIZE)
+        except socket.error:
+            pass
+        finally:
+            self.socket.settimeout(TIMEOUT)
+        return
+
+    def readports(self, ports=None):
+        """
+        Reads ports by sending all the queries before waiting for the replies
+
+        :param:
+            - `ports`: the port letters to read (default is all of them)
+
+        :rtype: Dictionary
+        :return: port:value for the ports that answered (and updates the shadow)
+        """
+        if ports is None:
+            ports = self.ports
+        ports = [port.upper() for port in ports]
+        values = {}
+        self.drain()
+        for attempt in range(self.MAX_RETRY):
+            missing = [port for port in ports if port not in values]
+            if not missing:
+                break
+            for port in missing:
+                self.trysend(port.lower())
+            while len(values) < len(ports):
+                try:
+                    msg = self.socket.recv(REPLY_SIZE)
+                except socket.timeout:
+                    print "elexol24.readports: socket timeout"
+                    break
+                except socket.error:
+                    print "elexol24.readports: ", socket.error
+                    break
+                # the reply's letter says which query it answers
+                if len(msg) == REPLY_SIZE and msg[0] in missing:
+                    values[msg[0]] = ord(msg[1])
+        self.shadow.update(values)
+        return values
+
+    def refresh(self):
+        """
+        Re-reads all the ports into the shadow registers
+
+        :raise: socket.timeout if a port doesn't answer
+        """
+        values = self.readports()
+        for port in self.ports:
+            if port.upper() not in values:
+                raise socket.timeout("elexol24.refresh: no reply for port {0}".format(port))
+        return
+
+    def register(self, port):
+        """
+        :param:
+            - `port`: A string containing either 'A', 'B', or 'C'.
+
+        :return: the port's shadow value (reading the port if it isn't known)
+        """
+        value = self.shadow.get(port.upper())
+        if value is None:
+            value = self.getport(port)
+        return value
+
+    def outlets(self, refresh=False):
+        """
+        :param:
+            - `refresh`: if True, read the ports instead of using the shadow registers
+
+        :rtype: Integer
+        :return: 24-bit mask of the pins that are set (pin 0 is bit 0)
+        """
+        if refresh or any(self.shadow.get(port.upper()) is None for port in self.ports):
+            self.refresh()
+        mask = 0
+        for index, port in enumerate(self.ports):
+            mask |= self.shadow[port.upper()] << (index * self.pins)
+        return mask
+
+    def set_outlets(self, mask, verify=True):
+        """
+        Sets the pins in the mask and clears all the others
+
+        :param:
+            - `mask`: 24-bit integer with a 1 for each pin to set (pin 0 is bit 0)
+            - `verify`: if True, read the ports back (re-writing the ones that don't match)
+
+        :rtype: Integer
+        :return: the mask read back (or the mask written if not verifying)
+        :raise: socket.timeout if a port still doesn't answer after the last attempt
+        """
+        assert 0 <= mask < 1 << (len(self.ports) * self.pins), "elexol24.set_outlets: mask out of range"
+        byte = (1 << self.pins) - 1
+        values = dict((port.upper(), (mask >> (index * self.pins)) & byte)
+                      for index, port in enumerate(self.ports))
+        for attempt in range(self.MAX_RETRY):
+            for port in self.ports:
+                if self.shadow.get(port.upper()) != values[port.upper()]:
+                    self.setport(port, values[port.upper()])
+            if not verify:
+                return mask
+            read = self.readports()
+            if read == values:
+                return mask
+            for port in values:
+                # re-write (or, after the last attempt, re-read) the ports that didn't answer or didn't change
+                if read.get(port) != values[port]:
+                    self.shadow[port] = None
+            if attempt + 1 < self.MAX_RETRY:
+                print "elexol24.set_outlets: ports didn't match, retrying"
+        return self.outlets()
             
     # clear all values of individual port
     def clearport(self, port):
@@ -168,12 +298,12 @@ class elexol24(object):
         """        
         assert(pin < 8 and pin >= 0), "elexol24.setpin: pin out of range"
         
-        # get existing port status and OR the result
-        a = self.getport(port)
+        # get existing port status (from the shadow) and OR the result
+        a = self.register(port)
         b = a | (1 << pin)
             
         # write it back to device
-        self.trysend(port.upper()+chr(b)) 
+        self.setport(port, b)
             
     # set individual pin value, with all else zero
     def setxpin(self, port, pin):
@@ -186,7 +316,7 @@ class elexol24(object):
             
         """
         
-        self.trysend(port.upper()+chr(1 << pin))
+        self.setport(port, 1 << pin)
             
     # get status of individual pin
     def getpin(self, port, pin):
@@ -219,12 +349,12 @@ class elexol24(object):
         """
         
         assert(pin < 8 and pin >= 0), "elexol24.clearpin: pin out of range"
-        # get port status, AND with inverted pin value
-        a = self.getport(port)
+        # get port status (from the shadow), AND with inverted pin value
+        a = self.register(port)
         b = a & ~(1 << pin)
         
         # write back to device
-        self.trysend(port.upper()+chr(b))
+        self.setport(port, b)
         
     # set one pin in entire 24 pin bank 
     def setpin24(self, pin):
@@ -255,12 +385,8 @@ class elexol24(object):
         """        
         assert (pin < 24 and pin >= 0), "elexol24.setxpin24: Pin input outside of range."
         
-        # determine port
-        port, pin = self.ports[pin/self.pins], pin % self.pins
-        
-        # perform operation
-        self.clearall()
-        self.setpin(port, pin)
+        # one write per port (the ports already clear aren't written)
+        self.set_outlets(1 << pin, verify=False)
         return
 
     def getpin24(self, pin):
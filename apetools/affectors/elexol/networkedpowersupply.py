@@ -1,6 +1,6 @@
 
 #python
-import time
+import socket
 from types import IntType
 
 #apetools
@@ -15,8 +15,6 @@ from errors import FaucetteError
 MAX_PINS = 24
 # Total number of AC devices per port (A, B, C)
 PINS_PER_PORT = 8
-# Time, in seconds, to delay between turning a device on/off
-TOGGLE_DELAY = 0.05
 # Maximum number of devices that are allowed to be on at a time.
 MAX_ON = 6
 # ID if first pin
@@ -163,19 +161,27 @@ class NetworkedPowerSupply (BaseClass):
 
         :postcondition: `self.port_status` dict contains port,pin statuses
         """
-        for port in self.ports:
-            raw_int = self.elexol.getport(port)
+        self.update_port_status(self.elexol.outlets(refresh=True))
+        return
+
+    def update_port_status(self, mask):
+        """
+        :param:
+
+         - `mask`: 24-bit integer of the switches that are on
+
+        :postcondition: `self.port_status` dict matches the mask
+        """
+        for index, port in enumerate(self.ports):
             for pin in self.pins_per_port:
-                self.port_status[port][pin] = bool(raw_int & (1 << pin))
+                self.port_status[port][pin] = bool(mask & (1 << (index * PINS_PER_PORT + pin)))
         return
 
-    def switch_is_on(self, switch):
+    def check_switch(self, switch):
         """
         :param:
 
          - `switch`: The switch ID (e.g. 16 for port C, pin 0)
-        
-        :return: True if pin is on
 
         :raise: FaucetteError if switch ID is invalid.
         """
@@ -183,11 +189,62 @@ class NetworkedPowerSupply (BaseClass):
             raise FaucetteError("Switch must be integer, not {0}".format(type(switch)))
         if switch >= MAX_PINS or switch < FIRST_PIN:
             raise FaucetteError("Switch # {0} does not exist!".format(switch))
+        return
+
+    def switch_mask(self, switches):
+        """
+        :param:
+
+         - `switches`: iterable of switch IDs
+
+        :return: 24-bit integer with the switches' bits set
+        :raise: FaucetteError if a switch ID is invalid.
+        """
+        mask = 0
+        for switch in switches:
+            self.check_switch(switch)
+            mask |= 1 << switch
+        return mask
+
+    def set_switches(self, mask):
+        """
+        Turns on the switches in the mask and off all the others
+
+        :param:
+
+         - `mask`: 24-bit integer of the switches to have on
+
+        :raise: FaucetteError if too many switches would be on or the switches don't change (or can't be read back)
+        """
+        current = self.elexol.outlets()
+        if mask & ~current and bin(mask).count('1') > MAX_ON:
+            raise FaucetteError(('Maximum number of ON switches exceeded'
+                                 ' ({0})--switches {1:06x} were not turned on').format(MAX_ON, mask))
+        if mask == current:
+            return
+        self.logger.debug("Setting switches {0:06x} (were {1:06x})".format(mask, current))
+        try:
+            read = self.elexol.set_outlets(mask)
+        except socket.timeout as error:
+            raise FaucetteError("Could not set the switches to {0:06x} ({1})".format(mask, error))
+        self.update_port_status(read)
+        if read != mask:
+            raise FaucetteError("Could not set the switches to {0:06x} (they're {1:06x})".format(mask,
+                                                                                              read))
+        return
+
+    def switch_is_on(self, switch):
+        """
+        :param:
 
-        self.set_port_status()
+         - `switch`: The switch ID (e.g. 16 for port C, pin 0)
         
-        port, pin = self.ports[switch/PINS_PER_PORT], switch % PINS_PER_PORT
-        return self.port_status[port][pin]
+        :return: True if pin is on (according to the elexol's shadow registers)
+
+        :raise: FaucetteError if switch ID is invalid.
+        """
+        self.check_switch(switch)
+        return bool(self.elexol.outlets() & (1 << switch))
 
     def switch_is_off(self, switch):
         """
@@ -206,12 +263,7 @@ class NetworkedPowerSupply (BaseClass):
         :rtype: int
         :return: Number of switches currently ON.
         """
-        count = 0
-        self.set_port_status()        
-                
-        for port in self.ports:
-            count += len([pin for pin in self.pins_per_port if self.port_status[port][pin]])
-        return count
+        return bin(self.elexol.outlets()).count('1')
     
     def turn_on_switches(self, switches, turn_others_off=False):
         """
@@ -227,10 +279,10 @@ class NetworkedPowerSupply (BaseClass):
         - If `clear`, all switches not in `switches` are off.
         - All switches in `outlets` are on.
         """
-        if turn_others_off:
-            self.all_off_except(switches)
-        for switch in switches:
-            self.turn_on(switch)
+        mask = self.switch_mask(switches)
+        if not turn_others_off:
+            mask |= self.elexol.outlets()
+        self.set_switches(mask)
         return
     
     def turn_off_switches(self, off_list):
@@ -243,8 +295,7 @@ class NetworkedPowerSupply (BaseClass):
 
         :postcondition: All switches in `off_list` are off.
         """
-        for switch in off_list:
-            self.turn_off(switch)
+        self.set_switches(self.elexol.outlets() & ~self.switch_mask(off_list))
         return
 
     def toggle_switch(self, switch, on_or_off):
@@ -259,17 +310,21 @@ class NetworkedPowerSupply (BaseClass):
         :raise: FaucetteError if invalid switch, failed change, too many switches on.
         """
         self.logger.debug("Turning switch {0} {1}".format(switch, on_or_off))
-        if on_or_off == ON and self.switches_on() >= MAX_ON:
-            raise FaucetteError(('Maximum number of ON switches exceeded'
-                                 ' ({0})--switch {1} was not turned on').format(MAX_ON, switch))
-
-        for attempt in self.attempts:
-            if self.check_switch_is[on_or_off](switch):
-                return
-            self.turn_switch[on_or_off](switch)
-            time.sleep(TOGGLE_DELAY)
-        raise FaucetteError("Could not turn {o} pin #{s}".format(s=switch,
-                                                                 o=on_or_off))
+        bit = self.switch_mask([switch])
+        current = self.elexol.outlets()
+        if on_or_off == ON:
+            if not current & bit and self.switches_on() >= MAX_ON:
+                raise FaucetteError(('Maximum number of ON switches exceeded'
+                                     ' ({0})--switch {1} was not turned on').format(MAX_ON, switch))
+            mask = current | bit
+        else:
+            mask = current & ~bit
+        try:
+            self.set_switches(mask)
+        except FaucetteError as error:
+            self.logger.debug(error)
+            raise FaucetteError("Could not turn {o} pin #{s}".format(s=switch,
+                                                                     o=on_or_off))
         return
     
     def turn_on(self, switch):
@@ -309,9 +364,7 @@ class NetworkedPowerSupply (BaseClass):
         :postcondition: All devices not in `exception` are turned off.
         """
         self.logger.debug("Turning off all pins except {0}".format(exceptions))
-        for pin in self.pins:
-            if pin not in exceptions: 
-                self.turn_off(pin)
+        self.set_switches(self.elexol.outlets() & self.switch_mask(exceptions))
         return
 
     def __str__(self):
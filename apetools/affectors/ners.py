@@ -1,25 +1,209 @@
 
 # python standard library
+from collections import namedtuple
+import Queue
+import threading
+from time import time
 from types import StringType
 
 # this package
 from apetools.baseclass import BaseClass
+from apetools.commons.errors import AffectorError, TimeoutError
+from apetools.threads.threads import Thread
+
+
+WORKERS = 8
+TIMEOUT = 120
+POLL_INTERVAL = 0.1
+ENABLE = 'enable_wifi'
+DISABLE = 'disable_wifi'
+
+
+class SwitchResult(namedtuple("SwitchResult", "address action elapsed error")):
+    __slots__ = ()
+
+    def __str__(self):
+        outcome = "OK" if self.error is None else self.error
+        return "{0} {1}: {2:.3f} s ({3})".format(self.action, self.address,
+                                                self.elapsed, outcome)
+
+
+class RadioSwitcher(BaseClass):
+    """
+    A runner of radio-switching calls on many nodes at once
+    """
+    def __init__(self, nodes, workers=WORKERS, timeout=TIMEOUT):
+        """
+        :param:
+
+         - `nodes`: A dictionary of <address>:Wifi enabler/disabler
+         - `workers`: the most nodes to switch at once
+         - `timeout`: seconds to wait for a node's call
+        """
+        super(RadioSwitcher, self).__init__()
+        self.nodes = nodes
+        self.workers = workers
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.started = {}
+        self.abandoned = set()
+        return
+
+    def run(self, action, addresses):
+        """
+        Calls the action on the nodes and waits for them all (or their timeouts)
+
+        :param:
+
+         - `action`: name of the method to call (ENABLE or DISABLE)
+         - `addresses`: keys of the nodes to call it on
+
+        :return: list of SwitchResult (sorted by address)
+        """
+        remaining = set(addresses)
+        if not remaining:
+            return []
+        pending = Queue.Queue()
+        finished = Queue.Queue()
+        for address in sorted(remaining):
+            pending.put(address)
+        with self.lock:
+            self.started = {}
+            self.abandoned = set()
+        for lane in range(min(self.workers, len(remaining))):
+            Thread(target=self.lane, args=(action, pending, finished),
+                   name="RadioSwitcher {0}".format(lane))
+
+        results = {}
+        while remaining:
+            try:
+                result = finished.get(timeout=POLL_INTERVAL)
+                if result.address in remaining:
+                    results[result.address] = result
+                    remaining.discard(result.address)
+            except Queue.Empty:
+                pass
+            for result in self.expired(action, remaining):
+                results[result.address] = result
+                remaining.discard(result.address)
+                # the hung call keeps its thread so another lane takes its place
+                Thread(target=self.lane, args=(action, pending, finished),
+                       name="RadioSwitcher {0}".format(result.address))
+        return [results[address] for address in sorted(results)]
+
+    def lane(self, action, pending, finished):
+        """
+        Calls the action on addresses from the queue until it's empty (a thread's target)
+
+        :param:
+
+         - `action`: name of the method to call
+         - `pending`: Queue of addresses
+         - `finished`: Queue to put the SwitchResults on
+        """
+        while True:
+            try:
+                address = pending.get_nowait()
+            except Queue.Empty:
+                return
+            start = time()
+            with self.lock:
+                self.started[address] = start
+            error = None
+            try:
+                getattr(self.nodes[address], action)()
+            except Exception as exception:
+                self.logger.error("{0} {1}: {2}".format(action, address, exception))
+                error = exception
+            finished.put(SwitchResult(address=address, action=action,
+                                      elapsed=time() - start, error=error))
+            with self.lock:
+                if address in self.abandoned:
+                    # this lane was replaced when the call timed out
+                    return
+        return
+
+    def expired(self, action, remaining):
+        """
+        :param:
+
+         - `action`: name of the method that was called
+         - `remaining`: addresses that haven't finished
+
+        :return: list of SwitchResult for the calls that have run out of time
+        """
+        now = time()
+        results = []
+        with self.lock:
+            for address in remaining:
+                start = self.started.get(address)
+                if start is None or now - start < self.timeout:
+                    continue
+                self.abandoned.add(address)
+                error = TimeoutError("{0} {1} took more than {2} seconds".format(action, address,
+                                                                                 self.timeout))
+                results.append(SwitchResult(address=address, action=action,
+                                            elapsed=now - start, error=error))
+        return results
+# end class RadioSwitcher
 
 
 class NeRS(BaseClass):
     """
     A Networked Radio Switch to enable and disable radios over the network.
     """
-    def __init__(self, nodes):
+    def __init__(self, nodes, workers=WORKERS, timeout=TIMEOUT):
         """
         :param:
 
          - `nodes`: A dictionary of <address>:Wifi enabler/disabler
+         - `workers`: the most nodes to switch at once
+         - `timeout`: seconds to wait for a node to switch
         """
         super(NeRS, self).__init__()
-        self.nodes = nodes        
+        self.nodes = nodes
+        self.workers = workers
+        self.timeout = timeout
+        self.results = []
+        self._switcher = None
         return
 
+    @property
+    def switcher(self):
+        """
+        :return: RadioSwitcher for the nodes
+        """
+        if self._switcher is None:
+            self._switcher = RadioSwitcher(self.nodes, workers=self.workers,
+                                           timeout=self.timeout)
+        return self._switcher
+
+    def switch(self, action, addresses):
+        """
+        Switches the radios on the nodes and logs how long each took
+
+        :param:
+
+         - `action`: ENABLE or DISABLE
+         - `addresses`: keys of the nodes to switch
+
+        :return: list of SwitchResult
+        :raise: AffectorError if a node failed to switch
+        """
+        if not addresses:
+            return []
+        start = time()
+        results = self.switcher.run(action, addresses)
+        for result in results:
+            self.logger.info(str(result))
+        self.logger.info("{0}: {1} nodes in {2:.3f} s".format(action, len(results),
+                                                              time() - start))
+        self.results.extend(results)
+        failed = [result.address for result in results if result.error is not None]
+        if failed:
+            raise AffectorError("{0} failed on {1}".format(action, ", ".join(failed)))
+        return results
+
     def __call__(self, parameters=None):
         """
         :param:
@@ -28,22 +212,21 @@ class NeRS(BaseClass):
 
         :postconditions:
 
-         - `enable_wifi` called on all nodes with address in addresses
          - `disable_wifi` called on all nodes with an address not in addresses
+         - `enable_wifi` called on all nodes with address in addresses (after the disables finished)
+         - `results` has the SwitchResult for each node
+        :raise: AffectorError if a node failed to switch
         """
+        addresses = []
         if parameters is not None:
             addresses = parameters.nodes.parameters
             if type(addresses) is StringType:
                 addresses = [addresses]
-            for address in addresses:
-                self.logger.info("Enabling: '{0}'".format(address))
-                self.nodes[address].enable_wifi()
-
-                kill_addresses = [address for address in self.nodes if address not in addresses]
-        else:
-            kill_addresses = self.nodes.keys()
-        for address in kill_addresses:
-            self.logger.info("Disabling: '{0}'".format(address))
-            self.nodes[address].disable_wifi()
+        self.results = []
+        kill_addresses = [address for address in self.nodes if address not in addresses]
+        self.logger.info("Disabling: {0}".format(kill_addresses))
+        self.switch(DISABLE, kill_addresses)
+        self.logger.info("Enabling: {0}".format(addresses))
+        self.switch(ENABLE, addresses)
         return
 # end class NeRS
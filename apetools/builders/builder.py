@@ -9,12 +9,17 @@ class MagicMock(object):
 # end class MagicMock
 
 
+# python standard library
+import os
+
 # apetools
 from apetools.baseclass import BaseClass
 
 # proletarians
 from apetools.proletarians import hortator
 from apetools.proletarians.testoperator import TestOperator
+from apetools.proletarians.checkpointjournal import CheckpointJournal, journal_name, find_resumable
+from apetools.proletarians.scheduler import OperatorScheduler, ScheduledOperation, claim_resources
 #from apetools.proletarians import countdowntimer
 
 from subbuilders.basetoolbuilder import Parameters
@@ -37,6 +42,7 @@ from apetools.threads.semaphore import Semaphore
 
 # builders
 from subbuilders.nodesbuilder import NodesBuilder
+from subbuilders.noderegistry import THREAD
 from subbuilders.operationsetupbuilder import OperationSetupBuilder
 from subbuilders.operationteardownbuilder import OperationTeardownBuilder
 from subbuilders.setuptestbuilder import SetupTestBuilder
@@ -82,14 +88,19 @@ class Builder(BaseClass):
     """
     A builder builds objects
     """
-    def __init__(self, maps, *args, **kwargs):
+    def __init__(self, maps, resume=False, lanes=1, *args, **kwargs):
         """
         :param:
 
          - `maps`: A generator of ConfigurationMaps
+         - `resume`: if True, continue unfinished campaigns in their output folders
+         - `lanes`: the most configuration files to run at once
         """
         super(Builder, self).__init__(*args, **kwargs)
         self.maps = maps
+        self.resume = resume
+        self.lanes = lanes
+        self._scheduler = None
         self._repetitions = None
         self._parameters = None
         self._operators = None
@@ -98,7 +109,9 @@ class Builder(BaseClass):
         self._storage = None
         self._lock = None
         self._nodes = None
+        self._nodes_builder = None
         self._thread_nodes = None
+        self._thread_nodes_builder = None
         self._semaphore = None
         self._saved_semaphore = None
         self._events = None
@@ -240,7 +253,9 @@ class Builder(BaseClass):
         """
         if self._nodes is None:
             #import pudb; pudb.set_trace()
-            self._nodes = NodesBuilder(self, self.current_config).nodes
+            if self._nodes_builder is None:
+                self._nodes_builder = NodesBuilder(self, self.current_config)
+            self._nodes = self._nodes_builder.nodes
         return self._nodes
 
     @property
@@ -250,7 +265,9 @@ class Builder(BaseClass):
         """
         if self._thread_nodes is None:
             #import pudb; pudb.set_trace()
-            self._thread_nodes = NodesBuilder(self, self.current_config).nodes
+            self._thread_nodes_builder = NodesBuilder(self, self.current_config,
+                                                      purpose=THREAD)
+            self._thread_nodes = self._thread_nodes_builder.nodes
         return self._thread_nodes
 
     def build_operator(self, config_map):
@@ -270,6 +287,9 @@ class Builder(BaseClass):
         """
         self.reset()
         self.current_config = config_map
+        # start bringing up the nodes while the rest of the operator is built
+        self._nodes_builder = NodesBuilder(self, config_map)
+        self._nodes_builder.start()
 
         message = "Building the TestParameters with configmap '{0}'"
         self.logger.info(message.format(config_map.filename))
@@ -310,6 +330,9 @@ class Builder(BaseClass):
                              ConfigOptions.tag_option,
                              default="APETest",
                              optional=True)
+        journal = CheckpointJournal(os.path.join(self.storage.path,
+                                                 journal_name(config_map.filename)),
+                                    config_map.filename)
         return TestOperator(ParameterGenerator(self.parameters),
                             operation_setup=operation_setup,
                             operation_teardown=operation_teardown,
@@ -319,20 +342,61 @@ class Builder(BaseClass):
                             nodes=self.nodes,
                             no_cleanup=no_cleanup,
                             storage=self.storage,
-                            tag=tag)
+                            tag=tag,
+                            journal=journal,
+                            resume=self.resume)
+
+    def detach(self):
+        """
+        Hands the current nodes over to the caller (so `reset` won't release them)
+
+        :return: callable that releases the nodes to the registry
+        """
+        nodes_builders = [nodes_builder for nodes_builder in (self._nodes_builder,
+                                                              self._thread_nodes_builder)
+                          if nodes_builder is not None]
+        self._nodes_builder = None
+        self._thread_nodes_builder = None
+
+        def release():
+            for nodes_builder in nodes_builders:
+                nodes_builder.release()
+            return
+        return release
+
+    @property
+    def scheduler(self):
+        """
+        :return: OperatorScheduler if more than one lane was asked for (else None)
+        """
+        if self._scheduler is None and self.lanes > 1:
+            self._scheduler = OperatorScheduler(lanes=self.lanes)
+        return self._scheduler
 
     @property
     def operators(self):
         """
-        :yield: test operators
+        :yield: test operators (ScheduledOperations if there's a scheduler)
         """
         for config_map in self.maps:
+            claim = None
+            if self.scheduler is not None:
+                claim = claim_resources(config_map)
+                self.scheduler.reserve(claim)
             try:
-                yield self.build_operator(config_map)
+                operator = self.build_operator(config_map)
             except Exception as error:
                 self.logger.error(error)
                 message = "Couldn't build {0}".format(config_map.filename)
                 self.logger.error(message)
+                if claim is not None:
+                    self.scheduler.cancel(claim)
+                continue
+            if claim is None:
+                yield operator
+            else:
+                yield ScheduledOperation(operator=operator, claim=claim,
+                                         release=self.detach())
         return
 
     @property
@@ -344,7 +408,8 @@ class Builder(BaseClass):
             self.logger.debug("Building the Hortator")
             generator = GeneratorHolder(generator=self.operators,
                                         count=self.maps.finder.matching_count)
-            self._hortator = hortator.Hortator(operations=generator)
+            self._hortator = hortator.Hortator(operations=generator,
+                                               scheduler=self.scheduler)
         return self._hortator
 
     @property
@@ -366,7 +431,8 @@ class Builder(BaseClass):
          - `folder_name`: The name of the output folder for data.
 
         :precondition: self.current_config is a configuration map
-        :return: StorageOutput for the folder.
+        :return: StorageOutput for the folder (the unfinished one if resuming)
+        :postcondition: if there's a scheduler the folder has a sub-folder for the configuration
         """
         if self._storage is None:
             section = ConfigOptions.test_section
@@ -376,6 +442,16 @@ class Builder(BaseClass):
                                                   default="",
                                                   optional=True)
 
+            if self.scheduler is not None:
+                # operators running at once can't share a folder
+                name = os.path.splitext(os.path.basename(self.current_config.filename))[0]
+                folder_name = os.path.join(folder_name, name)
+            if self.resume:
+                resumable = find_resumable(folder_name,
+                                           self.current_config.filename)
+                if resumable is not None:
+                    self.logger.info("Resuming in {0}".format(resumable))
+                    folder_name = resumable
             message = "Building the Storage with folder: {0}"
             self.logger.debug(message.format(folder_name))
             self._storage = storageoutput.StorageOutput(folder_name)
@@ -383,7 +459,7 @@ class Builder(BaseClass):
 
     def reset(self):
         """
-        :postcondition: parameters reset to None
+        :postcondition: parameters reset to None, nodes released to the registry
         """
         self._parameters = None
         self._repetitions = None
@@ -393,7 +469,16 @@ class Builder(BaseClass):
         self._execute_test_builder = None
         self._teardown_test_builder = None
         self._storage = None
+        if self.scheduler is not None:
+            # each operator that runs at once needs its own traffic pc
+            self._tpc_device = None
+        for nodes_builder in (self._nodes_builder, self._thread_nodes_builder):
+            if nodes_builder is not None:
+                nodes_builder.release()
         self._nodes = None
+        self._nodes_builder = None
+        self._thread_nodes = None
+        self._thread_nodes_builder = None
         self._lock = None
         return
 # end Builder
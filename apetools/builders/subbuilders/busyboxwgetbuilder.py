@@ -1,6 +1,6 @@
 
 from apetools.lexicographers.config_options import ConfigOptions
-from apetools.tools.wgetsession import BusyboxWgetSession
+from apetools.tools.wgetsession import BusyboxWgetSession, WgetLoadSession, FETCH_TIMEOUT
 from apetools.commons.errors import ConfigurationError
 
 from basetoolbuilder import BaseToolBuilder, Parameters
@@ -32,6 +32,9 @@ class BusyboxWgetBuilder(BaseToolBuilder):
         self._repetitions = None
         self._data_file = None
         self._max_time = None
+        self._workers = None
+        self._local = None
+        self._timeout = None
         return
 
     @property
@@ -95,12 +98,59 @@ class BusyboxWgetBuilder(BaseToolBuilder):
                 default=None,
                 optional=True)
         return self._max_time   
+
+    @property
+    def workers(self):
+        """
+        :return: number of fetches to run at once on each node (None for one-at-a-time)
+        """
+        if self._workers is None:
+            self._workers = self.config_map.get_int(ConfigOptions.busyboxwget_section,
+                                                    ConfigOptions.workers_option,
+                                                    default=None,
+                                                    optional=True)
+        return self._workers
+
+    @property
+    def local(self):
+        """
+        :return: True if the fetches should be made in this process
+        """
+        if self._local is None:
+            self._local = self.config_map.get_boolean(ConfigOptions.busyboxwget_section,
+                                                      ConfigOptions.local_option,
+                                                      default=False,
+                                                      optional=True)
+        return self._local
+
+    @property
+    def timeout(self):
+        """
+        :return: seconds to wait for a fetch
+        """
+        if self._timeout is None:
+            self._timeout = self.config_map.get_time(ConfigOptions.busyboxwget_section,
+                                                     ConfigOptions.timeout_option,
+                                                     default=FETCH_TIMEOUT,
+                                                     optional=True)
+        return self._timeout
     
     @property
     def product(self):
         """
-        :return: A Busybox Wget Session
+        :return: A Busybox Wget Session (or a Wget Load Session if `workers` is set)
         """
+        if self._product is None and self.workers:
+            connections = [node.connection for node in self.master.nodes.values()]
+            self._product = WgetLoadSession(url=self.url,
+                                            connections=connections,
+                                            storage=self.master.storage,
+                                            workers=self.workers,
+                                            local=self.local,
+                                            timeout=self.timeout,
+                                            data_file=self.data_file,
+                                            repetitions=self.repetitions,
+                                            max_time=self.max_time)
         if self._product is None:
             self._product = BusyboxWgetSession(url=self.url,
                                                connection=self.connection,
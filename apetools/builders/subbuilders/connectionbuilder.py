@@ -108,6 +108,7 @@ class SSHConnectionBuilder(BaseClass):
         self._operating_system = None
         self._path = None
         self._library_path = None
+        self._max_sessions = None
         return
 
     @property
@@ -147,6 +148,19 @@ class SSHConnectionBuilder(BaseClass):
                 self.logger.debug(error)
         return self._path
     @property
+    def max_sessions(self):
+        """
+        :return: channels to allow at once on each ssh-transport to the host
+        """
+        if self._max_sessions is None:
+            try:
+                self._max_sessions = int(self.parameters.max_sessions)
+            except AttributeError as error:
+                self.logger.debug(error)
+                self._max_sessions = sshconnection.MAX_SESSIONS
+        return self._max_sessions
+
+    @property
     def hostname(self):
         """
         :rtype: StringType
@@ -209,7 +223,8 @@ class SSHConnectionBuilder(BaseClass):
                                                            password=self.password,
                                                            path=self.path,
                                                            library_path=self.library_path,
-                                                           operating_system=self.operating_system)
+                                                           operating_system=self.operating_system,
+                                                           max_sessions=self.max_sessions)
         return self._connection
 # end class SshConnectionBuilder
 
@@ -251,7 +266,8 @@ class AdbShellSshConnectionBuilder(SSHConnectionBuilder):
                                                                    path=self.path,
                                                                    library_path=self.library_path,
                                                                    operating_system=self.operating_system,
-                                                                   serial_number=self.serial_number)
+                                                                   serial_number=self.serial_number,
+                                                                   max_sessions=self.max_sessions)
         return self._connection
 # end class AdbShellSshConnectionBuilder
 
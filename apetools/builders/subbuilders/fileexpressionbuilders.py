@@ -38,6 +38,7 @@ class BatteryWatcherBuilder(BasePollerBuilder):
                                            output=self.output_file,
                                            interval=self.interval,
                                            name=self.name,
-                                           use_header=use_header)
+                                           use_header=use_header,
+                                           session=self.session)
         return self._product       
 # end class BatteryWatcherBuilder
@@ -4,6 +4,8 @@ from iperfparameterbuilders import IperfParametersBuilder
 from apetools.commands.iperfcommand import IperfCommand, IperfCommandEnum
 from storagepipebuilder import StoragePipeBuilder
 from apetools.pipes.storagepipe import StoragePipeEnum
+from apetools.commons.columnstore import ColumnStore
+from apetools.parameters.iperf_common_parameters import IperfExtraParameters
 
 
 class IperfCommandBuilder(object):
@@ -22,6 +24,7 @@ class IperfCommandBuilder(object):
         self._server_command = None
         self._filename = None
         self._output = None
+        self._columns = None
         return
 
     @property
@@ -53,6 +56,20 @@ class IperfCommandBuilder(object):
             self._parameters = IperfParametersBuilder(self.config_map)
         return self._parameters
 
+    @property
+    def columns(self):
+        """
+        :return: ColumnStore for the parsed bandwidths (None unless `columnar` is set)
+        """
+        if self._columns is None:
+            columnar = self.config_map.get_boolean(ConfigOptions.iperf_section,
+                                                   IperfExtraParameters.columnar,
+                                                   default=False,
+                                                   optional=True)
+            if columnar:
+                self._columns = ColumnStore()
+        return self._columns
+
     @property
     def client_command(self):
         """
@@ -62,7 +79,8 @@ class IperfCommandBuilder(object):
             self._client_command = IperfCommand(parameters=self.parameters.client_parameters,
                                                 output=self.output,
                                                 role=IperfCommandEnum.client,
-                                                base_filename=self.filename)
+                                                base_filename=self.filename,
+                                                columns=self.columns)
         return self._client_command
 
     @property
@@ -74,6 +92,7 @@ class IperfCommandBuilder(object):
             self._server_command = IperfCommand(parameters=self.parameters.server_parameters,
                                                 output=self.output,
                                                 role=IperfCommandEnum.server,
-                                                base_filename=self.filename)
+                                                base_filename=self.filename,
+                                                columns=self.columns)
         return self._server_command
 # end class IperfCommandBuilder
@@ -5,6 +5,8 @@ from apetools.tools import iperftest
 from iperfcommandbuilder import IperfCommandBuilder 
 from apetools.commons import errors
 from apetools.commons import enumerations
+from apetools.lexicographers.config_options import ConfigOptions
+from apetools.parameters.iperf_common_parameters import IperfExtraParameters
 
 
 IperfDirection = enumerations.IperfDirection
@@ -32,8 +34,21 @@ class IperfTestBuilder(BaseClass):
         self.events = events
         self._test = None
         self._commands = None
+        self._persistent = None
         return
 
+    @property
+    def persistent(self):
+        """
+        :return: True if the iperf servers should be kept running between tests (default False)
+        """
+        if self._persistent is None:
+            self._persistent = self.config_map.get_boolean(ConfigOptions.iperf_section,
+                                                           IperfExtraParameters.persistent,
+                                                           default=False,
+                                                           optional=True)
+        return self._persistent
+
     @property
     def commands(self):
         """
@@ -51,7 +66,8 @@ class IperfTestBuilder(BaseClass):
         if self._test is None:
             self._test = iperftest.IperfTest(receiver_command=self.commands.server_command,
                                              sender_command=self.commands.client_command,
-                                             wait_events=self.events)
+                                             wait_events=self.events,
+                                             persistent=self.persistent)
         return self._test
         
 # end class IperfTestBuilder
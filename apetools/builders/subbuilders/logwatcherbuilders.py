@@ -1,6 +1,7 @@
 
 from apetools.baseclass import BaseClass
 from apetools.commons.errors import ConfigurationError
+from apetools.commons.storageoutput import APPEND, DurabilityPolicy
 
 from apetools.watchers.logcatwatcher import LogcatWatcher
 from apetools.watchers.logwatcher import LogWatcher
@@ -75,7 +76,8 @@ class BaseWatcherBuilder(BaseClass):
 
             self._output_file = self.output.open("{0}.log".format(prefix),
                                                  subdir="logs",
-                                                 mode=APPEND)
+                                                 mode=APPEND,
+                                                 durability=DurabilityPolicy.group)
         return self._output_file
 
 # end class BaseWatcherBuilder
@@ -189,6 +191,7 @@ class PingWatcherBuilder(BaseWatcherBuilder):
         super(PingWatcherBuilder, self).__init__(*args, **kwargs)
         self._target = None
         self._threshold = None
+        self._interval = None
         return
 
     @property
@@ -215,6 +218,16 @@ class PingWatcherBuilder(BaseWatcherBuilder):
             else:
                 self._threshold = 5
         return self._threshold
+
+    @property
+    def interval(self):
+        """
+        Seconds between streamed pings (None to ping once a second)
+        """
+        if self._interval is None:
+            if hasattr(self.parameters, 'interval'):
+                self._interval = float(self.parameters.interval)
+        return self._interval
     
     @property
     def product(self):
@@ -222,10 +235,18 @@ class PingWatcherBuilder(BaseWatcherBuilder):
         :return: logcatwatcher
         """
         if self._product is None:
-            self._product = PingWatcher(target=self.target,
-                                        threshold=self.threshold,
-                                        output=self.output_file,
-                                        connection=self.node.connection)
+            if self.interval is None:
+                self._product = PingWatcher(target=self.target,
+                                            threshold=self.threshold,
+                                            output=self.output_file,
+                                            connection=self.node.connection)
+            else:
+                self._product = PingWatcher(target=self.target,
+                                            threshold=self.threshold,
+                                            output=self.output_file,
+                                            connection=self.node.connection,
+                                            interval=self.interval,
+                                            streaming=True)
         return self._product
     
 # end class PingWatcherBuilder
@@ -0,0 +1,202 @@
+
+#python
+from collections import namedtuple
+from Queue import Queue, Empty
+import threading
+from time import time
+
+#apetools
+from apetools.baseclass import BaseClass
+from apetools.commons.errors import ConnectionError
+from apetools.threads.threads import Thread
+from noderegistry import registry, NODE
+
+
+WORKERS = 8
+NODE_TIMEOUT = 120
+WAIT_TICK = 0.1
+
+
+NodeTiming = namedtuple("NodeTiming", "name wait build warm total error".split())
+
+
+class NodeBringUp(BaseClass):
+    """
+    Builds and warms nodes on a pool of threads
+    """
+    def __init__(self, build, registry=registry, purpose=NODE, workers=WORKERS,
+                 timeout=NODE_TIMEOUT):
+        """
+        :param:
+
+         - `build`: callable that builds a node from its parameters
+         - `registry`: the NodeRegistry to get the nodes from
+         - `purpose`: registry purpose (to keep separate sets of the same nodes)
+         - `workers`: most nodes to bring up at once
+         - `timeout`: seconds a node can take once its bring-up has started
+        """
+        super(NodeBringUp, self).__init__()
+        self.build = build
+        self.registry = registry
+        self.purpose = purpose
+        self.workers = workers
+        self.timeout = timeout
+        self.condition = threading.Condition(threading.RLock())
+        self.queue = Queue()
+        self.names = []
+        self.started = {}
+        self.nodes = {}
+        self.timings = {}
+        self.threads = []
+        self.start_time = None
+        self.released = False
+        return
+
+    def start(self, node_tuples):
+        """
+        Queues the nodes and starts the workers (doesn't wait for them)
+
+        :param:
+
+         - `node_tuples`: dictionary of name:node-parameters
+        """
+        self.start_time = time()
+        self.names = sorted(node_tuples)
+        for name in self.names:
+            self.queue.put((name, node_tuples[name]))
+        for worker in range(min(self.workers, len(self.names))):
+            self.add_worker()
+        return
+
+    def add_worker(self):
+        """
+        :postcondition: another worker thread is taking nodes from the queue
+        """
+        name = "NodeBringUp {0}".format(len(self.threads))
+        self.threads.append(Thread(target=self.work, name=name))
+        return
+
+    def work(self):
+        """
+        Brings up nodes until the queue is empty
+        """
+        while True:
+            try:
+                name, parameters = self.queue.get_nowait()
+            except Empty:
+                return
+            self.bring_up(name, parameters)
+        return
+
+    def bring_up(self, name, parameters):
+        """
+        Builds and warms one node and records its timing
+
+        :param:
+
+         - `name`: the node's name
+         - `parameters`: the node's parameters
+        """
+        started = time()
+        with self.condition:
+            self.started[name] = started
+        node, error = None, None
+        built = warmed = started
+        try:
+            build = lambda: self.build(parameters)
+            node = self.registry.acquire(parameters, build, purpose=self.purpose)
+            built = time()
+            warning = self.warm(name, node)
+            warmed = time()
+        except Exception as error:
+            self.logger.error("Unable to build {0}: {1}".format(name, error))
+            error = "{0}: {1}".format(type(error).__name__, error)
+        else:
+            if warning is not None:
+                error = warning
+        finished = time()
+        with self.condition:
+            if name in self.timings or self.released:
+                self.logger.warning("{0} came up after it was given up on ({1:.1f} seconds)".format(name,
+                                                                                                finished - started))
+                if node is not None:
+                    self.registry.release(node)
+                return
+            if node is not None:
+                self.nodes[name] = node
+            self.timings[name] = NodeTiming(name=name,
+                                            wait=started - self.start_time,
+                                            build=built - started,
+                                            warm=warmed - built,
+                                            total=finished - self.start_time,
+                                            error=error)
+            self.condition.notify_all()
+        return
+
+    def warm(self, name, node):
+        """
+        Checks the node's connection and queries its address
+
+        :param:
+
+         - `name`: the node's name
+         - `node`: a built device
+
+        :return: a warning string if the node didn't respond (None otherwise)
+        """
+        if not self.registry.is_healthy(node):
+            return "the connection didn't respond"
+        try:
+            self.logger.debug("{0} address: {1}".format(name, node.address))
+        except Exception as error:
+            self.logger.debug(error)
+            return "unable to get the address ({0})".format(error)
+        return
+
+    def wait(self):
+        """
+        Waits for all the nodes to come up (or time out)
+
+        :return: dictionary of name:node
+        :raise: ConnectionError listing the nodes that failed or timed out
+        """
+        with self.condition:
+            while len(self.timings) < len(self.names):
+                now = time()
+                for name, started in self.started.items():
+                    if name not in self.timings and now - started > self.timeout:
+                        self.timings[name] = NodeTiming(name=name,
+                                                        wait=started - self.start_time,
+                                                        build=now - started,
+                                                        warm=0,
+                                                        total=now - self.start_time,
+                                                        error="timed out after {0} seconds".format(self.timeout))
+                        if not self.queue.empty():
+                            self.add_worker()
+                self.condition.wait(WAIT_TICK)
+            failed = []
+            for name in self.names:
+                timing = self.timings[name]
+                self.logger.info("{0}: waited {1:.2f}, built {2:.2f}, warmed {3:.2f}, total {4:.2f} seconds".format(*timing))
+                if timing.error is None:
+                    continue
+                if name in self.nodes:
+                    self.logger.warning("{0} was built but {1}".format(name, timing.error))
+                else:
+                    failed.append("{0} ({1})".format(name, timing.error))
+            if failed:
+                self.release()
+                raise ConnectionError("Unable to bring up nodes: {0}".format(", ".join(failed)))
+            return self.nodes
+
+    def release(self):
+        """
+        :postcondition: the nodes that came up (and any that come up later) are released to the registry
+        """
+        with self.condition:
+            if not self.released:
+                self.released = True
+                for node in self.nodes.itervalues():
+                    self.registry.release(node)
+        return
+# end class NodeBringUp
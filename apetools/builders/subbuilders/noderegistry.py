@@ -0,0 +1,210 @@
+
+# python standard library
+import threading
+from time import time
+
+# apetools
+from apetools.baseclass import BaseClass
+from apetools.commons.errors import ConnectionError, CommandError
+from apetools.connections.sshconnection import SSHConnection
+
+
+IDLE_TIMEOUT = 300
+CHECK_AFTER = 5
+HEALTH_TOKEN = "apetools_node_check"
+NODE = 'node'
+THREAD = 'thread'
+
+
+def registry_key(parameters, role=None, purpose=NODE):
+    """
+    :param:
+
+     - `parameters`: named tuple of node parameters
+     - `role`: the node's role
+     - `purpose`: string to separate sets of nodes built from the same parameters
+
+    :return: hashable key for the node (or None if the parameters can't be hashed)
+    """
+    try:
+        fields = tuple(sorted(zip(parameters._fields, parameters)))
+        key = (purpose, role, fields)
+        hash(key)
+    except (AttributeError, TypeError):
+        return
+    return key
+
+
+class RegistryEntry(object):
+    """
+    A node and its reference count
+    """
+    def __init__(self, key, node):
+        """
+        :param:
+
+         - `key`: the node's registry key
+         - `node`: the built device
+        """
+        self.key = key
+        self.node = node
+        self.references = 0
+        self.released = time()
+        self.checking = False
+        return
+
+    @property
+    def idle(self):
+        """
+        :return: seconds since the last release (0 if in use)
+        """
+        if self.references:
+            return 0
+        return time() - self.released
+# end class RegistryEntry
+
+
+class NodeRegistry(BaseClass):
+    """
+    A process-wide store of built nodes
+    """
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, check_after=CHECK_AFTER):
+        """
+        :param:
+
+         - `idle_timeout`: seconds a released node is kept
+         - `check_after`: seconds a node can be idle before it's health-checked
+        """
+        super(NodeRegistry, self).__init__()
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self.entries = {}
+        self.lock = threading.Condition(threading.RLock())
+        return
+
+    def acquire(self, parameters, build, role=None, purpose=NODE):
+        """
+        :param:
+
+         - `parameters`: named tuple of node parameters
+         - `build`: callable that builds the node if the registry doesn't have it
+         - `role`: the node's role
+         - `purpose`: string to separate sets of nodes built from the same parameters
+
+        :return: the registered (or newly built) node
+        """
+        key = registry_key(parameters, role, purpose)
+        if key is None:
+            return build()
+        with self.lock:
+            self.evict()
+            entry = self.entries.get(key)
+            while entry is not None and entry.checking:
+                # wait for the other caller's health check
+                self.lock.wait()
+                entry = self.entries.get(key)
+            if entry is not None:
+                check = entry.idle > self.check_after
+                entry.references += 1
+                entry.checking = check
+        if entry is not None:
+            if not check:
+                self.logger.debug("Re-using node: {0}".format(entry.node))
+                return entry.node
+            healthy = False
+            try:
+                healthy = self.is_healthy(entry.node)
+            finally:
+                with self.lock:
+                    entry.checking = False
+                    if not healthy:
+                        # nobody else took it while it was being checked
+                        entry.references -= 1
+                        self.discard(entry)
+                    self.lock.notify_all()
+            if healthy:
+                self.logger.debug("Re-using node: {0}".format(entry.node))
+                return entry.node
+            self.logger.info("Rebuilding unhealthy node: {0}".format(entry.node))
+        node = build()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = RegistryEntry(key, node)
+                self.entries[key] = entry
+            entry.references += 1
+            return entry.node
+
+    def release(self, node):
+        """
+        Decrements the node's reference count (starting its idle time when it reaches 0)
+
+        :param:
+
+         - `node`: a node returned by `acquire`
+        """
+        with self.lock:
+            for entry in self.entries.itervalues():
+                if entry.node is node:
+                    entry.references = max(0, entry.references - 1)
+                    if not entry.references:
+                        entry.released = time()
+                    break
+        return
+
+    def is_healthy(self, node):
+        """
+        :param:
+
+         - `node`: a device
+
+        :return: True if the node's connection responds
+        """
+        connection = getattr(node, 'connection', None)
+        if connection is None:
+            return True
+        try:
+            output, error = connection.echo(HEALTH_TOKEN)
+            return any(HEALTH_TOKEN in line for line in output)
+        except (ConnectionError, CommandError, IOError, OSError) as error:
+            self.logger.debug(error)
+        return False
+
+    def evict(self):
+        """
+        :postcondition: entries idle for more than idle_timeout are discarded
+        """
+        with self.lock:
+            for entry in self.entries.values():
+                if entry.idle > self.idle_timeout:
+                    self.logger.debug("Evicting idle node: {0}".format(entry.node))
+                    self.discard(entry)
+        return
+
+    def discard(self, entry):
+        """
+        :param:
+
+         - `entry`: RegistryEntry to remove
+
+        :postcondition: entry removed, its ssh-pool (if any) closed
+        """
+        with self.lock:
+            if self.entries.get(entry.key) is entry:
+                del self.entries[entry.key]
+            connection = getattr(entry.node, 'connection', None)
+            if isinstance(connection, SSHConnection):
+                connection.client.close()
+        return
+
+    def clear(self):
+        """
+        :postcondition: all the entries are discarded
+        """
+        with self.lock:
+            for entry in self.entries.values():
+                self.discard(entry)
+        return
+# end class NodeRegistry
+
+registry = NodeRegistry()
@@ -7,6 +7,8 @@ from apetools.baseclass import BaseClass
 from apetools.lexicographers.config_options import ConfigOptions
 from apetools.devices.dummydevice import DummyDevice
 from nodebuilder import NodeBuilder
+from noderegistry import registry, NODE
+from nodebringup import NodeBringUp, WORKERS, NODE_TIMEOUT
 
 
 class NodeTypes(object):
@@ -19,35 +21,83 @@ class NodesBuilder(BaseClass):
     """
     A generic builder of id:device dictionaries
     """
-    def __init__(self, builder, config_map):
+    def __init__(self, builder, config_map, purpose=NODE, registry=registry,
+                 workers=WORKERS, timeout=NODE_TIMEOUT):
         """
         :param:
 
          - `builder`: the master builder
          - `config_map`: A configuration map to get the parameters from
+         - `purpose`: registry purpose (to keep separate sets of the same nodes)
+         - `registry`: the NodeRegistry to get the nodes from
+         - `workers`: most nodes to bring up at once
+         - `timeout`: seconds each node can take to come up
         """
         super(NodesBuilder, self).__init__()
         self.builder = builder
         self.config_map = config_map
+        self.purpose = purpose
+        self.registry = registry
+        self.workers = workers
+        self.timeout = timeout
+        self.bring_up = None
         self._nodes = None
         return
 
+    def start(self):
+        """
+        Starts bringing up the nodes (without waiting for them)
+        """
+        if self._nodes is not None or self.bring_up is not None:
+            return
+        nodes = self.config_map.options(ConfigOptions.nodes_section)
+        try:
+            config_tuples = [self.config_map.get_namedtuple(ConfigOptions.nodes_section,node, converter=lambda x: x)
+                             for node in nodes]
+            node_tuples = dict(zip(nodes, config_tuples))
+        except TypeError as error:
+            self.logger.debug(error)
+            self._nodes = {NodeTypes.dummy: DummyDevice()}
+            return
+        self.bring_up = NodeBringUp(build=lambda parameters: NodeBuilder(parameters=parameters).node,
+                                    registry=self.registry, purpose=self.purpose,
+                                    workers=self.workers, timeout=self.timeout)
+        self.bring_up.start(node_tuples)
+        return
+
     @property
     def nodes(self):
         """
         :return: dictionary of id:device nodes
+        :raise: ConnectionError if any of the nodes didn't come up
         """
         if self._nodes is None:
-            nodes = self.config_map.options(ConfigOptions.nodes_section)
-            self._nodes = {}
-            try:
-                config_tuples = [self.config_map.get_namedtuple(ConfigOptions.nodes_section,node, converter=lambda x: x)
-                               for node in nodes]
-                node_tuples = dict(zip(nodes, config_tuples))
-                for node, parameters in node_tuples.items():
-                    self._nodes[node] = NodeBuilder(parameters=parameters).node
-            except TypeError as error:
-                self.logger.debug(error)
-                self._nodes[NodeTypes.dummy] = DummyDevice()        
+            self.start()
+        if self._nodes is None:
+            self._nodes = self.bring_up.wait()
         return self._nodes
+
+    @property
+    def timings(self):
+        """
+        :return: list of NodeTiming (empty if the nodes weren't brought up)
+        """
+        if self.bring_up is None:
+            return []
+        with self.bring_up.condition:
+            return [self.bring_up.timings[name] for name in self.bring_up.names
+                    if name in self.bring_up.timings]
+
+    def release(self):
+        """
+        :postcondition: the nodes are released to the registry and self._nodes is None
+        """
+        if self.bring_up is not None:
+            self.bring_up.release()
+        elif self._nodes is not None:
+            for node in self._nodes.itervalues():
+                self.registry.release(node)
+        self._nodes = None
+        self.bring_up = None
+        return
 # end class NodesBuilder
@@ -1,11 +1,13 @@
 
 from apetools.baseclass import BaseClass
 from apetools.commons.errors import ConfigurationError
-from apetools.commons.storageoutput import APPEND
+from apetools.commons.storageoutput import APPEND, DurabilityPolicy
+from apetools.lexicographers.configurationmap import BooleanValues
 from apetools.watchers.rssipoller import RssiPoller
 from apetools.watchers.devicepoller import DevicePoller
 from apetools.watchers.procpollster import ProcnetdevPollster
 from apetools.watchers.procpollster import CpuPollster
+from apetools.watchers.pollingsession import session_for
 
 
 class PollerBuilderError(ConfigurationError):
@@ -43,6 +45,7 @@ class BasePollerBuilder(BaseClass):
         self._subdir = None
         self._interval = None
         self._use_header = None
+        self._session = None
         return
 
     @property
@@ -93,7 +96,8 @@ class BasePollerBuilder(BaseClass):
         if self._output_file is None:
             self._output_file = self.output.open(self.filename,
                                                  subdir=self.subdir,
-                                                 mode=APPEND)
+                                                 mode=APPEND,
+                                                 durability=DurabilityPolicy.group)
         return self._output_file
 
     @property
@@ -107,6 +111,16 @@ class BasePollerBuilder(BaseClass):
             else:
                 self._interval = 1
         return self._interval
+
+    @property
+    def session(self):
+        """
+        :return: shared PollingSession for the node if the `session` parameter is true, else None
+        """
+        if self._session is None:
+            if getattr(self.parameters, 'session', 'false').lower() in BooleanValues.true:
+                self._session = session_for(self.node.connection, self.interval)
+        return self._session
 # end class BasePollerBuilder
 
 
@@ -131,7 +145,8 @@ class ProcnetdevPollsterBuilder(BasePollerBuilder):
                                                output=self.output_file,
                                                interval=self.interval,
                                                interface=self.node.interface,
-                                               use_header=use_header)
+                                               use_header=use_header,
+                                               session=self.session)
         return self._product
 # end class ProcdevnetPollsterBuilder
 
@@ -213,6 +228,7 @@ class CpuPollsterBuilder(BasePollerBuilder):
             self._product = CpuPollster(device=self.node,
                                         output=self.output_file,
                                         interval=self.interval,
-                                        use_header=use_header)
+                                        use_header=use_header,
+                                        session=self.session)
         return self._product
 # end class CpuPollsterBuilder
@@ -0,0 +1,129 @@
+
+from basetoolbuilder import BaseToolBuilder, Parameters
+from apetools.tools.timetofailure import TimeToFailure
+from apetools.lexicographers.config_options import ConfigOptions
+
+
+TABLE_FILE = 'time_to_failure.csv'
+SUMMARY_FILE = 'time_to_failure_summary.csv'
+
+
+class TimeToFailureBuilderEnum(object):
+    __slots__ = ()
+    nodes = 'nodes'
+# end class TimeToFailureBuilderEnum
+
+
+class TimeToFailureBuilder(BaseToolBuilder):
+    """
+    A builder of TTF Objects
+    """
+    def __init__(self, *args, **kwargs):
+        super(TimeToFailureBuilder, self).__init__(*args, **kwargs)
+        self._section = None
+        self._target = None
+        self._timeout = None
+        self._threshold = None
+        self._interval = None
+        self._fan_out = None
+        return
+
+    @property
+    def section(self):
+        """
+        :return: the name of the section in the config_file
+        """
+        if self._section is None:
+            self._section = ConfigOptions.time_to_failure_section
+        return self._section
+
+    @property
+    def timeout(self):
+        """
+        :return: the total time to try and ping
+        """
+        if self._timeout is None:
+            self._timeout = self.config_map.get_int(self.section,
+                                                    ConfigOptions.timeout_option,
+                                                    optional=True,
+                                                    default=300)
+        return self._timeout
+
+    @property
+    def threshold(self):
+        """
+        :return: the number of consecutive failed pings to count as a failure
+        """
+        if self._threshold is None:
+            self._threshold = self.config_map.get_int(self.section,
+                                                      ConfigOptions.threshold_option,
+                                                      optional=True,
+                                                      default=5)
+        return self._threshold
+
+    @property
+    def interval(self):
+        """
+        :return: seconds between streamed pings (None to ping once per call)
+        """
+        if self._interval is None:
+            self._interval = self.config_map.get_float(self.section,
+                                                       ConfigOptions.interval_option,
+                                                       optional=True,
+                                                       default=None)
+        return self._interval
+
+    @property
+    def fan_out(self):
+        """
+        :return: True if all the nodes should be measured at once
+        """
+        if self._fan_out is None:
+            self._fan_out = self.config_map.get_boolean(self.section,
+                                                        ConfigOptions.fan_out_option,
+                                                        optional=True,
+                                                        default=False)
+        return self._fan_out
+
+    @property
+    def target(self):
+        """
+        :return: the test-pc's address
+        """
+        if self._target is None:
+            self._target = self.master.tpc_device.address
+        return self._target
+
+    @property
+    def product(self):
+        """
+        :return: a TTF
+        """
+        if self._product is None:
+            table = summary = None
+            if self.fan_out:
+                table = self.master.storage.open(TABLE_FILE)
+                summary = self.master.storage.open(SUMMARY_FILE)
+            self._product = TimeToFailure(target=self.target,
+                                          timeout=self.timeout,
+                                          threshold=self.threshold,
+                                          interval=self.interval,
+                                          nodes=self.master.nodes,
+                                          fan_out=self.fan_out,
+                                          table=table,
+                                          summary=summary)
+        return self._product
+
+    @property
+    def parameters(self):
+        """
+        :return: list of namedtuples with `name` and `parameters` attributes
+        """
+        if self._parameters is None:
+            if not self.fan_out and not any([p.name == TimeToFailureBuilderEnum.nodes
+                                             for p in self.previous_parameters]):
+                self.previous_parameters.append(Parameters(name=TimeToFailureBuilderEnum.nodes,
+                                                           parameters=self.master.nodes.keys()))
+            self._parameters = self.previous_parameters
+        return self._parameters
+# end TimeToFailureBuilder
@@ -4,12 +4,17 @@ from apetools.tools.timetorecovery import TimeToRecovery
 from apetools.lexicographers.config_options import ConfigOptions
 
 
+TABLE_FILE = 'time_to_recovery.csv'
+SUMMARY_FILE = 'time_to_recovery_summary.csv'
+
+
 class TimeToRecoveryBuilderEnum(object):
     __slots__ = ()
     nodes = 'nodes'
     target = 'target'
     timeout = "timeout"
     threshold = "threshold"
+    interval = "interval"
 # end class TimeToRecoveryBuilderEnum
 
 
@@ -23,6 +28,8 @@ class TimeToRecoveryBuilder(BaseToolBuilder):
         self._ttr = None
         self._timeout = None
         self._threshold = None
+        self._interval = None
+        self._fan_out = None
         return
 
     @property
@@ -59,6 +66,30 @@ class TimeToRecoveryBuilder(BaseToolBuilder):
         return self._threshold
     
 
+    @property
+    def interval(self):
+        """
+        :return: seconds between streamed pings (None to ping once per call)
+        """
+        if self._interval is None:
+            self._interval = self.config_map.get_float(ConfigOptions.time_to_recovery_section,
+                                                       ConfigOptions.interval_option,
+                                                       optional=True,
+                                                       default=None)
+        return self._interval
+
+    @property
+    def fan_out(self):
+        """
+        :return: True if all the nodes should be measured at once
+        """
+        if self._fan_out is None:
+            self._fan_out = self.config_map.get_boolean(ConfigOptions.time_to_recovery_section,
+                                                        ConfigOptions.fan_out_option,
+                                                        optional=True,
+                                                        default=False)
+        return self._fan_out
+
     @property
     def target(self):
         """
@@ -83,7 +114,13 @@ class TimeToRecoveryBuilder(BaseToolBuilder):
         :return: a TTR
         """
         if self._product is None:
-            self._product = TimeToRecovery(self.master.nodes)
+            if self.fan_out:
+                storage = self.master.storage
+                self._product = TimeToRecovery(self.master.nodes, fan_out=True,
+                                               table=storage.open(TABLE_FILE),
+                                               summary=storage.open(SUMMARY_FILE))
+            else:
+                self._product = TimeToRecovery(self.master.nodes)
         return self._product
 
     @property
@@ -92,8 +129,9 @@ class TimeToRecoveryBuilder(BaseToolBuilder):
         :return: namedtuple with `name` and `parameters` attribute
         """
         if self._parameters is None:
-            self.add_parameter(TimeToRecoveryBuilderEnum.nodes,
-                               self.master.nodes.keys())
+            if not self.fan_out:
+                self.add_parameter(TimeToRecoveryBuilderEnum.nodes,
+                                   self.master.nodes.keys())
 
             self.add_parameter(TimeToRecoveryBuilderEnum.target,
                                [self.target])
@@ -101,6 +139,8 @@ class TimeToRecoveryBuilder(BaseToolBuilder):
                                [self.threshold])
             self.add_parameter(TimeToRecoveryBuilderEnum.timeout,
                                [self.timeout])
+            self.add_parameter(TimeToRecoveryBuilderEnum.interval,
+                               [self.interval])
             self._parameters = self.previous_parameters
         return self._parameters
 
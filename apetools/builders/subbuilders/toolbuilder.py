@@ -4,6 +4,7 @@ class ToolBuilderEnum(object):
     ners = "ners"
     apconnect = "apconnect"
     timetorecovery = "timetorecovery"
+    timetofailure = "timetofailure"
     dumpdevicestatebuilder = "dumpdevicestatebuilder"
     iperf = "iperf"
     rotate = 'rotate'
@@ -24,6 +25,7 @@ class ToolBuilder(object):
         self._ners = None
         self._apconnect = None
         self._timetorecovery = None
+        self._timetofailure = None
         self._dumpdevicestate = None
         self._iperf = None
         self._rotate = None
@@ -111,6 +113,11 @@ class ToolBuilder(object):
         from timetorecoverybuilder import TimeToRecoveryBuilder
         return TimeToRecoveryBuilder
 
+    @property
+    def timetofailure(self):
+        from timetofailurebuilder import TimeToFailureBuilder
+        return TimeToFailureBuilder
+
     @property
     def dumpdevicestate(self):
         from dumpdevicestatebuilder import DumpDeviceStateBuilder
@@ -5,9 +5,14 @@ from logwatcherbuilders import LogcatWatcherBuilder, LogWatcherBuilder, LogFollo
 from pollerbuilders import RssiPollerBuilder, DevicePollerBuilder, ProcnetdevPollsterBuilder, CpuPollsterBuilder
 from fileexpressionbuilders import BatteryWatcherBuilder
 from apetools.watchers import thewatcher
+from apetools.watchers.samplingscheduler import SampleTable
 from apetools.lexicographers.config_options import ConfigOptions
 
 
+TABLE_FILENAME = "aligned_samples.csv"
+TABLE_SUBDIR = "logs"
+
+
 class WatcherTypes(object):
     """
     The names of the valid watcher types
@@ -51,6 +56,7 @@ class WatcherBuilder(BaseToolBuilder):
         super(WatcherBuilder, self).__init__(*args, **kwargs)
         self._watchers = None
         self._watcher_ids = None
+        self._table = None
         return
 
     @property
@@ -77,15 +83,29 @@ class WatcherBuilder(BaseToolBuilder):
                 for name, node in self.master.thread_nodes.iteritems():
                     watcher = builder(node=node, parameters=parameters,
                                       output=self.master.storage, name=name).product
+                    if hasattr(watcher, 'label'):
+                        watcher.label = "{0}_{1}".format(parameters.type, name)
                     self._watchers.append(watcher)
                 if parameters.type == WatcherTypes.procnetdev:
                     watcher = builder(node=self.master.tpc_device,
                                       parameters=parameters,
                                       output=self.master.storage,
                                       name='tpc').product
+                    watcher.label = "{0}_tpc".format(parameters.type)
                     self._watchers.append(watcher)
         return self._watchers
 
+    @property
+    def table(self):
+        """
+        :return: SampleTable for the watchers' aligned samples (None if none of them have columns)
+        """
+        if self._table is None:
+            if any(getattr(watcher, 'columns', None) for watcher in self.watchers):
+                self._table = SampleTable(self.master.storage.open(TABLE_FILENAME,
+                                                                   subdir=TABLE_SUBDIR))
+        return self._table
+
     @property
     def product(self):
         """
@@ -93,7 +113,8 @@ class WatcherBuilder(BaseToolBuilder):
         :return: A master watcher
         """
         if self._product is None:
-            self._product = thewatcher.TheWatcher(watchers=self.watchers)
+            self._product = thewatcher.TheWatcher(watchers=self.watchers,
+                                                  table=self.table)
         return self._product
 
     @property
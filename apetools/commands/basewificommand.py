@@ -1,25 +1,78 @@
 
 #python libraries
-from abc import ABCMeta, abstractproperty
+from abc import ABCMeta, abstractproperty, abstractmethod
+from collections import namedtuple
+import threading
+from time import time
 
 from apetools.baseclass import BaseClass
 from apetools.commons import errors
 
+
 MAC_UNAVAILABLE = "MAC Unavailable (use `netcfg`)"
 CommandError = errors.CommandError
+NA = 'NA'
+TTL = 0.1
+
+
+class WifiSnapshot(namedtuple("WifiSnapshot", "ssid bssid channel rssi noise bitrate mac_address ip_address state".split())):
+    """
+    The wifi information from one query of the device
+    """
+    __slots__ = ()
+# end class WifiSnapshot
+
+
+def snapshot(**fields):
+    """
+    :param:
+
+     - `fields`: the fields the tool reported
+
+    :return: WifiSnapshot with the missing fields set to NA
+    """
+    values = dict((field, NA) for field in WifiSnapshot._fields)
+    values.update((field, value) for field, value in fields.iteritems()
+                  if value is not None)
+    return WifiSnapshot(**values)
+
+
+def parse(lines, expressions, fields=None):
+    """
+    :param:
+
+     - `lines`: lines of output from the device
+     - `expressions`: (field, compiled expression with a group named field) pairs
+     - `fields`: dictionary to add the fields to
+
+    :return: dictionary of field:value (the first match for each field)
+    """
+    if fields is None:
+        fields = {}
+    for line in lines:
+        for name, expression in expressions:
+            if name in fields:
+                continue
+            match = expression.search(line)
+            if match:
+                fields[name] = match.group(name).strip()
+    return fields
+
 
 class BaseWifiCommand(BaseClass):
     """
     The Base Wifi query command
     """
     __metaclass__ = ABCMeta
-    def __init__(self, connection, interface=None, operating_system=None):
+    def __init__(self, connection, interface=None, operating_system=None,
+                 ttl=TTL):
         """
         :param:
 
          - `connection`: A connection to the device
          - `interface`: The interface to check
          - `operating_system` : The operating system on the devices.
+         - `ttl`: seconds to re-use a snapshot
         """
         super(BaseWifiCommand, self).__init__()
         self._logger = None
@@ -33,6 +86,10 @@ class BaseWifiCommand(BaseClass):
         self._mac_address = None
         self._ip_address = None
         self._bitrate = None
+        self.ttl = ttl
+        self._snapshot = None
+        self.snapshot_time = None
+        self.snapshot_lock = threading.Lock()
         return
 
     @property
@@ -43,6 +100,35 @@ class BaseWifiCommand(BaseClass):
         if self._operating_system is None:
             self._operating_system = self.connection.operating_system
         return self._operating_system
+
+    @property
+    def snapshot(self):
+        """
+        :return: WifiSnapshot (re-queried if older than the ttl)
+        """
+        with self.snapshot_lock:
+            if (self._snapshot is None or
+                time() - self.snapshot_time >= self.ttl):
+                self._snapshot = self.query()
+                self.snapshot_time = time()
+            return self._snapshot
+
+    def expire(self):
+        """
+        :postcondition: the next property read queries the device
+        """
+        with self.snapshot_lock:
+            self._snapshot = None
+        return
+
+    @abstractmethod
+    def query(self):
+        """
+        Queries the device for all its wifi information at once
+
+        :return: WifiSnapshot
+        """
+        return
     
     @abstractproperty
     def interface(self):
@@ -78,4 +164,4 @@ class BaseWifiCommand(BaseClass):
     def __str__(self):
         return "({iface}) RSSI: {rssi}".format(iface=self.interface,
                                                rssi=self.rssi)
-# end class BaseWifiCommand
\ No newline at end of file
+# end class BaseWifiCommand
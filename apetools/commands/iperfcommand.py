@@ -38,13 +38,15 @@ class IperfCommandEnum(object):
     udp = 'udp'
     path = 'path'
     iperf = 'iperf'
+    listening = 'Server listening'
 # end IperfCommandEnum
 
 class IperfCommand(BaseThreadClass):
     """
     An Iperf Command executes iperf commands
     """
-    def __init__(self, parameters, output, role, base_filename="", subdirectory="raw_iperf"):
+    def __init__(self, parameters, output, role, base_filename="", subdirectory="raw_iperf",
+                 columns=None):
         """
         :param:
 
@@ -53,9 +55,11 @@ class IperfCommand(BaseThreadClass):
          - `role`: client or server
          - `base_filename`: string to add to all filenames
          - `subdirectory`: A folder to put the iperf files intn
+         - `columns`: a ColumnStore to also send the parsed bandwidths to
         """
         super(IperfCommand, self).__init__()
         self.role = role
+        self.columns = columns
         self._parameters = None
         self.parameters = parameters
         self._parser  = None
@@ -70,6 +74,7 @@ class IperfCommand(BaseThreadClass):
         self.running = False
         self.stop = False
         self._is_daemon = None
+        self.ready = threading.Event()
         return
 
     def get_output_filename(self):
@@ -120,7 +125,8 @@ class IperfCommand(BaseThreadClass):
             parser = SumParser(threads=threads)
             self._parser = StoragePipe(role=StoragePipeEnum.sink,
                                        transform=parser,
-                add_timestamp=True)            
+                                       add_timestamp=True,
+                                       columns=self.columns)
         return self._parser
     
     @property
@@ -313,6 +319,8 @@ class IperfCommand(BaseThreadClass):
         :raise: IperfError if runtime is greater than self.parameters.time
         """
         filename = self.filename(filename, device.role)
+        if self.columns is not None:
+            self.parser.node = device.address.strip()
         is_udp = hasattr(self.parameters, IperfCommandEnum.udp)
         self.output.unset_emit()        
         #if not server:
@@ -328,6 +336,7 @@ class IperfCommand(BaseThreadClass):
         #
 
         self.logger.debug("Executing parameters: {0}".format(self.parameters))
+        self.ready.clear()
         
         with device.connection.lock:
             self.logger.debug("Waiting for the connection lock")
@@ -344,6 +353,8 @@ class IperfCommand(BaseThreadClass):
         for line in readoutput.ValidatingOutput(output, self.validate):
             if len(line.strip()):
                 self.logger.debug(line.rstrip(newline))
+            if IperfCommandEnum.listening in line:
+                self.ready.set()
             self.send_line(file_output, line)
             
             if self.now() > abort_time:
@@ -381,6 +392,7 @@ class IperfCommand(BaseThreadClass):
 
         :postcondition: iperf command started in self.thread
         """
+        self.ready.clear()
         if self.parameters.daemon is not None:
             run_method = self.run_daemon
         else:
@@ -2,36 +2,44 @@
 #python libraries
 import re
 
-from apetools.baseclass import BaseClass
 from apetools.commons import enumerations
 from apetools.commons import expressions
 from apetools.commons import errors
+from basewificommand import BaseWifiCommand, TTL, snapshot, parse
+
 
 MAC_UNAVAILABLE = "MAC Unavailable (use `netcfg`)"
 CommandError = errors.CommandError
+INTERFACE = re.compile(expressions.IW_INTERFACE)
+MAC_ADDRESS = re.compile(r"addr" + expressions.SPACES + expressions.MAC_ADDRESS)
+
+
+LINK_EXPRESSIONS = (("bssid", re.compile(r"^(Connected to|Station)\s+(?P<bssid>([0-9a-fA-F]{2}:){5}[0-9a-fA-F]{2})")),
+                    ("ssid", re.compile(r"^\s*SSID:\s+(?P<ssid>.*)$")),
+                    ("channel", re.compile(r"^\s*freq:\s+(?P<channel>\d+)")),
+                    ("rssi", re.compile(expressions.IW_RSSI)),
+                    ("bitrate", re.compile(r"^\s*tx bitrate:\s+(?P<bitrate>\d+(\.\d+)?)")))
+STATION_FIELDS = "bssid rssi bitrate".split()
 
-class IwCommand(BaseClass):
+
+class IwCommand(BaseWifiCommand):
     """
     The IwCommand interprets iw
     """
-    def __init__(self, connection, interface=None, operating_system=None):
+    def __init__(self, connection, interface=None, operating_system=None,
+                 ttl=TTL):
         """
         :param:
 
          - `connection`: A connection to the device
          - `interface`: The interface to check
          - `operating_system` : The operating system on the devices.
+         - `ttl`: seconds to re-use a snapshot
         """
-        super(IwCommand, self).__init__()
-        self.connection = connection
-        self._interface = interface
-        self._operating_system = operating_system
-        self._rssi = None
-        self._mac_address = None
-        self._ssid = None
-        self.bssid = ""
-        self._channel = None
-        self.noise = 'NA'
+        super(IwCommand, self).__init__(connection=connection,
+                                        interface=interface,
+                                        operating_system=operating_system,
+                                        ttl=ttl)
         return
 
     @property
@@ -49,39 +57,44 @@ class IwCommand(BaseClass):
         :return: the name of the wireless interface
         """
         if self._interface is None:
-            expression = expressions.IW_INTERFACE
             name = expressions.INTERFACE_NAME
             command = "dev"
-            self._interface = self._match(expression, name, command)
+            self._interface = self._match(INTERFACE, name, command)
         return self._interface
 
+    def query(self):
+        """
+        Reads `iw link` (and `iw station dump` if the signal or bit-rate are missing)
+
+        :return: WifiSnapshot
+        """
+        fields = parse(self.run("dev {i} link".format(i=self.interface)),
+                       LINK_EXPRESSIONS)
+        if not all(name in fields for name in STATION_FIELDS):
+            parse(self.run("dev {i} station dump".format(i=self.interface)),
+                  LINK_EXPRESSIONS, fields)
+        return snapshot(**fields)
+
     @property
     def ssid(self):
         """
         The ssid of the attached ap
         """
-        self.logger.debug('Getting the SSID')
-        name = 'SSID'
+        return self.snapshot.ssid
 
-        expr = expressions.NAMED.format(name=name,
-                                        pattern=expressions.EVERYTHING)
-        expression = 'SSID:' + expressions.SPACES + expr + '$'
-        command = '{i} link'.format(i=self.interface)
-        return self._match(expression, name, command)
+    @property
+    def bssid(self):
+        """
+        :return: the MAC address of the attached ap
+        """
+        return self.snapshot.bssid
     
     @property
     def channel(self):
         """
         The channel of the attached ap (actually frequency right now)
         """
-        self.logger.debug('Getting the channel')
-        name = 'channel'
-
-        expr = expressions.NAMED.format(name=name,
-                                        pattern=expressions.INTEGER)
-        expression = 'freq:' + expressions.SPACES + expr
-        command = '{i} link'.format(i=self.interface)
-        return self._match(expression, name, command)
+        return self.snapshot.channel
     
     @property
     def rssi(self):
@@ -90,10 +103,21 @@ class IwCommand(BaseClass):
         
         :return: The rssi for the interface
         """        
-        expression = expressions.IW_RSSI
-        name = expressions.RSSI_NAME
-        command = "dev {i} link".format(i=self.interface)
-        return self._match(expression, name, command)
+        return self.snapshot.rssi
+
+    @property
+    def noise(self):
+        """
+        :return: NA (iw doesn't report the noise)
+        """
+        return self.snapshot.noise
+
+    @property
+    def bitrate(self):
+        """
+        :return: the transmit bit-rate (MBit/s)
+        """
+        return self.snapshot.bitrate
     
     @property
     def mac_address(self):
@@ -101,45 +125,55 @@ class IwCommand(BaseClass):
         :return: MAC Address of the interface
         """
         if self._mac_address is None:
-            expression = expressions.MAC_ADDRESS
             name = expressions.MAC_ADDRESS_NAME
-            command = "{i} link".format(i=self.expression)
-            self._mac_address = self._match(expression, name, command)
+            command = "dev {i} info".format(i=self.interface)
+            self._mac_address = self._match(MAC_ADDRESS, name, command)
         return self._mac_address
+
+    def run(self, command):
+        """
+        :param:
+
+         - `command`: The command to send to iw
+
+        :return: list of output lines
+        :raise: CommandError if iw reports an error
+        """
+        with self.connection.lock:
+            output, error = self.connection.iw(command)
+        lines = [line for line in output]
+        err = error.read()
+        if len(err):
+            self.logger.error(err)
+            if "No such device" in err:
+                raise CommandError("Unknown Interface: {0}".format(self._interface))
+            raise CommandError(err)
+        return lines
     
     def _match(self, expression, name, command):
         """
         :param:
 
-         - `expression`: The regular expression to match
+         - `expression`: The compiled regular expression to match
          - `name`: The group name to pull the match out of the line
          - `command`: The command to send to iw
          
-        :return: The named-group that matched or None
+        :return: The named-group that matched or ''
         """
-        expression = re.compile(expression)
-        with self.connection.lock:
-            output, error = self.connection.iw(command)
-        for line in output:
+        for line in self.run(command):
             match = expression.search(line)
             if match:
                 return match.group(name)
-        err = error.read()
-        if len(err):
-            self.logger.error(err)
-            if "No such device" in err:
-                raise CommandError("Unknown Interface: {0}".format(self.interface))
-            else:
-                raise CommandError(err)
         return ''
 
     def __str__(self):
         return "({iface}) RSSI: {rssi}".format(iface=self.interface,
                                                rssi=self.rssi)
-# end class IfconfigCommand
+# end class IwCommand
+
 
 if __name__ == "__main__":
     from apetools.connections import adbconnection
     connection = adbconnection.ADBShellConnection()
     iw = IwCommand(connection)
-    print(str(iw))
\ No newline at end of file
+    print(str(iw))
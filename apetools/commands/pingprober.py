@@ -0,0 +1,328 @@
+
+# python standard library
+from collections import namedtuple
+import math
+import Queue
+import re
+import socket
+from time import time
+
+# apetools
+from apetools.baseclass import BaseThreadClass
+from apetools.commons import expressions
+from apetools.commons.enumerations import OperatingSystem
+from apetools.commons.errors import ConfigurationError
+from apetools.threads.threads import Thread
+
+
+INTERVAL = 0.2
+WAIT = 1
+SEGMENT = 1000
+READ_TIMEOUT = 1
+UNKNOWN_HOST = 'unknown host'
+NEWLINE = '\n'
+# 64 bytes from 192.168.20.1: icmp_seq=1 ttl=255 time=207 ms
+# Request timeout for icmp_seq 5
+SEQUENCE = re.compile(r"icmp_seq[=\s](?P<sequence>\d+)")
+LOSSES = ('timed out', 'timeout', 'unreachable', 'no answer')
+PING = re.compile(expressions.PING)
+
+
+class ProberArguments(object):
+    """
+    A holder of the streaming ping arguments
+    """
+    __slots__ = ()
+    arguments = {OperatingSystem.android:' -i {interval} -W 1 -c {count} {target}',
+                 OperatingSystem.linux:' -i {interval} -W 1 -c {count} {target}',
+                 OperatingSystem.windows:'-n {count} -w 1000 {target}',
+                 OperatingSystem.mac:' -i {interval} -c {count} {target}',
+                 OperatingSystem.ios:' -i {interval} -c {count} {target}'}
+    first = {OperatingSystem.mac:0,
+             OperatingSystem.ios:0}
+    fixed_interval = {OperatingSystem.windows:1}
+# end class ProberArguments
+
+
+class ProbeReply(namedtuple("ProbeReply", "sequence sent rtt")):
+    __slots__ = ()
+
+    @property
+    def success(self):
+        """
+        :return: True if the ping was answered
+        """
+        return self.rtt is not None
+
+    def __str__(self):
+        return ",".join(["{f}:{v}".format(f=f,v=getattr(self, f)) for f in self._fields])
+
+
+StreamEvent = namedtuple("StreamEvent", "kind sequence arrival rtt")
+
+class StreamEventEnum(object):
+    __slots__ = ()
+    start = 'start'
+    reply = 'reply'
+    end = 'end'
+# end class StreamEventEnum
+
+
+class PingProber(BaseThreadClass):
+    """
+    A long-running ping whose replies are read as they stream
+    """
+    def __init__(self, connection, target, interval=INTERVAL, wait=WAIT,
+                 segment=SEGMENT):
+        """
+        :param:
+
+         - `connection`: connection to the device to ping from
+         - `target`: address to ping
+         - `interval`: seconds between pings
+         - `wait`: seconds after a ping is sent before it's declared lost
+         - `segment`: pings per process when there's no duration
+        """
+        super(PingProber, self).__init__()
+        self.connection = connection
+        self.target = target
+        self.operating_system = connection.operating_system
+        self.interval = float(ProberArguments.fixed_interval.get(self.operating_system,
+                                                                 interval))
+        self.wait = max(wait, 2 * self.interval)
+        self.segment = segment
+        self.duration = None
+        self.queue = Queue.Queue()
+        self.thread = None
+        self.output = None
+        self.stopped = False
+        self.error = None
+        self.sequence = 0
+        self.origin = None
+        return
+
+    def arguments(self, count):
+        """
+        :param:
+
+         - `count`: number of pings the process should send
+
+        :return: the argument string for the ping
+        """
+        arguments = ProberArguments.arguments.get(self.operating_system)
+        if arguments is None:
+            self.logger.warning('unknown OS ({0}), using Linux'.format(self.operating_system))
+            arguments = ProberArguments.arguments[OperatingSystem.linux]
+        return arguments.format(interval=self.interval, count=count,
+                                target=self.target)
+
+    def start(self, duration=None):
+        """
+        Starts pinging in a thread
+
+        :param:
+
+         - `duration`: seconds to ping (None to ping until stopped)
+
+        :return: the thread
+        """
+        self.duration = duration
+        self.stopped = False
+        self.thread = Thread(target=self.run_thread,
+                             name="PingProber {0}".format(self.target))
+        return self.thread
+
+    def stop(self):
+        """
+        Stops pinging (closing the output so the ping dies on its next write)
+        """
+        self.stopped = True
+        output = self.output
+        if output is None:
+            return
+        lines = getattr(output, 'lines', output)
+        channel = getattr(lines, 'channel', None)
+        try:
+            if channel is not None:
+                channel.close()
+            else:
+                lines.close()
+        except (AttributeError, ValueError, IOError, OSError, socket.error) as error:
+            self.logger.debug(error)
+        return
+
+    def run(self):
+        """
+        Runs pings (one after another) until stopped or the duration is up
+        """
+        end_time = None
+        if self.duration is not None:
+            end_time = time() + self.duration
+        base = 0
+        try:
+            while not self.stopped:
+                if end_time is None:
+                    count = self.segment
+                else:
+                    remaining = end_time - time()
+                    if remaining <= 0:
+                        break
+                    count = int(math.ceil(remaining/self.interval)) + 1
+                self.probe(base, count)
+                base += count
+        finally:
+            self.queue.put(StreamEvent(StreamEventEnum.end, base, time(), None))
+        return
+
+    def probe(self, base, count):
+        """
+        Runs one ping process and queues its replies
+
+        :param:
+
+         - `base`: sequence number of the process' first ping
+         - `count`: number of pings to send
+        """
+        output, error = self.connection.ping(self.arguments(count),
+                                             timeout=READ_TIMEOUT)
+        self.output = output
+        self.queue.put(StreamEvent(StreamEventEnum.start, base, time(), None))
+        first = ProberArguments.first.get(self.operating_system, 1)
+        counted = 0
+        for line in output:
+            if self.stopped:
+                break
+            if UNKNOWN_HOST in line:
+                self.error = ConfigurationError("Unknown Host: {0}".format(self.target))
+                self.stopped = True
+                break
+            parsed = self.parse(line)
+            if parsed is None:
+                continue
+            sequence, rtt = parsed
+            if sequence is None:
+                sequence = counted
+            else:
+                sequence -= first
+            counted = sequence + 1
+            self.queue.put(StreamEvent(StreamEventEnum.reply, base + sequence, time(), rtt))
+        return
+
+    def parse(self, line):
+        """
+        :param:
+
+         - `line`: a line of the ping's output
+
+        :return: (sequence number or None, rtt or None) or None if not a reply
+        """
+        match = PING.search(line)
+        rtt = match.group('rtt') if match is not None else None
+        if rtt is None and not any(loss in line.lower() for loss in LOSSES):
+            return
+        self.logger.debug(line.rstrip(NEWLINE))
+        sequence = SEQUENCE.search(line)
+        if sequence is not None:
+            sequence = int(sequence.group('sequence'))
+        return sequence, rtt
+
+    def sent(self, sequence):
+        """
+        :return: estimated time the ping with the sequence number was sent
+        """
+        return self.origin + sequence * self.interval
+
+    def lost(self, stop):
+        """
+        :param:
+
+         - `stop`: the first sequence number not to declare lost
+
+        :yield: ProbeReply for each unanswered ping before stop
+        """
+        while self.sequence < stop:
+            yield ProbeReply(self.sequence, self.sent(self.sequence), None)
+            self.sequence += 1
+        return
+
+    def replies(self, deadline=None, stopped=None):
+        """
+        Generates the replies in sequence order until the pinging ends or the deadline
+
+        :param:
+
+         - `deadline`: time (since the epoch) to stop generating
+         - `stopped`: callable that returns True to stop generating (checked at least every second)
+
+        :yield: ProbeReply
+        :raise: ConfigurationError if the target is unknown
+        """
+        while True:
+            now = time()
+            expected = None
+            if self.origin is not None:
+                expected = self.sent(self.sequence) + self.wait
+                if now > expected:
+                    for reply in self.lost(self.sequence + 1):
+                        yield reply
+                    continue
+            if deadline is not None and now >= deadline:
+                return
+            if stopped is not None and stopped():
+                return
+            timeout = min(limit for limit in (expected, deadline, now + READ_TIMEOUT)
+                          if limit is not None) - now
+            try:
+                event = self.queue.get(timeout=max(timeout, 0))
+            except Queue.Empty:
+                continue
+            if event.kind == StreamEventEnum.end:
+                if self.error is not None:
+                    raise self.error
+                return
+            if event.kind == StreamEventEnum.start:
+                if self.origin is not None:
+                    for reply in self.lost(event.sequence):
+                        yield reply
+                self.sequence = event.sequence
+                self.origin = event.arrival - event.sequence * self.interval
+                continue
+            if event.sequence < self.sequence:
+                self.logger.debug("Late reply for ping {0}".format(event.sequence))
+                continue
+            if event.rtt is not None:
+                sent = event.arrival - float(event.rtt)/1000
+                self.origin = sent - event.sequence * self.interval
+            for reply in self.lost(event.sequence):
+                yield reply
+            if event.rtt is None:
+                sent = self.sent(event.sequence)
+            self.sequence = event.sequence + 1
+            yield ProbeReply(event.sequence, sent, event.rtt)
+        return
+
+    def wait_for(self, success, threshold, deadline=None, stopped=None):
+        """
+        Waits for `threshold` consecutive answered (or lost) pings
+
+        :param:
+
+         - `success`: True to wait for answered pings, False for lost ones
+         - `threshold`: number of consecutive pings that make the edge
+         - `deadline`: time (since the epoch) to give up
+         - `stopped`: callable that returns True to give up
+
+        :return: ProbeReply for the first ping of the run or None
+        """
+        first, count = None, 0
+        for reply in self.replies(deadline, stopped):
+            if reply.success == success:
+                count += 1
+                if count == 1:
+                    first = reply
+                if count >= threshold:
+                    return first
+            else:
+                first, count = None, 0
+        return
+# end class PingProber
@@ -69,16 +69,16 @@ class SftpCommand(BaseClass):
         The Paramiko client extracted from the connection.
         """
         if self._ssh is None:
-            self._ssh = self.connection._client._client
+            self._ssh = self.connection.client.client
         return self._ssh
 
     @property
     def sftp(self):
         """
-        Sftp Client from the SSH client
+        Sftp Client on a channel from the connection's ssh-pool
         """
         if self._sftp is None:
-            self._sftp = self.ssh.open_sftp()
+            self._sftp = self.connection.client.open_sftp()
         return self._sftp
 
     def close(self):
@@ -147,16 +147,15 @@ class TestSftpCommand(unittest.TestCase):
         Does the ssh property return the paramiko client?
         """
         client = MagicMock()
-        self.connection._client._client = client
+        self.connection.client.client = client
         self.assertEqual(self.command.ssh, client)
         return
 
     def test_sftp(self):
         """
-        Does the sftp property return the output of an open_sftp() call?
+        Does the sftp property return the output of the client's open_sftp() call?
         """
-        self.command._ssh = self.ssh
-        self.ssh.open_sftp.return_value = self.sftp
+        self.connection.client.open_sftp.return_value = self.sftp
         self.assertEqual(self.command.sftp, self.sftp)
         return
 
@@ -5,11 +5,20 @@ import re
 # this package
 from apetools.commons import errors
 
-from basewificommand import BaseWifiCommand
+from basewificommand import BaseWifiCommand, snapshot, parse
+
 
 MAC_UNAVAILABLE = "MAC Unavailable (use `netcfg`)"
 CommandError = errors.CommandError
 
+
+STATUS_EXPRESSIONS = (("ssid", re.compile(r'^SSID:\s+"?(?P<ssid>[^"]*)"?')),
+                      ("rssi", re.compile(r"RSSI:\s+(?P<rssi>-?\d+)")),
+                      ("noise", re.compile(r"noise:\s+(?P<noise>-?\d+)")),
+                      ("bssid", re.compile(r"BSSID:\s+(?P<bssid>([0-9a-fA-F]{2}:){5}[0-9a-fA-F]{2})")),
+                      ("channel", re.compile(r"(Control|Primary) channel:\s+(?P<channel>\d+)")))
+
+
 class WlCommand(BaseWifiCommand):
     """
     The Wl Command interprets WL information
@@ -21,8 +30,10 @@ class WlCommand(BaseWifiCommand):
          - `connection`: A connection to the device
          - `interface`: The interface to check
          - `operating_system` : The operating system on the devices.
+         - `ttl`: seconds to re-use a snapshot
         """
         super(WlCommand, self).__init__(*args, **kwargs)
+        self.rate_subcommand = "rate"
         return
     
     @property
@@ -41,8 +52,7 @@ class WlCommand(BaseWifiCommand):
         
         :return: The rssi for the interface
         """
-        output = self.get("rssi")
-        return output.readline()
+        return self.snapshot.rssi
     
     @property
     def mac_address(self):
@@ -51,7 +61,7 @@ class WlCommand(BaseWifiCommand):
         """
         if self._mac_address is None:
             output = self.get("mac")
-            self._mac_address = output.readline()
+            self._mac_address = output.readline().strip()
         return self._mac_address
 
     @property
@@ -59,40 +69,47 @@ class WlCommand(BaseWifiCommand):
         """
         :return: the reported physical bitrate
         """
-        return self.get("rate").readline().split()[0]
+        return self.snapshot.bitrate
 
     @property
     def ssid(self):
         """
         :return: the SSID of the currently attched ap
         """
-        output = self.get('ssid')
-        return output.readline().split(":")[-1]
+        return self.snapshot.ssid
 
     @property
     def noise(self):
         """
         :return: the current noise
         """
-        return self.get('noise').readline()
+        return self.snapshot.noise
 
     @property
     def channel(self):
         """
         :return: the current channel setting
         """
-        output = self.get('status')
-        for line in output:
-            if "Control channel:" in line:
-                return line.split(":")[-1].strip()
-        return
+        return self.snapshot.channel
 
     @property
     def bssid(self):
         """
         :return: the bssid of the attached ap
         """
-        return self.get('bssid').readline()
+        return self.snapshot.bssid
+
+    def query(self):
+        """
+        Reads the status and the rate
+
+        :return: WifiSnapshot
+        """
+        fields = parse(self.get('status'), STATUS_EXPRESSIONS)
+        rate = self.get(self.rate_subcommand).readline().split()
+        if rate:
+            fields['bitrate'] = rate[0]
+        return snapshot(**fields)
     
     def get(self, subcommand):
         """
@@ -140,8 +157,9 @@ class WlCommand(BaseWifiCommand):
                                                rssi=self.rssi)
 # end class WlCommand
 
+
 if __name__ == "__main__":
     from apetools.connections import adbconnection
     connection = adbconnection.ADBShellConnection()
     iw = IwCommand(connection)
-    print( str(iw))
\ No newline at end of file
+    print( str(iw))
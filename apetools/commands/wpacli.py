@@ -3,32 +3,47 @@
 import re
 
 # this package
-from apetools.baseclass import BaseClass
 from apetools.commons import expressions
 from apetools.commons import errors
 
+from basewificommand import BaseWifiCommand, TTL, snapshot, parse
+
 CommandError = errors.CommandError
 
-class WpaCliCommand(BaseClass):
+
+INTERFACE = re.compile(expressions.WPA_INTERFACE)
+MAC_ADDRESS = re.compile(expressions.LINE_START + expressions.WPA_MAC)
+STATUS_EXPRESSIONS = (("bssid", re.compile(r"^bssid=(?P<bssid>\S+)")),
+                      ("channel", re.compile(r"^freq=(?P<channel>\d+)")),
+                      ("ssid", re.compile(expressions.WPA_SSID)),
+                      ("state", re.compile(r"^wpa_state=(?P<state>\w+)")),
+                      ("ip_address", re.compile(expressions.LINE_START + expressions.WPA_IP)),
+                      ("mac_address", MAC_ADDRESS))
+SIGNAL_EXPRESSIONS = (("rssi", re.compile(r"^RSSI=(?P<rssi>-?\d+)")),
+                      ("bitrate", re.compile(r"^LINKSPEED=(?P<bitrate>\d+)")),
+                      ("noise", re.compile(r"^NOISE=(?P<noise>-?\d+)")))
+
+
+class WpaCliCommand(BaseWifiCommand):
     """
     The WpaCliCommand interprets ifconfig
     """
-    def __init__(self, connection, interface=None):
+    def __init__(self, connection, interface=None, ttl=TTL):
         """
         :param:
 
          - `connection`: A connection to the device
          - `interface`: The interface to check
+         - `ttl`: seconds to re-use a snapshot
         """
-        super(WpaCliCommand, self).__init__()
-        self.connection = connection
-        self._interface = interface
-        self._ip_address = None
-        self._mac_address = None
+        super(WpaCliCommand, self).__init__(connection=connection,
+                                            interface=interface,
+                                            ttl=ttl)
         self._status = None
         self._ssid = None
         self._supplicant_state = None
         self.status_command = "status"
+        self.signal_command = "signal_poll"
         self.interface_list_command = "interface_list"
         return
 
@@ -40,10 +55,17 @@ class WpaCliCommand(BaseClass):
         
         :return: The status of the wpa-connection
         """
-        with self.connection.lock:
-            output = ''.join([line for line in self.connection.wpa_cli(self.status_command)[0]])
-        return output
+        return ''.join(self.run(self.status_command))
+
+    def query(self):
+        """
+        Reads the status and the signal
 
+        :return: WifiSnapshot
+        """
+        fields = parse(self.run(self.status_command), STATUS_EXPRESSIONS)
+        parse(self.run(self.signal_command), SIGNAL_EXPRESSIONS, fields)
+        return snapshot(**fields)
     
     @property
     def ip_address(self):
@@ -52,12 +74,7 @@ class WpaCliCommand(BaseClass):
         
         :return: The IP Address of the interface
         """
-        expression = expressions.WPA_IP
-        name = expressions.IP_ADDRESS_NAME
-        command = self.status_command
-        return self._match(expression,
-                           name,
-                           command)
+        return self.snapshot.ip_address
 
     @property
     def ssid(self):
@@ -66,10 +83,42 @@ class WpaCliCommand(BaseClass):
         
         :return: The SSID of the attached AP
         """
-        expression = expressions.WPA_SSID
-        name = expressions.SSID_NAME
-        command = self.status_command
-        return self._match(expression, name, command)
+        return self.snapshot.ssid
+
+    @property
+    def bssid(self):
+        """
+        :return: The MAC address of the attached AP
+        """
+        return self.snapshot.bssid
+
+    @property
+    def channel(self):
+        """
+        :return: The frequency of the attached AP
+        """
+        return self.snapshot.channel
+
+    @property
+    def rssi(self):
+        """
+        :return: The RSSI from the signal-poll
+        """
+        return self.snapshot.rssi
+
+    @property
+    def noise(self):
+        """
+        :return: The noise from the signal-poll (9999 if the driver doesn't report it)
+        """
+        return self.snapshot.noise
+
+    @property
+    def bitrate(self):
+        """
+        :return: The link-speed from the signal-poll
+        """
+        return self.snapshot.bitrate
 
     @property
     def supplicant_state(self):
@@ -78,10 +127,7 @@ class WpaCliCommand(BaseClass):
 
         :return: The supplicant-state
         """
-        expression = expressions.WPA_SUPPLICANT_STATE
-        name = expressions.SUPPLICANT_STATE_NAME
-        command = self.status_command
-        return self._match(expression, name, command)
+        return self.snapshot.state
     
     @property
     def interface(self):
@@ -91,10 +137,9 @@ class WpaCliCommand(BaseClass):
         :return: The connected interface
         """
         if self._interface is None:
-            expression = expressions.WPA_INTERFACE
             name = expressions.INTERFACE_NAME
             command = self.interface_list_command
-            self._interface = self._match(expression,
+            self._interface = self._match(INTERFACE,
                                           name,
                                           command)
         return self._interface
@@ -107,36 +152,45 @@ class WpaCliCommand(BaseClass):
         :return: MAC Address of the interface
         """
         if self._mac_address is None:
-            expression = expressions.WPA_MAC
             name = expressions.MAC_ADDRESS_NAME
             command = self.status_command
-            self._mac_address = self._match(expression,
+            self._mac_address = self._match(MAC_ADDRESS,
                                             name,
                                             command)
         return self._mac_address
 
+    def run(self, arguments):
+        """
+        :param:
+
+         - `arguments`: The arguments to give to the wpa_cli
+
+        :return: list of output lines
+        :raise: CommandError if wpa_cli reports an error
+        """
+        with self.connection.lock:
+            output, error = self.connection.wpa_cli(arguments)
+        lines = [line for line in output]
+        err = error.read()
+        if len(err):
+            self.logger.error(err)
+            raise CommandError(err)
+        return lines
     
     def _match(self, expression, name, arguments):
         """
         :param:
 
-         - `expression`: The regular expression to match
+         - `expression`: The compiled regular expression to match
          - `name`: The group name to pull the match out of the line
-         - `command`: The arguments to give to the wpa_cli
+         - `arguments`: The arguments to give to the wpa_cli
          
         :return: The named-group that matched or None
         """
-        expression = re.compile(expression)
-        with self.connection.lock:
-            output, error = self.connection.wpa_cli(arguments)
-        for line in output:
+        for line in self.run(arguments):
             match = expression.search(line)
             if match:
                 return match.group(name)
-        err = error.read()
-        if len(err):
-            self.logger.error(err)
-            raise CommandError(err)
         return
 
     def __str__(self):
@@ -148,9 +202,10 @@ class WpaCliCommand(BaseClass):
 
 # end class WpaCliCommand
 
+
 if __name__ == "__main__":
     from apetools.connections import adbconnection
     connection = adbconnection.ADBShellConnection()
     command = WpaCliCommand(connection)
     print( str(command))
-    print(command.status)
\ No newline at end of file
+    print(command.status)
@@ -1,32 +1,43 @@
 
 # python standard library
-import random
 from math import modf
-from itertools import repeat
+
+# third-party
+import numpy
 
 
 TWO = SQUARED = 2
 TWO_F = 2.0
 SQUARE_ROOT = 0.5
 PERCENT = 1/100.0
+DEGREES_OF_FREEDOM = 1
+CHUNK_SIZE = 2**20
+ROWS = 1
 
 
 class CentralTendency(object):
     """
     The central tendency stores data and reports the median and mean
     """
-    def __init__(self, bootstraps=200, z_score=1.96, precision=4):
+    def __init__(self, bootstraps=200, z_score=1.96, precision=4, seed=None,
+                 chunk_size=CHUNK_SIZE):
         """
         :param:
 
          - `bootstraps`: the number of bootstrap samples to take to calculate the error
          - `z_score`: the multiplier for the confidence level
          - `precision`: number of decmal places for the string representation
+         - `seed`: seed for the bootstrap's random number generator (for repeatable errors)
+         - `chunk_size`: maximum number of re-sampled values to hold in memory at once
         """
         self.bootstraps = bootstraps
         self.z_score = z_score
         self.precision = precision
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self._random = None
         self._data = None
+        self._array = None
         self._median = None
         self._median_error = None
         self._mean = None
@@ -37,42 +48,77 @@ class CentralTendency(object):
     @property
     def data(self):
         """
-        :return: a list
+        :return: a list (a copy of the loaded array if `load` was used)
         """
         if self._data is None:
-            self._data = []
+            if self._array is None:
+                self._data = []
+            else:
+                self._data = self._array.tolist()
         return self._data
+
+    @property
+    def array(self):
+        """
+        :return: the data as a float numpy array (rebuilt after new data is added)
+        """
+        if self._array is None or (self._data is not None and
+                                   len(self._array) != len(self._data)):
+            self._array = numpy.asarray(self.data, dtype=float)
+        return self._array
+
+    @property
+    def random(self):
+        """
+        :return: numpy RandomState seeded with self.seed
+        """
+        if self._random is None:
+            self._random = numpy.random.RandomState(self.seed)
+        return self._random
     
     @property
     def median(self):
         """
         :return: the median value for the data
         """
-        if not self.sorted:
-            self.data.sort()
-            self.sorted = True
-        return self.percentile(self.data)
+        return self.percentile(self.array)
 
     def percentile(self, data, k=50):
+        """
+        Selects the k-th percentile with numpy.partition (the data doesn't need to be sorted)
+
+        :param:
+
+         - `data`: list or array (if 2-dimensional, the percentile of each row is returned)
+         - `k`: the percentile (0-100)
+
+        :return: the k-th percentile of the data
+        """
+        data = numpy.asarray(data, dtype=float)
         k *= PERCENT
-        remainder, quotient = modf(len(data) *k)
+        remainder, quotient = modf(data.shape[-1] *k)
         quotient = int(quotient)
         if remainder:
-            return data[quotient]
-        return (data[quotient]+ data[quotient - 1])/TWO_F
+            return numpy.partition(data, quotient, axis=-1)[..., quotient]
+        data = numpy.partition(data, [quotient - 1, quotient], axis=-1)
+        return (data[..., quotient] + data[..., quotient - 1])/TWO_F
 
     @property
     def median_error(self):
         """
         :return: bootstrapped error
         """
-        choose = random.choice
-        data = self.data
-        std = self._std
-        length = len(self.data)
-        bootstraps = repeat(None, self.bootstraps)
-        median = self.percentile
-        return std([median([choose(data) for n in repeat(None, length)]) for b in bootstraps]) * self.z_score
+        data = self.array
+        length = len(data)
+        rows = max(ROWS, self.chunk_size//max(length, ROWS))
+        medians = []
+        remaining = self.bootstraps
+        while remaining > 0:
+            rows = min(rows, remaining)
+            indices = self.random.randint(0, length, size=(rows, length))
+            medians.append(self.percentile(data[indices]))
+            remaining -= rows
+        return self._std(numpy.concatenate(medians)) * self.z_score
 
     
     @property
@@ -80,7 +126,7 @@ class CentralTendency(object):
         """
         :return: the mean of the data set
         """
-        return self.meanaverage(self.data)
+        return self.meanaverage(self.array)
 
     def meanaverage(self, data):
         """
@@ -90,14 +136,14 @@ class CentralTendency(object):
 
         :return: the mean of the data
         """
-        return sum(data)/float(len(data))
+        return numpy.mean(data)
 
     @property
     def sample_deviation(self):
         """
         :return: sample standard deviation for the data set
         """
-        return self._std(self.data)
+        return self._std(self.array)
     
     def _std(self, data):
         """
@@ -107,10 +153,7 @@ class CentralTendency(object):
          
         :return: standard deviation of the data
         """
-        count = float(len(data)) - 1
-        xbar = self.meanaverage(data)
-        
-        return (sum([(x - xbar)**SQUARED for x in data])/count)**SQUARE_ROOT
+        return numpy.std(data, ddof=DEGREES_OF_FREEDOM)
     
     def __call__(self, value):
         """
@@ -129,6 +172,19 @@ class CentralTendency(object):
         self(value)
         return
 
+    def load(self, values):
+        """
+        Replaces the data with an array without copying it
+
+        :param:
+
+         - `values`: a float array (e.g. a numpy.memmap)
+        """
+        self._data = None
+        self._array = numpy.asarray(values, dtype=float)
+        self.sorted = False
+        return
+
     def reset(self):
         """
         :postcondition:
@@ -138,9 +194,26 @@ class CentralTendency(object):
         """
         self.tail = 0
         self._data = None
+        self._array = None
         return
     
     def __str__(self):
         base = ",".join(["{{{i}:.{p}f}}".format(i=index,p=self.precision) for index in range(4)])
         return base.format(self.mean, self.sample_deviation, self.median, self.median_error)
 # end class CentralTendency
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    bootstraps = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    generator = numpy.random.RandomState(0)
+    for power in range(3, 7):
+        tendency = CentralTendency(bootstraps=bootstraps, seed=0)
+        for value in generator.normal(100, 10, 10**power):
+            tendency(value)
+        start = time.time()
+        summary = str(tendency)
+        print "10^{0} samples: {1:>8.3f} seconds ({2})".format(power,
+                                                              time.time() - start,
+                                                              summary)
@@ -0,0 +1,280 @@
+
+# python standard library
+from array import array
+import json
+import os
+import sys
+import threading
+import time
+
+# third-party
+import numpy
+
+# apetools
+from apetools.baseclass import BaseClass
+from errors import StorageError
+from storageoutput import flusher, GROUP_COMMIT_INTERVAL
+
+
+VERSION = 1
+SCHEMA_FILE = 'schema.json'
+COLUMN_EXTENSION = '.bin'
+TEMPORARY_EXTENSION = '.tmp'
+BUFFER_SIZE = 4096
+APPEND = 'ab'
+READ = 'r'
+WRITE = 'w'
+LITTLE = 'little'
+
+
+COLUMNS = (('timestamp', 'd', 'f8'),
+           ('value', 'd', 'f8'),
+           ('node', 'i', 'i4'),
+           ('parameter', 'i', 'i4'))
+
+
+class ColumnStore(BaseClass):
+    """
+    An appender of rows to typed column files
+    """
+    def __init__(self, path=None, buffer_size=BUFFER_SIZE,
+                 sync_interval=GROUP_COMMIT_INTERVAL):
+        """
+        :param:
+
+         - `path`: the store's folder (created if it doesn't exist)
+         - `buffer_size`: number of rows to hold before writing them
+         - `sync_interval`: most seconds to hold a row before writing it
+        """
+        super(ColumnStore, self).__init__()
+        self.path = path
+        self.buffer_size = buffer_size
+        self.sync_interval = sync_interval
+        self.first_pending = None
+        self.lock = threading.RLock()
+        self.buffers = dict((name, array(code)) for name, code, dtype in COLUMNS)
+        self.pending = 0
+        self.rows = 0
+        self.tables = {'nodes': [], 'parameters': []}
+        self.indices = {'nodes': {}, 'parameters': {}}
+        self.loaded = False
+        return
+
+    def index(self, table, label):
+        """
+        :param:
+
+         - `table`: 'nodes' or 'parameters'
+         - `label`: the label to look up
+
+        :return: index of the label in the table (the label is added if it's new)
+        """
+        label = str(label)
+        indices = self.indices[table]
+        if label not in indices:
+            indices[label] = len(self.tables[table])
+            self.tables[table].append(label)
+        return indices[label]
+
+    def append(self, timestamp, value, node='', parameter=''):
+        """
+        Adds a row
+
+        :param:
+
+         - `timestamp`: seconds since the epoch
+         - `value`: the datum
+         - `node`: label for the node the datum came from
+         - `parameter`: label for the parameter (e.g. the run's file-name)
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            self.buffers['timestamp'].append(timestamp)
+            self.buffers['value'].append(value)
+            self.buffers['node'].append(self.index('nodes', node))
+            self.buffers['parameter'].append(self.index('parameters', parameter))
+            self.pending += 1
+            if self.pending >= self.buffer_size:
+                self.flush()
+            elif self.first_pending is None:
+                self.first_pending = time.time()
+                flusher.register(self)
+        return
+
+    def load(self):
+        """
+        Picks up an existing store in `path` (so that rows are appended to it)
+
+        :raise: StorageError if the existing store has a different layout
+        """
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        schema_file = os.path.join(self.path, SCHEMA_FILE)
+        rows = 0
+        if os.path.isfile(schema_file):
+            with open(schema_file) as opened:
+                schema = json.load(opened)
+            if (schema['version'] != VERSION or schema['byteorder'] != sys.byteorder
+                or [column[0] for column in schema['columns']] != [column[0] for column in COLUMNS]):
+                raise StorageError("Incompatible column store: {0}".format(self.path))
+            rows = schema['rows']
+            for table in self.tables:
+                for label in schema[table]:
+                    self.index(table, label)
+        for name, code, dtype in COLUMNS:
+            # rows written after the schema was last updated are cut off
+            with open(os.path.join(self.path, name + COLUMN_EXTENSION), APPEND) as column:
+                column.truncate(rows * array(code).itemsize)
+        self.rows = rows
+        self.loaded = True
+        if not os.path.isfile(schema_file):
+            self.write_schema()
+        return
+
+    def flush(self):
+        """
+        Writes the buffered rows to the column files and updates the schema
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            if not self.pending:
+                return
+            for name, code, dtype in COLUMNS:
+                with open(os.path.join(self.path, name + COLUMN_EXTENSION), APPEND) as column:
+                    self.buffers[name].tofile(column)
+                    column.flush()
+                    os.fsync(column.fileno())
+                self.buffers[name] = array(code)
+            self.rows += self.pending
+            self.pending = 0
+            self.first_pending = None
+            self.write_schema()
+        flusher.unregister(self)
+        return
+
+    def sync_if_due(self):
+        """
+        Flushes the buffered rows if the oldest has waited `sync_interval` seconds (called by the flusher)
+        """
+        with self.lock:
+            if (self.first_pending is not None and
+                time.time() - self.first_pending >= self.sync_interval):
+                self.flush()
+        return
+
+    def write_schema(self):
+        """
+        Replaces the schema file
+        """
+        schema = {'version': VERSION,
+                  'byteorder': sys.byteorder,
+                  'columns': [[name, dtype] for name, code, dtype in COLUMNS],
+                  'rows': self.rows}
+        schema.update(self.tables)
+        schema_file = os.path.join(self.path, SCHEMA_FILE)
+        with open(schema_file + TEMPORARY_EXTENSION, WRITE) as opened:
+            json.dump(schema, opened)
+            opened.flush()
+            os.fsync(opened.fileno())
+        os.rename(schema_file + TEMPORARY_EXTENSION, schema_file)
+        return
+
+    def close(self):
+        """
+        Writes any buffered rows
+        """
+        self.flush()
+        return
+# end class ColumnStore
+
+
+class ColumnReader(object):
+    """
+    A reader of column stores
+    """
+    def __init__(self, path):
+        """
+        :param:
+
+         - `path`: the store's folder
+        """
+        self.path = path
+        self._schema = None
+        return
+
+    @property
+    def schema(self):
+        """
+        :return: the store's schema (dict)
+        :raise: StorageError if the store is unreadable
+        """
+        if self._schema is None:
+            try:
+                with open(os.path.join(self.path, SCHEMA_FILE)) as opened:
+                    self._schema = json.load(opened)
+            except (IOError, ValueError) as error:
+                raise StorageError("Unable to read the column store '{0}': {1}".format(self.path,
+                                                                                       error))
+            if self._schema['version'] != VERSION:
+                raise StorageError("Unknown column store version: {0}".format(self._schema['version']))
+        return self._schema
+
+    @property
+    def nodes(self):
+        """
+        :return: list of node labels
+        """
+        return self.schema['nodes']
+
+    @property
+    def parameters(self):
+        """
+        :return: list of parameter labels
+        """
+        return self.schema['parameters']
+
+    def column(self, name):
+        """
+        :param:
+
+         - `name`: the column's name (e.g. 'value')
+
+        :return: read-only numpy.memmap of the column
+        :raise: StorageError if there's no such column
+        """
+        types = dict(self.schema['columns'])
+        if name not in types:
+            raise StorageError("Unknown column: {0}".format(name))
+        order = '<' if self.schema['byteorder'] == LITTLE else '>'
+        dtype = numpy.dtype(order + types[name])
+        rows = self.schema['rows']
+        if not rows:
+            return numpy.zeros(0, dtype=dtype)
+        return numpy.memmap(os.path.join(self.path, name + COLUMN_EXTENSION),
+                            dtype=dtype, mode=READ, shape=(rows,))
+
+    def values(self, node=None, parameter=None, column='value'):
+        """
+        :param:
+
+         - `node`: node label to select (all nodes if None)
+         - `parameter`: parameter label to select (all parameters if None)
+         - `column`: name of the column to return
+
+        :return: the column's values for the selected rows
+        """
+        values = self.column(column)
+        if node is None and parameter is None:
+            return values
+        mask = numpy.ones(len(values), dtype=bool)
+        for name, table, label in (('node', self.nodes, node),
+                                   ('parameter', self.parameters, parameter)):
+            if label is None:
+                continue
+            if label not in table:
+                return values[:0]
+            mask &= self.column(name) == table.index(label)
+        return values[mask]
+# end class ColumnReader
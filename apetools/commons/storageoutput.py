@@ -5,10 +5,13 @@ import time
 import copy
 #from types import StringType
 import shutil
+import threading
+from weakref import WeakSet
 
 
 # apetools libraries
-from apetools.baseclass import BaseClass
+from apetools.baseclass import BaseClass, BaseThreadClass
+from apetools.threads.threads import Thread
 #from assertions import assert_is
 from errors import StorageError
 
@@ -20,27 +23,202 @@ TIMESTAMP_FLAG = "{t}"
 NEWLINE = "\n"
 IPERF_TIMESTAMP = "%Y%m%d%H%M%S"
 FOLDER_TIMESTAMP = "%Y_%m_%d"
+GROUP_COMMIT_LINES = 256
+GROUP_COMMIT_INTERVAL = 0.5
+FLUSHER_TICK = 0.1
+
+
+class DurabilityPolicy(object):
+    """
+    A holder of constants for the StorageOutput sync policies
+    """
+    __slots__ = ()
+    line = "line"
+    lines = "lines"
+    interval = "interval"
+    group = "group"
+    close = "close"
+# end class DurabilityPolicy
+
+TIMED_POLICIES = (DurabilityPolicy.interval, DurabilityPolicy.group)
+COUNTED_POLICIES = (DurabilityPolicy.lines, DurabilityPolicy.group)
+
+
+class StorageFlusher(BaseThreadClass):
+    """
+    A background thread to sync StorageOutputs whose sync-interval has expired
+    """
+    def __init__(self, tick=FLUSHER_TICK):
+        """
+        :param:
+
+         - `tick`: seconds to sleep between checks of the registered outputs
+        """
+        super(StorageFlusher, self).__init__()
+        self.tick = tick
+        self.outputs = WeakSet()
+        self.lock = threading.Lock()
+        self.thread = None
+        return
+
+    def register(self, output):
+        """
+        Adds the output to the set to check (starts the thread if needed)
+
+        :param:
+
+         - `output`: an opened StorageOutput with a timed policy
+        """
+        with self.lock:
+            self.outputs.add(output)
+            if self.thread is None:
+                self.thread = Thread(target=self.run_thread,
+                                     name="StorageFlusher")
+        return
+
+    def unregister(self, output):
+        """
+        Removes the output from the set to check
+
+        :param:
+
+         - `output`: a StorageOutput that was registered
+        """
+        with self.lock:
+            self.outputs.discard(output)
+        return
+
+    def run(self):
+        """
+        Checks the outputs every tick until there are none left
+
+        :postcondition: self.thread is None
+        """
+        try:
+            while True:
+                time.sleep(self.tick)
+                with self.lock:
+                    outputs = list(self.outputs)
+                    if not outputs:
+                        self.thread = None
+                        return
+                for output in outputs:
+                    try:
+                        output.sync_if_due()
+                    except Exception as error:
+                        self.logger.error("Unable to sync {0}: {1}".format(output, error))
+        finally:
+            # an unexpected error mustn't leave a dead thread registered
+            with self.lock:
+                if self.thread is threading.current_thread():
+                    self.thread = None
+        return
+# end class StorageFlusher
+
+flusher = StorageFlusher()
+
+
+class OutputRecord(object):
+    """
+    A record of the paths the StorageOutputs hand out (while someone is watching)
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.watchers = []
+        return
+
+    def watch(self):
+        """
+        :return: list that the paths handed out from now on are appended to
+        """
+        paths = []
+        with self.lock:
+            self.watchers.append(paths)
+        return paths
+
+    def unwatch(self, paths):
+        """
+        :param:
+
+         - `paths`: a list returned by `watch`
+
+        :postcondition: paths is no longer appended to
+        """
+        with self.lock:
+            self.watchers = [watcher for watcher in self.watchers if watcher is not paths]
+        return
+
+    def add(self, path):
+        """
+        :param:
+
+         - `path`: path to a file in an output folder
+
+        :postcondition: path appended to the watchers' lists
+        """
+        with self.lock:
+            for paths in self.watchers:
+                paths.append(path)
+        return
+# end class OutputRecord
+
+output_record = OutputRecord()
 
 
 class StorageOutput(BaseClass):
     """
     A StorageOutput maintains an output file.
     """
-    def __init__(self, output_folder, timestamp_format=IPERF_TIMESTAMP, *args, **kwargs):
+    def __init__(self, output_folder, timestamp_format=IPERF_TIMESTAMP,
+                 durability=DurabilityPolicy.line, sync_lines=GROUP_COMMIT_LINES,
+                 sync_interval=GROUP_COMMIT_INTERVAL, *args, **kwargs):
         """
         :param:
 
          - `output_folder`: name of (path to) the output folder to use.
          - `timestamp_format`: strftime timestamp format
+         - `durability`: DurabilityPolicy to decide when to sync to disk
+         - `sync_lines`: number of lines between syncs (lines and group policies)
+         - `sync_interval`: seconds between syncs (interval and group policies)
         """
         super(StorageOutput, self).__init__(*args, **kwargs)
         self.output_folder = output_folder
         self.timestamp_format = timestamp_format
+        self.durability = durability
+        self.sync_lines = sync_lines
+        self.sync_interval = sync_interval
         self._path = None
+        self._lock = None
+        self._flusher = None
+        self._pending = 0
+        self._last_sync = None
         self.filename = None
         self.output_file = None
         return
 
+    @property
+    def lock(self):
+        """
+        :return: lock to keep the writers and the flusher from colliding
+        """
+        if self._lock is None:
+            self._lock = threading.RLock()
+        return self._lock
+
+    @property
+    def sync_due(self):
+        """
+        :return: True if the pending lines should be synced now
+        """
+        if self.durability == DurabilityPolicy.line:
+            return True
+        if (self.durability in COUNTED_POLICIES and
+            self._pending >= self.sync_lines):
+            return True
+        if self.durability in TIMED_POLICIES:
+            return time.time() - self._last_sync >= self.sync_interval
+        return False
+
     @property
     def path(self):
         """
@@ -106,7 +284,7 @@ class StorageOutput(BaseClass):
         """
         return os.path.join(self.output_folder, filename)
     
-    def open(self, filename, subdir=None, mode=WRITEABLE):
+    def open(self, filename, subdir=None, mode=WRITEABLE, durability=None):
         """
         Opens a writeable file using the stored path information 
         
@@ -114,13 +292,20 @@ class StorageOutput(BaseClass):
 
          - `filename`: The name of the file to open 
          - `subdir`: A subdirectory whithin the output folder to put the file in.
+         - `durability`: DurabilityPolicy for this file (default is self.durability)
          
         :return: A clone of this object with a new file opened.
         """
         self.filename = self.get_filename(filename, subdir, mode)
         #self.logger.debug("Opening File: {0}".format(self.filename))
         clone = copy.deepcopy(self)
+        if durability is not None:
+            clone.durability = durability
         clone.output_file = open(self.filename, mode)
+        clone._last_sync = time.time()
+        if clone.durability in TIMED_POLICIES:
+            clone._flusher = flusher
+            flusher.register(clone)
         return clone
 
     def get_filename(self, filename, subdir=None, mode=WRITEABLE):
@@ -128,6 +313,7 @@ class StorageOutput(BaseClass):
         Builds a super-filename with the path and numbering
 
          * This was broken out so that other file-related classes can use it
+         * The path is added to the `output_record`
 
         :param:
 
@@ -147,7 +333,9 @@ class StorageOutput(BaseClass):
             filename = self.timestamp(filename)
             filename = self._fix_duplicate_names(filename, extension, subdir)
         filename += extension
-        return os.path.join(directory, filename)
+        path = os.path.join(directory, filename)
+        output_record.add(path)
+        return path
 
 
     def timestamp(self, name, timestamp_format=None):
@@ -189,9 +377,11 @@ class StorageOutput(BaseClass):
         """
         try:
             #assert_is(type(line), StringType)
-            self.output_file.write(line)
-            self.output_file.flush()
-            os.fsync(self.output_file.fileno())
+            with self.lock:
+                self.output_file.write(line)
+                self._pending += 1
+                if self.sync_due:
+                    self.sync()
         except AssertionError as error:
             self.logger.error(error)
         except AttributeError as error:
@@ -199,6 +389,32 @@ class StorageOutput(BaseClass):
             raise StorageError("Unable to write to file: {0}".format(self.output_file))
         return
 
+    def sync(self):
+        """
+        Flushes the output file and forces it to disk
+
+        :postcondition: no lines are pending
+        """
+        with self.lock:
+            self.output_file.flush()
+            os.fsync(self.output_file.fileno())
+            self._pending = 0
+            self._last_sync = time.time()
+        return
+
+    def sync_if_due(self):
+        """
+        Syncs the output file if it has pending lines older than the sync-interval
+
+         * This is what the StorageFlusher calls
+        """
+        with self.lock:
+            if (self._pending and self.output_file is not None and
+                not self.output_file.closed and
+                time.time() - self._last_sync >= self.sync_interval):
+                self.sync()
+        return
+
     def writeline(self, line):
         """
         Coerces the line to a string and adds a newline.
@@ -246,6 +462,7 @@ class StorageOutput(BaseClass):
         target = os.path.join(directory, filename)
         try:
             shutil.copy(source, target)
+            output_record.add(target)
         except IOError as error:
             self.logger.error(error)
         return
@@ -269,6 +486,7 @@ class StorageOutput(BaseClass):
         target = os.path.join(directory, filename)
         try:
             shutil.move(source, target)
+            output_record.add(target)
         except IOError as error:
             self.logger.error(error)
         return
@@ -282,10 +500,14 @@ class StorageOutput(BaseClass):
          - self.output_file is closed
         """
         if self.output_file is not None:
+            if self._flusher is not None:
+                self._flusher.unregister(self)
+                self._flusher = None
             try:
-                self.output_file.flush()
-                os.fsync(self.output_file.fileno())
-                self.output_file.close()
+                with self.lock:
+                    self.output_file.flush()
+                    os.fsync(self.output_file.fileno())
+                    self.output_file.close()
             except ValueError as error:
                 self.logger.debug("File already closed?: {0}".format(error))
         return
@@ -299,3 +521,26 @@ class StorageOutput(BaseClass):
         self.close()
         return
 # end class StorageOutput
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    line = "20121101094356,-45,wlan0,54.0 Mb/s\n"
+    folder = tempfile.mkdtemp()
+    storage = StorageOutput(folder)
+    try:
+        for policy in (DurabilityPolicy.line, DurabilityPolicy.lines,
+                       DurabilityPolicy.interval, DurabilityPolicy.group,
+                       DurabilityPolicy.close):
+            output = storage.open("{0}.csv".format(policy), durability=policy)
+            start = time.time()
+            for index in xrange(line_count):
+                output.write(line)
+            output.close()
+            elapsed = time.time() - start
+            print "{0:>8}: {1:>12.1f} lines/second".format(policy,
+                                                           line_count/elapsed)
+    finally:
+        shutil.rmtree(folder)
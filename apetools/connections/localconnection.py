@@ -4,6 +4,7 @@ from StringIO import StringIO
 from collections import namedtuple
 import Queue
 import os
+import threading
 
 # Third-party Libraries
 try:
@@ -15,8 +16,9 @@ except ImportError as error:
 # apetools Libraries
 from apetools.baseclass import BaseClass
 from apetools.commons.errors import ConnectionError
-from apetools.commons.readoutput import StandardOutput
-from producer import PopenProducer
+from producer import PopenProducer, PopenFile
+from sharedcounter import SharedCounter
+
 
 
 SPACER = '{0} {1} '
@@ -103,6 +105,43 @@ class LocalConnection(BaseClass):
 # end class LocalConnection
 
 
+class SpawnedProcess(object):
+    """
+    An adapter to make a pexpect child look like a subprocess.Popen
+    """
+    def __init__(self, child):
+        """
+        :param:
+
+         - `child`: a pexpect.spawn
+        """
+        self.child = child
+        return
+
+    @property
+    def pid(self):
+        """
+        :return: the child's process id
+        """
+        return self.child.pid
+
+    def poll(self):
+        """
+        :return: None if the child is running, its exit status otherwise
+        """
+        if self.child.isalive():
+            return
+        return self.child.status
+
+    def kill(self):
+        """
+        :postcondition: the child has been sent a SIGKILL
+        """
+        self.child.terminate(force=True)
+        return
+# end class SpawnedProcess
+
+
 class LocalNixConnection(LocalConnection):
     """
     A Class that uses Pexpect to get around the problem of file-buffering
@@ -116,33 +155,29 @@ class LocalNixConnection(LocalConnection):
 
     def run(self, command, arguments):
         """
-        runs the Pexpect command and puts lines of output on the Queue
+        runs the Pexpect command with its output read by the pipe-reader
 
         :param:
 
          - `command`: The shell command.
          - `arguments`: A string of command arguments.
 
-        :postcondition: OutputError with output and error file-like objects
+        :return: OutputError with output and error file-like objects
+        :postcondition: the OutputError is also on self.queue
         """
 
         if len(self.command_prefix):
             command = SPACER.format(self.command_prefix,
                                     command)
         child = pexpect.spawn(SPACER.format(command, arguments), timeout=None)
-        line = None
-
-        output_queue = Queue.Queue()
-        output = StandardOutput(queue=output_queue)
-        error = StringIO('')
-        self.queue.put(OutputError(output, error))
-        while line != EOF:
-            try:
-                line = child.readline()
-                output_queue.put(line)
-            except pexpect.TIMEOUT:
-                self.logger.debug("pexpect.readline() timed out")
-        output_queue.put(line)
+        counter = SharedCounter()
+        counter.increment()
+        output = PopenFile(child, process=SpawnedProcess(child),
+                           lock=threading.Lock(), counter=counter)
+        output.start()
+        output_error = OutputError(output, StringIO(EOF))
+        self.queue.put(output_error)
+        return output_error
 # end class LocalNixConnection
 
 
@@ -0,0 +1,201 @@
+
+# python standard library
+import shlex
+import socket
+import subprocess
+import threading
+from time import time
+
+# apetools
+from apetools.baseclass import BaseClass
+from apetools.commons.errors import ConnectionError, TimeoutError
+from producer import PopenFile
+from sharedcounter import SharedCounter
+from sshconnection import SSHConnection
+
+
+EOF = ''
+SPACE = ' '
+NEWLINE = '\n'
+SEMICOLON_JOIN = "; "
+SHELL = 'sh'
+SHELL_SUFFIX = 'shell'
+BEGIN = "__APE_BEGIN_"
+END = "__APE_END_"
+
+
+class PersistentShell(BaseClass):
+    """
+    A long-lived shell on a device that runs batches of commands
+    """
+    def __init__(self, connection, timeout=10):
+        """
+        :param:
+
+         - `connection`: the connection to the device
+         - `timeout`: seconds to wait for a batch to finish
+        """
+        super(PersistentShell, self).__init__()
+        self.connection = connection
+        self.timeout = timeout
+        self._shell_command = None
+        self._lock = None
+        self.stdin = None
+        self.stdout = None
+        self.process = None
+        self.count = 0
+        return
+
+    @property
+    def lock(self):
+        """
+        :return: lock so only one batch at a time is sent
+        """
+        if self._lock is None:
+            self._lock = threading.RLock()
+        return self._lock
+
+    @property
+    def shell_command(self):
+        """
+        :return: the command to start the shell
+        """
+        if self._shell_command is None:
+            prefix = getattr(self.connection, 'command_prefix', '').strip()
+            if prefix.endswith(SHELL_SUFFIX):
+                self._shell_command = prefix
+            else:
+                self._shell_command = SPACE.join((prefix, SHELL)).strip()
+        return self._shell_command
+
+    @property
+    def is_open(self):
+        """
+        :return: True if the shell has been opened and not closed
+        """
+        return self.stdin is not None
+
+    def open(self):
+        """
+        Starts the shell
+
+        :postcondition: self.stdin and self.stdout are set
+        :raise: ConnectionError if the shell can't be started
+        """
+        self.logger.debug("Opening persistent shell `{0}` on {1}".format(self.shell_command,
+                                                                         self.connection))
+        if isinstance(self.connection, SSHConnection):
+            self.stdin, self.stdout, stderr = self.connection.client.exec_command(self.shell_command,
+                                                                                  timeout=self.timeout)
+            return
+        try:
+            self.process = subprocess.Popen(shlex.split(self.shell_command),
+                                            stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE,
+                                            stderr=subprocess.STDOUT)
+        except OSError as error:
+            self.logger.error(error)
+            raise ConnectionError("Unable to start `{0}`".format(self.shell_command))
+        counter = SharedCounter()
+        counter.increment()
+        self.stdin = self.process.stdin
+        self.stdout = PopenFile(self.process.stdout, process=self.process,
+                                lock=threading.Lock(), counter=counter,
+                                timeout=self.timeout)
+        return
+
+    def readline(self):
+        """
+        :return: next line of output, None on timeout
+        """
+        try:
+            return self.stdout.readline()
+        except socket.timeout:
+            return None
+
+    def batch(self, commands):
+        """
+        Sends all the commands to the shell at once and collects their output
+
+        :param:
+
+         - `commands`: list of command strings
+
+        :return: list of lists of output lines (one list per command)
+        :raise: ConnectionError if the shell dies, TimeoutError if the batch doesn't finish
+        """
+        with self.lock:
+            if not self.is_open:
+                self.open()
+            self.count += 1
+            lines = []
+            for index, command in enumerate(commands):
+                lines.append('echo "{0}""{1} {2}"'.format(BEGIN, self.count, index))
+                lines.append("{0} 2>&1".format(command))
+            lines.append('echo "{0}""{1}"'.format(END, self.count))
+            try:
+                self.stdin.write(SEMICOLON_JOIN.join(lines) + NEWLINE)
+                self.stdin.flush()
+            except (IOError, socket.error) as error:
+                self.logger.error(error)
+                self.close()
+                raise ConnectionError("Lost the persistent shell on {0}".format(self.connection))
+
+            begin = "{0}{1} ".format(BEGIN, self.count)
+            end = "{0}{1}".format(END, self.count)
+            outputs = [[] for command in commands]
+            current = None
+            deadline = time() + self.timeout
+            while True:
+                line = self.readline()
+                if line == EOF:
+                    self.close()
+                    raise ConnectionError("The persistent shell on {0} exited".format(self.connection))
+                if line is None:
+                    if time() > deadline:
+                        self.close()
+                        raise TimeoutError("Batch {0} timed out after {1} seconds".format(self.count,
+                                                                                         self.timeout))
+                    continue
+                # output without a trailing newline runs into the next marker
+                position = line.find(end)
+                if position >= 0 and not line[position + len(end):].strip():
+                    if position and current is not None:
+                        current.append(line[:position])
+                    break
+                position = line.find(begin)
+                if position >= 0:
+                    if position and current is not None:
+                        current.append(line[:position])
+                    current = outputs[int(line[position + len(begin):])]
+                    continue
+                if current is not None:
+                    current.append(line)
+        return outputs
+
+    def close(self):
+        """
+        Closes the shell
+
+        :postcondition: self.stdin and self.stdout are None
+        """
+        if self.stdin is not None:
+            try:
+                self.stdin.close()
+            except (IOError, socket.error) as error:
+                self.logger.debug(error)
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.kill()
+            except OSError as error:
+                self.logger.debug(error)
+        self.stdin = self.stdout = self.process = None
+        return
+
+    def __del__(self):
+        """
+        :postcondition: self.close called
+        """
+        self.close()
+        return
+# end class PersistentShell
@@ -0,0 +1,370 @@
+
+# python standard library
+from collections import deque
+import errno
+import os
+import Queue
+import select
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # windows
+    fcntl = None
+
+# apetools
+from apetools.baseclass import BaseThreadClass
+from apetools.threads.threads import Thread
+
+
+EOF = ''
+NEWLINE = '\n'
+CHUNK_SIZE = 4096
+QUEUE_SIZE = 10000
+PAUSED_TIMEOUT = 1
+WAKE = 'w'
+# the epoll flags have the same values as the poll flags
+READABLE = select.POLLIN | select.POLLPRI if hasattr(select, 'poll') else None
+CLOSED = select.POLLHUP | select.POLLERR | select.POLLNVAL if hasattr(select, 'poll') else None
+
+
+def set_cloexec(descriptor):
+    """
+    Keeps the descriptor from being inherited by the subprocesses
+
+    :param:
+
+     - `descriptor`: a file-descriptor
+    """
+    if fcntl is None:
+        return
+    flags = fcntl.fcntl(descriptor, fcntl.F_GETFD)
+    fcntl.fcntl(descriptor, fcntl.F_SETFD, flags | fcntl.FD_CLOEXEC)
+    return
+
+
+class Poller(object):
+    """
+    A select.epoll (or select.poll if there's no epoll)
+    """
+    def __init__(self):
+        if hasattr(select, 'epoll'):
+            self.poller = select.epoll()
+            set_cloexec(self.poller.fileno())
+            self.scale = 1
+        else:
+            self.poller = select.poll()
+            # poll's timeout is in milliseconds
+            self.scale = 1000
+        return
+
+    def register(self, descriptor, events=READABLE):
+        """
+        :param:
+
+         - `descriptor`: file-descriptor to watch
+         - `events`: event-mask to watch for
+        """
+        try:
+            self.poller.register(descriptor, events)
+        except IOError as error:
+            if error.errno != errno.EEXIST:
+                raise
+            self.poller.modify(descriptor, events)
+        return
+
+    def unregister(self, descriptor):
+        """
+        :param:
+
+         - `descriptor`: file-descriptor to stop watching
+        """
+        try:
+            self.poller.unregister(descriptor)
+        except (IOError, OSError, KeyError, ValueError):
+            # epoll forgets descriptors that were closed
+            pass
+        return
+
+    def poll(self, timeout=None):
+        """
+        :param:
+
+         - `timeout`: seconds to wait (None to wait until there's an event)
+
+        :return: list of (descriptor, event) (empty if interrupted)
+        """
+        if timeout is None:
+            timeout = -1
+        else:
+            timeout *= self.scale
+        try:
+            return self.poller.poll(timeout)
+        except (select.error, IOError) as error:
+            if error.args[0] == errno.EINTR:
+                return []
+            raise
+# end class Poller
+
+
+class LineQueue(Queue.Queue):
+    """
+    A bounded Queue that wakes the reader when a paused pipe has room
+    """
+    def __init__(self, maxsize=QUEUE_SIZE):
+        """
+        :param:
+
+         - `maxsize`: the most lines to hold
+        """
+        Queue.Queue.__init__(self, maxsize)
+        self.waiting = False
+        self.wake = None
+        return
+
+    def get(self, block=True, timeout=None):
+        """
+        :return: the next line (waking the reader if it's waiting for room)
+        """
+        item = Queue.Queue.get(self, block, timeout)
+        if self.waiting:
+            self.waiting = False
+            if self.wake is not None:
+                self.wake()
+        return item
+# end class LineQueue
+
+
+class Pipe(object):
+    """
+    A registered pipe's queue and the output that hasn't been queued
+    """
+    def __init__(self, queue):
+        """
+        :param:
+
+         - `queue`: the Queue to put the lines on
+        """
+        self.queue = queue
+        self.buffer = EOF
+        self.pending = deque()
+        self.paused = False
+        self.finished = False
+        return
+# end class Pipe
+
+
+class PipeReader(BaseThreadClass):
+    """
+    A single thread that reads many pipes
+    """
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        """
+        :param:
+
+         - `chunk_size`: maximum bytes to read from a pipe at once
+        """
+        super(PipeReader, self).__init__()
+        self.chunk_size = chunk_size
+        self.pipes = {}
+        self.lock = threading.RLock()
+        self.thread = None
+        self._poller = None
+        self._wake_read = None
+        self._wake_write = None
+        return
+
+    @property
+    def paused(self):
+        """
+        :return: True if a pipe is waiting for room in its queue
+        """
+        return any(pipe.paused for pipe in self.pipes.itervalues())
+
+    @property
+    def available(self):
+        """
+        :return: True if this platform's select has poll (so pipes can be registered)
+        """
+        return READABLE is not None
+
+    @property
+    def poller(self):
+        """
+        :return: Poller with the wake-up pipe registered
+        """
+        if self._poller is None:
+            self._wake_read, self._wake_write = os.pipe()
+            for descriptor in (self._wake_read, self._wake_write):
+                set_cloexec(descriptor)
+            if fcntl is not None:
+                # a wake when the pipe is full isn't needed (one is waiting)
+                flags = fcntl.fcntl(self._wake_write, fcntl.F_GETFL)
+                fcntl.fcntl(self._wake_write, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+            self._poller = Poller()
+            self._poller.register(self._wake_read, READABLE)
+        return self._poller
+
+    def wake(self):
+        """
+        :postcondition: the poll in the thread returns
+        """
+        try:
+            os.write(self._wake_write, WAKE)
+        except OSError as error:
+            if error.errno != errno.EAGAIN:
+                self.logger.debug(error)
+        return
+
+    def register(self, file_object, queue):
+        """
+        Starts watching the file (starting the thread if needed)
+
+        :param:
+
+         - `file_object`: a readable file with a `fileno`
+         - `queue`: the Queue (preferably a LineQueue) to put the lines on
+
+        :raise: AttributeError, TypeError or ValueError if file_object has no usable fileno
+        """
+        descriptor = file_object.fileno()
+        with self.lock:
+            self.poller.register(descriptor, READABLE)
+            if isinstance(queue, LineQueue):
+                queue.wake = self.wake
+            self.pipes[descriptor] = Pipe(queue)
+            if self.thread is None:
+                self.thread = Thread(target=self.run_thread, name="PipeReader")
+            else:
+                self.wake()
+        return
+
+    def unregister(self, file_object):
+        """
+        Stops watching the file (no EOF is put on its queue)
+
+        :param:
+
+         - `file_object`: a registered file
+        """
+        try:
+            descriptor = file_object.fileno()
+        except (AttributeError, ValueError):
+            return
+        with self.lock:
+            if self.pipes.pop(descriptor, None) is not None:
+                self.poller.unregister(descriptor)
+                self.wake()
+        return
+
+    def finish(self, descriptor):
+        """
+        Puts the remaining buffer and the EOF on the queue and stops watching the pipe
+
+        :param:
+
+         - `descriptor`: file-descriptor that reached the end of file
+        """
+        pipe = self.pipes[descriptor]
+        if not pipe.paused:
+            self.poller.unregister(descriptor)
+        pipe.finished = True
+        if pipe.buffer:
+            pipe.pending.append(pipe.buffer)
+        pipe.pending.append(EOF)
+        self.flush(descriptor)
+        return
+
+    def flush(self, descriptor):
+        """
+        Moves the pipe's pending lines to its queue (pausing it if the queue fills)
+
+        :param:
+
+         - `descriptor`: a registered file-descriptor
+        """
+        pipe = self.pipes[descriptor]
+        while pipe.pending:
+            try:
+                pipe.queue.put_nowait(pipe.pending[0])
+            except Queue.Full:
+                if pipe.paused:
+                    return
+                pipe.paused = True
+                pipe.queue.waiting = True
+                if not pipe.finished:
+                    self.poller.unregister(descriptor)
+                # try again in case a line was taken before `waiting` was set
+                continue
+            pipe.pending.popleft()
+        if pipe.finished:
+            del self.pipes[descriptor]
+        elif pipe.paused:
+            pipe.paused = False
+            self.poller.register(descriptor, READABLE)
+        return
+
+    def read(self, descriptor):
+        """
+        Reads a chunk from the pipe and puts the complete lines on its queue
+
+        :param:
+
+         - `descriptor`: a registered file-descriptor that is readable
+        """
+        try:
+            chunk = os.read(descriptor, self.chunk_size)
+        except OSError as error:
+            if error.errno in (errno.EAGAIN, errno.EINTR):
+                return
+            self.logger.debug(error)
+            chunk = EOF
+        if chunk == EOF:
+            self.finish(descriptor)
+            return
+        pipe = self.pipes[descriptor]
+        lines = (pipe.buffer + chunk).split(NEWLINE)
+        pipe.buffer = lines.pop()
+        pipe.pending.extend(line + NEWLINE for line in lines)
+        self.flush(descriptor)
+        return
+
+    def run(self):
+        """
+        Reads the pipes until there are none left
+
+        :postcondition: self.thread is None
+        """
+        try:
+            while True:
+                with self.lock:
+                    if not self.pipes:
+                        self.thread = None
+                        return
+                    timeout = PAUSED_TIMEOUT if self.paused else None
+                events = self.poller.poll(timeout)
+                with self.lock:
+                    for descriptor, event in events:
+                        if descriptor == self._wake_read:
+                            os.read(self._wake_read, self.chunk_size)
+                            continue
+                        pipe = self.pipes.get(descriptor)
+                        if pipe is None or pipe.paused:
+                            continue
+                        if event & READABLE:
+                            self.read(descriptor)
+                        elif event & CLOSED:
+                            self.finish(descriptor)
+                    for descriptor in [descriptor for descriptor, pipe in self.pipes.iteritems()
+                                       if pipe.paused]:
+                        self.flush(descriptor)
+        finally:
+            # an unexpected error mustn't leave a dead reader registered (register starts a new one)
+            with self.lock:
+                if self.thread is threading.current_thread():
+                    self.thread = None
+        return
+# end class PipeReader
+
+pipe_reader = PipeReader()
@@ -3,15 +3,16 @@ import subprocess
 import threading
 import Queue
 from time import time as now
-from sys import maxint
 import shlex
 
 from apetools.baseclass import BaseThreadClass, BaseClass
 from sharedcounter import SharedCounter
+from pipereader import pipe_reader, LineQueue
 
 
 EOF = ""
 SPACE = ' '
+POLL_INTERVAL = 0.1
 
 
 class PopenProducer(BaseClass):
@@ -120,7 +121,8 @@ class PopenFile(BaseThreadClass):
     """
     A container for a process' readable file-outputs
     """
-    def __init__(self, file_object, process, lock, counter=None, timeout=10, queue=None):
+    def __init__(self, file_object, process, lock, counter=None, timeout=10, queue=None,
+                 reader=None):
         """
         :param:
 
@@ -129,6 +131,7 @@ class PopenFile(BaseThreadClass):
          - `process`: process that created the file_object
          - `timeout`: max time to try a readline
          - `queue`: where to put output read from the file_object
+         - `reader`: PipeReader to feed the queue (default is the shared pipe_reader)
         """
         super(PopenFile, self).__init__()
         self.file_object = file_object
@@ -140,17 +143,28 @@ class PopenFile(BaseThreadClass):
         self.stop = False
         self.process = process
         self.lock = lock
+        self._reader = reader
+        self.registered = False
         return
 
     @property
     def queue(self):
         """
-        :return: Queue.Queue for lines of output
+        :return: LineQueue for lines of output
         """
         if self._queue is None:
-            self._queue = Queue.Queue()
+            self._queue = LineQueue()
         return self._queue
 
+    @property
+    def reader(self):
+        """
+        :return: the PipeReader that feeds the queue
+        """
+        if self._reader is None:
+            self._reader = pipe_reader
+        return self._reader
+
     def run(self):
         """
         :postcondition: lines read from the file and put on the Queue
@@ -176,12 +190,23 @@ class PopenFile(BaseThreadClass):
 
     def start(self):
         """
-        :postcondition: self.run executing as self.thread
+        :postcondition: file registered with the reader, self.run executing as self.thread or EOF queued if there's no file
         """
         if self.started:
             return
-        self.logger.debug("Starting thread")
         self.started = True
+        if self.file_object is None:
+            # the stream was redirected (e.g. stderr to stdout)
+            self.queue.put(EOF)
+            return
+        if self.reader.available:
+            try:
+                self.reader.register(self.file_object, self.queue)
+                self.registered = True
+                return
+            except (AttributeError, TypeError, ValueError) as error:
+                self.logger.debug("Unable to register with the pipe-reader: {0}".format(error))
+        self.logger.debug("Starting thread")
         self.thread = threading.Thread(target=self.run_thread)
         self.thread.daemon = True
         self.thread.start()
@@ -211,20 +236,27 @@ class PopenFile(BaseThreadClass):
         :return: lines from the queue joined as a string
         """
         self.start()
-        output = EOF
-        line = None
-
-        max_time = maxint
+        output = []
+        deadline = None
         if timeout is not None:
-            max_time = now() + timeout
-            
-        while all((line != EOF, self.process.poll() is None,  now() < max_time)):
+            deadline = now() + timeout
+
+        while True:
+            wait = POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - now())
+                if wait <= 0:
+                    break
             try:
-                line = self.queue.get(block=False)
+                line = self.queue.get(block=True, timeout=wait)
             except Queue.Empty:
+                if self.process.poll() is not None:
+                    break
                 continue
-            output += line
-        return output
+            if line == EOF:
+                break
+            output.append(line)
+        return EOF.join(output)
 
     def close(self):
         """
@@ -232,6 +264,9 @@ class PopenFile(BaseThreadClass):
         """
         with self.lock:
             if self.file_object is not None:
+                if self.registered:
+                    self.reader.unregister(self.file_object)
+                    self.registered = False
                 self.logger.debug("Closing the file")
                 self.file_object.close()
                 if self.process.poll() is None:
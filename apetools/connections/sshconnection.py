@@ -18,6 +18,7 @@ ConnectionError = errors.ConnectionError
 # connections
 from nonlocalconnection import NonLocalConnection
 from localconnection import OutputError
+from sshpool import pool_for, release, MAX_SESSIONS, KEEPALIVE
 
 
 SPACER = '{0} {1}'
@@ -108,7 +109,8 @@ class SimpleClient(BaseClass):
 
     The only intended public interface is exec_command.
     """
-    def __init__(self, hostname, username, password=None, port=22, timeout=5):
+    def __init__(self, hostname, username, password=None, port=22, timeout=5,
+                 max_sessions=MAX_SESSIONS, keepalive=KEEPALIVE):
         """
         :param:
 
@@ -117,6 +119,8 @@ class SimpleClient(BaseClass):
          - `password`: optional if ssh-keys are set up.
          - `port`: The port for the ssh process.
          - `timeout`: Time to give the client to connect
+         - `max_sessions`: channels to allow at once on each pooled transport
+         - `keepalive`: seconds between keepalives on the pooled transports
         """
         super(SimpleClient, self).__init__()
         self._logger = None
@@ -125,9 +129,34 @@ class SimpleClient(BaseClass):
         self.password = password
         self.port = port
         self.timeout = timeout
-        self._client = None
+        self.max_sessions = max_sessions
+        self.keepalive = keepalive
+        self._pool = None
         return
 
+    @property
+    def pool(self):
+        """
+        :return: the shared SSHPool for the host
+        """
+        if self._pool is None or self._pool.closed:
+            self._pool = pool_for(hostname=self.hostname,
+                                  username=self.username,
+                                  password=self.password,
+                                  port=self.port,
+                                  timeout=self.timeout,
+                                  max_sessions=self.max_sessions,
+                                  keepalive=self.keepalive,
+                                  client_class=SSHClient)
+        return self._pool
+
+    @property
+    def statistics(self):
+        """
+        :return: PoolStatistics for the host's pool
+        """
+        return self.pool.statistics
+
     def exec_command(self, command, timeout=10):
         """
         A pass-through to the SSHClient's exec_command.
@@ -145,10 +174,9 @@ class SimpleClient(BaseClass):
         if not command.endswith(NEWLINE):
             command += NEWLINE
         try:
-            return self.client.exec_command(command, timeout)
+            return self.pool.exec_command(command, timeout)
 
         except paramiko.SSHException as error:
-            self._client = None
             self.logger.error(error)
             raise ConnectionError("There is a problem with the ssh-connection to:\n {0}".format(self))
         except paramiko.PasswordRequiredException as error:
@@ -161,31 +189,32 @@ class SimpleClient(BaseClass):
                 raise ConnectionError("SSH Server Not responding: check setup:\n {0}".format(self))
             raise ConnectionError("Problem with:\n {0}".format(self))
         return
+
+    def open_sftp(self):
+        """
+        :return: paramiko SFTPClient on a channel from the pool
+        :raise: ConnectionError for paramiko or socket exceptions
+        """
+        try:
+            return self.pool.open_sftp()
+        except (paramiko.SSHException, socket.error, EOFError) as error:
+            self.logger.error(error)
+            raise ConnectionError("Unable to open an sftp-channel to:\n {0}".format(self))
+        return
         
     @property
     def client(self):
         """
         :rtype: paramiko.SSHClient
-        :return: An instance of SSHClient connected to remote host.
-        :raise: ClientError if the connection fails.
+        :return: An instance of SSHClient (from the pool) connected to remote host.
+        :raise: ConnectionError if the connection fails.
+
+        .. warning:: channels opened on the client aren't counted by the pool (use `exec_command` or `open_sftp`)
         """
-        if self._client is None:
-            self._client = SSHClient()
-            self._client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self._client.load_system_host_keys()
-            try:
-                self._client.connect(hostname=self.hostname,
-                                     port=self.port,
-                                     username=self.username,
-                                     password=self.password,
-                                     timeout=self.timeout)
-            except paramiko.AuthenticationException as error:
-                self.logger.error(error)
-                raise ConnectionError("There is a problem with the ssh-keys or password for \n{0}".format(self))
-            except socket.timeout as error:
-                self.logger.error(error)
-                raise ConnectionError("Paramiko is unable to connect to \n{0}".format(self))
-        return self._client
+        transport = self.pool.acquire()
+        with self.pool.condition:
+            transport.reserved -= 1
+        return transport.client
 
     def __str__(self):
         """
@@ -199,10 +228,11 @@ class SimpleClient(BaseClass):
 
     def close(self):
         """
-        :postcondition: client's connection is closed and self._client is None                
+        :postcondition: this client's use of the host's pool is released and self._pool is None
         """
-        self.client.close()
-        self._client = None
+        if self._pool is not None:
+            release(self._pool)
+        self._pool = None
         return
 # class SimpleClient
 
@@ -213,6 +243,7 @@ class SSHConnection(NonLocalConnection):
     """
     def __init__(self, hostname, username,
                  password=None, port=22, timeout=5, 
+                 max_sessions=MAX_SESSIONS, keepalive=KEEPALIVE,
                  *args, **kwargs):
         """
         SSHConnection Constructor
@@ -225,6 +256,8 @@ class SSHConnection(NonLocalConnection):
          - `port`: The ssh port
          - `operating_system`: OperatingSystem enumeration
          - `timeout`: The login timeout
+         - `max_sessions`: channels to allow at once on each pooled transport
+         - `keepalive`: seconds between keepalives on the pooled transports
         """
         super(SSHConnection, self).__init__(*args, **kwargs)
         self.hostname = hostname
@@ -232,6 +265,8 @@ class SSHConnection(NonLocalConnection):
         self.password = password
         self.port = port
         self.timeout = timeout
+        self.max_sessions = max_sessions
+        self.keepalive = keepalive
         self._logger = None
         self._client = None
         self._lock = None
@@ -245,8 +280,17 @@ class SSHConnection(NonLocalConnection):
         if self._client is None:
             self._client = SimpleClient(hostname=self.hostname, username=self.username,
                                         password=self.password, port=self.port,
-                                        timeout=self.timeout)
+                                        timeout=self.timeout,
+                                        max_sessions=self.max_sessions,
+                                        keepalive=self.keepalive)
         return self._client
+
+    @property
+    def statistics(self):
+        """
+        :return: PoolStatistics for the connection's ssh pool
+        """
+        return self.client.statistics
     
 
     def _main(self, command, arguments, timeout):
@@ -272,13 +316,9 @@ class SSHConnection(NonLocalConnection):
         command = SPACER.format(command, arguments)
         self.logger.debug("calling client.exec_command with '{0}'".format(command))
 
-        # the guys at Ryan's house are running into 'Administratively prohibited'
-        # which apparently happens if too many clients try to connect to the ssh-server
-        # I don't think this is where the problem is
-        # but to take this out of the question I'm going to put a lock so no more
-        # than one paramiko client can hit the server at once
-        with self.lock:
-            stdin, stdout, stderr = self.client.exec_command(command, timeout=timeout)
+        # 'Administratively prohibited' (too many sessions on the ssh-server)
+        # is handled by the pool, which limits the channels on each transport
+        stdin, stdout, stderr = self.client.exec_command(command, timeout=timeout)
         
         self.logger.debug("Completed exec_command of: '{0}'".format(command))
 
@@ -0,0 +1,360 @@
+
+# python standard library
+from collections import namedtuple
+import socket
+import threading
+from time import time, sleep
+from weakref import WeakSet
+
+# third-party
+import paramiko
+
+# apetools
+from apetools.baseclass import BaseClass
+from apetools.commons.errors import ConnectionError
+from apetools.threads.threads import Thread
+
+
+MAX_SESSIONS = 8
+MAX_TRANSPORTS = 2
+KEEPALIVE = 30
+WAIT = 60
+WAIT_TICK = 0.1
+RETRIES = 2
+BACKOFF_START = 1
+BACKOFF_MAX = 30
+NEWLINE = "\n"
+
+
+PoolStatistics = namedtuple("PoolStatistics", "transports channels opened reconnects waits")
+
+
+class PooledTransport(object):
+    """
+    A connected client and the channels open on it
+    """
+    def __init__(self, client, max_sessions=MAX_SESSIONS):
+        """
+        :param:
+
+         - `client`: a connected SSHClient
+         - `max_sessions`: the number of channels to allow at once
+        """
+        self.client = client
+        self.max_sessions = max_sessions
+        self.channels = WeakSet()
+        self.reserved = 0
+        return
+
+    @property
+    def sessions(self):
+        """
+        :return: count of channels that aren't closed (and those being opened)
+        """
+        return self.reserved + len([channel for channel in self.channels if not channel.closed])
+
+    @property
+    def is_active(self):
+        """
+        :return: True if the transport is still connected
+        """
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    @property
+    def has_capacity(self):
+        """
+        :return: True if another channel can be opened
+        """
+        return self.sessions < self.max_sessions
+# end class PooledTransport
+
+
+class SSHPool(BaseClass):
+    """
+    A pool of ssh-transports to one host
+    """
+    def __init__(self, hostname, username, password=None, port=22, timeout=5,
+                 max_sessions=MAX_SESSIONS, max_transports=MAX_TRANSPORTS,
+                 keepalive=KEEPALIVE, wait=WAIT, client_class=None):
+        """
+        :param:
+
+         - `hostname`: ip address or resolvable hostname.
+         - `username`: the login name.
+         - `password`: optional if ssh-keys are set up.
+         - `port`: The port for the ssh process.
+         - `timeout`: Time to give a transport to connect
+         - `max_sessions`: channels to allow at once on each transport
+         - `max_transports`: transports to open to the host
+         - `keepalive`: seconds between keepalives (0 to disable)
+         - `wait`: seconds to wait for a free channel before giving up
+         - `client_class`: class to build the clients (default is paramiko.SSHClient)
+        """
+        super(SSHPool, self).__init__()
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.port = port
+        self.timeout = timeout
+        self.max_sessions = max_sessions
+        self.max_transports = max_transports
+        self.keepalive = keepalive
+        self.wait = wait
+        self.client_class = client_class
+        if client_class is None:
+            self.client_class = paramiko.SSHClient
+        self.transports = []
+        self.condition = threading.Condition(threading.RLock())
+        self.opened = 0
+        self.reconnects = 0
+        self.waits = 0
+        self.reconnecting = None
+        self.closed = False
+        self.users = 0
+        self.connecting = 0
+        return
+
+    def connect(self):
+        """
+        :return: PooledTransport with a newly connected client
+        :raise: ConnectionError if the connection fails
+        """
+        client = self.client_class()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.load_system_host_keys()
+        try:
+            client.connect(hostname=self.hostname,
+                           port=self.port,
+                           username=self.username,
+                           password=self.password,
+                           timeout=self.timeout)
+        except paramiko.AuthenticationException as error:
+            self.logger.error(error)
+            raise ConnectionError("There is a problem with the ssh-keys or password for \n{0}".format(self))
+        except (socket.timeout, socket.error) as error:
+            self.logger.error(error)
+            raise ConnectionError("Paramiko is unable to connect to \n{0}".format(self))
+        if self.keepalive:
+            client.get_transport().set_keepalive(self.keepalive)
+        return PooledTransport(client, self.max_sessions)
+
+    def discard(self, transport):
+        """
+        Removes the transport from the pool and starts the background re-connect
+
+        :param:
+
+         - `transport`: a PooledTransport that isn't active
+        """
+        with self.condition:
+            if transport in self.transports:
+                self.transports.remove(transport)
+                self.logger.warning("Lost a transport to {0}".format(self.hostname))
+                try:
+                    transport.client.close()
+                except (paramiko.SSHException, socket.error, EOFError) as error:
+                    self.logger.debug(error)
+                if self.reconnecting is None and not self.closed:
+                    self.reconnecting = Thread(target=self.reconnect,
+                                               name="SSHPool {0}".format(self.hostname))
+        return
+
+    def acquire(self):
+        """
+        :return: a PooledTransport with a free channel reserved
+        :raise: ConnectionError if none is free after `wait` seconds
+        """
+        deadline = time() + self.wait
+        with self.condition:
+            while True:
+                for transport in self.transports[:]:
+                    if not transport.is_active:
+                        self.discard(transport)
+                    elif transport.has_capacity:
+                        transport.reserved += 1
+                        return transport
+                if len(self.transports) + self.connecting < self.max_transports:
+                    self.connecting += 1
+                    break
+                remaining = deadline - time()
+                if remaining <= 0:
+                    raise ConnectionError("All the ssh-sessions to {0} stayed busy for {1} seconds".format(self.hostname,
+                                                                                                         self.wait))
+                self.waits += 1
+                self.condition.wait(min(WAIT_TICK, remaining))
+
+        # the slot is reserved, connect without blocking the callers of the other transports
+        transport = None
+        try:
+            transport = self.connect()
+        finally:
+            with self.condition:
+                self.connecting -= 1
+                if transport is not None and not self.closed:
+                    transport.reserved += 1
+                    self.transports.append(transport)
+                self.condition.notify_all()
+        if self.closed:
+            transport.client.close()
+            raise ConnectionError("The pool for {0} was closed while connecting".format(self.hostname))
+        return transport
+
+    def open_sftp(self):
+        """
+        :return: paramiko SFTPClient on a channel counted against the transport's sessions
+        :raise: ConnectionError if no transport is available, paramiko.SSHException or socket.error if the channel can't be opened
+        """
+        transport = self.acquire()
+        sftp = None
+        try:
+            sftp = transport.client.open_sftp()
+        finally:
+            with self.condition:
+                transport.reserved -= 1
+                if sftp is not None:
+                    transport.channels.add(sftp.get_channel())
+                    self.opened += 1
+        return sftp
+
+    def exec_command(self, command, timeout=10):
+        """
+        Runs the command on a channel from the pool
+
+        :param:
+
+         - `command`: A string to send to the host.
+         - `timeout`: Set non-blocking timeout.
+
+        :rtype: tuple
+        :return: stdin, stdout, stderr
+        :raise: ConnectionError if no transport is available, paramiko.SSHException or socket.error if the retries fail
+        """
+        last_error = None
+        for attempt in range(RETRIES):
+            transport = self.acquire()
+            try:
+                stdin, stdout, stderr = transport.client.exec_command(command, timeout=timeout)
+            except (paramiko.SSHException, socket.error, EOFError) as error:
+                self.logger.debug(error)
+                last_error = error
+                with self.condition:
+                    transport.reserved -= 1
+                    if transport.is_active:
+                        transport.max_sessions = max(1, transport.sessions)
+                        self.logger.warning("{0} refused a channel, limiting the transport to {1}".format(self.hostname,
+                                                                                                          transport.max_sessions))
+                    else:
+                        self.discard(transport)
+                continue
+            with self.condition:
+                transport.reserved -= 1
+                transport.channels.add(stdout.channel)
+                self.opened += 1
+            return stdin, stdout, stderr
+        if isinstance(last_error, EOFError):
+            raise paramiko.SSHException(str(last_error))
+        raise last_error
+
+    def reconnect(self):
+        """
+        Re-connects a transport (backing off between attempts) unless the pool has one
+        """
+        backoff = BACKOFF_START
+        while not self.closed:
+            with self.condition:
+                if any(transport.is_active for transport in self.transports):
+                    self.reconnecting = None
+                    return
+            try:
+                transport = self.connect()
+            except ConnectionError as error:
+                self.logger.debug(error)
+                sleep(backoff)
+                backoff = min(2 * backoff, BACKOFF_MAX)
+                continue
+            with self.condition:
+                self.transports.append(transport)
+                self.reconnects += 1
+                self.reconnecting = None
+                self.condition.notify_all()
+            self.logger.info("Re-connected a transport to {0}".format(self.hostname))
+            return
+        self.reconnecting = None
+        return
+
+    @property
+    def statistics(self):
+        """
+        :return: PoolStatistics for the pool
+        """
+        with self.condition:
+            transports = [transport for transport in self.transports if transport.is_active]
+            return PoolStatistics(transports=len(transports),
+                                  channels=sum(transport.sessions for transport in transports),
+                                  opened=self.opened,
+                                  reconnects=self.reconnects,
+                                  waits=self.waits)
+
+    def close(self):
+        """
+        :postcondition: all the transports are closed and no re-connects will be attempted
+        """
+        with self.condition:
+            self.closed = True
+            for transport in self.transports:
+                transport.client.close()
+            self.transports = []
+        return
+
+    def __str__(self):
+        """
+        :return: username, hostname, port in string
+        """
+        return NEWLINE.join(["Username: {0}".format(self.username),
+                             "Hostname: {0}".format(self.hostname),
+                             "Port: {0}".format(self.port)])
+# end class SSHPool
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def pool_for(hostname, username, port=22, **kwargs):
+    """
+    :param:
+
+     - `hostname`: ip address or resolvable hostname.
+     - `username`: the login name.
+     - `port`: The port for the ssh process.
+     - `kwargs`: the rest of the SSHPool parameters (only used if the pool is created)
+
+    :return: the SSHPool for the host (with the caller counted as a user)
+    """
+    with pools_lock:
+        key = (hostname, port, username)
+        if key not in pools or pools[key].closed:
+            pools[key] = SSHPool(hostname=hostname, username=username,
+                                 port=port, **kwargs)
+        pools[key].users += 1
+        return pools[key]
+
+
+def release(pool):
+    """
+    Drops one user of the pool, closing it and removing it from the shared pools if it was the last
+
+    :param:
+
+     - `pool`: an SSHPool (from `pool_for`)
+    """
+    with pools_lock:
+        pool.users -= 1
+        if pool.users > 0:
+            return
+        key = (pool.hostname, pool.port, pool.username)
+        if pools.get(key) is pool:
+            del pools[key]
+    pool.close()
+    return
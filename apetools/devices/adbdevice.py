@@ -68,14 +68,14 @@ class AdbDevice(BaseDevice):
         """
         :return: the ssid of the attached AP
         """
-        return self._wifi_querier.ssid
+        return self.wifi_querier.ssid
 
     @property
     def bssid(self):
         """
         :return: the MAC address of the attached AP
         """
-        return self._wifi_querier.bssid
+        return self.wifi_querier.bssid
     
     @property
     def mac_address(self):
@@ -29,6 +29,8 @@ class ConfigOptions(object):
     repetitions_option  = "repetitions"
     repeat_option = 'repeat'
     recovery_time_option = "recovery_time"
+    workers_option = "workers"
+    local_option = "local"
     
     test_interface_option = "test_interface"
     operating_system_option = "operating_system"
@@ -59,6 +61,8 @@ class ConfigOptions(object):
     time_to_recovery_section = "TIMETORECOVERY"
     threshold_option = "threshold"
     timeout_option = "timeout"
+    fan_out_option = "fan_out"
+    time_to_failure_section = "TIMETOFAILURE"
     affector_section = "AFFECTOR"
     affector_type_option = "type"
     switches_option = "switches"
@@ -55,6 +55,14 @@ class ParameterGenerator(BaseClass):
             self._tree = ParameterTree(self.parameters)
         return self._tree
 
+    @property
+    def fingerprint(self):
+        """
+        :return: list of (name, number of values) for each level of the tree (to check a journal against)
+        """
+        return [(name, size) for (name, cargo), size in zip(self.tree.levels,
+                                                            self.tree.sizes)]
+
 
     def __iter__(self):
         """
@@ -1,6 +1,7 @@
 
 # python standard library
 from collections import namedtuple
+from operator import mul
 
 
 Parameters = namedtuple("Parameters", "name parameters".split())
@@ -40,7 +41,10 @@ class ParameterTree(object):
         """
         self.parameters = parameters
         self._tree = None
-        self._paths = None
+        self._levels = None
+        self._sizes = None
+        self._total_count = None
+        self._path_type = None
         return
 
     @property
@@ -63,27 +67,104 @@ class ParameterTree(object):
             self._tree = tree
         return self._tree
 
+    @property
+    def levels(self):
+        """
+        :return: list of (name, list of Parameters) for each level
+        """
+        if self._levels is None:
+            self._levels = [(level.name,
+                             [Parameters(name=level.name, parameters=sibling)
+                              for sibling in level.parameters])
+                            for level in self.parameters]
+        return self._levels
+
+    @property
+    def sizes(self):
+        """
+        :return: list of the number of parameters in each level
+        """
+        if self._sizes is None:
+            self._sizes = [len(cargo) for name, cargo in self.levels]
+        return self._sizes
+
+    @property
+    def total_count(self):
+        """
+        :return: the number of paths (product of the level sizes)
+        """
+        if self._total_count is None:
+            self._total_count = reduce(mul, self.sizes, 1)
+        return self._total_count
+
+    @property
+    def path_type(self):
+        """
+        :return: namedtuple class shared by all the paths
+        """
+        if self._path_type is None:
+            names = []
+            for name, cargo in self.levels:
+                if name not in names:
+                    names.append(name)
+            self._path_type = namedtuple("Paths", ["total_count"] + names)
+        return self._path_type
+
+    def path(self, index):
+        """
+        Builds a single path without building the paths before it
+
+        :param:
+
+         - `index`: the (zero-based) position of the path (negative counts back from the end)
+
+        :return: Paths namedtuple
+        :raise: IndexError if the index is out of range
+        """
+        total_count = self.total_count
+        if index < 0:
+            index += total_count
+        if not 0 <= index < total_count:
+            raise IndexError("path index {0} out of range (0-{1})".format(index,
+                                                                           total_count - 1))
+        fields = {"total_count":total_count}
+        for (name, cargo), size in reversed(zip(self.levels, self.sizes)):
+            index, digit = divmod(index, size)
+            fields.setdefault(name, cargo[digit])
+        return self.path_type(**fields)
+
+    def paths_from(self, index=0):
+        """
+        A generator of paths starting at the given index (to resume a sweep)
+
+        :param:
+
+         - `index`: the (zero-based) position of the first path to yield
+
+        :yield: Paths namedtuples in order
+        """
+        for path_index in xrange(index, self.total_count):
+            yield self.path(path_index)
+        return
+
     @property
     def paths(self):
         """
-        :return: list of namedtuples
-        """
-        if self._paths is None:
-            # create the paths with a series of tree-traversals
-            self._paths = []
-            for limb in self.tree:
-                path = {}
-                self._traverse(limb, path, self._paths)
-
-            # convert self._paths from dicts to namedtuples
-            paths = []
-            for path in self._paths:
-                Paths = namedtuple("Paths", ["total_count"] + path.keys())
-                fields = dict([(f,path[f]) for f in Paths._fields if f != "total_count"])
-                fields["total_count"] = len(self._paths)
-                paths.append(Paths(**fields))
-            self._paths = paths
-        return self._paths
+        :return: generator of Paths namedtuples
+        """
+        return self.paths_from(0)
+
+    def __len__(self):
+        """
+        :return: total_count
+        """
+        return self.total_count
+
+    def __getitem__(self, index):
+        """
+        :return: path at index
+        """
+        return self.path(index)
     
     def _traverse(self, tree, path, paths):
         """
@@ -111,3 +192,22 @@ class ParameterTree(object):
             self._traverse(child, new_path, paths)
         return
 # end class Parameter_Tree
+
+
+if __name__ == "__main__":
+    import time
+    levels = [Parameters("repetition", range(100)),
+              Parameters("nodes", "a b c d".split()),
+              Parameters("direction", "to from".split()),
+              Parameters("attenuation", range(0, 100, 2)),
+              Parameters("angle", range(0, 360, 30))]
+    start = time.time()
+    tree = ParameterTree(levels)
+    first = next(tree.paths)
+    print "first path after {0:.6f} seconds".format(time.time() - start)
+    start = time.time()
+    count = sum(1 for path in tree.paths)
+    print "{0} paths in {1:.3f} seconds".format(count, time.time() - start)
+    start = time.time()
+    middle = tree[count/2]
+    print "path {0} in {1:.6f} seconds".format(count/2, time.time() - start)
@@ -1,8 +1,13 @@
 
 # Python Libraries
+import atexit
+from collections import namedtuple
 import logging
 import logging.handlers
 import os
+from Queue import Queue, Empty, Full
+import threading
+from time import time
 
 
 logger = logging.getLogger(__package__)
@@ -18,6 +23,10 @@ BACKUP_LOGS = 5
 
 LOGNAME = "{0}.log".format(__package__)
 
+QUEUE_SIZE = 10000
+BATCH_SIZE = 256
+RATE_WINDOW = 1
+
 
 def cleanup(log_directory="last_log"):
     """
@@ -40,13 +49,202 @@ def cleanup(log_directory="last_log"):
     return
 
 
+LogStatistics = namedtuple("LogStatistics", "received dropped rate")
+
+
+class QueueHandler(logging.Handler):
+    """
+    A handler that puts the records on a queue for the QueueListener
+    """
+    def __init__(self, queue=None, block_level=logging.WARNING):
+        """
+        :param:
+
+         - `queue`: a bounded Queue (one is created if not given)
+         - `block_level`: records at or above this level wait if the queue is full
+        """
+        logging.Handler.__init__(self)
+        self.queue = queue
+        if queue is None:
+            self.queue = Queue(maxsize=QUEUE_SIZE)
+        self.block_level = block_level
+        self.received = 0
+        self.dropped = 0
+        self.window_start = time()
+        self.window_count = 0
+        self.rate = 0.
+        self.listener = None
+        return
+
+    @property
+    def statistics(self):
+        """
+        :return: LogStatistics for the handler
+        """
+        rate = self.rate
+        elapsed = time() - self.window_start
+        if elapsed >= RATE_WINDOW:
+            rate = self.window_count/elapsed
+        return LogStatistics(received=self.received,
+                             dropped=self.dropped,
+                             rate=rate)
+
+    def count(self):
+        """
+        :postcondition: the record is added to the counts
+        """
+        self.received += 1
+        self.window_count += 1
+        now = time()
+        elapsed = now - self.window_start
+        if elapsed >= RATE_WINDOW:
+            self.rate = self.window_count/elapsed
+            self.window_start = now
+            self.window_count = 0
+        return
+
+    def emit(self, record):
+        """
+        Builds the record's message and puts the record on the queue
+
+        :param:
+
+         - `record`: a LogRecord
+        """
+        self.count()
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging._defaultFormatter.formatException(record.exc_info)
+                record.exc_info = None
+            if record.levelno >= self.block_level:
+                self.queue.put(record)
+            else:
+                self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            self.handleError(record)
+        return
+
+    def stop(self):
+        """
+        Reports the statistics and stops the listener (if it hasn't been stopped yet)
+
+        :postcondition: statistics logged as a warning, queued records written, self.listener is None
+        """
+        if self.listener is None:
+            return
+        logger.warning("Logging: {0} records received, {1} dropped, {2:.1f} records/second".format(*self.statistics))
+        listener, self.listener = self.listener, None
+        listener.stop()
+        return
+# end class QueueHandler
+
+
+class QueueListener(object):
+    """
+    A thread that passes the queued records to the handlers
+    """
+    def __init__(self, queue, handlers, batch_size=BATCH_SIZE):
+        """
+        :param:
+
+         - `queue`: the QueueHandler's queue
+         - `handlers`: list of handlers to send the records to
+         - `batch_size`: most records to take from the queue at once
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.thread = None
+        self.sentinel = object()
+        return
+
+    def start(self):
+        """
+        :postcondition: the listener thread is running
+        """
+        self.thread = threading.Thread(target=self.run, name="QueueListener")
+        self.thread.daemon = True
+        self.thread.start()
+        return
+
+    def handle(self, records):
+        """
+        :param:
+
+         - `records`: a batch of LogRecords
+
+        :postcondition: records sent to the handlers that accept their level, handlers flushed
+        """
+        for handler in self.handlers:
+            handler.batching = True
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            handler.batching = False
+            handler.flush()
+        return
+
+    def run(self):
+        """
+        Takes batches of records off the queue until the sentinel is found
+        """
+        while True:
+            records = [self.queue.get()]
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self.queue.get_nowait())
+                except Empty:
+                    break
+            stopped = self.sentinel in records
+            if stopped:
+                records = records[:records.index(self.sentinel)]
+            self.handle(records)
+            if stopped:
+                return
+
+    def stop(self):
+        """
+        :postcondition: the queued records are written and the thread has stopped
+        """
+        if self.thread is not None:
+            self.queue.put(self.sentinel)
+            self.thread.join()
+            self.thread = None
+        return
+# end class QueueListener
+
+
+class BatchingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    A rotating file handler that doesn't flush while a batch is being written
+    """
+    batching = False
+
+    def flush(self):
+        """
+        :postcondition: the stream is flushed (unless a batch is being written)
+        """
+        if not self.batching:
+            logging.handlers.RotatingFileHandler.flush(self)
+        return
+# end class BatchingFileHandler
+
+
 def set_logger(args):
     """
     Creates a logger and sets the level based on args.
 
     :param:
 
-     - `args`: args with debug and silent attributes
+     - `args`: args with debug and silent attributes (and asynclog to queue the records)
+
+    :return: the QueueHandler if asynclog is set, None otherwise
     """
     cleanup()
     stderr = logging.StreamHandler()
@@ -58,8 +256,13 @@ def set_logger(args):
     screen_format = logging.Formatter(screen_format, datefmt=SMALL_TIMESTAMP)
     stderr.setFormatter(screen_format)
 
-    log_file = logging.handlers.RotatingFileHandler(LOGNAME,
-                                           maxBytes=GIGABYTE, backupCount=BACKUP_LOGS)
+    asynclog = getattr(args, 'asynclog', False)
+    if asynclog:
+        file_handler = BatchingFileHandler
+    else:
+        file_handler = logging.handlers.RotatingFileHandler
+    log_file = file_handler(LOGNAME,
+                            maxBytes=GIGABYTE, backupCount=BACKUP_LOGS)
     file_format = logging.Formatter(LOG_FORMAT, datefmt=LOG_TIMESTAMP)
     log_file.setFormatter(file_format)
     
@@ -73,6 +276,15 @@ def set_logger(args):
     else:
         stderr.setLevel(logging.INFO)
 
+    if asynclog:
+        handler = QueueHandler()
+        listener = QueueListener(handler.queue, [stderr, log_file])
+        listener.start()
+        handler.listener = listener
+        atexit.register(handler.stop)
+        logger.addHandler(handler)
+        return handler
+
     logger.addHandler(stderr)
     logger.addHandler(log_file)
     return 
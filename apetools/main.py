@@ -20,10 +20,15 @@ def main():
     if args is None:
         raise Exception("Something's wrong with the ArgumentParser")
         return
-    set_logger(args)
+    handler = set_logger(args)
     enable_debugging(args)    
 
-    args.function(args)
+    try:
+        args.function(args)
+    finally:
+        if handler is not None:
+            # report the dropped log records and write the ones still queued
+            handler.stop()
     return
 
 
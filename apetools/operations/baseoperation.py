@@ -67,4 +67,14 @@ class BaseOperation(BaseClass):
             if returned:
                 return_tokens.append(returned)
         return TOKEN_JOINER.join((str(token) for token in return_tokens))
+
+    def close(self):
+        """
+        Calls `close` on the products that have one (e.g. to stop servers left running)
+        """
+        for product in self.products:
+            close = getattr(product, 'close', None)
+            if callable(close):
+                close()
+        return
 #end class BaseOperation
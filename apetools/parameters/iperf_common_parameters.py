@@ -352,4 +352,6 @@ class IperfExtraParameters(object):
     __slots__ = ()
     directions = 'directions'
     protocol = 'protocol'
-    parameters = [directions, protocol]
+    persistent = 'persistent'
+    columnar = 'columnar'
+    parameters = [directions, protocol, persistent, columnar]
@@ -1,6 +1,6 @@
 
 # python libraries
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import os
 
 # this package
@@ -8,16 +8,21 @@ from apetools.baseclass import BaseClass
 
 from iperfexpressions import HumanExpression, ParserKeys
 from iperfexpressions import CsvExpression
+from iperftokenizer import TOKENIZERS, is_natural, is_integer
 from unitconverter import UnitConverter
 from coroutine import coroutine
 
 
+WATERMARK = 4
+COUNT, BANDWIDTH = 0, 1
+
+
 class IperfParser(BaseClass):
     """
     The Iperf Parser extracts bandwidth and other information from the output
     """
     def __init__(self, expected_interval=1, interval_tolerance=0.1, units="Mbits", threads=4,
-                 maximum=10**9):
+                 maximum=10**9, watermark=WATERMARK):
         """
         :param:
 
@@ -26,6 +31,7 @@ class IperfParser(BaseClass):
          - `units`: desired output units (must match iperf output case - e.g. MBytes)
          - `threads`: (number of threads) needed for coroutine and pipe
          - `maximum`: the max value (after conversion) allowed (if exceeded converts to 0)
+         - `watermark`: number of pending intervals the pipe holds waiting for missing threads
         """
         super(IperfParser, self).__init__()
         self._logger = None
@@ -34,6 +40,7 @@ class IperfParser(BaseClass):
         self.units = units
         self.threads = threads
         self.maximum = maximum
+        self.watermark = watermark
         self._regex = None
         self._human_regex = None
         self._csv_regex = None
@@ -137,8 +144,43 @@ class IperfParser(BaseClass):
             self.intervals[float(match[ParserKeys.start])] += self.bandwidth(match)
         return bandwidth
     
+    def accepts(self, thread, format):
+        """
+        :param:
+
+         - `thread`: the thread-column from a tokenized line
+         - `format`: the line's format (ParserKeys.human or ParserKeys.csv)
+
+        :return: True if the thread matches what the format's expression matches
+        """
+        if format == ParserKeys.human:
+            return is_integer(thread)
+        return is_natural(thread)
+
     def search(self, line):
         """
+        :param:
+
+         - `line`: a string of iperf output
+        :return: match dict or None
+        """
+        if self.format == ParserKeys.csv:
+            formats = (ParserKeys.csv, ParserKeys.human)
+        else:
+            formats = (ParserKeys.human, ParserKeys.csv)
+        for format in formats:
+            match = TOKENIZERS[format](line)
+            if match is not None:
+                if self.accepts(match[ParserKeys.thread], format):
+                    self.format = format
+                    return match
+                return None
+        return self.search_regex(line)
+
+    def search_regex(self, line):
+        """
+        Searches the line with the regular expressions (the slow path)
+
         :param:
 
          - `line`: a string of iperf output
@@ -176,7 +218,7 @@ class IperfParser(BaseClass):
         
         :warnings:
 
-         - For bad connections with threads this might break (as the threads die)
+         - If threads die the intervals are sent late (after `watermark` intervals) and partial
          - Use for good connections or live data only (use `bandwidths` and completed data for greater fidelity)
          
         :parameters:
@@ -187,20 +229,36 @@ class IperfParser(BaseClass):
 
          - bandwidth converted to self.units as a float
         """
-        threads = defaultdict(lambda:[0,0])
-        thread_count = 0
-        bandwidth = 1
+        # pending is an ordered dict of interval:[thread_count, bandwidth]
+        pending = OrderedDict()
+        expected = self.threads
+        last_sent = None
         while True:
             line = (yield)
             match = self.search(line)
-            if match is not None and self.valid(match):
-                # threads is a dict of interval:(thread_count, bandwidths)
-                interval = match[ParserKeys.start]
-                threads[interval][thread_count] += 1
-                threads[interval][bandwidth] += self.bandwidth(match)
-                for key in threads:
-                    if key == min(threads) and threads[interval][thread_count]==self.threads:
-                        target.send(threads[interval][bandwidth])
+            if match is None or not self.valid(match):
+                continue
+            interval = float(match[ParserKeys.start])
+            if last_sent is not None and interval <= last_sent:
+                continue
+            if interval not in pending:
+                pending[interval] = [0, 0]
+            pending[interval][COUNT] += 1
+            pending[interval][BANDWIDTH] += self.bandwidth(match)
+
+            while pending:
+                oldest = next(iter(pending))
+                count, bandwidth = pending[oldest]
+                if count < expected:
+                    if len(pending) <= self.watermark:
+                        break
+                    self.logger.warning("Only {0} of {1} threads reported interval {2}".format(count,
+                                                                                             expected,
+                                                                                             oldest))
+                    expected = count
+                del pending[oldest]
+                last_sent = oldest
+                target.send(bandwidth)
         return
     
     def reset(self):
@@ -225,3 +283,45 @@ class IperfParser(BaseClass):
         base, ext = os.path.splitext(basename)
         return "{0}.csv".format(base)
 # end class IperfParser
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from sumparser import SumParser
+
+    HUMAN_LINE = "[{t:>3}] {s:4.1f}-{e:4.1f} sec   896 KBytes  7.34 Mbits/sec"
+    HUMAN_SUM = "[SUM] {s:4.1f}-{e:4.1f} sec  3.50 MBytes  29.4 Mbits/sec"
+    CSV_LINE = "20120912102944,192.168.20.50,5684{t},192.168.20.99,5001,{t},{s:.1f}-{e:.1f},786432,6291456"
+    CSV_SUM = "20120912102944,192.168.20.50,0,192.168.20.99,5001,-1,{s:.1f}-{e:.1f},3145728,25165824"
+
+    def synthesize(line, total, threads=4, intervals=36000):
+        lines = []
+        for interval in xrange(intervals):
+            start = interval/10.0
+            for thread in range(3, 3 + threads):
+                lines.append(line.format(t=thread, s=start, e=start + 0.1))
+            lines.append(total.format(s=start, e=start + 0.1))
+        return lines
+
+    if len(sys.argv) > 1:
+        sources = [(name, open(name).readlines()) for name in sys.argv[1:]]
+    else:
+        sources = [("human", synthesize(HUMAN_LINE, HUMAN_SUM)),
+                   ("csv", synthesize(CSV_LINE, CSV_SUM))]
+    for name, lines in sources:
+        rates = []
+        for method in ('search', 'search_regex'):
+            parser = SumParser(threads=4, expected_interval=0.1)
+            # compile the expressions before the clock starts
+            parser.regex
+            search = getattr(parser, method)
+            start = time.time()
+            matches = [search(line) for line in lines]
+            elapsed = max(time.time() - start, 1e-9)
+            rates.append(len(lines)/elapsed)
+            print "{0} {1}: {2} lines, {3} matches, {4:,.0f} lines/second".format(name, method,
+                                                                              len(lines),
+                                                                              len(matches) - matches.count(None),
+                                                                              rates[-1])
+        print "{0}: {1:.1f} times faster".format(name, rates[0]/rates[1])
@@ -0,0 +1,113 @@
+
+# this package
+from iperfexpressions import ParserKeys
+
+
+COMMA = ','
+DASH = '-'
+DOT = '.'
+L_BRACKET = '['
+R_BRACKET = ']'
+SECONDS = ' sec'
+PER_SECOND = '/sec'
+BYTES = 'Bytes'
+BITS = 'bits'
+PREFIXES = ('', 'K', 'M', 'G')
+UNITS = frozenset(prefix + unit for prefix in PREFIXES for unit in (BITS, BYTES))
+TRANSFER_UNITS = frozenset(prefix + BYTES for prefix in PREFIXES)
+CSV_FIELDS = 9
+
+
+def is_natural(token):
+    """
+    :return: True if the token is all digits
+    """
+    return token.isdigit()
+
+
+def is_integer(token):
+    """
+    :return: True if the token is digits with an optional leading minus sign
+    """
+    if token.startswith(DASH):
+        token = token[1:]
+    return token.isdigit()
+
+
+def is_float(token):
+    """
+    :return: True if the token is an integer, a decimal point and digits
+    """
+    whole, point, fraction = token.partition(DOT)
+    return bool(point) and is_integer(whole) and fraction.isdigit()
+
+
+def tokenize_human(line):
+    """
+    :param:
+
+     - `line`: a line of human-readable iperf output
+
+    :return: dict of ParserKeys:strings or None if it isn't a data line
+    """
+    left = line.find(L_BRACKET)
+    if left < 0:
+        return None
+    right = line.find(R_BRACKET, left)
+    if right < 0:
+        return None
+    interval, seconds, columns = line[right + 1:].partition(SECONDS)
+    start, dash, end = interval.partition(DASH)
+    columns = columns.split(None, 4)
+    if not (seconds and dash) or len(columns) < 4:
+        return None
+    transfer, transfer_units, bandwidth, units = columns[:4]
+    if (units[-4:] != PER_SECOND or units[:-4] not in UNITS
+        or transfer_units not in TRANSFER_UNITS):
+        return None
+    try:
+        float(start), float(end), float(transfer), float(bandwidth)
+    except ValueError:
+        return None
+    return {ParserKeys.thread: line[left + 1:right].strip(),
+            ParserKeys.start: start.strip(),
+            ParserKeys.end: end.strip(),
+            ParserKeys.transfer: transfer,
+            ParserKeys.bandwidth: bandwidth,
+            ParserKeys.units: units[:-4]}
+
+
+def tokenize_csv(line):
+    """
+    :param:
+
+     - `line`: a line of csv-format iperf output
+
+    :return: dict of ParserKeys:strings or None if it isn't a data line
+    """
+    fields = line.split(COMMA)
+    for offset in xrange(len(fields) - CSV_FIELDS + 1):
+        (timestamp, sender_ip, sender_port, receiver_ip, receiver_port,
+         thread, interval, transfer, bandwidth) = fields[offset:offset + CSV_FIELDS]
+        bandwidth = bandwidth.rstrip()
+        start, dash, end = interval.partition(DASH)
+        if (timestamp.isdigit() and sender_ip.count(DOT) == 3
+            and receiver_ip.count(DOT) == 3
+            and is_integer(sender_port) and is_integer(receiver_port)
+            and is_integer(thread) and dash and is_float(start) and is_float(end)
+            and is_integer(transfer) and is_integer(bandwidth)):
+            return {ParserKeys.timestamp: timestamp,
+                    ParserKeys.sender_ip: sender_ip,
+                    ParserKeys.sender_port: sender_port,
+                    ParserKeys.receiver_ip: receiver_ip,
+                    ParserKeys.receiver_port: receiver_port,
+                    ParserKeys.thread: thread,
+                    ParserKeys.start: start,
+                    ParserKeys.end: end,
+                    ParserKeys.transfer: transfer,
+                    ParserKeys.bandwidth: bandwidth}
+    return None
+
+
+TOKENIZERS = {ParserKeys.human: tokenize_human,
+              ParserKeys.csv: tokenize_csv}
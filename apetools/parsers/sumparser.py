@@ -1,11 +1,14 @@
 
 from iperfparser import IperfParser 
 from iperfexpressions import HumanExpression, ParserKeys, CsvExpression
+from iperftokenizer import is_integer
 import oatbran as bran
 from coroutine import coroutine
 
 
 BITS = 'bits'
+HUMAN_SUM = 'SUM'
+CSV_SUM = '-1'
 
 
 class HumanExpressionSum(HumanExpression):
@@ -84,6 +87,21 @@ class SumParser(IperfParser):
                            ParserKeys.csv:CsvExpressionSum(threads=self.threads).regex}
         return self._regex
 
+    def accepts(self, thread, format):
+        """
+        :param:
+
+         - `thread`: the thread-column from a tokenized line
+         - `format`: the line's format (ParserKeys.human or ParserKeys.csv)
+
+        :return: True if the thread is the sum (or any thread if there's only one)
+        """
+        if self.threads > 1:
+            if format == ParserKeys.human:
+                return thread == HUMAN_SUM
+            return thread == CSV_SUM
+        return is_integer(thread)
+
     def __call__(self, line):
         """
         :param:
@@ -1,12 +1,16 @@
 
+import os
+import time
+
 from apetools.baseclass import BaseClass
 from apetools.commons.coroutine import coroutine
-from apetools.commons.storageoutput import StorageOutput
+from apetools.commons.storageoutput import StorageOutput, DurabilityPolicy
 from apetools.commons.timestamp import TimestampFormat, TimestampFormatEnums
 
 
 EOF = ""
 NEWLINE = "\n"
+COLUMNS_FOLDER = "columns"
 
 
 class StoragePipeEnum(object):
@@ -26,7 +30,8 @@ class StoragePipe(BaseClass):
     """
     def __init__(self, path='', role=StoragePipeEnum.pipe,
                  target=None, header_token=None, transform=None, emit=False,
-                 add_timestamp=True):
+                 add_timestamp=True, durability=DurabilityPolicy.group,
+                 columns=None, node=''):
         """
         :param:
 
@@ -37,6 +42,9 @@ class StoragePipe(BaseClass):
          - `transform`: callable function to transform sent lines
          - `emit`: if true emit the output when actin as a sink
          - `add_timestamp`: if true add timestamp to raw output
+         - `durability`: DurabilityPolicy for the files (default is group-commit)
+         - `columns`: ColumnStore for the sink to also send the values to
+         - `node`: label for the node in the column store
         """
         super(StoragePipe, self).__init__()
         self.path = path
@@ -46,6 +54,9 @@ class StoragePipe(BaseClass):
         self.transform = transform
         self.emit = emit
         self.add_timestamp = add_timestamp
+        self.durability = durability
+        self.columns = columns
+        self.node = node
         self._timestamp = None
         self._storage = None
         return
@@ -65,7 +76,8 @@ class StoragePipe(BaseClass):
         :return: opened StorageOutput
         """
         if self._storage is None:
-            self._storage = StorageOutput(output_folder=self.path)
+            self._storage = StorageOutput(output_folder=self.path,
+                                          durability=self.durability)
         return self._storage
 
     @coroutine
@@ -122,6 +134,9 @@ class StoragePipe(BaseClass):
             self.transform.reset()
             filename = self.transform.filename(filename)
         output = self.storage.open(filename)
+        if self.columns is not None and self.columns.path is None:
+            self.columns.path = os.path.join(self.storage.path, COLUMNS_FOLDER)
+        parameter = os.path.splitext(os.path.basename(filename))[0]
         line = None
         if self.header_token is not None:
             line = (yield)
@@ -137,11 +152,19 @@ class StoragePipe(BaseClass):
 
             if self.emit:
                 self.logger.info(line)
+            if self.columns is not None and line != EOF:
+                try:
+                    self.columns.append(time.time(), float(line), node=self.node,
+                                        parameter=parameter)
+                except ValueError:
+                    pass
             if self.add_timestamp:
                 line = "{0},{1}".format(self.timestamp.now, line)
                 
             output.writeline(str(line))
         output.close()
+        if self.columns is not None:
+            self.columns.flush()
         return
 
     
@@ -92,6 +92,11 @@ class ArgumentParser(BaseClass):
                                  help="Turn off screen output.",
                                  action="store_true", default=False,
                                  dest='silent')
+
+        self.parser.add_argument("--asynclog",
+                                 help="Write the log from a background thread (dropping debug messages if it falls behind).",
+                                 action="store_true", default=False,
+                                 dest='asynclog')
         return
 
     def _add_subparsers(self):
@@ -103,6 +108,10 @@ class ArgumentParser(BaseClass):
                             metavar="<config-file glob>",
                             default="*.ini",
                             nargs="?")
+        runner.add_argument("--resume", action="store_true", default=False,
+                            help="Skip the iterations an interrupted run finished (and use its output folder).")
+        runner.add_argument("--parallel", type=int, default=1, metavar="<count>",
+                            help="Run up to this many config files at once if they don't share devices (default=%(default)s).")
         runner.set_defaults(function=self.strategerizer.run)
 
         fetcher = self.subparsers.add_parser("fetch", help="Fetch a sample config file.")
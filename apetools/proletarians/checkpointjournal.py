@@ -0,0 +1,189 @@
+
+# python standard library
+import glob
+import json
+import os
+
+# apetools
+from apetools.baseclass import BaseClass
+
+
+JOURNAL_EXTENSION = '.journal'
+TIMESTAMP_FLAG = '{t}'
+WILDCARD = '*'
+APPEND = 'a'
+WRITEABLE = 'w'
+NEWLINE = '\n'
+CONFIG = 'config'
+FINGERPRINT = 'fingerprint'
+INDEX = 'index'
+PARAMETERS = 'parameters'
+FILES = 'files'
+RESULT = 'result'
+COMPLETE = 'complete'
+
+
+def journal_name(config_filename):
+    """
+    :param:
+
+     - `config_filename`: path to the configuration file
+
+    :return: name of the configuration's journal file
+    """
+    name = os.path.splitext(os.path.basename(config_filename))[0]
+    return name + JOURNAL_EXTENSION
+
+
+def find_resumable(output_folder, config_filename):
+    """
+    :param:
+
+     - `output_folder`: the output_folder option (possibly with a {t})
+     - `config_filename`: path to the configuration file
+
+    :return: path to the newest folder with an unfinished journal or None
+    """
+    pattern = output_folder.replace(TIMESTAMP_FLAG, WILDCARD)
+    name = journal_name(config_filename)
+    paths = [os.path.join(folder, name) for folder in glob.glob(pattern)]
+    paths = [path for path in paths if os.path.isfile(path)]
+    for path in sorted(paths, key=os.path.getmtime, reverse=True):
+        journal = CheckpointJournal(path)
+        journal.load()
+        if not journal.complete:
+            return os.path.dirname(path)
+    return
+
+
+class CheckpointJournal(BaseClass):
+    """
+    An on-disk record of the finished test-iterations
+    """
+    def __init__(self, path, config_filename=None):
+        """
+        :param:
+
+         - `path`: path to the journal file
+         - `config_filename`: name of the configuration file (for the header)
+        """
+        super(CheckpointJournal, self).__init__()
+        self.path = path
+        self.config_filename = config_filename
+        self.fingerprint = None
+        self.completed = {}
+        self.complete = False
+        return
+
+    def load(self):
+        """
+        Reads the journal (if it exists)
+
+        :postcondition: fingerprint, completed and complete set from the file
+        """
+        self.fingerprint = None
+        self.completed = {}
+        self.complete = False
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path) as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    self.logger.debug("Ignoring partial journal line: {0}".format(line.rstrip()))
+                    continue
+                if FINGERPRINT in entry:
+                    self.fingerprint = entry[FINGERPRINT]
+                elif INDEX in entry:
+                    self.completed[entry[INDEX]] = entry
+                elif entry.get(COMPLETE):
+                    self.complete = True
+        return
+
+    def start(self, fingerprint, resume=False):
+        """
+        Starts (or, if resuming and the parameters match, continues) the journal
+
+        :param:
+
+         - `fingerprint`: list of [name, size] for the levels of the parameter tree
+         - `resume`: if True, keep the iterations already in the journal
+
+        :return: set of indices of the iterations to skip
+        """
+        fingerprint = [list(level) for level in fingerprint]
+        if resume:
+            self.load()
+            if self.fingerprint == fingerprint:
+                self.logger.info("Resuming: {0} iterations already finished".format(len(self.completed)))
+                self.complete = False
+                return set(self.completed)
+            if self.fingerprint is not None:
+                self.logger.warning("The parameters don't match the journal, starting over")
+        self.fingerprint = fingerprint
+        self.completed = {}
+        self.complete = False
+        self.write({CONFIG: self.config_filename, FINGERPRINT: fingerprint},
+                   mode=WRITEABLE)
+        return set()
+
+    def record(self, index, parameters, files=None, result=None):
+        """
+        Adds a finished iteration
+
+        :param:
+
+         - `index`: zero-based index of the iteration's parameters
+         - `parameters`: the iteration's parameters
+         - `files`: paths (relative to the output folder) the iteration added
+         - `result`: the test's outcome
+        """
+        entry = {INDEX: index,
+                 PARAMETERS: str(parameters),
+                 FILES: sorted(files or []),
+                 RESULT: None if result is None else str(result)}
+        self.completed[index] = entry
+        self.write(entry)
+        return
+
+    def finish(self):
+        """
+        Marks the journal complete (so `find_resumable` won't pick its folder)
+        """
+        self.complete = True
+        self.write({COMPLETE: True})
+        return
+
+    def write(self, entry, mode=APPEND):
+        """
+        Writes the entry as a line and syncs it to disk
+
+        :param:
+
+         - `entry`: dictionary to write as JSON
+         - `mode`: file-mode to open the journal with
+        """
+        with open(self.path, mode) as journal:
+            journal.write(json.dumps(entry) + NEWLINE)
+            journal.flush()
+            os.fsync(journal.fileno())
+        return
+
+    def list_files(self, folder, paths):
+        """
+        :param:
+
+         - `folder`: the output folder
+         - `paths`: paths to the files an iteration created (from the storage's `output_record`)
+
+        :return: set of paths (relative to the folder) of the files that are in it
+        """
+        files = set()
+        for path in paths:
+            path = os.path.relpath(path, folder)
+            if path != os.pardir and not path.startswith(os.pardir + os.sep):
+                files.add(path)
+        files.discard(os.path.basename(self.path))
+        return files
+# end class CheckpointJournal
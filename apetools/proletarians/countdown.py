@@ -2,7 +2,6 @@
 # python libraries
 from datetime import datetime as clock
 from collections import namedtuple
-import heapq
 import math
 
 #apetools
@@ -11,6 +10,10 @@ from apetools.baseclass import BaseClass
 
 SIXTY = 60.
 TWENTY_FOUR = 24
+MEDIAN = 0.5
+ALPHA = 0.1
+MARKERS = 5
+TOTAL_COUNT = 'total_count'
 
 
 class Times(namedtuple("Times", 'days hours minutes seconds'.split())):
@@ -26,22 +29,164 @@ class Times(namedtuple("Times", 'days hours minutes seconds'.split())):
 #end class Times
 
 
+class EstimatorEnum(object):
+    """
+    A holder of the estimators `remaining` can use
+    """
+    __slots__ = ()
+    median = 'median'
+    ewma = 'ewma'
+# end class EstimatorEnum
+
+
+LevelTime = namedtuple("LevelTime", "name parameter count median".split())
+
+
+class StreamingQuantile(object):
+    """
+    A constant-memory estimator of a quantile
+    """
+    def __init__(self, quantile=MEDIAN):
+        """
+        :param:
+
+         - `quantile`: the quantile to estimate (0 < quantile < 1)
+        """
+        self.quantile = quantile
+        self.count = 0
+        self.heights = []
+        self.positions = range(MARKERS)
+        self.desired = [0, 2 * quantile, 4 * quantile, 2 + 2 * quantile, 4]
+        self.increments = [0, quantile/2., quantile, (1 + quantile)/2., 1]
+        return
+
+    def add(self, sample):
+        """
+        :param:
+
+         - `sample`: the next observation
+
+        :postcondition: the markers are adjusted for the sample
+        """
+        self.count += 1
+        heights = self.heights
+        if self.count <= MARKERS:
+            heights.append(sample)
+            heights.sort()
+            return
+        if sample < heights[0]:
+            heights[0] = sample
+            cell = 0
+        elif sample >= heights[-1]:
+            heights[-1] = sample
+            cell = MARKERS - 2
+        else:
+            cell = 0
+            while sample >= heights[cell + 1]:
+                cell += 1
+        positions = self.positions
+        for index in range(cell + 1, MARKERS):
+            positions[index] += 1
+        for index in range(MARKERS):
+            self.desired[index] += self.increments[index]
+        for index in range(1, MARKERS - 1):
+            offset = self.desired[index] - positions[index]
+            if ((offset >= 1 and positions[index + 1] - positions[index] > 1) or
+                (offset <= -1 and positions[index - 1] - positions[index] < -1)):
+                step = 1 if offset > 0 else -1
+                height = self.parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = self.linear(index, step)
+                heights[index] = height
+                positions[index] += step
+        return
+
+    def parabolic(self, index, step):
+        """
+        :return: the marker's height moved by the piecewise-parabolic formula
+        """
+        heights, positions = self.heights, self.positions
+        below = positions[index] - positions[index - 1]
+        above = positions[index + 1] - positions[index]
+        return heights[index] + step/float(positions[index + 1] - positions[index - 1]) * (
+            (below + step) * (heights[index + 1] - heights[index])/above +
+            (above - step) * (heights[index] - heights[index - 1])/below)
+
+    def linear(self, index, step):
+        """
+        :return: the marker's height moved toward its neighbor
+        """
+        heights, positions = self.heights, self.positions
+        return heights[index] + step * (heights[index + step] - heights[index])/float(positions[index + step] - positions[index])
+
+    @property
+    def value(self):
+        """
+        :return: the estimated quantile (None if there are no samples)
+        """
+        if not self.count:
+            return
+        if self.count > MARKERS:
+            return self.heights[2]
+        rank = self.quantile * (self.count - 1)
+        lower = int(math.floor(rank))
+        upper = min(lower + 1, self.count - 1)
+        return self.heights[lower] + (rank - lower) * (self.heights[upper] - self.heights[lower])
+# end class StreamingQuantile
+
+
+class MovingAverage(object):
+    """
+    An exponentially-weighted moving average
+    """
+    def __init__(self, alpha=ALPHA):
+        """
+        :param:
+
+         - `alpha`: the weight of the newest sample (0 < alpha <= 1)
+        """
+        self.alpha = alpha
+        self.value = None
+        return
+
+    def add(self, sample):
+        """
+        :param:
+
+         - `sample`: the next observation
+
+        :postcondition: value is the updated average
+        """
+        if self.value is None:
+            self.value = float(sample)
+        else:
+            self.value += self.alpha * (sample - self.value)
+        return
+# end class MovingAverage
+
+
 class CountDown(BaseClass):
     """
     A countdown timer
     """
-    def __init__(self, total_repetitions=0):
+    def __init__(self, total_repetitions=0, alpha=ALPHA,
+                 estimator=EstimatorEnum.median):
         """
         :param:
 
          - `total_repetitions`: number of times the operations will be repeated
+         - `alpha`: weight of the newest duration in the moving average
+         - `estimator`: default EstimatorEnum for `remaining`
         """
         super(CountDown, self).__init__()
         self.total_repetitions = total_repetitions
+        self.alpha = alpha
+        self.estimator = estimator
         self.start_time = None
         self._now = None
-        self._heap = None
         self._median = None
+        self._moving_average = None
+        self._levels = None
         self._elapsed = None
         return
 
@@ -56,22 +201,29 @@ class CountDown(BaseClass):
     @property
     def median(self):
         """
-        :return: dictionary of modulus:function to get median
+        :return: StreamingQuantile of the durations (in seconds)
         """
         if self._median is None:
-            self._median = {1:lambda heap:heap[len(heap)/2].total_seconds(),
-                  0:lambda heap:(heap[len(heap)/2].total_seconds() +
-                                 heap[(len(heap)/2) - 1].total_seconds())/2.}
+            self._median = StreamingQuantile(MEDIAN)
         return self._median
 
     @property
-    def heap(self):
+    def moving_average(self):
         """
-        :return: list of timedeltas
+        :return: MovingAverage of the durations (in seconds)
         """
-        if self._heap is None:
-            self._heap = []
-        return self._heap
+        if self._moving_average is None:
+            self._moving_average = MovingAverage(self.alpha)
+        return self._moving_average
+
+    @property
+    def levels(self):
+        """
+        :return: dictionary of (parameter name, parameter):StreamingQuantile
+        """
+        if self._levels is None:
+            self._levels = {}
+        return self._levels
 
     @property
     def now(self):
@@ -87,31 +239,61 @@ class CountDown(BaseClass):
         self.start_time = clock.now()
         return
 
-    def add(self, start_time):
+    def add(self, start_time, parameters=None):
         """
         :param:
 
          - `start_time`: datetime object from start of operation
+         - `parameters`: optional namedtuple of the operation's parameters
 
-        :postcondition: now - start-time added to the heap
+        :postcondition: now - start-time added to the estimators
+        :return: the duration in seconds
         """
-        heapq.heappush(self.heap, self.now - start_time)
-        return
+        duration = (self.now - start_time).total_seconds()
+        self.median.add(duration)
+        self.moving_average.add(duration)
+        if parameters is not None and hasattr(parameters, '_fields'):
+            for name, parameter in zip(parameters._fields, parameters):
+                if name == TOTAL_COUNT:
+                    continue
+                parameter = str(getattr(parameter, 'parameters', parameter))
+                key = (name, parameter)
+                if key not in self.levels:
+                    self.levels[key] = StreamingQuantile(MEDIAN)
+                self.levels[key].add(duration)
+        return duration
 
-    def remaining(self, current_count):
+    def remaining(self, current_count, estimator=None):
         """
         :param:
 
          - `current_count`: 0-based index of current operation
+         - `estimator`: EstimatorEnum to use (default is self.estimator)
 
-        :return: string with estimate of time remaining or None
+        :return: Times with estimate of time remaining or None
         """
         remaining = self.total_repetitions - (current_count + 1)
-        if not remaining:
+        if remaining <= 0:
             return
-        median_time = self.median[len(self.heap)%2](self.heap)
-        remaining_time = remaining * median_time
-        remaining_time = self.to_time(remaining_time)
+        if estimator is None:
+            estimator = self.estimator
+        if estimator == EstimatorEnum.ewma:
+            duration = self.moving_average.value
+        else:
+            duration = self.median.value
+        if duration is None:
+            return
+        return self.to_time(remaining * duration)
+
+    @property
+    def level_times(self):
+        """
+        :return: list of LevelTime (slowest median first)
+        """
+        times = [LevelTime(name=name, parameter=parameter,
+                           count=quantile.count, median=quantile.value)
+                 for (name, parameter), quantile in self.levels.iteritems()]
+        return sorted(times, key=lambda level: level.median, reverse=True)
 
     def to_time(self, seconds):
         """
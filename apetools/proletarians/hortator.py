@@ -1,14 +1,16 @@
 
 # python Libraries
 from collections import namedtuple
+import threading
 
 # apetools Libraries
 from apetools.baseclass import BaseClass
 from errors import OperatorError
-from countdown import CountDown
+from countdown import CountDown, EstimatorEnum
 
 
 ELAPSED_TIME = 'Elapsed Time: {t}'
+COMPLETED = "{0} out of {1} tests completed"
 
 
 class CrashRecord(namedtuple("CrashRecord",
@@ -31,17 +33,22 @@ class Hortator(BaseClass):
     """
     A builder builds objects.
     """
-    def __init__(self, operations, *args, **kwargs):
+    def __init__(self, operations, scheduler=None, *args, **kwargs):
         """
         :param:
 
          - `operations`: An iterator of operators
-         - `storage`: a file mover for the log
+         - `scheduler`: OperatorScheduler to run the operations concurrently
         """
         super(Hortator, self).__init__(*args, **kwargs)
         self.operations = operations
+        self.scheduler = scheduler
         self.last_operator = None
         self._countdown = None
+        self.lock = threading.Lock()
+        self.crash_times = []
+        self.completed = 0
+        self.scheduled = 0
         return
 
     @property
@@ -53,11 +60,67 @@ class Hortator(BaseClass):
             self._countdown = CountDown(self.operations.count)
         return self._countdown
 
+    def run_operation(self, operation):
+        """
+        Runs one scheduled operation (in the scheduler's thread)
+
+        :param:
+
+         - `operation`: a ScheduledOperation
+        """
+        operation_start = self.countdown.now
+        try:
+            operation()
+        except OperatorError as error:
+            self.logger.error(error)
+            with self.lock:
+                self.crash_times.append(CrashRecord(id=operation.claim.name,
+                                                    start_time=operation_start,
+                                                    error=error,
+                                                    crash_time=self.countdown.now))
+        with self.lock:
+            duration = self.countdown.add(operation_start)
+            self.completed += 1
+            completed = self.completed
+            waiting = max(0, self.operations.count - self.scheduled)
+            median = self.countdown.median.value
+        self.logger.info(COMPLETED.format(completed, self.operations.count))
+        if median is None:
+            median = duration
+        if completed < self.operations.count:
+            # the scheduler counts this one as running until it returns
+            remaining = self.scheduler.eta(median, waiting)
+            message = "Estimated Time Remaining: {0} ({1} running, {2} waiting)"
+            self.logger.info(message.format(self.countdown.to_time(remaining),
+                                            self.scheduler.running - 1,
+                                            waiting))
+        return
+
+    def run_scheduled(self):
+        """
+        Starts each operation as the scheduler lets it be built then waits for them to finish
+        """
+        try:
+            for operation in self.operations:
+                self.scheduled += 1
+                self.scheduler.start(operation, self.run_operation)
+            self.scheduler.join()
+        except KeyboardInterrupt:
+            warning = "Oh, I am slain. (by a Keyboard-Interrupt)"
+            self.logger.warning(warning)
+
+        for crash in self.crash_times:
+            print str(crash)
+        self.logger.info(ELAPSED_TIME.format(t=self.countdown.elapsed))
+        return
+
     def __call__(self):
         """
         Runs the operators
         """
         self.countdown.start()
+        if self.scheduler is not None:
+            return self.run_scheduled()
 
         crash_times = []
 
@@ -82,8 +145,10 @@ class Hortator(BaseClass):
                 message = "{0} out of {1} tests completed"
                 self.logger.info(message.format(operation_count,
                                                 self.operations.count))
-                message = "Estimated Time Remaining: {0}"
-                self.logger.info(message.format(remaining))
+                recent = self.countdown.remaining(operation_count,
+                                                  EstimatorEnum.ewma)
+                message = "Estimated Time Remaining: {0} (recent average: {1})"
+                self.logger.info(message.format(remaining, recent))
 
         for crash in crash_times:
             print str(crash)
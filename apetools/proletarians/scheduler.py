@@ -0,0 +1,209 @@
+
+# python standard library
+from collections import namedtuple
+import heapq
+import threading
+from time import time
+
+# apetools
+from apetools.baseclass import BaseClass
+from apetools.lexicographers.config_options import ConfigOptions
+from apetools.threads.threads import Thread
+
+
+LANES = 1
+WAIT_TIMEOUT = 1
+COMMA = ','
+COLON = ':'
+IDENTIFIERS = ('hostname', 'test_ip', 'serial_number', 'address')
+DEVICE_SECTIONS = (ConfigOptions.nodes_section, ConfigOptions.traffic_pc_section)
+
+
+class ResourceClaim(namedtuple("ResourceClaim", "name resources")):
+    __slots__ = ()
+
+    def conflicts(self, other):
+        """
+        :param:
+
+         - `other`: another ResourceClaim
+
+        :return: True if the claims can't be held at the same time
+        """
+        if self.resources is None or other.resources is None:
+            return True
+        return bool(self.resources & other.resources)
+
+    def __str__(self):
+        if self.resources is None:
+            return "{0} (exclusive)".format(self.name)
+        return "{0} ({1})".format(self.name, COMMA.join(sorted(self.resources)))
+
+
+def identifiers(option, value):
+    """
+    :param:
+
+     - `option`: name of a configuration option
+     - `value`: the option's value
+
+    :return: set of identifiers in the option
+    """
+    if option.lower() in IDENTIFIERS:
+        return set([value.strip().lower()])
+    found = set()
+    for field in value.split(COMMA):
+        key, colon, item = field.partition(COLON)
+        if colon and key.strip().lower() in IDENTIFIERS:
+            found.add(item.strip().lower())
+    return found
+
+
+def claim_resources(config_map):
+    """
+    :param:
+
+     - `config_map`: a ConfigurationMap
+
+    :return: ResourceClaim for the configuration
+    """
+    resources = set()
+    for section in config_map.sections:
+        for option in config_map.options(section, default=[]):
+            value = config_map.get(section, option, default='', optional=True)
+            found = identifiers(option, value)
+            if not found and section in DEVICE_SECTIONS:
+                return ResourceClaim(config_map.filename, None)
+            resources |= found
+    return ResourceClaim(config_map.filename, frozenset(resources))
+
+
+class ScheduledOperation(namedtuple("ScheduledOperation", "operator claim release")):
+    __slots__ = ()
+
+    def __call__(self):
+        return self.operator()
+
+
+class OperatorScheduler(BaseClass):
+    """
+    A runner of operations whose resources don't conflict
+    """
+    def __init__(self, lanes=LANES):
+        """
+        :param:
+
+         - `lanes`: the most operations to run at once
+        """
+        super(OperatorScheduler, self).__init__()
+        self.lanes = max(1, lanes)
+        self.condition = threading.Condition()
+        self.claims = []
+        self.started = {}
+        return
+
+    def reserve(self, claim):
+        """
+        Waits until the claim can be held and holds it
+
+        :param:
+
+         - `claim`: ResourceClaim to hold
+        """
+        with self.condition:
+            waiting = False
+            while (len(self.claims) >= self.lanes or
+                   any(claim.conflicts(other) for other in self.claims)):
+                if not waiting:
+                    self.logger.info("Waiting to run {0}".format(claim))
+                    waiting = True
+                # a timeout so a keyboard-interrupt isn't blocked
+                self.condition.wait(WAIT_TIMEOUT)
+            self.claims.append(claim)
+        return
+
+    def cancel(self, claim):
+        """
+        Lets go of a claim (e.g. when the operator couldn't be built)
+
+        :param:
+
+         - `claim`: a reserved ResourceClaim
+        """
+        with self.condition:
+            if claim in self.claims:
+                self.claims.remove(claim)
+            self.started.pop(claim, None)
+            self.condition.notify_all()
+        return
+
+    def start(self, operation, target):
+        """
+        Runs the operation in a thread
+
+        :param:
+
+         - `operation`: a ScheduledOperation whose claim is reserved
+         - `target`: callable to run the operation with
+
+        :return: the thread
+        """
+        with self.condition:
+            self.started[operation.claim] = time()
+        return Thread(target=self.run, args=(operation, target),
+                      name="Operator {0}".format(operation.claim.name))
+
+    def run(self, operation, target):
+        """
+        Runs the operation (the thread's target) then releases its nodes and claim
+
+        :param:
+
+         - `operation`: a ScheduledOperation
+         - `target`: callable to run the operation with
+        """
+        try:
+            target(operation)
+        finally:
+            try:
+                operation.release()
+            finally:
+                self.cancel(operation.claim)
+        return
+
+    def join(self):
+        """
+        Waits for all the reserved claims to be let go
+        """
+        with self.condition:
+            while self.claims:
+                self.condition.wait(WAIT_TIMEOUT)
+        return
+
+    @property
+    def running(self):
+        """
+        :return: number of operations that have been started and not finished
+        """
+        with self.condition:
+            return len(self.started)
+
+    def eta(self, duration, waiting):
+        """
+        :param:
+
+         - `duration`: estimated seconds an operation takes
+         - `waiting`: number of operations that haven't started
+
+        :return: estimated seconds until all the operations are done
+        """
+        now = time()
+        with self.condition:
+            lanes = [max(0, duration - (now - start))
+                     for start in self.started.itervalues()]
+        lanes += [0] * (self.lanes - len(lanes))
+        heapq.heapify(lanes)
+        for operation in xrange(waiting):
+            heapq.heapreplace(lanes, lanes[0] + duration)
+        return max(lanes)
+# end class OperatorScheduler
@@ -42,7 +42,9 @@ class SetUp(BaseClass):
             l = self.lexicographer
             message = "Building builder with Lexicographer '{0}'".format(str(l))
             self.logger.debug(message)
-            self._builder = builder.Builder(l)
+            self._builder = builder.Builder(l,
+                                            resume=getattr(self.arguments, 'resume', False),
+                                            lanes=getattr(self.arguments, 'parallel', 1))
         return self._builder
         
     def __call__(self):
@@ -11,11 +11,13 @@ from apetools.baseclass import BaseClass
 from apetools.tools import sleep
 from apetools.commons import errors
 from apetools.commons import sublogger
-from countdown import CountDown
+from apetools.commons.storageoutput import output_record
+from countdown import CountDown, EstimatorEnum
 from apetools.log_setter import LOGNAME
 
 
-TIME_REMAINING = "Estimated time Remaining: {t}"
+TIME_REMAINING = "Estimated time Remaining: {t} (recent average: {r})"
+LEVEL_TIME = "{n} = {p}: median {m:.2f} seconds over {c} tests"
 
 
 OperatorStaticTestParameters = namedtuple("OperatorStaticTestParameters",
@@ -36,7 +38,8 @@ class TestOperator(BaseClass):
     """
     def __init__(self, test_parameters, operation_setup, operation_teardown,
                  test_setup, tests, test_teardown, nodes, no_cleanup, storage,
-                 countdown_timer=None, tag="APETools", sleep=None):
+                 countdown_timer=None, tag="APETools", sleep=None,
+                 journal=None, resume=False):
         """
         :params:
 
@@ -52,6 +55,8 @@ class TestOperator(BaseClass):
          - `storage`: a storage-output
          - `tag`: String to identify start/stop of test in log
          - `sleep`: A sleep for recovery times
+         - `journal`: CheckpointJournal to record the finished iterations in
+         - `resume`: if True, skip the iterations already in the journal
         """
         super(TestOperator, self).__init__()
         self.test_parameters = test_parameters
@@ -67,6 +72,9 @@ class TestOperator(BaseClass):
         self.tag = tag
         self._sleep = sleep
         self._sub_logger = None
+        self.test_result = None
+        self.journal = journal
+        self.resume = resume
         self.parameter_queue = Queue()
         return
 
@@ -139,16 +147,18 @@ class TestOperator(BaseClass):
         #**** Execute test
         self.logger.info("Running Test")
         test_result = self.tests(parameter, filename_prefix)
+        self.test_result = test_result
         self.logger.info(TEST_RESULT.format(r=test_result,
                                             tag=self.tag))
         self.logger.info("Running teardown")
 
         #**** Teardown Test
         self.test_teardown(parameter)
-        self.countdown_timer.add(test_start)
-        remaining = self.countdown_timer.remaining(count)
+        self.countdown_timer.add(test_start, parameter)
+        remaining = self.countdown_timer.remaining(count - 1)
         if remaining:
-            self.logger.info(TIME_REMAINING.format(t=remaining))
+            recent = self.countdown_timer.remaining(count - 1, EstimatorEnum.ewma)
+            self.logger.info(TIME_REMAINING.format(t=remaining, r=recent))
         message = TEST_TAG.format(r=count,
                                   t=parameter.total_count,
                                   s='Ending',
@@ -159,6 +169,64 @@ class TestOperator(BaseClass):
             self.logger.debug(error)
         return
 
+    def start_journal(self):
+        """
+        Starts (or resumes) the journal
+
+        :return: set of indices of the iterations to skip
+        """
+        if self.journal is None:
+            return set()
+        return self.journal.start(self.test_parameters.fingerprint,
+                                  resume=self.resume)
+
+    def checkpoint(self, index, parameter, created):
+        """
+        Records a finished iteration in the journal
+
+        :param:
+
+         - `index`: the iteration's index
+         - `parameter`: the iteration's parameters
+         - `created`: list of paths of the files the iteration created (from `watch_output`)
+        """
+        if self.journal is None:
+            return
+        files = self.journal.list_files(self.storage.path, created)
+        self.journal.record(index, parameter, files, self.test_result)
+        return
+
+    def watch_output(self):
+        """
+        :return: list the paths of the files created from now on are added to (None if there's no journal)
+        """
+        if self.journal is None:
+            return
+        return output_record.watch()
+
+    def unwatch_output(self, created):
+        """
+        :param:
+
+         - `created`: list returned by `watch_output`
+
+        :postcondition: created is no longer added to
+        """
+        if created is not None:
+            output_record.unwatch(created)
+        return
+
+    def log_level_times(self):
+        """
+        :postcondition: the median time for each parameter value logged (slowest first)
+        """
+        for level in self.countdown_timer.level_times:
+            self.logger.info(LEVEL_TIME.format(n=level.name,
+                                               p=level.parameter,
+                                               m=level.median,
+                                               c=level.count))
+        return
+
     def log_info(self, message, node):
         """
         :param:
@@ -172,6 +240,22 @@ class TestOperator(BaseClass):
         #self.nodes[node].logger('"{0}"'.format(message))
         return
 
+    def close_tests(self):
+        """
+        Closes the tests (e.g. kills persistent iperf servers) once all the iterations are done
+
+        :postcondition: tests that have a `close` have been closed (errors are logged)
+        """
+        close = getattr(self.tests, 'close', None)
+        if not callable(close):
+            return
+        self.logger.info("Closing the tests")
+        try:
+            close()
+        except (errors.ConnectionError, errors.CommandError) as error:
+            self.logger.error(error)
+        return
+
     def __call__(self):
         """
         This is the main operation method.
@@ -188,32 +272,48 @@ class TestOperator(BaseClass):
         prefix = self.operation_setup()
 
         try:
+            skip = self.start_journal()
+            failed = False
             # the count is decremented on error, so it can't use enmurate
-            count = 1
-            for parameter in self.test_parameters:
+            count = 1 + len(skip)
+            for index, parameter in enumerate(self.test_parameters):
+                if index in skip:
+                    continue
                 self.countdown_timer.total_repetitions = parameter.total_count
 
+                created = self.watch_output()
                 try:
                     self.one_repetition(parameter, count, prefix)
+                    self.checkpoint(index, parameter, created)
                     count += 1
                 except (errors.AffectorError, errors.CommandError) as error:
                     self.logger.error(error)
                     self.logger.error("Quitting this test")
-                    self.parameter_queue.put(parameter)
+                    self.parameter_queue.put((index, parameter))
                     count -= 1
+                finally:
+                    self.unwatch_output(created)
             while not self.parameter_queue.empty():
-                parameter = self.parameter_queue.get()
+                index, parameter = self.parameter_queue.get()
                 self.logger.info("Re-trying: {0}".format(parameter))
                 count += 1
+                created = self.watch_output()
                 try:
                     self.one_repetition(parameter, count, prefix)
+                    self.checkpoint(index, parameter, created)
                 except (errors.AffectorError, errors.CommandError) as error:
                     self.logger.error(error)
                     self.logger.error("Quitting this iteration")
+                    failed = True
+                finally:
+                    self.unwatch_output(created)
+            if self.journal is not None and not failed:
+                self.journal.finish()
 
             elapsed_time = self.countdown_timer.elapsed
             self.logger.info(TEST_POSTAMBLE.format(t=elapsed_time,
                                                    tag=self.tag))
+            self.log_level_times()
             message = "Sleeping to let logs finish recording test-information"
             self.logger.info(message)
             self.sleep()
@@ -223,6 +323,7 @@ class TestOperator(BaseClass):
         finally:
             self.logger.info("Tearing Down the Current Operation")
             try:
+                self.close_tests()
                 self.operation_teardown()
                 self.storage.copy(LOGNAME)
             except AttributeError as error:
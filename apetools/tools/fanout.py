@@ -0,0 +1,169 @@
+
+# python standard library
+from collections import namedtuple
+import threading
+from time import time
+
+# apetools
+from apetools.baseclass import BaseClass
+from apetools.commons.centraltendency import CentralTendency
+from apetools.commons.timestamp import TimestampFormat
+from apetools.threads.threads import Thread
+
+
+PERCENTILE = 90
+NOT_AVAILABLE = 'NA'
+COMMA = ','
+SEMICOLON = ';'
+NEWLINE = '\n'
+TABLE_HEADER = "start,node,elapsed,rtt,error\n"
+SUMMARY_HEADER = "start,nodes,events,minimum,median,mean,percentile_{0},maximum\n".format(PERCENTILE)
+
+
+FanOutResult = namedtuple("FanOutResult", "node elapsed rtt error")
+
+
+class FanOutSummary(namedtuple("FanOutSummary",
+                               "start nodes events minimum median mean percentile_90 maximum")):
+    __slots__ = ()
+
+    def __str__(self):
+        return ("{0} of {1} nodes, min={2} median={3} mean={4} p90={5} "
+                "max={6}").format(self.events, self.nodes, self.minimum, self.median,
+                                  self.mean, self.percentile_90, self.maximum)
+
+
+class FanOut(BaseClass):
+    """
+    A runner of one measurement per node, all at once
+    """
+    def __init__(self, nodes, table=None, summary=None, timestamp=None):
+        """
+        :param:
+
+         - `nodes`: dictionary of name:device
+         - `table`: opened file for the per-node rows
+         - `summary`: opened file for the summary rows
+         - `timestamp`: TimestampFormat to convert the start time
+        """
+        super(FanOut, self).__init__()
+        self.nodes = nodes
+        self.table = table
+        self.summary = summary
+        self.timestamp = timestamp
+        if timestamp is None:
+            self.timestamp = TimestampFormat()
+        self.lock = threading.Lock()
+        self.wrote_headers = False
+        return
+
+    def run(self, measure):
+        """
+        Measures every node concurrently from one start time
+
+        :param:
+
+         - `measure`: callable that takes a connection and the start time
+
+        :return: list of FanOutResult (sorted by node name), FanOutSummary
+        """
+        start = time()
+        results = {}
+        threads = [Thread(target=self.measure_node,
+                          args=(name, measure, start, results),
+                          name="FanOut {0}".format(name))
+                   for name in sorted(self.nodes)]
+        for thread in threads:
+            thread.join()
+        results = [results[name] for name in sorted(results)]
+        summary = self.summarize(start, results)
+        self.logger.info("Fan-out: {0}".format(summary))
+        self.save(start, results, summary)
+        return results, summary
+
+    def measure_node(self, name, measure, start, results):
+        """
+        Takes one node's measurement (the thread's target)
+
+        :param:
+
+         - `name`: the node's name
+         - `measure`: callable that takes a connection and the start time
+         - `start`: the shared start time
+         - `results`: dictionary to put the FanOutResult in
+        """
+        elapsed = rtt = error = None
+        try:
+            outcome = measure(self.nodes[name].connection, start)
+            if hasattr(outcome, 'ttr'):
+                elapsed, rtt = outcome.ttr, outcome.rtt
+            else:
+                elapsed = outcome
+        except Exception as error:
+            self.logger.error("{0}: {1}".format(name, error))
+        with self.lock:
+            results[name] = FanOutResult(node=name, elapsed=elapsed, rtt=rtt,
+                                         error=error)
+        return
+
+    def summarize(self, start, results):
+        """
+        :param:
+
+         - `start`: the shared start time
+         - `results`: list of FanOutResult
+
+        :return: FanOutSummary of the elapsed times
+        """
+        elapsed = [result.elapsed for result in results if result.elapsed is not None]
+        if not elapsed:
+            return FanOutSummary(start, len(results), 0, None, None, None, None, None)
+        tendency = CentralTendency()
+        return FanOutSummary(start=start,
+                             nodes=len(results),
+                             events=len(elapsed),
+                             minimum=min(elapsed),
+                             median=tendency.percentile(elapsed),
+                             mean=tendency.meanaverage(elapsed),
+                             percentile_90=tendency.percentile(elapsed, PERCENTILE),
+                             maximum=max(elapsed))
+
+    def save(self, start, results, summary):
+        """
+        Writes the per-node rows and the summary row (with headers the first time)
+
+        :param:
+
+         - `start`: the shared start time
+         - `results`: list of FanOutResult
+         - `summary`: FanOutSummary
+        """
+        timestamp = self.timestamp.convert(start)
+        if not self.wrote_headers:
+            if self.table is not None:
+                self.table.write(TABLE_HEADER)
+            if self.summary is not None:
+                self.summary.write(SUMMARY_HEADER)
+            self.wrote_headers = True
+        if self.table is not None:
+            for result in results:
+                error = result.error
+                if error is not None:
+                    error = str(error).replace(COMMA, SEMICOLON)
+                row = [timestamp, result.node, result.elapsed, result.rtt, error]
+                self.table.write(self.format_row(row))
+        if self.summary is not None:
+            self.summary.write(self.format_row([timestamp] + list(summary[1:])))
+        return
+
+    def format_row(self, row):
+        """
+        :param:
+
+         - `row`: list of values (None for values that aren't available)
+
+        :return: csv-line for the row
+        """
+        return COMMA.join(NOT_AVAILABLE if value is None else str(value)
+                          for value in row) + NEWLINE
+# end class FanOut
@@ -0,0 +1,217 @@
+
+# python standard library
+import re
+import threading
+from time import time, sleep
+
+# apetools
+from apetools.baseclass import BaseThreadClass
+from apetools.commons.readoutput import ValidatingOutput
+from apetools.commands.iperfcommand import IperfCommandEnum
+from apetools.threads.threads import Thread
+
+
+READY_TIMEOUT = 10
+QUIET = 1
+FINISH_TIMEOUT = 10
+WAIT_TICK = 0.05
+SUMS = ('SUM', '-1')
+# [  4] local 192.168.20.99 port 5001 connected with 192.168.20.50 port 57069
+CONNECTED = re.compile(r"^\[\s*(?P<id>\d+)\]\s+local\s.*connected\s+with")
+# [  4]  0.0-10.0 sec  1.09 GBytes   936 Mbits/sec
+HUMAN = re.compile(r"^\[\s*(?P<id>\d+|SUM)\]\s+(?P<start>\d+\.\d+)\s*-\s*(?P<end>\d+\.\d+)\s+sec")
+# 20120912102944,192.168.20.50,56843,192.168.20.99,5001,4,0.0-10.0,786432,6291456
+CSV = re.compile(r"^\d+,[^,]*,\d+,[^,]*,\d+,(?P<id>-?\d+),(?P<start>\d+\.\d+)-(?P<end>\d+\.\d+),")
+
+
+class IperfRun(object):
+    """
+    The output file and connections for one client run
+    """
+    def __init__(self, output):
+        """
+        :param:
+
+         - `output`: the opened storage pipe for the run
+        """
+        self.output = output
+        self.connections = set()
+        self.finished = set()
+        self.last_line = time()
+        return
+
+    @property
+    def done(self):
+        """
+        :return: True if connections were made and all of them have reported summaries
+        """
+        return bool(self.connections) and self.connections <= self.finished
+# end class IperfRun
+
+
+class IperfServer(BaseThreadClass):
+    """
+    A long-running iperf server whose output is split per client run
+    """
+    def __init__(self, command, ready_timeout=READY_TIMEOUT, quiet=QUIET,
+                 finish_timeout=FINISH_TIMEOUT):
+        """
+        :param:
+
+         - `command`: the server's IperfCommand (for the parameters, output and validation)
+         - `ready_timeout`: seconds to wait for the server to start listening
+         - `quiet`: seconds of silence after which a run is assumed finished
+         - `finish_timeout`: most seconds to wait for a run's summaries
+        """
+        super(IperfServer, self).__init__()
+        self.command = command
+        self.ready_timeout = ready_timeout
+        self.quiet = quiet
+        self.finish_timeout = finish_timeout
+        self.device = None
+        self.ready = threading.Event()
+        self.lock = threading.RLock()
+        self.current = None
+        self.connections = {}
+        self.thread = None
+        self._reporting_interval = None
+        return
+
+    @property
+    def is_alive(self):
+        """
+        :return: True if the server's output is still being read
+        """
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def reporting_interval(self):
+        """
+        :return: the server's `--interval` in seconds (0 if not set)
+        """
+        if self._reporting_interval is None:
+            self._reporting_interval = 0
+            interval = getattr(self.command.parameters, 'interval', None)
+            if interval is not None:
+                self._reporting_interval = float(interval.split()[-1])
+        return self._reporting_interval
+
+    def start(self, device):
+        """
+        Starts the server (if it isn't already running on the device) and waits for it to listen
+
+        :param:
+
+         - `device`: the device to run the server on
+
+        :return: True if the server said it was listening before the ready_timeout
+        """
+        if self.is_alive and device is self.device:
+            return True
+        self.device = device
+        self.ready.clear()
+        with self.lock:
+            self.connections = {}
+        self.command.output.unset_emit()
+        self.thread = Thread(target=self.run_thread, name="IperfServer")
+        if not self.ready.wait(self.ready_timeout):
+            self.logger.warning("The iperf server on {0} didn't report that it was listening".format(device.connection.hostname))
+            return False
+        return True
+
+    def run(self):
+        """
+        Runs the iperf server and routes its output until it exits
+        """
+        self.logger.info("running persistent iperf {0}".format(self.command.parameters))
+        output, error = self.device.connection.iperf(str(self.command.parameters))
+        for line in ValidatingOutput(output, self.command.validate):
+            self.route(line)
+        self.logger.warning("The iperf server on {0} exited".format(self.device.connection.hostname))
+        with self.lock:
+            if self.current is not None:
+                self.current.connections = self.current.finished
+        return
+
+    def route(self, line):
+        """
+        Sends the line to the run it belongs to
+
+        :param:
+
+         - `line`: a line of the server's output
+        """
+        if IperfCommandEnum.listening in line:
+            self.ready.set()
+        if not line.strip():
+            return
+        with self.lock:
+            identifier = None
+            match = CONNECTED.search(line)
+            if match is not None:
+                identifier = match.group('id')
+                self.connections[identifier] = self.current
+            else:
+                match = HUMAN.search(line) or CSV.search(line)
+                if match is not None:
+                    identifier = match.group('id')
+                    if identifier not in self.connections and identifier not in SUMS:
+                        self.connections[identifier] = self.current
+            run = self.connections.get(identifier, self.current)
+            if run is None:
+                self.logger.debug("Not in a run: {0}".format(line.rstrip()))
+                return
+            run.last_line = time()
+            if identifier is not None and identifier not in SUMS:
+                run.connections.add(identifier)
+                if match.re is not CONNECTED and self.is_summary(match):
+                    run.finished.add(identifier)
+                    del self.connections[identifier]
+            self.command.send_line(run.output, line)
+        return
+
+    def is_summary(self, match):
+        """
+        :param:
+
+         - `match`: match for an interval line
+
+        :return: True if the line is a connection's final report
+        """
+        start, end = float(match.group('start')), float(match.group('end'))
+        if start != 0:
+            return False
+        if not self.reporting_interval:
+            return True
+        return end - start > 1.5 * self.reporting_interval
+
+    def begin(self, filename):
+        """
+        Opens the file for the next client run
+
+        :param:
+
+         - `filename`: base filename (the role and protocol prefixes are added)
+        """
+        filename = self.command.filename(filename, self.device.role)
+        with self.lock:
+            self.current = IperfRun(self.command.output.open(filename=filename))
+        return
+
+    def end(self):
+        """
+        Waits for the current run's summaries (or for the server to go quiet) and closes its file
+        """
+        deadline = time() + self.finish_timeout
+        while time() < deadline:
+            with self.lock:
+                run = self.current
+                if run is None or run.done or time() - run.last_line > self.quiet:
+                    break
+            sleep(WAIT_TICK)
+        with self.lock:
+            if self.current is not None:
+                self.command.send_line(self.current.output, IperfCommandEnum.eof)
+            self.current = None
+        return
+# end class IperfServer
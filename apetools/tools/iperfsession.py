@@ -130,4 +130,11 @@ class IperfSession(BaseClass):
                                     receiver=sender_receiver.receiver,
                                     filename=filename)
         return self.poll
+
+    def close(self):
+        """
+        Closes the iperf test (stopping any persistent servers)
+        """
+        self.iperf_test.close()
+        return
 # end class IperfSession
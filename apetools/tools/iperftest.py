@@ -7,10 +7,12 @@ from apetools.commands.sftpcommand import SftpCommand
 #this folder
 from sleep import Sleep 
 from killall import KillAll, KillAllError
+from iperfserver import IperfServer, READY_TIMEOUT
 
 
 
 SIGKILL = 9
+KILL_WAIT = 1
 
 
 class IperfTestError(CommandError):
@@ -25,7 +27,7 @@ class IperfTest(BaseClass):
     The Iperf Test runs a single iperf test.
     """
     def __init__(self, sender_command=None, receiver_command=None, sleep=None,
-                 wait_events=None):
+                 wait_events=None, persistent=False):
         """
         :param:
 
@@ -33,11 +35,14 @@ class IperfTest(BaseClass):
          - `receiver_command`: IperfCommand bundled with server parameters
          - `sleep`: A Sleep object with the sleep time preset
          - `wait_events`: list of events to wait for
+         - `persistent`: if True, keep the servers running between calls
         """
         super(IperfTest, self).__init__()
         self.sender_command = sender_command
         self.receiver_command = receiver_command
         self.wait_events = wait_events
+        self.persistent = persistent
+        self.servers = {}
         self._sleep = sleep
         self._kill = None
         return
@@ -48,7 +53,7 @@ class IperfTest(BaseClass):
         :return: iperf process killer
         """
         if self._kill is None:
-            self._kill = KillAll(name="iperf")
+            self._kill = KillAll(name="iperf", time_to_sleep=KILL_WAIT)
         return self._kill
 
     @property
@@ -79,6 +84,85 @@ class IperfTest(BaseClass):
             self.kill.level = SIGKILL
             self.kill()            
         return
+
+    def server(self, receiver):
+        """
+        Gets the receiver's persistent server, (re)starting it if it isn't running
+
+        :param:
+
+         - `receiver`: A device to receive traffic
+
+        :return: running IperfServer for the receiver
+        """
+        port = getattr(self.receiver_command.parameters, 'port', None)
+        key = (receiver.connection, port)
+        server = self.servers.get(key)
+        if server is None:
+            server = self.servers[key] = IperfServer(self.receiver_command)
+        if not server.is_alive:
+            self.logger.info("Starting the persistent iperf server on {0}".format(receiver.connection.hostname))
+            self.kill_processes(receiver.connection)
+            server.start(receiver)
+        return server
+
+    def wait_for_server(self):
+        """
+        Waits for the (non-persistent) server to report that it's listening
+        """
+        if self.receiver_command.is_daemon:
+            self.logger.info("Sleeping to let the server start.")
+            self.sleep()
+            return
+        self.logger.info("Waiting for the server to start listening.")
+        if not self.receiver_command.ready.wait(READY_TIMEOUT):
+            self.logger.warning("The server didn't report that it was listening")
+        return
+
+    def wait(self):
+        """
+        Allows other processes to block the iperf client-start
+
+        :raise: IperfTestError if wait_events time out
+        """
+        if self.wait_events is not None:
+            time_out = self.sender_command.max_time
+            if not self.wait_events.wait(time_out):
+                raise IperfTestError("Timed out waiting for event.")                
+        return
+
+    def run_persistent(self, sender, receiver, filename):
+        """
+        Runs the client against the receiver's persistent server
+
+        :param:
+
+         - `sender`: a device to originate traffic
+         - `receiver`: A device to receive traffic
+         - `filename`: a filename to use for output
+        """
+        server = self.server(receiver)
+        self.logger.info("Running Iperf: {2} ({0}) -> {3} ({1})".format(sender.address, receiver.address,
+                                                                        sender.role, receiver.role))
+        server.begin(filename)
+        try:
+            self.wait()
+            self.logger.info("Running the client (sender)")
+            self.sender_command.run(sender, filename)
+        finally:
+            server.end()
+        return
+
+    def close(self):
+        """
+        Kills the persistent servers
+
+        :postcondition: self.servers is empty
+        """
+        for (connection, port), server in self.servers.items():
+            self.kill_processes(connection)
+        self.servers = {}
+        return
     
     def __call__(self, sender, receiver, filename):
         """
@@ -95,6 +179,10 @@ class IperfTest(BaseClass):
         # set the target address in the iperf command to the receiver (server)
         self.sender_command.parameters.client = receiver.address
 
+        if self.persistent:
+            self.run_persistent(sender, receiver, filename)
+            return
+
         self.logger.info("Killing Existing Iperf Processes")
         self.kill_processes(sender.connection)
         self.kill_processes(receiver.connection)
@@ -103,14 +191,10 @@ class IperfTest(BaseClass):
         self.logger.info("Starting the iperf server (receiver)")
 
         self.receiver_command.start(receiver, filename)
-        self.logger.info("Sleeping to let the server start.")
-        self.sleep()
+        self.wait_for_server()
 
         # allow other processes to block the iperf client-start
-        if self.wait_events is not None:
-            time_out = self.sender_command.max_time
-            if not self.wait_events.wait(time_out):
-                raise IperfTestError("Timed out waiting for event.")                
+        self.wait()
         self.logger.info("Running the client (sender)")
 
         self.sender_command.run(sender, filename)
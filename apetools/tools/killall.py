@@ -1,10 +1,10 @@
 
 #python
 import re
+from time import time, sleep
 
 # apetools
 from apetools.baseclass import BaseClass
-from apetools.tools import sleep
 from apetools.commons import enumerations, expressions, errors
 from apetools.parsers.oatbran import NAMED, STRING_START,SPACES, INTEGER
 from apetools.commands.pscommand import PsGrep
@@ -15,6 +15,11 @@ CYGWIN = STRING_START + SPACES + NAMED(n=expressions.PID_NAME,e=INTEGER)
 
 operating_systems = enumerations.OperatingSystem
 
+# operating systems with a ``pkill`` that takes the signal as -<level>
+PKILL_SYSTEMS = (operating_systems.linux,)
+BACKOFF_START = 0.1
+BACKOFF_MAX = 1
+SPACE = ' '
 
 
 class KillAllError(errors.CommandError):
@@ -27,21 +32,23 @@ class KillAll(BaseClass):
     """
     A killall kills processes. The default operating system is linux
     """
-    def __init__(self, connection=None, name=None, time_to_sleep=0, level=None):
+    def __init__(self, connection=None, name=None, time_to_sleep=0, level=None,
+                 fast=True):
         """
         :param:
 
          - `name`: The name of a process to kill
-         - `time_to_sleep`: The number of seconds to wait for a process to die.
+         - `time_to_sleep`: The most seconds to wait for a process to die.
          - `connection`: A connection to a device
          - `level`: the signal level (as a positive integer)
+         - `fast`: if True use ``pkill`` on operating systems that have it
         """
         super(BaseClass, self).__init__()
         self._logger = None
         self.name = name
         self._arguments = None
         self.time_to_sleep = time_to_sleep
-        self._sleep = None
+        self.fast = fast
         self._connection = None
         self.connection = connection
         self._grep = None
@@ -109,39 +116,77 @@ class KillAll(BaseClass):
 
 
     @property
-    def sleep(self):
+    def use_pkill(self):
         """
-        A sleep object to pace the execution of commands on the device
-        
-        :return: A sleep timer
+        :return: True if `fast` and the connection's operating system has ``pkill``
         """
-        if self._sleep is None:
-            self._sleep = sleep.Sleep(self.time_to_sleep).run
-        return self._sleep
+        return self.fast and self.connection.operating_system in PKILL_SYSTEMS
 
     def kill(self, name, level=None):
         """
-        Tries to kill all matching processes
+        Sends one ``kill`` with all the matching process ID's
 
         :param:
 
          - `name`: the name of the process
          - `level`: a signal level to override the set level
+
+        :return: the number of processes signalled
         """
         if level is None:
             level = self.level
-        kill_count = 0
-                
-        for pid in self.grep(name):
-            self.logger.debug("killing: " + pid)
-            command = " {0} {1}".format(self.level, pid)
-            kill_count+= 1
-            self.logger.debug("kill " + command)
-            k_output, k_error = self.connection.kill(command)
-            for k_line in k_error:
-                if len(k_line) > 1:
-                    self.logger.error(k_line)
-        return kill_count
+        pids = list(self.grep(name))
+        if not pids:
+            return 0
+        command = " {0} {1}".format(level, SPACE.join(pids))
+        self.logger.debug("kill " + command)
+        k_output, k_error = self.connection.kill(command)
+        for k_line in k_error:
+            if len(k_line) > 1:
+                self.logger.error(k_line)
+        return len(pids)
+
+    def pkill(self, name, level=None):
+        """
+        Sends one ``pkill`` for processes named `name` (without checking for them first)
+
+        :param:
+
+         - `name`: the name of the process
+         - `level`: a signal level to override the set level
+        """
+        if level is None:
+            level = self.level
+        command = " {0} -x {1}".format(level, name)
+        self.logger.debug("pkill " + command)
+        p_output, p_error = self.connection.pkill(command)
+        for p_line in p_error:
+            if len(p_line) > 1:
+                self.logger.error(p_line)
+        return
+
+    def verify(self, name, time_to_sleep):
+        """
+        Checks for the process until it's gone or time_to_sleep seconds have passed
+
+        :param:
+
+         - `name`: the name of the process
+         - `time_to_sleep`: the most seconds to wait
+
+        :return: True if no processes named `name` were found
+        """
+        deadline = time() + time_to_sleep
+        delay = BACKOFF_START
+        while True:
+            if not list(self.grep(name)):
+                return True
+            remaining = deadline - time()
+            if remaining <= 0:
+                return False
+            sleep(min(delay, remaining))
+            delay = min(2 * delay, BACKOFF_MAX)
+        return
     
     def run(self, name=None, time_to_sleep=None):
         """
@@ -162,19 +207,23 @@ class KillAll(BaseClass):
 
         self.logger.debug("process to kill: {0}".format(name))
 
-        kill_count = self.kill(name)
-        
-        if not kill_count:
-            self.logger.info("No '{p}' processes found on {h}".format(h=self.connection.hostname,
-                                                                        p=name))
-            return
-
-        self.sleep(time_to_sleep)
+        if self.use_pkill:
+            self.pkill(name)
+            kill_count = None
+        else:
+            kill_count = self.kill(name)
+            if not kill_count:
+                self.logger.info("No '{p}' processes found on {h}".format(h=self.connection.hostname,
+                                                                            p=name))
+                return
 
         # double-check to see if the process is dead
-        for pid in self.grep(name):
+        if not self.verify(name, time_to_sleep):
             raise KillAllError("Unable to kill {0}".format(name))
-            self.logger.error(err)
+        if kill_count is None:
+            self.logger.info("Killed '{p}' processes on {h}".format(h=self.connection.hostname,
+                                                                    p=name))
+            return
         self.logger.info("Killed {k} '{p}' processes on {h}".format(k=kill_count, 
                                                                     h=self.connection.hostname,
                                                                     p=name))
@@ -201,16 +250,16 @@ class KillAll(BaseClass):
 
 #python standard library
 import unittest
-from random import randrange, choice
+from random import randrange
 #third-party
-from mock import MagicMock, patch, call
+from mock import MagicMock, call
 from nose.tools import raises
 
 
 class TestKillAll(unittest.TestCase):
     def setUp(self):
         self.connection = MagicMock()
-        self.kill = KillAll(connection=self.connection)
+        self.kill = KillAll(connection=self.connection, fast=False)
         return
     
     def test_set_connection(self):
@@ -236,7 +285,7 @@ class TestKillAll(unittest.TestCase):
         def side_effects(*args, **kwargs):
             return pids.pop(0)
         pgrep.side_effect = side_effects
-        expected = [call("  {0}".format(pid)) for pid in pids[0]]
+        expected = [call("  {0}".format(" ".join(pids[0])))] if pids[0] else []
 
         self.kill._grep = pgrep
         self.kill.run(name='emacs',
@@ -253,7 +302,7 @@ class TestKillAll(unittest.TestCase):
         self.connection.operating_system = operating_systems.linux
         self.connection.kill.return_value = [""], [""]
 
-        pids = ['{0}'.format(randrange(1000)) for i in range(randrange(100))]
+        pids = ['{0}'.format(randrange(1000)) for i in range(randrange(1, 100))]
         pgrep.return_value = pids
 
         self.kill._grep = pgrep
@@ -277,7 +326,7 @@ class TestKillAll(unittest.TestCase):
 
         # use the default kill level
         self.kill.level = None
-        expected = [call("  {0}".format(pid)) for pid in pids[0]]
+        expected = [call("  {0}".format(" ".join(pids[0])))] if pids[0] else []
 
         self.kill._grep = pgrep
         self.kill(name='emacs',
@@ -299,7 +348,7 @@ class TestKillAll(unittest.TestCase):
         def side_effects(*args, **kwargs):
             return pids.pop(0)
         pgrep.side_effect = side_effects
-        expected = [call(" -{1} {0}".format(pid, level)) for pid in pids[0]]
+        expected = [call(" -{1} {0}".format(" ".join(pids[0]), level))] if pids[0] else []
 
         self.kill._grep = pgrep
         self.kill.kill(name='emacs')
@@ -322,11 +371,32 @@ class TestKillAll(unittest.TestCase):
         def side_effects(*args, **kwargs):
             return pids.pop(0)
         pgrep.side_effect = side_effects
-        expected = [call("  {0}".format(pid)) for pid in pids[0]]
+        expected = [call("  {0}".format(" ".join(pids[0])))] if pids[0] else []
 
         self.kill._grep = pgrep
         self.kill.kill(name='emacs')
         self.assertEqual(self.connection.kill.call_args_list, expected)
         return
 
-        
+    def test_pkill(self):
+        """
+        Will linux use one pkill (and poll until the processes are gone)?
+        """
+        pgrep = MagicMock()
+        self.kill.fast = True
+        self.connection.operating_system = operating_systems.linux
+        self.connection.pkill.return_value = [""], [""]
+        pids = [['1', '2'], []]
+        def side_effects(*args, **kwargs):
+            return pids.pop(0)
+        pgrep.side_effect = side_effects
+        self.kill._grep = pgrep
+        self.kill(name='iperf', time_to_sleep=1)
+        self.connection.pkill.assert_called_once_with("  -x iperf")
+        self.assertFalse(self.connection.kill.called)
+        self.assertEqual(2, pgrep.call_count)
+
+        # android doesn't have pkill
+        self.connection.operating_system = operating_systems.android
+        self.assertFalse(self.kill.use_pkill)
+        return
@@ -4,7 +4,10 @@ import time
 now = time.time
 
 from apetools.baseclass import BaseClass
+from apetools.commons.errors import CommandError
 from apetools.commands import ping
+from apetools.commands.pingprober import PingProber
+from apetools.tools.fanout import FanOut
 
 
 class TimeToFailure(BaseClass):
@@ -12,7 +15,8 @@ class TimeToFailure(BaseClass):
     A TimeToFailure pings a target until the pings fail.
     """
     def __init__(self, pinger=None, target=None, timeout=300,
-                 threshold=5, *args, **kwargs):
+                 threshold=5, connection=None, interval=None, nodes=None,
+                 fan_out=False, table=None, summary=None, *args, **kwargs):
         """
         :param:
 
@@ -20,6 +24,12 @@ class TimeToFailure(BaseClass):
          - `target`: The target address to ping
          - `timeout`: The length of time to try in seconds.
          - `threshold`: The number of consecutive failures to make a fail
+         - `connection`: connection to ping from with a PingProber
+         - `interval`: seconds between the prober's pings (None to use the pinger)
+         - `nodes`: A dictionary of id:device pairs (to ping from when called)
+         - `fan_out`: if True, measure all the nodes at once on each call
+         - `table`: opened file for the fan-out's per-node times
+         - `summary`: opened file for the fan-out's summaries
         """
         super(TimeToFailure, self).__init__(*args, **kwargs)
         self._pinger = pinger
@@ -27,6 +37,13 @@ class TimeToFailure(BaseClass):
         self.target = target
         self.timeout = timeout
         self.threshold = threshold
+        self.connection = connection
+        self.interval = interval
+        self.nodes = nodes
+        self.fan_out = fan_out
+        self.table = table
+        self.summary = summary
+        self._fan_out = None
         return
 
     @property
@@ -38,7 +55,34 @@ class TimeToFailure(BaseClass):
             self._pinger = ping.ADBPing()
         return self._pinger
 
-    def run(self, parameters):
+    @property
+    def fanout(self):
+        """
+        :return: FanOut for all the nodes
+        """
+        if self._fan_out is None:
+            self._fan_out = FanOut(nodes=self.nodes, table=self.table,
+                                   summary=self.summary)
+        return self._fan_out
+
+    def _unpack_parameters(self, parameters):
+        """
+        :param:
+
+         - `parameters`: namedtuple with target, timeout and threshold (values or builder Parameters) or None
+
+        :return: target, timeout, threshold (the defaults fill in the missing ones)
+        """
+        unpacked = []
+        for name, default in (('target', self.target),
+                              ('timeout', self.timeout),
+                              ('threshold', self.threshold)):
+            value = getattr(parameters, name, None)
+            value = getattr(value, 'parameters', value)
+            unpacked.append(default if value is None else value)
+        return unpacked
+
+    def run(self, parameters, connection=None, start=None):
         """
         Pings until failure or timeout.
 
@@ -47,30 +91,32 @@ class TimeToFailure(BaseClass):
          - `parameters.target`: The address to ping.
          - `parameters.timeout`: The length of time to try (in seconds)
          - `parameters.threshold`: The number of consecutive failures needed to be a failure.
+         - `connection`: connection to ping from (default is self.connection or the pinger's)
+         - `start`: time to measure from (default is now)
 
         :rtype: FloatType or NoneType
         :return: time from start of run to first of failed pings (or None)
         """
-        if parameters.target is None:
-            target = self.target
-        else:
-            target = parameters.target
-        if parameters.timeout is None:
-            timeout = self.timeout
-        else:
-            timeout = parameters.timeout
-        if parameters.threshold is None:
-            threshold = self.threshold
-        else:
-            threshold = parameters.threshold
+        target, timeout, threshold = self._unpack_parameters(parameters)
 
-        start = now()
+        if start is None:
+            start = now()
+        if connection is None:
+            connection = self.connection
+            pinger = None
+        else:
+            pinger = ping.PingCommand(connection=connection,
+                                      operating_system=connection.operating_system)
+        if connection is not None and self.interval is not None:
+            return self.stream(target, timeout, threshold, connection, start)
+        if pinger is None:
+            pinger = self.pinger
         time_limit = start + timeout
         failures = 0
         first = None
 
         while failures < threshold and now() < time_limit:
-            if self.pinger.run(target):
+            if pinger.run(target):
                 failures = 0
                 first = None
             else:
@@ -80,5 +126,68 @@ class TimeToFailure(BaseClass):
         if failures == threshold and first is not None:
             return first - start
         return
-                 
+
+    def stream(self, target, timeout, threshold, connection=None, start=None):
+        """
+        Pings with a PingProber until failure or timeout.
+
+        :param:
+
+         - `target`: The address to ping.
+         - `timeout`: The length of time to try (in seconds)
+         - `threshold`: The number of consecutive failures needed to be a failure.
+         - `connection`: connection to ping from (default is self.connection)
+         - `start`: time to measure from (default is now)
+
+        :rtype: FloatType or NoneType
+        :return: time from start of run to first of failed pings (or None)
+        """
+        if start is None:
+            start = now()
+        if connection is None:
+            connection = self.connection
+        prober = PingProber(connection=connection, target=target,
+                            interval=self.interval)
+        prober.start(duration=max(0, start + timeout - now()))
+        try:
+            first = prober.wait_for(success=False, threshold=threshold,
+                                    deadline=start + timeout)
+        finally:
+            prober.stop()
+        if first is None:
+            return
+        return max(0, first.sent - start)
+
+    def run_all(self, parameters):
+        """
+        Measures the time to failure for all the nodes at once
+
+        :param:
+
+         - `parameters`: namedtuple with target, timeout and threshold (or None)
+
+        :return: list of FanOutResult, FanOutSummary
+        """
+        return self.fanout.run(lambda connection, start: self.run(parameters, connection, start))
+
+    def __call__(self, parameters):
+        """
+        :param:
+
+         - `parameters`: namedtuple with the nodes attribute (unless fanning out)
+
+        :raises: CommandError if the pings didn't fail
+        """
+        if self.fan_out:
+            results, summary = self.run_all(None)
+            failed = [result.node for result in results if result.elapsed is None]
+            if failed:
+                raise CommandError("Pings to {0} didn't fail from {1}".format(self.target,
+                                                                             ", ".join(failed)))
+            return
+        ttf = self.run(None, self.nodes[parameters.nodes.parameters].connection)
+        self.logger.info("TTF: {0}".format(ttf))
+        if ttf is None:
+            raise CommandError("Pings to {0} didn't fail".format(self.target))
+        return
 # end TimeToFailure
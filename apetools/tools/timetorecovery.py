@@ -9,6 +9,8 @@ from collections import namedtuple
 from apetools.baseclass import BaseClass
 from apetools.commons.errors import CommandError
 from apetools.commands import ping
+from apetools.commands.pingprober import PingProber
+from apetools.tools.fanout import FanOut
 
 
 class TTRData(namedtuple("TTRData", "ttr rtt")):
@@ -26,7 +28,8 @@ class TimeToRecovery(BaseClass):
     A TimeToRecovery pings a target until the pings succeeed.
     """
     def __init__(self, nodes, pinger=None, target=None, timeout=300,
-                 threshold=5):
+                 threshold=5, interval=None, fan_out=False, table=None,
+                 summary=None):
         """
         :param:
 
@@ -35,6 +38,10 @@ class TimeToRecovery(BaseClass):
          - `target`: The target address to ping
          - `timeout`: The length of time to try in seconds.
          - `threshold`: The number of consecutive pings to make a recovery
+         - `interval`: seconds between streamed pings (None to use the pinger)
+         - `fan_out`: if True, measure all the nodes at once on each call
+         - `table`: opened file for the fan-out's per-node times
+         - `summary`: opened file for the fan-out's summaries
         """
         super(TimeToRecovery, self).__init__()
         self.nodes = nodes
@@ -43,6 +50,11 @@ class TimeToRecovery(BaseClass):
         self.target = target
         self.timeout = timeout
         self.threshold = threshold
+        self.interval = interval
+        self.fan_out = fan_out
+        self.table = table
+        self.summary = summary
+        self._fan_out = None
         return
 
     @property
@@ -54,6 +66,16 @@ class TimeToRecovery(BaseClass):
             self._pinger = ping.PingCommand()
         return self._pinger
 
+    @property
+    def fanout(self):
+        """
+        :return: FanOut for all the nodes
+        """
+        if self._fan_out is None:
+            self._fan_out = FanOut(nodes=self.nodes, table=self.table,
+                                   summary=self.summary)
+        return self._fan_out
+
     def _unpack_parameters(self, parameters):
         try:
             target = parameters.target.parameters
@@ -67,9 +89,13 @@ class TimeToRecovery(BaseClass):
             threshold = parameters.threshold.parameters
         except AttributeError:
             threshold = self.threshold
-        return target, timeout, threshold
+        try:
+            interval = parameters.interval.parameters
+        except AttributeError:
+            interval = self.interval
+        return target, timeout, threshold, interval
         
-    def run(self, parameters=None, connection=None):
+    def run(self, parameters=None, connection=None, start=None, pinger=None):
         """
         Pings until failure or timeout.
 
@@ -78,22 +104,31 @@ class TimeToRecovery(BaseClass):
          - `parameters.target`: The address to ping.
          - `parameters.timeout`: The length of time to try (in seconds)
          - `parameters.threshold`: The number of consecutive pings needed to be a success.
+         - `parameters.interval`: seconds between streamed pings (optional)
          - `connection`: The connection to the source of the ping
+         - `start`: time to measure from (default is now)
+         - `pinger`: callable to use instead of self.pinger
 
         :rtype: FloatType or NoneType
         :return: time from start of run to first of successful pings (or None)
         """
-        target, timeout, threshold = self._unpack_parameters(parameters)
+        target, timeout, threshold, interval = self._unpack_parameters(parameters)
         self.logger.info(("{pinger}: Waiting for {target} to return {threshold} pings"
                           " (up to {timeout} seconds)").format(target=target, threshold=threshold,
                                                                timeout=timeout, pinger=connection))
-        start = now()
+        if start is None:
+            start = now()
+        if interval is not None:
+            return self.stream(target, timeout, threshold, interval, connection,
+                               start)
+        if pinger is None:
+            pinger = self.pinger
         time_limit = start + timeout
         pings = 0
         first = None
 
         while pings < threshold and now() < time_limit:
-            result = self.pinger(target, connection)
+            result = pinger(target, connection)
             if result is not None:
                 pings += 1
                 if pings == 1:
@@ -108,6 +143,36 @@ class TimeToRecovery(BaseClass):
             return TTRData(ttr=first - start, rtt=first_result.rtt)
         return
 
+    def stream(self, target, timeout, threshold, interval, connection, start=None):
+        """
+        Pings with a PingProber until recovery or timeout.
+
+        :param:
+
+         - `target`: The address to ping.
+         - `timeout`: The length of time to try (in seconds)
+         - `threshold`: The number of consecutive pings needed to be a success.
+         - `interval`: seconds between pings
+         - `connection`: The connection to the source of the ping
+         - `start`: time to measure from (default is now)
+
+        :return: TTRData or None
+        """
+        if start is None:
+            start = now()
+        prober = PingProber(connection=connection, target=target,
+                            interval=interval)
+        prober.start(duration=max(0, start + timeout - now()))
+        try:
+            first = prober.wait_for(success=True, threshold=threshold,
+                                    deadline=start + timeout)
+        finally:
+            prober.stop()
+        if first is None:
+            return
+        self.logger.info("Pinged target")
+        return TTRData(ttr=max(0, first.sent - start), rtt=first.rtt)
+
     def __call__(self, parameters):
         """
         :param:
@@ -116,9 +181,34 @@ class TimeToRecovery(BaseClass):
 
         :raises: CommandError if unable to recover
         """
+        if self.fan_out:
+            self.run_all(parameters)
+            return
         ttr =  self.run(parameters, self.nodes[parameters.nodes.parameters].connection)
         self.logger.info("TTR: {0}".format(ttr))
         if ttr is None:
             raise CommandError("Unable to ping {0}".format(parameters.target.parameters))
         return 
+
+    def run_all(self, parameters):
+        """
+        Measures the time to recovery for all the nodes at once
+
+        :param:
+
+         - `parameters`: namedtuple with the target (and optionally timeout, threshold, interval)
+
+        :return: list of FanOutResult, FanOutSummary
+        :raises: CommandError if any of the nodes didn't recover
+        """
+        def measure(connection, start):
+            return self.run(parameters, connection, start,
+                            pinger=ping.PingCommand())
+        results, summary = self.fanout.run(measure)
+        failed = [result.node for result in results if result.elapsed is None]
+        if failed:
+            target = self._unpack_parameters(parameters)[0]
+            raise CommandError("Unable to ping {0} from {1}".format(target,
+                                                                  ", ".join(failed)))
+        return results, summary
 # end TimeToRecovery
@@ -1,11 +1,33 @@
 
 # python standard library
+from collections import namedtuple
+import httplib
+import socket
+import threading
 import time
+import urlparse
 
 # this package
 from apetools.baseclass import BaseClass
 from apetools.commons.errors import ConfigurationError
 from apetools.commands.busyboxwget import BusyboxWget, HEADER
+from apetools.threads.threads import Thread
+
+
+WORKERS = 4
+FETCH_TIMEOUT = 10
+CHUNK_SIZE = 65536
+NA = 'NA'
+COMMA = ','
+NEWLINE = '\n'
+HTTP = 'HTTP/'
+CONTENT_LENGTH = 'content-length'
+WGET_ERROR = 'wget:'
+# upper bounds (milliseconds) of the histogram buckets (the last bucket has no upper bound)
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 60000)
+HISTOGRAM_HEADER = 'Upper Bound(ms),TTFB,Total\n'
+SUMMARY_HEADER = ('Workers,Requests,Errors,Bytes,Elapsed(seconds),Requests/Second,Mbits/Second,'
+                  'TTFB Median(ms),TTFB 95th(ms),Total Median(ms),Total 95th(ms)\n')
 
 
 class BusyboxWgetSession(BaseClass):
@@ -125,3 +147,329 @@ class BusyboxWgetSession(BaseClass):
                 time.sleep(self.recovery_time)
         self.logger.info("Ended `wget` session")
         return
+
+
+class FetchResult(namedtuple("FetchResult", "ttfb total size error")):
+    __slots__ = ()
+
+
+class LatencyHistogram(object):
+    """
+    A count of times in (millisecond) buckets
+    """
+    def __init__(self, buckets=BUCKETS):
+        """
+        :param:
+
+         - `buckets`: ascending upper bounds (milliseconds) of the buckets
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        return
+
+    def add(self, seconds):
+        """
+        :param:
+
+         - `seconds`: a time to count
+        """
+        milliseconds = seconds * 1000
+        index = 0
+        for bound in self.buckets:
+            if milliseconds <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        return
+
+    def percentile(self, fraction):
+        """
+        :param:
+
+         - `fraction`: fraction of the counts (e.g. 0.95)
+
+        :return: upper bound of the bucket the fraction falls in (NA if no counts or the last bucket)
+        """
+        if not self.count:
+            return NA
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= fraction * self.count:
+                return bound
+        return NA
+# end class LatencyHistogram
+
+
+class BusyboxFetcher(BaseClass):
+    """
+    A fetcher that runs busybox wget on a device
+    """
+    def __init__(self, url, connection, timeout=FETCH_TIMEOUT):
+        """
+        :param:
+
+         - `url`: URL to fetch
+         - `connection`: connection to the device
+         - `timeout`: seconds for wget (and the connection) to wait
+        """
+        super(BusyboxFetcher, self).__init__()
+        self.url = url
+        self.connection = connection
+        self.timeout = timeout
+        self._arguments = None
+        return
+
+    @property
+    def arguments(self):
+        """
+        :return: the busybox arguments
+        """
+        if self._arguments is None:
+            self._arguments = "wget -S {0} -O /dev/null -T {1} 2>&1".format(self.url,
+                                                                            self.timeout)
+        return self._arguments
+
+    def __call__(self):
+        """
+        Fetches the URL once
+
+        :return: FetchResult
+        """
+        ttfb, size, error = None, None, ''
+        start = time.time()
+        output, errors = self.connection.busybox(self.arguments, timeout=self.timeout)
+        for line in output:
+            line = line.strip()
+            if ttfb is None and line.startswith(HTTP):
+                ttfb = time.time() - start
+            name, colon, value = line.partition(':')
+            if colon and name.lower() == CONTENT_LENGTH:
+                try:
+                    size = int(value)
+                except ValueError:
+                    pass
+            if WGET_ERROR in line:
+                error = line.split(':')[-1].strip()
+        return FetchResult(ttfb=ttfb, total=time.time() - start, size=size,
+                           error=error)
+# end class BusyboxFetcher
+
+
+class HttpFetcher(BaseClass):
+    """
+    A fetcher that gets the URL in this process
+    """
+    def __init__(self, url, timeout=FETCH_TIMEOUT):
+        """
+        :param:
+
+         - `url`: URL to fetch (http only)
+         - `timeout`: seconds for the socket to wait
+        """
+        super(HttpFetcher, self).__init__()
+        self.url = url
+        self.timeout = timeout
+        parsed = urlparse.urlsplit(url)
+        self.host = parsed.netloc
+        self.path = parsed.path or '/'
+        if parsed.query:
+            self.path += '?' + parsed.query
+        return
+
+    def __call__(self):
+        """
+        Fetches the URL once
+
+        :return: FetchResult
+        """
+        ttfb, size, error = None, 0, ''
+        start = time.time()
+        connection = httplib.HTTPConnection(self.host, timeout=self.timeout)
+        try:
+            connection.request('GET', self.path)
+            response = connection.getresponse()
+            ttfb = time.time() - start
+            if response.status != httplib.OK:
+                error = "{0} {1}".format(response.status, response.reason)
+            chunk = response.read(CHUNK_SIZE)
+            while chunk:
+                size += len(chunk)
+                chunk = response.read(CHUNK_SIZE)
+        except (socket.error, httplib.HTTPException) as exception:
+            error = str(exception) or exception.__class__.__name__
+        finally:
+            connection.close()
+        return FetchResult(ttfb=ttfb, total=time.time() - start, size=size,
+                           error=error)
+# end class HttpFetcher
+
+
+class WgetLoadSession(BusyboxWgetSession):
+    """
+    A runner of concurrent fetches
+    """
+    def __init__(self, url, connections, storage, workers=WORKERS, local=False,
+                 timeout=FETCH_TIMEOUT, **kwargs):
+        """
+        :param:
+
+         - `url`: URL of server (http://<ip>[:<port>]/<file>)
+         - `connections`: list of connections to the devices to run `wget` on
+         - `storage`: storage to open the output files with
+         - `workers`: number of fetches to run at once on each device
+         - `local`: if True fetch in this process instead of with busybox
+         - `timeout`: seconds to wait for a fetch
+         - `repetitions`: total number of fetches (over all the workers)
+         - `max_time`: maximum seconds to run
+         - `data_file`: name to use for the histogram file
+         - `recovery_time`: seconds a worker sleeps if its fetch failed
+        """
+        super(WgetLoadSession, self).__init__(url=url, connection=None,
+                                              storage=storage, **kwargs)
+        self.connections = connections
+        self.workers = workers
+        self.local = local
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.ttfb = None
+        self.total = None
+        self.requests = None
+        self.errors = None
+        self.bytes = None
+        self._fetchers = None
+        self._summary_file = None
+        self.reset()
+        return
+
+    def reset(self):
+        """
+        :postcondition: the histograms and counts are empty (so each call reports only its own fetches)
+        """
+        with self.lock:
+            self.ttfb = LatencyHistogram()
+            self.total = LatencyHistogram()
+            self.requests = 0
+            self.errors = 0
+            self.bytes = 0
+        return
+
+    @property
+    def fetchers(self):
+        """
+        :return: list of fetchers (one per worker)
+        """
+        if self._fetchers is None:
+            if self.local:
+                self._fetchers = [HttpFetcher(self.url, timeout=self.timeout)
+                                  for worker in range(self.workers)]
+            else:
+                self._fetchers = [BusyboxFetcher(self.url, connection, timeout=self.timeout)
+                                  for connection in self.connections
+                                  for worker in range(self.workers)]
+        return self._fetchers
+
+    @property
+    def summary_file(self):
+        """
+        :return: name of the file for the summary (data_file with `_summary` added)
+        """
+        if self._summary_file is None:
+            base, dot, extension = self.data_file.rpartition('.')
+            if not dot:
+                base, extension = extension, ''
+            self._summary_file = "{0}_summary{1}{2}".format(base, dot, extension)
+        return self._summary_file
+
+    def next_fetch(self):
+        """
+        :return: True if another fetch should be started
+        """
+        with self.lock:
+            return self.time_remains
+
+    def record(self, result):
+        """
+        Adds the result to the histograms and counts
+
+        :param:
+
+         - `result`: a FetchResult
+        """
+        with self.lock:
+            self.requests += 1
+            self.total.add(result.total)
+            if result.ttfb is not None:
+                self.ttfb.add(result.ttfb)
+            if result.size is not None:
+                self.bytes += result.size
+            if result.error:
+                self.errors += 1
+        return
+
+    def worker(self, fetcher):
+        """
+        Fetches until the session is over (a thread's target)
+
+        :param:
+
+         - `fetcher`: callable that returns a FetchResult
+        """
+        while self.next_fetch():
+            result = fetcher()
+            self.record(result)
+            if result.error:
+                self.logger.error(result.error)
+                time.sleep(self.recovery_time)
+        return
+
+    def write(self, elapsed):
+        """
+        Writes the histograms and the summary
+
+        :param:
+
+         - `elapsed`: seconds the session ran
+        """
+        output = self.storage.open(self.data_file)
+        output.write(HISTOGRAM_HEADER)
+        bounds = [str(bound) for bound in self.ttfb.buckets] + ['inf']
+        for bound, ttfb, total in zip(bounds, self.ttfb.counts, self.total.counts):
+            output.write("{0},{1},{2}\n".format(bound, ttfb, total))
+
+        elapsed = max(elapsed, 1e-6)
+        summary = (len(self.fetchers), self.requests, self.errors, self.bytes,
+                   "{0:.3f}".format(elapsed),
+                   "{0:.3f}".format(self.requests/elapsed),
+                   "{0:.3f}".format(self.bytes * 8/(elapsed * 10**6)),
+                   self.ttfb.percentile(0.5), self.ttfb.percentile(0.95),
+                   self.total.percentile(0.5), self.total.percentile(0.95))
+        output = self.storage.open(self.summary_file)
+        output.write(SUMMARY_HEADER)
+        output.write(COMMA.join(str(item) for item in summary) + NEWLINE)
+        self.logger.info(COMMA.join(str(item) for item in summary))
+        return
+
+    def __call__(self, parameters=None, filename_prefix=None):
+        """
+        Runs the workers until we are out of time or repetitions
+
+        :param:
+
+         - `parameters`: not used (legacy signature)
+        """
+        self.logger.info("Starting `wget` load session with {0} workers".format(len(self.fetchers)))
+        self.reset()
+        self.start_timer()
+        start = time.time()
+        threads = [Thread(target=self.worker, args=(fetcher,),
+                          name="WgetWorker {0}".format(index))
+                   for index, fetcher in enumerate(self.fetchers)]
+        for thread in threads:
+            thread.join()
+        self.write(time.time() - start)
+        self.logger.info("Ended `wget` load session")
+        return
+# end class WgetLoadSession
@@ -19,6 +19,7 @@ class BaseDevicePoller(BasePollster):
          - `name`: Name to use in the logs
          - `event`: An event which if set starts the polling
          - `use_header`: If True, prepend header to output
+         - `scheduler`: the SamplingScheduler to use (default is the shared one)
         """
         super(BaseDevicePoller, self).__init__(*args, **kwargs)
         self._logger = None        
@@ -6,7 +6,7 @@ import re
 # apetools
 from apetools.baseclass import BaseThreadClass
 from apetools.commons.timestamp import TimestampFormat, TimestampFormatEnums
-from apetools.threads.threads import Thread
+from samplingscheduler import scheduler
 
 
 CSV_JOIN = "{0},{1}"
@@ -19,7 +19,8 @@ class BasePollster(BaseThreadClass):
     """
     __metaclass__ = ABCMeta
     def __init__(self, device, output, expression=None, interval=1,
-                 timestamp=None, name=None, event=None, use_header=True):
+                 timestamp=None, name=None, event=None, use_header=True,
+                 scheduler=None):
         """
         :param:
 
@@ -31,6 +32,7 @@ class BasePollster(BaseThreadClass):
          - `name`: Name to use in the logs
          - `event`: An event which if set starts the polling
          - `use_header`: If True, prepend header to output
+         - `scheduler`: the SamplingScheduler to use (default is the shared one)
         """
         super(BasePollster, self).__init__()
         self._logger = None
@@ -43,6 +45,10 @@ class BasePollster(BaseThreadClass):
         self._name = name
         self._timestamp = timestamp
         self._regex = None
+        self._scheduler = scheduler
+        self.label = None
+        self.table = None
+        self.sampler = None
         return
 
     @abstractproperty
@@ -77,18 +83,51 @@ class BasePollster(BaseThreadClass):
             self._regex = re.compile(self.expression)
         return self._regex
 
+    @property
+    def scheduler(self):
+        """
+        :return: the SamplingScheduler that calls `tick`
+        """
+        if self._scheduler is None:
+            self._scheduler = scheduler
+        return self._scheduler
+
+    @property
+    def columns(self):
+        """
+        :return: names of the values `tick` returns (None to leave them out of the aligned table)
+        """
+        return
+
     @abstractmethod
-    def run(self):
+    def tick(self):
         """
-        The method to poll the device
+        Takes one sample
+
+        :return: list of the sampled values (or None if nothing was sampled)
         """
         return
 
     def start(self):
         """
-        :postcondition: self.thread contains the run() thread
+        :postcondition: self.sampler is `tick` scheduled every interval
+        """
+        label = self.label
+        if label is None:
+            label = self.name
+        self.sampler = self.scheduler.add(name=label, sample=self.tick,
+                                          interval=self.interval,
+                                          columns=self.columns,
+                                          table=self.table)
+        return
+
+    def stop(self):
+        """
+        :postcondition: `tick` is no longer scheduled
         """
-        self.thread = Thread(target=self.run_thread, name=self.name)
+        if self.sampler is not None:
+            self.scheduler.remove(self.sampler)
+            self.sampler = None
         return
 
     def __call__(self):
@@ -1,19 +1,19 @@
 
 # python standard library
 import re
-from time import time, sleep
-import threading
 
 # this package
 from apetools.baseclass import BaseThreadClass
 from apetools.commons.timestamp import TimestampFormat
+from samplingscheduler import scheduler
 
 
 class CommandWatcher(BaseThreadClass):
     """
     A class to call a command and save a csv using the output
     """
-    def __init__(self, output, command, expression, connection=None, interval=1):
+    def __init__(self, output, command, expression, connection=None, interval=1,
+                 scheduler=None):
         """
         :param:
 
@@ -23,6 +23,7 @@ class CommandWatcher(BaseThreadClass):
         - `connection`: the connection to the device to watch
         - `command`: string with command and arguments
         - `expression`: A regular expression with groups to match the output
+        - `scheduler`: the SamplingScheduler to use (default is the shared one)
         """
         super(CommandWatcher, self).__init__()
         self.output = output
@@ -32,8 +33,19 @@ class CommandWatcher(BaseThreadClass):
         self._timestamp = None
         self.command = command
         self.stopped = False
+        self._scheduler = scheduler
+        self.sampler = None
         return
 
+    @property
+    def scheduler(self):
+        """
+        :return: the SamplingScheduler that calls `tick`
+        """
+        if self._scheduler is None:
+            self._scheduler = scheduler
+        return self._scheduler
+
     @property
     def expression(self):
         """
@@ -64,9 +76,12 @@ class CommandWatcher(BaseThreadClass):
     
     def stop(self):
         """
-        :postcondition: `self.stopped` is True
+        :postcondition: `self.stopped` is True, `tick` is no longer scheduled
         """
         self.stopped = True
+        if self.sampler is not None:
+            self.scheduler.remove(self.sampler)
+            self.sampler = None
         return
 
 
@@ -85,29 +100,29 @@ class CommandWatcher(BaseThreadClass):
     
     def start(self):
         """
-        :postcondition: `run` method running in a thread
+        :postcondition: `tick` scheduled every interval
         """
-        t = threading.Thread(target=self.run_thread, name="commandwatcher")
-        t.daemon = True
-        t.start()
+        self.stopped = False
+        self.sampler = self.scheduler.add(name="commandwatcher", sample=self.tick,
+                                          interval=self.interval)
         return
     
-    def run(self):
-        while not self.stopped:                
-            start = time()
-            matches = []
-            output, error = self.connection.sh(self.command)
-            for line in output:
-                self.logger.debug(line)
-                match = self.expression.search(line)
-                if match:
-                    for value in match.groups():
-                        matches.append(value)
-            self.output.write("{0},{1}\n".format(self.timestamp.now, ','.join(matches)))
-            try:
-                sleep(self.interval - (time() - start))
-            except IOError:
-                self.logger.debug("cat {0} took more than one second".format(self.name))
+    def tick(self):
+        """
+        Calls the command and writes the matched values
 
-        return
+        :return: list of the matched values (or None if stopped)
+        """
+        if self.stopped:
+            return
+        matches = []
+        output, error = self.connection.sh(self.command)
+        for line in output:
+            self.logger.debug(line)
+            match = self.expression.search(line)
+            if match:
+                for value in match.groups():
+                    matches.append(value)
+        self.output.write("{0},{1}\n".format(self.timestamp.now, ','.join(matches)))
+        return matches
 # end class CommandWatcher
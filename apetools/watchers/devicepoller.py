@@ -1,9 +1,6 @@
 
-#python standard library
-from time import time as now, sleep
-
 #apetools
-from basepollster import BasePollster, CSV_JOIN, ZERO
+from basepollster import BasePollster, CSV_JOIN
 
 
 class DevicePollerEnum(object):
@@ -42,20 +39,33 @@ class DevicePoller(BasePollster):
         """
         return self._expression
 
-    def run(self):
+    @property
+    def columns(self):
+        """
+        :return: the names of the values in the aligned table
+        """
+        return ['rssi', 'noise', 'bitrate']
+
+    def start(self):
         """
-        :postcondition: the poller is sending rssi values to the output
+        :postcondition: header written and `tick` scheduled
         """
-        interval = self.interval
         #if self.use_header:
         self.output.write("timestamp,rssi,noise,bitrate\n")
-        while True:
-            if self.event is not None:
-                self.event.wait()
-            start_time = now()
-            datum = CSV_JOIN.format(self.timestamp(), self.device.poll())
-            self.output.writeline(datum)
-            self.logger.debug(datum)
-            sleep(max(interval - now() + start_time, ZERO))
+        super(DevicePoller, self).start()
         return
+
+    def tick(self):
+        """
+        Sends one line of device values to the output (unless the event isn't set)
+
+        :return: list of the polled values (or None)
+        """
+        if self.event is not None and not self.event.is_set():
+            return
+        poll = self.device.poll()
+        datum = CSV_JOIN.format(self.timestamp(), poll)
+        self.output.writeline(datum)
+        self.logger.debug(datum)
+        return str(poll).split(',')
 # end DevicePoller
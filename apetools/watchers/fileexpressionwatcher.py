@@ -1,7 +1,6 @@
 
 #python standard library
 from abc import ABCMeta, abstractproperty
-from time import time, sleep
 from collections import defaultdict
 
 #apetools
@@ -28,9 +27,13 @@ class BaseFileexpressionwatcher(BasePollster):
         - `connection`: the connection to the device to watch
         - `name`: the name of the file to watch
         - `expression`: A regular expression with groups to match the output
+        - `session`: a PollingSession to share (if None it's scheduled on its own)
+        - `scheduler`: the SamplingScheduler to use (default is the shared one)
         """
+        session = kwargs.pop('session', None)
         super(BaseFileexpressionwatcher, self).__init__(*args, **kwargs)
         self._logger = None
+        self.session = session
         self._connection = None
         self._expression_keys = None
         self._stopped = None
@@ -84,30 +87,56 @@ class BaseFileexpressionwatcher(BasePollster):
             self._connection = self.device.connection
         return self._connection
 
-    def run(self):
+    def sample(self, output):
         """
-        Repeatedly cats file self.name and saves matching output
+        Writes a csv-line of the values matched in the output
+
+        :param:
+
+         - `output`: lines of output from the file
+
+        :return: list of the values written
+        """
+        data = defaultdict(lambda:NOT_AVAILABLE)
+        for line in output:
+            match = self.regex.search(line)
+            if match:                    
+                match = match.groupdict()
+                for key, value in match.iteritems():
+                    if value is not None:
+                        data[key] = value
+        values = [data[key] for key in self.expression_keys]
+        self.output.write("{0},{1}\n".format(self.timestamp.now, ",".join(values)))
+        return values
+
+    @property
+    def columns(self):
+        """
+        :return: the expression keys
+        """
+        return list(self.expression_keys)
+
+    def tick(self):
+        """
+        Cats file self.name and saves the matching output (unscheduling itself once stopped)
+
+        :return: list of the values written (or None)
+        """
+        if self.stopped:
+            self.stop()
+            return
+        output, error = self.connection.cat(self.name)
+        return self.sample(output)
+
+    def start(self):
+        """
+        :postcondition: `tick` is scheduled or this is registered with the session
         """
-        #if self.use_header:
         self.output.writeline(self.header)
-       
-        while not self.stopped:                
-            start = time()
-            data = defaultdict(lambda:NOT_AVAILABLE)
-            output, error = self.connection.cat(self.name)
-            for line in output:
-                match = self.regex.search(line)
-                if match:                    
-                    match = match.groupdict()
-                    for key, value in match.iteritems():
-                        if value is not None:
-                            data[key] = value
-            data_out = ",".join([data[key] for key in self.expression_keys])
-            self.output.write("{0},{1}\n".format(self.timestamp.now, data_out))
-            try:
-                sleep(self.interval - (time() - start))
-            except IOError:
-                self.logger.debug("cat {0} took more than one second".format(self.name))
+        if self.session is not None:
+            self.session.register(self)
+            return
+        super(BaseFileexpressionwatcher, self).start()
         return
 # end class BaseFileexpressionWatcher
 
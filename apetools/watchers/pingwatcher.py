@@ -12,6 +12,7 @@ from apetools.commons.enumerations import OperatingSystem
 from apetools.threads import threads
 from apetools.commons.timestamp import TimestampFormat, TimestampFormatEnums
 from apetools.commands.ping import PingArguments
+from apetools.commands.pingprober import PingProber
 
 
 HEADER = 'TimeOfEvent,Event,SecondsToEvent\n'
@@ -46,7 +47,7 @@ class PingWatcher(BaseThreadClass):
     def __init__(self, target, output, connection, threshold=5,
                  event=None, interval=1,
                  timestamp_format=TimestampFormatEnums.log,
-                 *args, **kwargs):
+                 streaming=False, *args, **kwargs):
         """
         Pingwatcher constructor
         
@@ -59,6 +60,7 @@ class PingWatcher(BaseThreadClass):
          - `event`: A threading event to stop a threaded watcher
          - `connection`: A connection to the Device         
          - `timestamp_format`: One of the TimestampFormatEnums
+         - `streaming`: if True, use one PingProber instead of a ping per interval
         """
         super(PingWatcher, self).__init__(*args, **kwargs)
         self.target = target
@@ -74,6 +76,9 @@ class PingWatcher(BaseThreadClass):
         self._expression = None
         self._stop = None
         self._stopped = None
+        self.streaming = streaming
+        self.prober = None
+        self.last_event = None
         return
 
     @property
@@ -190,6 +195,26 @@ class PingWatcher(BaseThreadClass):
         if events == self.threshold:
             return event_data(timestamp=first_timestamp, elapsed=first_time-start_time)
         return
+
+    def stream_event(self, success, event_data):
+        """
+        Reads the prober's replies until `threshold` consecutive ones match `success`
+
+        :param:
+
+         - `success`: True to wait for answered pings, False for lost ones
+         - `event_data`: RecoveryData or FailureData namedtuples
+
+        :return: event_data or None if stopped first
+        """
+        first = self.prober.wait_for(success=success, threshold=self.threshold,
+                                     stopped=lambda: self.stopped)
+        if first is None:
+            return
+        elapsed = max(0, first.sent - self.last_event)
+        self.last_event = first.sent
+        return event_data(timestamp=self.timestamp.convert(first.sent),
+                          elapsed=elapsed)
     
     def run(self):
         """
@@ -199,16 +224,27 @@ class PingWatcher(BaseThreadClass):
 
         """
         self.output.write(HEADER)
-        while not self.stopped:            
-            self.logger.debug('Waiting for a Failure')
-            outcome = self.time_to_failure()
-            if outcome:
-                self.logger.info('PingWatch: Failure Detected')
-                self.output.write(ADD_NEWLINE.format(outcome))
-            outcome = self.time_to_recovery()
-            if outcome:
-                self.logger.info('PingWatch: Recovery Detected')
-                self.output.write(ADD_NEWLINE.format(outcome))
+        if self.streaming:
+            self.prober = PingProber(connection=self.connection,
+                                     target=self.target,
+                                     interval=self.interval)
+            self.prober.start()
+            self.last_event = time.time()
+        try:
+            while not self.stopped:            
+                self.logger.debug('Waiting for a Failure')
+                outcome = self.time_to_failure()
+                if outcome:
+                    self.logger.info('PingWatch: Failure Detected')
+                    self.output.write(ADD_NEWLINE.format(outcome))
+                outcome = self.time_to_recovery()
+                if outcome:
+                    self.logger.info('PingWatch: Recovery Detected')
+                    self.output.write(ADD_NEWLINE.format(outcome))
+        finally:
+            if self.prober is not None:
+                self.prober.stop()
+                self.prober = None
         return
     
     def time_to_recovery(self):
@@ -217,6 +253,8 @@ class PingWatcher(BaseThreadClass):
 
         :return: RecoveryData
         """        
+        if self.prober is not None:
+            return self.stream_event(True, RecoveryData)
         return self.time_to_event(lambda rtt: rtt is not None,
                                   RecoveryData)
 
@@ -226,6 +264,8 @@ class PingWatcher(BaseThreadClass):
 
         :return: FailureData
         """
+        if self.prober is not None:
+            return self.stream_event(False, FailureData)
         return self.time_to_event(lambda rtt: rtt is None,
                                   FailureData)
 
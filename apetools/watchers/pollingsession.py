@@ -0,0 +1,163 @@
+
+# python standard library
+from collections import OrderedDict
+import threading
+from time import time
+
+# apetools
+from apetools.baseclass import BaseThreadClass
+from apetools.commons.errors import ConnectionError, TimeoutError
+from apetools.connections.persistentshell import PersistentShell
+from samplingscheduler import scheduler
+
+
+CAT = "cat {0}"
+
+
+class PollingSession(BaseThreadClass):
+    """
+    A shared poller of files on a device
+    """
+    def __init__(self, connection, interval=1, shell=None, scheduler=None):
+        """
+        :param:
+
+         - `connection`: the connection to the device
+         - `interval`: seconds between samples
+         - `shell`: a PersistentShell (one is created if not given)
+         - `scheduler`: the SamplingScheduler to use (default is the shared one)
+        """
+        super(PollingSession, self).__init__()
+        self.connection = connection
+        self.interval = interval
+        self._shell = shell
+        self.pollsters = OrderedDict()
+        self.lock = threading.RLock()
+        self._scheduler = scheduler
+        self.sampler = None
+        self.stopped = True
+        return
+
+    @property
+    def scheduler(self):
+        """
+        :return: the SamplingScheduler that calls `tick`
+        """
+        if self._scheduler is None:
+            self._scheduler = scheduler
+        return self._scheduler
+
+    @property
+    def shell(self):
+        """
+        :return: PersistentShell on the connection
+        """
+        if self._shell is None:
+            self._shell = PersistentShell(self.connection)
+        return self._shell
+
+    def register(self, pollster):
+        """
+        Adds the pollster to the session (scheduling the session if needed)
+
+        :param:
+
+         - `pollster`: object with `name`, `stopped` and `sample(output)`
+        """
+        with self.lock:
+            self.pollsters.setdefault(pollster.name, []).append(pollster)
+            self.stopped = False
+            if self.sampler is None:
+                self.sampler = self.scheduler.add(name="PollingSession",
+                                                  sample=self.tick,
+                                                  interval=self.interval)
+        return
+
+    def unregister(self, pollster):
+        """
+        Removes the pollster from the session (stopping the session if it was the last)
+
+        :param:
+
+         - `pollster`: a registered pollster
+        """
+        with self.lock:
+            pollsters = self.pollsters.get(pollster.name, [])
+            if pollster in pollsters:
+                pollsters.remove(pollster)
+            if not pollsters:
+                self.pollsters.pop(pollster.name, None)
+            if not self.pollsters:
+                self.stopped = True
+        return
+
+    def poll(self):
+        """
+        Reads all the registered files in one batch and sends the output to the pollsters
+        """
+        with self.lock:
+            names = self.pollsters.keys()
+        outputs = self.shell.batch([CAT.format(name) for name in names])
+        for name, output in zip(names, outputs):
+            with self.lock:
+                pollsters = self.pollsters.get(name, [])[:]
+            for pollster in pollsters:
+                if pollster.stopped:
+                    self.unregister(pollster)
+                    continue
+                try:
+                    pollster.sample(output)
+                except Exception as error:
+                    self.logger.error("{0} failed: {1}".format(pollster.name, error))
+        return
+
+    def tick(self):
+        """
+        Polls the files (or, if there are no pollsters left, unschedules the session)
+
+        :postcondition: if stopped, shell is closed and self.sampler is None
+        """
+        with self.lock:
+            if self.stopped:
+                if self.sampler is not None:
+                    self.scheduler.remove(self.sampler)
+                    self.sampler = None
+                self.shell.close()
+                return
+        start = time()
+        try:
+            self.poll()
+        except (ConnectionError, TimeoutError) as error:
+            self.logger.error(error)
+        if time() - start > self.interval:
+            self.logger.debug("Polling session took {0} seconds".format(time() - start))
+        return
+
+    def stop(self):
+        """
+        :postcondition: the session will unschedule itself on the next tick
+        """
+        self.stopped = True
+        return
+# end class PollingSession
+
+
+sessions = {}
+sessions_lock = threading.Lock()
+
+
+def session_for(connection, interval=1):
+    """
+    :param:
+
+     - `connection`: the connection to the device
+     - `interval`: seconds between samples
+
+    :return: the PollingSession for the connection and interval
+    """
+    with sessions_lock:
+        key = (connection, interval)
+        if key not in sessions:
+            sessions[key] = PollingSession(connection=connection,
+                                           interval=interval)
+        return sessions[key]
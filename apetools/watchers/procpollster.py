@@ -1,7 +1,5 @@
 
 #python standard library
-from time import time, sleep
-import threading
 from abc import ABCMeta, abstractproperty
 
 # third-party module
@@ -28,13 +26,19 @@ class BaseProcPollster(BasePollster):
         - `name`: the name of the file to watch
         - `timestamp_format`: format for timestamps
         - `use_header`: If True, prepend header to output
+        - `session`: a PollingSession to share (if None it's scheduled on its own)
+        - `scheduler`: the SamplingScheduler to use (default is the shared one)
         """
+        session = kwargs.pop('session', None)
         super(BaseProcPollster, self).__init__(*args, **kwargs)
         self._logger = None
         self._header = None
         self._expression_keys = None
         self._connection = None
+        self.session = session
         self.stopped = False
+        self.start_array = None
+        self.next_array = None
         return
 
     @property
@@ -62,64 +66,85 @@ class BaseProcPollster(BasePollster):
 
     def stop(self):
         """
-        :postcondition: `self.stopped` is True
+        :postcondition: `self.stopped` is True, the pollster is unregistered or unscheduled
         """
         self.stopped = True
+        if self.session is not None:
+            self.session.unregister(self)
+        super(BaseProcPollster, self).stop()
         return
 
-    def run(self):
+    def write_header(self):
         """
-        The main loop
+        :postcondition: header written to the output if self.use_header
         """
         if self.use_header:
-            self.logger.info("self.header")
             self.output.write(self.header)
-        start = time()
+        return
+
+    def cat(self):
+        """
+        :return: lines of output from the proc-file
+        """
         output, error = self.connection.cat(self.name)
-        start_array = numpy.zeros(len(self.expression_keys), dtype=object)
-        next_array = numpy.zeros(len(self.expression_keys), dtype=object)
-        #enum = ProcnetdevWatcherEnum
+        return output
+
+    def sample(self, output):
+        """
+        Writes the change since the last sample (the first sample is only kept)
+
+        :param:
+
+         - `output`: lines of output from the proc-file
+
+        :return: list of the changes written (or None)
+        """
+        values = None
         for line in output:
             match = self.regex.search(line)
             if match:
+                tstamp = self.timestamp.now
                 self.logger.debug(line)
-                match  = match.groupdict()
-                for value_index, expression_key in enumerate(self.expression_keys):
-                    start_array[value_index] = int(match[expression_key])
-            try:
-                sleep(self.interval - (time() - start))
-            except IOError:
-                pass
-        while not self.stopped:
-            start = time()
-            output, error = self.connection.cat(self.name)
-            for line in output:
-                match = self.regex.search(line)
-                if match:
-                    tstamp = self.timestamp.now
-                    self.logger.debug(line)
-                    match = match.groupdict()
-                    for value_index, expression_key  in enumerate(self.expression_keys):
-                        next_array[value_index] = int(match[expression_key])
-
+                match = match.groupdict()
+                if self.next_array is None:
+                    self.next_array = numpy.zeros(len(self.expression_keys), dtype=object)
+                for value_index, expression_key  in enumerate(self.expression_keys):
+                    self.next_array[value_index] = int(match[expression_key])
+                if self.start_array is not None:
+                    values = [str(i) for i in (self.next_array - self.start_array)]
                     self.output.write("{0},{1}\n".format(tstamp,
-                                                         ",".join((str(i) for i in (next_array - start_array)))))
-                    start_array = numpy.copy(next_array)
-            try:
-                sleep(self.interval - (time() - start))
-            except IOError:
-                self.logger.debug("cat {0} took more than one second".format(self.name))
-        return
+                                                         ",".join(values)))
+                self.start_array = numpy.copy(self.next_array)
+        return values
+
+    @property
+    def columns(self):
+        """
+        :return: the header's names (without the timestamp)
+        """
+        return self.header.strip().split(',')[1:]
+
+    def tick(self):
+        """
+        Takes one sample of the proc-file
+
+        :return: list of the changes written (or None)
+        """
+        if self.stopped:
+            return
+        return self.sample(self.cat())
 
     def start(self):
         """
-        :postcondition: run is running in a thread (self.thread)
+        :postcondition: `tick` is scheduled or this is registered with the session
         """
         self.stopped = False
-        name = self.name.replace('/', '')
-        self.thread = threading.Thread(target=self.run_thread, name=name)
-        self.thread.daemon = True
-        self.thread.start()
+        self.start_array = None
+        self.write_header()
+        if self.session is not None:
+            self.session.register(self)
+            return
+        super(BaseProcPollster, self).start()
         return
 # end class BaseProcPollster
 
@@ -328,60 +353,50 @@ class CpuPollster(BaseProcPollster):
                                             idle])
         return self._expression
 
-    def run(self):
+    def write_header(self):
         """
-        The main loop
+        :postcondition: header written to the output
         """
         self.output.write(self.header)
-        start = time()
-        lock = self.connection.lock
+        return
 
-        with lock:
+    def cat(self):
+        """
+        :return: lines of /proc/stat (read while holding the connection's lock)
+        """
+        with self.connection.lock:
             output, error = self.connection.cat(self.name)
-        start_used = 0
-        next_used = 0
-        start_total = 0
-        next_total = 0
+        return output
 
-        # get the first sample
+    def sample(self, output):
+        """
+        Writes the percent of the cpu used since the last sample (the first is only kept)
+
+        :param:
+
+         - `output`: lines of output from /proc/stat
+
+        :return: list with the percent written (or None)
+        """
+        values = None
         for line in output:
             match = self.regex.search(line)
             if match:
+                tstamp = self.timestamp.now
                 self.logger.debug(line)
-                match  = match.groupdict()
-
-                start_total = sum([int(value) for value in match.itervalues()])
-                start_used = start_total - int(match[CpuPollsterEnum.idle])
-
-            try:
-                sleep(self.interval - (time() - start))
-            except IOError:
-                pass
-
-            # watch the file
-        while not self.stopped:
-            start = time()
-            with lock:
-                output, error = self.connection.cat(self.name)
-            for line in output:
-                match = self.regex.search(line)
-                if match:
-                    tstamp = self.timestamp.now
-                    self.logger.debug(line)
-                    match = match.groupdict()
-                    next_total = sum([int(value) for value in match.itervalues()])
-                    next_used = next_total - float(match[CpuPollsterEnum.idle])
-                    used = (next_used - start_used)/(next_total - start_total)
-                    self.output.write("{0},{1}\n".format(tstamp,
-                                                         100 * used))
-                    start_used, start_total = next_used, next_total
-                    next_used = next_total = 0
-                    break
-            try:
-                sleep(self.interval - (time() - start))
-            except IOError:
-                self.logger.debug("cat {0} took more than one second".format(self.name))
-        return
+                match = match.groupdict()
+                next_total = sum([int(value) for value in match.itervalues()])
+                next_used = next_total - float(match[CpuPollsterEnum.idle])
+                if self.start_array is not None:
+                    start_used, start_total = self.start_array
+                    if next_total > start_total:
+                        used = (next_used - start_used)/(next_total - start_total)
+                        values = [100 * used]
+                        self.output.write("{0},{1}\n".format(tstamp,
+                                                             100 * used))
+                self.start_array = (next_used, next_total)
+                break
+        return values
 # end class CpuPollster
 
 
@@ -1,10 +1,7 @@
 
-#python standard library
-from time import time as now, sleep
-
 #apetools
 from apetools.parsers import oatbran
-from basepollster import BasePollster, CSV_JOIN, ZERO
+from basepollster import BasePollster, CSV_JOIN
 
 
 class RssiPollerEnum(object):
@@ -44,20 +41,33 @@ class RssiPoller(BasePollster):
                                               e=oatbran.INTEGER))
         return self._expression
 
-    def run(self):
+    @property
+    def columns(self):
+        """
+        :return: the names of the values in the aligned table
+        """
+        return ['rssi']
+
+    def start(self):
         """
-        :postcondition: the poller is sending rssi values to the output
+        :postcondition: header written (if use_header) and `tick` scheduled
         """
-        interval = self.interval
         if self.use_header:
             self.output.write("timestamp,rssi\n")
-        while True:
-            if self.event is not None:
-                self.event.wait()
-            start_time = now()
-            datum = CSV_JOIN.format(self.timestamp(), self.device.rssi)
-            self.output.writeline(datum)
-            self.logger.debug(datum)
-            sleep(max(interval - now() + start_time, ZERO))
+        super(RssiPoller, self).start()
         return
+
+    def tick(self):
+        """
+        Sends one rssi value to the output (unless the event isn't set)
+
+        :return: list with the rssi (or None)
+        """
+        if self.event is not None and not self.event.is_set():
+            return
+        rssi = self.device.rssi
+        datum = CSV_JOIN.format(self.timestamp(), rssi)
+        self.output.writeline(datum)
+        self.logger.debug(datum)
+        return [rssi]
 # end RssiPoller
@@ -0,0 +1,334 @@
+
+# python standard library
+from collections import namedtuple
+import heapq
+import itertools
+import math
+from Queue import Queue
+import threading
+from time import time
+
+# apetools
+from apetools.baseclass import BaseClass, BaseThreadClass
+from apetools.commons.timestamp import TimestampFormat
+from apetools.threads.threads import Thread
+
+
+WORKERS = 4
+ORIGIN = 0
+NOT_AVAILABLE = 'NA'
+PRECISION = 6
+
+
+SamplerStatistics = namedtuple("SamplerStatistics", "name samples missed mean_drift max_drift")
+
+
+class ScheduledSampler(object):
+    """
+    A callable sampled every interval and its statistics
+    """
+    def __init__(self, name, sample, interval, columns=None, table=None):
+        """
+        :param:
+
+         - `name`: name for the logs and the aligned table
+         - `sample`: callable that takes a sample (returns list of values or None)
+         - `interval`: seconds between samples
+         - `columns`: names of the values `sample` returns (None to leave it out of the table)
+         - `table`: SampleTable to write the sampler's values to
+        """
+        self.name = name
+        self.sample = sample
+        self.interval = float(interval)
+        self.columns = columns
+        self.table = table
+        self.running = False
+        self.stopped = False
+        self.samples = 0
+        self.missed = 0
+        self.drift_total = 0.
+        self.drift_max = 0.
+        return
+
+    def next_deadline(self, origin, now):
+        """
+        :param:
+
+         - `origin`: the scheduler's shared clock origin
+         - `now`: time to get the next deadline after
+
+        :return: the first multiple of the interval (from the origin) after now
+        """
+        ticks = math.floor((now - origin)/self.interval) + 1
+        return origin + ticks * self.interval
+
+    @property
+    def statistics(self):
+        """
+        :return: SamplerStatistics for the sampler
+        """
+        mean = self.drift_total/self.samples if self.samples else 0
+        return SamplerStatistics(name=self.name,
+                                 samples=self.samples,
+                                 missed=self.missed,
+                                 mean_drift=mean,
+                                 max_drift=self.drift_max)
+# end class ScheduledSampler
+
+
+class SampleTable(BaseClass):
+    """
+    A writer of time-aligned csv-rows for many samplers
+    """
+    def __init__(self, output, timestamp=None):
+        """
+        :param:
+
+         - `output`: opened file to write the rows to
+         - `timestamp`: TimestampFormat to convert the deadlines
+        """
+        super(SampleTable, self).__init__()
+        self.output = output
+        self.timestamp = timestamp
+        if timestamp is None:
+            self.timestamp = TimestampFormat()
+        self.lock = threading.RLock()
+        self.samplers = []
+        self.header = None
+        self.rows = {}
+        self.pending = {}
+        return
+
+    def add(self, sampler):
+        """
+        Adds the sampler's columns (the header is re-written if rows were already written)
+
+        :param:
+
+         - `sampler`: a ScheduledSampler
+        """
+        if sampler.columns is None:
+            return
+        with self.lock:
+            if sampler not in self.samplers:
+                self.samplers.append(sampler)
+                self.header = None
+        return
+
+    def expect(self, deadline, sampler):
+        """
+        :param:
+
+         - `deadline`: the deadline the sampler was called for
+         - `sampler`: the ScheduledSampler that was called
+        """
+        key = round(deadline, PRECISION)
+        with self.lock:
+            if sampler not in self.samplers:
+                return
+            self.rows.setdefault(key, {})
+            self.pending.setdefault(key, set()).add(sampler)
+        return
+
+    def record(self, deadline, sampler, values):
+        """
+        :param:
+
+         - `deadline`: the deadline the sampler was called for
+         - `sampler`: the ScheduledSampler that was called
+         - `values`: list of the sampled values (or None)
+        """
+        key = round(deadline, PRECISION)
+        with self.lock:
+            if key not in self.rows:
+                return
+            self.rows[key][sampler] = values
+            self.pending[key].discard(sampler)
+            self.flush()
+        return
+
+    def flush(self):
+        """
+        Writes the finished rows (in order, stopping at the first unfinished one)
+        """
+        with self.lock:
+            for key in sorted(self.rows):
+                if self.pending[key]:
+                    break
+                if self.header is None:
+                    self.header = ["timestamp", "seconds"]
+                    for sampler in self.samplers:
+                        self.header += ["{0}:{1}".format(sampler.name, column) for column in sampler.columns]
+                    self.output.write(",".join(self.header) + "\n")
+                values = self.rows.pop(key)
+                del self.pending[key]
+                row = [self.timestamp.convert(key), "{0:.3f}".format(key)]
+                for sampler in self.samplers:
+                    sample = values.get(sampler)
+                    if sample is None or len(sample) != len(sampler.columns):
+                        sample = [NOT_AVAILABLE] * len(sampler.columns)
+                    row += [str(value) for value in sample]
+                self.output.write(",".join(row) + "\n")
+        return
+# end class SampleTable
+
+
+class SamplingScheduler(BaseThreadClass):
+    """
+    One clock and worker pool for all the periodic samplers
+    """
+    def __init__(self, workers=WORKERS, origin=ORIGIN, table=None):
+        """
+        :param:
+
+         - `workers`: number of threads to take the samples
+         - `origin`: time the deadlines are counted from
+         - `table`: SampleTable for the samplers that aren't given one
+        """
+        super(SamplingScheduler, self).__init__()
+        self.workers = workers
+        self.origin = origin
+        self.table = table
+        self.condition = threading.Condition(threading.RLock())
+        self.heap = []
+        self.sequence = itertools.count()
+        self.queue = Queue()
+        self.samplers = []
+        self.thread = None
+        self.threads = []
+        return
+
+    def add(self, name, sample, interval, columns=None, table=None):
+        """
+        Schedules the sample (starting the threads if needed)
+
+        :param:
+
+         - `name`: name for the logs and the aligned table
+         - `sample`: callable that takes a sample (returns list of values or None)
+         - `interval`: seconds between samples
+         - `columns`: names of the values `sample` returns
+         - `table`: SampleTable for the values (default is the scheduler's table)
+
+        :return: the ScheduledSampler (to pass to `remove`)
+        """
+        if table is None:
+            table = self.table
+        sampler = ScheduledSampler(name=name, sample=sample,
+                                   interval=interval, columns=columns,
+                                   table=table)
+        if table is not None:
+            table.add(sampler)
+        with self.condition:
+            self.samplers.append(sampler)
+            self.push(sampler, time(), aligned=False)
+            while len(self.threads) < self.workers:
+                name = "SamplingWorker {0}".format(len(self.threads))
+                self.threads.append(Thread(target=self.work, name=name))
+            if self.thread is None:
+                self.thread = Thread(target=self.run_thread, name="SamplingScheduler")
+            self.condition.notify_all()
+        return sampler
+
+    def push(self, sampler, deadline, aligned=True):
+        """
+        :param:
+
+         - `sampler`: ScheduledSampler to schedule
+         - `deadline`: time the sampler is due
+         - `aligned`: True if the deadline is on the sampler's grid (goes in the table)
+        """
+        heapq.heappush(self.heap, (deadline, next(self.sequence), sampler, aligned))
+        return
+
+    def remove(self, sampler):
+        """
+        Stops calling the sampler (a sample that's running is allowed to finish)
+
+        :param:
+
+         - `sampler`: a ScheduledSampler returned by `add`
+        """
+        with self.condition:
+            sampler.stopped = True
+            if sampler in self.samplers:
+                self.samplers.remove(sampler)
+                statistics = sampler.statistics
+                self.logger.debug(("{0}: {1} samples, {2} missed, drift mean {3:.4f} "
+                                   "max {4:.4f} seconds").format(*statistics))
+            self.condition.notify_all()
+        return
+
+    @property
+    def statistics(self):
+        """
+        :return: list of SamplerStatistics for the scheduled samplers
+        """
+        with self.condition:
+            return [sampler.statistics for sampler in self.samplers]
+
+    def run(self):
+        """
+        Dispatches the samplers as they come due until there are none left
+
+        :postcondition: self.thread is None
+        """
+        with self.condition:
+            try:
+                while True:
+                    while self.heap and self.heap[0][2].stopped:
+                        heapq.heappop(self.heap)
+                    if not self.heap:
+                        return
+                    deadline, sequence, sampler, aligned = self.heap[0]
+                    now = time()
+                    if deadline > now:
+                        self.condition.wait(deadline - now)
+                        continue
+                    heapq.heappop(self.heap)
+                    if sampler.running:
+                        sampler.missed += 1
+                        self.logger.debug("{0} is still running, skipping a sample".format(sampler.name))
+                    else:
+                        sampler.running = True
+                        if aligned and sampler.table is not None:
+                            sampler.table.expect(deadline, sampler)
+                        self.queue.put((sampler, deadline, aligned))
+                    if aligned:
+                        next_deadline = sampler.next_deadline(self.origin, now)
+                        overslept = int(round((next_deadline - deadline)/sampler.interval)) - 1
+                        sampler.missed += max(0, overslept)
+                    else:
+                        next_deadline = sampler.next_deadline(self.origin,
+                                                              now + sampler.interval/2.)
+                    self.push(sampler, next_deadline)
+            finally:
+                # an unexpected error mustn't leave a dead scheduler registered (add starts a new one)
+                if self.thread is threading.current_thread():
+                    self.thread = None
+        return
+
+    def work(self):
+        """
+        Takes samples from the queue for the life of the process
+        """
+        while True:
+            sampler, deadline, aligned = self.queue.get()
+            started = time()
+            values = None
+            try:
+                values = sampler.sample()
+            except Exception as error:
+                self.logger.error("{0} failed: {1}".format(sampler.name, error))
+            with self.condition:
+                sampler.running = False
+                sampler.samples += 1
+                drift = started - deadline
+                sampler.drift_total += drift
+                sampler.drift_max = max(sampler.drift_max, drift)
+                if aligned and sampler.table is not None:
+                    sampler.table.record(deadline, sampler, values)
+        return
+# end class SamplingScheduler
+
+scheduler = SamplingScheduler()
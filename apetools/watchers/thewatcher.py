@@ -14,16 +14,18 @@ class TheWatcher(BaseClass):
     """
     The Watcher is a class to hold other watchers so you don't have to call start on all of them
     """
-    def __init__(self, watchers, event=None, *args, **kwargs):
+    def __init__(self, watchers, event=None, table=None, *args, **kwargs):
         """
         :param:
 
          - `watchers`: A collection of watchers.
          - `event`: An event shared by the threads.
+         - `table`: A SampleTable for the aligned rows.
         """
         super(TheWatcher, self).__init__(*args, **kwargs)
         self.watchers = watchers
         self.event = None
+        self.table = table
         self.threads = None
         return
         
@@ -31,11 +33,13 @@ class TheWatcher(BaseClass):
         """
         Starts all the watchers.
 
-        :postcondition: self.threads is a list of started threads
+        :postcondition: self.threads is a list of started threads, the watchers with columns have the table
         """
         self.threads = []
         try:
             for watcher in self.watchers:
+                if self.table is not None and getattr(watcher, 'columns', None):
+                    watcher.table = self.table
                 try:
                     watcher.start()
                 except Exception as error:
@@ -0,0 +1,120 @@
+#python
+from unittest import TestCase
+import socket
+
+from apetools.affectors.elexol.elexol import elexol24
+from apetools.affectors.elexol.networkedpowersupply import NetworkedPowerSupply
+from apetools.affectors.elexol.errors import FaucetteError
+
+
+class FakeBoard(object):
+    """
+    A stand-in for the elexol's UDP socket
+    """
+    def __init__(self):
+        self.ports = {'A': 0, 'B': 0, 'C': 0}
+        self.replies = []
+        self.writes = 0
+        self.queries = 0
+        self.stuck = set()
+        self.mute = set()
+        self.timeout = None
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def sendto(self, message, address):
+        if message[0].islower():
+            self.queries += 1
+            port = message[0].upper()
+            if port not in self.mute:
+                self.replies.append(port + chr(self.ports[port]))
+        elif message[0] != '!':
+            self.writes += 1
+            if message[0] not in self.stuck:
+                self.ports[message[0]] = ord(message[1])
+
+    def recv(self, size):
+        if not self.replies:
+            if self.timeout == 0:
+                raise socket.error("would block")
+            raise socket.timeout("timed out")
+        return self.replies.pop(0)
+
+    def close(self):
+        pass
+# end class FakeBoard
+
+
+class TestElexol(TestCase):
+    def setUp(self):
+        self.board = FakeBoard()
+        self.elexol = elexol24("192.168.20.68", clear=False, retry=3)
+        self.elexol._socket = self.board
+        return
+
+    def test_set_outlets(self):
+        self.assertEqual(0x010203, self.elexol.set_outlets(0x010203))
+        self.assertEqual({'A': 3, 'B': 2, 'C': 1}, self.board.ports)
+        # one write per port and one read of each port to verify
+        self.assertEqual((3, 3), (self.board.writes, self.board.queries))
+
+        # only the port that changes is written
+        self.elexol.set_outlets(0x010201)
+        self.assertEqual((4, 6), (self.board.writes, self.board.queries))
+        self.assertEqual(0x010201, self.elexol.outlets())
+        return
+
+    def test_shadow(self):
+        self.elexol.setpin24(9)
+        self.elexol.setpin24(10)
+        self.elexol.clearpin24(9)
+        # the port is read once, after that the shadow is used
+        self.assertEqual(1, self.board.queries)
+        self.assertEqual(4, self.board.ports['B'])
+        self.elexol.setxpin24(0)
+        self.assertEqual({'A': 1, 'B': 0, 'C': 0}, self.board.ports)
+        return
+
+    def test_stale_reply(self):
+        # a reply to an earlier query that timed out is thrown away
+        self.board.replies.append('A' + chr(255))
+        self.assertEqual(0, self.elexol.getport('a'))
+        return
+
+    def test_retry(self):
+        self.board.stuck.add('C')
+        self.assertEqual(0x000003, self.elexol.set_outlets(0x070003))
+        # three attempts and a read of the ports that didn't match
+        self.assertEqual(4, self.board.queries / 3)
+        return
+
+    def test_no_reply(self):
+        # a port that never answers isn't reported with the value written to it
+        self.board.mute.add('B')
+        self.assertRaises(socket.timeout, self.elexol.set_outlets, 0x000300)
+        self.assertIsNone(self.elexol.shadow['B'])
+
+        supply = NetworkedPowerSupply("192.168.20.68", clear=False, retry=3)
+        supply._elexol = self.elexol
+        self.board.mute.clear()
+        self.elexol.outlets()
+        self.board.mute.add('B')
+        self.assertRaises(FaucetteError, supply.set_switches, 0x000500)
+        return
+
+    def test_power_supply(self):
+        supply = NetworkedPowerSupply("192.168.20.68", clear=False, retry=3)
+        supply._elexol = self.elexol
+        supply.turn_on_switches([0, 17], turn_others_off=True)
+        self.assertEqual({'A': 1, 'B': 0, 'C': 2}, self.board.ports)
+        self.assertTrue(supply.switch_is_on(17))
+        self.assertEqual(2, supply.switches_on())
+        supply.turn_off(0)
+        self.assertEqual(0, self.board.ports['A'])
+        self.assertRaises(FaucetteError, supply.turn_on_switches, range(7))
+        self.assertRaises(FaucetteError, supply.turn_on, 24)
+        self.board.stuck.add('A')
+        self.assertRaises(FaucetteError, supply.turn_on, 3)
+        return
+# end class TestElexol
@@ -2,15 +2,19 @@ from unittest import TestCase
 from string import letters
 from random import randint, choice
 from collections import namedtuple
+import threading
+from time import sleep, time
 
 from mock import MagicMock
 
 from apetools.affectors import ners
+from apetools.commons.errors import AffectorError
 
 EMPTY_STRING = ""
 
 Parameters = namedtuple("Parameters", 'name parameters'.split())
 Parameter = namedtuple("Parameter", "ners")
+NodesParameter = namedtuple("NodesParameter", "nodes")
 
 
 def get_nodes():
@@ -36,4 +40,92 @@ class TestNers(TestCase):
     #    for address in set(self.nodes.keys()).difference(set(addresses.ners.parameters)):
     #        self.nodes[address].disable_wifi.assert_called_with()
     #    return
-# end class TestNers
+
+class SlowNode(object):
+    """
+    A node whose radio takes a while to switch
+    """
+    def __init__(self, name, events, delay=0.1):
+        self.name = name
+        self.events = events
+        self.delay = delay
+
+    def switch(self, action):
+        self.events.append(("start", action, self.name))
+        sleep(self.delay)
+        self.events.append(("end", action, self.name))
+
+    def enable_wifi(self):
+        self.switch("enable")
+
+    def disable_wifi(self):
+        self.switch("disable")
+# end class SlowNode
+
+
+class TestRadioSwitcher(TestCase):
+    def setUp(self):
+        self.events = []
+        self.nodes = dict((name, SlowNode(name, self.events))
+                          for name in "igor inga frau eyegore".split())
+        return
+
+    def test_barrier(self):
+        switch = ners.NeRS(self.nodes, workers=4)
+        start = time()
+        switch(NodesParameter(Parameters("nodes", ["igor", "inga"])))
+        # four 0.1 second switches in two steps rather than one after the other
+        self.assertLess(time() - start, 0.35)
+        ends = [index for index, event in enumerate(self.events)
+                if event[:2] == ("end", "disable")]
+        starts = [index for index, event in enumerate(self.events)
+                  if event[:2] == ("start", "enable")]
+        self.assertLess(max(ends), min(starts))
+        self.assertEqual(["eyegore", "frau", "igor", "inga"],
+                         [result.address for result in switch.results])
+        for result in switch.results:
+            self.assertIsNone(result.error)
+            self.assertGreater(result.elapsed, 0.05)
+        return
+
+    def test_workers(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def disable():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            sleep(0.05)
+            with lock:
+                active.pop()
+
+        nodes = dict((name, MagicMock()) for name in range(10))
+        for node in nodes.itervalues():
+            node.disable_wifi.side_effect = disable
+        results = ners.RadioSwitcher(nodes, workers=3).run(ners.DISABLE, nodes.keys())
+        self.assertEqual(10, len(results))
+        self.assertEqual(3, max(peak))
+        return
+
+    def test_timeout(self):
+        self.nodes["igor"].delay = 1
+        switch = ners.NeRS(self.nodes, workers=2, timeout=0.3)
+        start = time()
+        self.assertRaises(AffectorError, switch)
+        self.assertLess(time() - start, 0.8)
+        failed = [result for result in switch.results if result.error is not None]
+        self.assertEqual(["igor"], [result.address for result in failed])
+        # the other nodes still got switched
+        self.assertEqual(4, len(switch.results))
+        return
+
+    def test_failed_disable(self):
+        self.nodes["igor"].disable_wifi = MagicMock(side_effect=RuntimeError("no adb"))
+        switch = ners.NeRS(self.nodes)
+        self.assertRaises(AffectorError, switch,
+                          NodesParameter(Parameters("nodes", ["inga"])))
+        self.assertNotIn(("start", "enable", "inga"), self.events)
+        return
+# end class TestRadioSwitcher
@@ -0,0 +1,111 @@
+from unittest import TestCase
+from collections import namedtuple
+from time import sleep, time
+
+from mock import MagicMock
+
+from apetools.builders.subbuilders.nodebringup import NodeBringUp
+from apetools.commons.errors import ConnectionError
+
+
+Parameters = namedtuple("Parameters", "hostname delay")
+
+
+def build(parameters):
+    """
+    Builds a MagicMock node after the parameter's delay
+    """
+    sleep(parameters.delay)
+    if parameters.hostname == "broken":
+        raise ConnectionError("no route to host")
+    node = MagicMock()
+    node.address = parameters.hostname
+    return node
+
+
+class FakeRegistry(object):
+    """
+    Builds a node for each acquire
+    """
+    def __init__(self):
+        self.released = []
+        self.healthy = True
+        return
+
+    def acquire(self, parameters, build, purpose=None):
+        return build()
+
+    def is_healthy(self, node):
+        return self.healthy
+
+    def release(self, node):
+        self.released.append(node)
+        return
+# end class FakeRegistry
+
+
+class TestNodeBringUp(TestCase):
+    def setUp(self):
+        self.registry = FakeRegistry()
+        self.bring_up = NodeBringUp(build=build, registry=self.registry, workers=4,
+                                    timeout=5)
+        return
+
+    def test_parallel(self):
+        node_tuples = dict(("node{0}".format(index), Parameters("node{0}".format(index), 0.2))
+                           for index in range(8))
+        start = time()
+        self.bring_up.start(node_tuples)
+        nodes = self.bring_up.wait()
+        elapsed = time() - start
+        self.assertEqual(sorted(node_tuples), sorted(nodes))
+        # two rounds of four workers rather than eight in a row
+        self.assertLess(elapsed, 1.2)
+        self.assertEqual(4, len(self.bring_up.threads))
+        timings = self.bring_up.timings
+        self.assertTrue(all(timing.error is None for timing in timings.itervalues()))
+        self.assertTrue(all(timing.build >= 0.2 for timing in timings.itervalues()))
+        self.assertTrue(any(timing.wait >= 0.2 for timing in timings.itervalues()))
+        return
+
+    def test_failures(self):
+        node_tuples = {"igor": Parameters("igor", 0),
+                       "eyegore": Parameters("broken", 0),
+                       "frankenstein": Parameters("broken", 0)}
+        self.bring_up.start(node_tuples)
+        with self.assertRaises(ConnectionError) as context:
+            self.bring_up.wait()
+        message = str(context.exception)
+        self.assertIn("eyegore (ConnectionError: no route to host)", message)
+        self.assertIn("frankenstein", message)
+        self.assertNotIn("igor", message)
+        # the node that came up goes back to the registry
+        self.assertEqual([self.bring_up.nodes["igor"]], self.registry.released)
+        return
+
+    def test_timeout(self):
+        self.bring_up = NodeBringUp(build=build, registry=self.registry, workers=1,
+                                    timeout=0.2)
+        node_tuples = {"eyegore": Parameters("eyegore", 0.6),
+                       "igor": Parameters("igor", 0)}
+        self.bring_up.start(node_tuples)
+        with self.assertRaises(ConnectionError) as context:
+            self.bring_up.wait()
+        self.assertIn("eyegore (timed out after 0.2 seconds)", str(context.exception))
+        # a replacement worker brought up the node queued behind the slow one
+        self.assertIn("igor", self.bring_up.nodes)
+        self.assertEqual(2, len(self.bring_up.threads))
+        sleep(0.6)
+        self.assertNotIn("eyegore", self.bring_up.nodes)
+        self.assertEqual(2, len(self.registry.released))
+        return
+
+    def test_warm_warning(self):
+        self.registry.healthy = False
+        self.bring_up.start({"igor": Parameters("igor", 0)})
+        nodes = self.bring_up.wait()
+        self.assertIn("igor", nodes)
+        self.assertEqual("the connection didn't respond",
+                         self.bring_up.timings["igor"].error)
+        return
+# end class TestNodeBringUp
@@ -0,0 +1,103 @@
+from unittest import TestCase
+from collections import namedtuple
+from StringIO import StringIO
+import threading
+from time import sleep
+
+from mock import MagicMock
+
+from apetools.builders.subbuilders.noderegistry import NodeRegistry, THREAD
+from apetools.commons.errors import ConnectionError
+
+
+Parameters = namedtuple("igor", "connection hostname operating_system")
+Renamed = namedtuple("eyegore", "hostname operating_system connection")
+
+
+class TestNodeRegistry(TestCase):
+    def setUp(self):
+        self.registry = NodeRegistry(idle_timeout=60, check_after=0)
+        self.parameters = Parameters("adbshell", "igor", "android")
+        self.build = MagicMock(side_effect=lambda: MagicMock())
+        return
+
+    def healthy(self, node):
+        node.connection.echo.side_effect = lambda token: (StringIO(token + "\n"), StringIO(""))
+        return node
+
+    def test_reuse(self):
+        node = self.healthy(self.registry.acquire(self.parameters, self.build))
+        self.registry.release(node)
+        # same fields in a different order and under a different name
+        renamed = Renamed(hostname="igor", operating_system="android", connection="adbshell")
+        self.assertIs(node, self.registry.acquire(renamed, self.build))
+        self.assertEqual(1, self.build.call_count)
+
+        # the thread-nodes are a separate set
+        thread_node = self.registry.acquire(self.parameters, self.build, purpose=THREAD)
+        self.assertIsNot(node, thread_node)
+        return
+
+    def test_unhealthy(self):
+        node = self.registry.acquire(self.parameters, self.build)
+        node.connection.echo.side_effect = ConnectionError("gone")
+        self.registry.release(node)
+        self.assertIsNot(node, self.registry.acquire(self.parameters, self.build))
+        self.assertEqual(2, self.build.call_count)
+        return
+
+    def test_evict(self):
+        node = self.registry.acquire(self.parameters, self.build)
+        self.registry.idle_timeout = 0
+        self.registry.evict()
+        # still in use
+        self.assertEqual(1, len(self.registry.entries))
+        self.registry.release(node)
+        self.registry.evict()
+        self.assertEqual(0, len(self.registry.entries))
+        return
+
+    def concurrent(self, healthy):
+        node = self.registry.acquire(self.parameters, self.build)
+        self.registry.release(node)
+        started, finish = threading.Event(), threading.Event()
+
+        def echo(token):
+            started.set()
+            finish.wait(5)
+            if not healthy:
+                raise ConnectionError("gone")
+            return StringIO(token + "\n"), StringIO("")
+        node.connection.echo.side_effect = echo
+        nodes = []
+        acquire = lambda: nodes.append(self.registry.acquire(self.parameters, self.build))
+        checker = threading.Thread(target=acquire)
+        checker.start()
+        started.wait(5)
+        waiter = threading.Thread(target=acquire)
+        waiter.start()
+        sleep(0.1)
+        # the second caller waits for the check instead of taking the node
+        self.assertEqual([], nodes)
+        finish.set()
+        checker.join(5)
+        waiter.join(5)
+        self.assertEqual(2, len(nodes))
+        self.assertIs(nodes[0], nodes[1])
+        self.assertEqual(1, node.connection.echo.call_count)
+        return node, nodes[0]
+
+    def test_concurrent_healthy(self):
+        node, acquired = self.concurrent(healthy=True)
+        self.assertIs(node, acquired)
+        self.assertEqual(1, self.build.call_count)
+        return
+
+    def test_concurrent_unhealthy(self):
+        node, acquired = self.concurrent(healthy=False)
+        self.assertIsNot(node, acquired)
+        entry = self.registry.entries.values()[0]
+        self.assertIs(acquired, entry.node)
+        self.assertEqual(2, entry.references)
+        return
+# end class TestNodeRegistry
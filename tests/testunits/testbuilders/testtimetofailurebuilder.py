@@ -0,0 +1,72 @@
+from unittest import TestCase
+from collections import namedtuple
+
+from mock import MagicMock, patch
+
+from apetools.builders.subbuilders.timetofailurebuilder import TimeToFailureBuilder
+from apetools.builders.subbuilders.timetorecoverybuilder import TimeToRecoveryBuilder
+from apetools.builders.subbuilders.toolbuilder import ToolBuilder
+from apetools.commons.errors import CommandError
+from apetools.lexicographers.config_options import ConfigOptions
+
+
+class TestTimeToFailureBuilder(TestCase):
+    def setUp(self):
+        self.master = MagicMock()
+        self.master.nodes = {'node0': MagicMock(), 'node1': MagicMock()}
+        self.master.tpc_device.address = '192.168.10.1'
+        self.config_map = MagicMock()
+        self.config_map.get_boolean.return_value = False
+        self.config_map.get_int.side_effect = lambda section, option, **kwargs: {ConfigOptions.timeout_option: 30,
+                                                                                 ConfigOptions.threshold_option: 3}[option]
+        self.config_map.get_float.return_value = 0.2
+        self.builder = TimeToFailureBuilder(self.master, self.config_map, [])
+        return
+
+    def test_tool_builder(self):
+        self.assertIs(TimeToFailureBuilder, ToolBuilder().timetofailure)
+        return
+
+    def test_product(self):
+        ttf = self.builder.product
+        self.assertEqual(('192.168.10.1', 30, 3, 0.2, False),
+                         (ttf.target, ttf.timeout, ttf.threshold, ttf.interval, ttf.fan_out))
+        self.assertIs(self.master.nodes, ttf.nodes)
+        self.assertEqual(ConfigOptions.time_to_failure_section,
+                         self.config_map.get_float.call_args[0][0])
+        self.assertEqual([('nodes', self.master.nodes.keys())],
+                         [tuple(p) for p in self.builder.parameters])
+        return
+
+    def test_call(self):
+        ttf = self.builder.product
+        # the time to recovery's timeout and threshold don't change the ttf's
+        ttr_map = MagicMock()
+        ttr_map.get_boolean.return_value = False
+        ttr_map.get_int.return_value = 100
+        ttr = TimeToRecoveryBuilder(self.master, ttr_map, self.builder.parameters)
+        names = [p.name for p in ttr.parameters]
+        Values = namedtuple('Values', names)
+        Value = namedtuple('Value', 'name parameters')
+        parameters = Values(*[Value(p.name, p.parameters[0]) for p in ttr.parameters])
+        with patch('apetools.tools.timetofailure.PingProber') as prober:
+            prober.return_value.wait_for.return_value = None
+            self.assertRaises(CommandError, ttf, parameters)
+            prober.assert_called_with(connection=self.master.nodes[parameters.nodes.parameters].connection,
+                                      target='192.168.10.1', interval=0.2)
+            self.assertEqual(3, prober.return_value.wait_for.call_args[1]['threshold'])
+            self.assertTrue(prober.return_value.stop.called)
+        return
+
+    def test_fan_out(self):
+        self.config_map.get_boolean.return_value = True
+        ttf = self.builder.product
+        self.assertEqual([], self.builder.parameters)
+        self.assertTrue(ttf.fan_out)
+        self.assertEqual(2, self.master.storage.open.call_count)
+        ttf.run = MagicMock(return_value=1.5)
+        with patch('apetools.tools.fanout.FanOut.save'):
+            ttf(None)
+        self.assertEqual(2, ttf.run.call_count)
+        return
+# end class TestTimeToFailureBuilder
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from mock import MagicMock
+
+from apetools.builders.subbuilders.timetorecoverybuilder import TimeToRecoveryBuilder
+from apetools.builders.subbuilders.iperfsessionbuilder import IperfSessionBuilder
+
+
+class TestTimeToRecoveryBuilder(TestCase):
+    def setUp(self):
+        self.master = MagicMock()
+        self.master.nodes = {'node0': MagicMock(), 'node1': MagicMock()}
+        self.config_map = MagicMock()
+        self.config_map.get_boolean.return_value = True
+        self.config_map.get_int.return_value = 5
+        self.config_map.get_float.return_value = None
+        return
+
+    def builders(self):
+        parameters = []
+        ttr = TimeToRecoveryBuilder(self.master, self.config_map, parameters)
+        iperf = IperfSessionBuilder(self.master, self.config_map, parameters)
+        iperf._directions = ['to_node']
+        return ttr, iperf
+
+    def nodes(self, parameters):
+        return [p.parameters for p in parameters if p.name == 'nodes']
+
+    def test_fan_out_first(self):
+        ttr, iperf = self.builders()
+        ttr.parameters
+        parameters = iperf.parameters
+        self.assertEqual([self.master.nodes.keys()], self.nodes(parameters))
+        return
+
+    def test_fan_out_last(self):
+        ttr, iperf = self.builders()
+        iperf.parameters
+        parameters = ttr.parameters
+        self.assertEqual([self.master.nodes.keys()], self.nodes(parameters))
+        self.assertTrue(ttr.product.fan_out)
+        return
+
+    def test_no_fan_out(self):
+        self.config_map.get_boolean.return_value = False
+        ttr, iperf = self.builders()
+        parameters = ttr.parameters
+        self.assertEqual([self.master.nodes.keys()], self.nodes(parameters))
+        self.assertFalse(ttr.product.fan_out)
+        return
+# end class TestTimeToRecoveryBuilder
@@ -14,3 +14,5 @@ bss info missing!
 '''
 
 rssi = "-45 dBm"
+
+not_connected = "Not connected.\n"
@@ -34,6 +34,33 @@ class IwCommandTest(TestCase):
         self.connection.iw.assert_called_with("dev {iface} link".format(iface=iw_dev.interface))
         return
 
+    def test_snapshot(self):
+        self.command._interface = iw_dev.interface
+        self.command.ttl = 60
+        self.connection.iw.return_value = StringIO(iw_link.output), StringIO('')
+        snapshot = self.command.snapshot
+        self.assertEqual(iw_link.rssi, self.command.rssi)
+        self.assertEqual("AU Test Network", self.command.ssid)
+        self.assertEqual("14:d6:4d:ec:1e:88", self.command.bssid)
+        self.assertEqual("2437", self.command.channel)
+        self.assertEqual("65.0", self.command.bitrate)
+        self.assertEqual("NA", self.command.noise)
+        # everything came from one `iw link` and is re-used until the ttl expires
+        self.assertEqual(1, self.connection.iw.call_count)
+        self.assertIs(snapshot, self.command.snapshot)
+        self.command.expire()
+        self.connection.iw.return_value = StringIO(iw_link.output), StringIO('')
+        self.assertIsNot(snapshot, self.command.snapshot)
+        return
+
+    def test_station_dump(self):
+        self.command._interface = iw_dev.interface
+        self.connection.iw.side_effect = [(StringIO(iw_link.not_connected), StringIO('')),
+                                          (StringIO(''), StringIO(''))]
+        self.assertEqual("NA", self.command.rssi)
+        self.connection.iw.assert_called_with("dev {0} station dump".format(iw_dev.interface))
+        return
+
     @raises(CommandError)
     def test_error(self):
         output = StringIO('')
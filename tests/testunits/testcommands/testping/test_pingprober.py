@@ -0,0 +1,170 @@
+from unittest import TestCase
+from StringIO import StringIO
+from collections import namedtuple
+from time import time
+
+from mock import MagicMock, patch
+
+from apetools.commands.pingprober import PingProber, StreamEvent, StreamEventEnum
+from apetools.commons.enumerations import OperatingSystem
+from apetools.commons.errors import ConfigurationError
+from apetools.tools.timetorecovery import TimeToRecovery
+
+
+# icmp_seq 1 and 2 were lost (linux doesn't say so)
+LINUX_RECOVERY = """PING 192.168.20.1 (192.168.20.1) 56(84) bytes of data.
+64 bytes from 192.168.20.1: icmp_seq=3 ttl=64 time=2.01 ms
+64 bytes from 192.168.20.1: icmp_seq=4 ttl=64 time=1.98 ms
+64 bytes from 192.168.20.1: icmp_seq=5 ttl=64 time=2.11 ms
+64 bytes from 192.168.20.1: icmp_seq=6 ttl=64 time=2.05 ms
+""".splitlines(True)
+
+LINUX_FAILURE = """PING 192.168.20.1 (192.168.20.1) 56(84) bytes of data.
+64 bytes from 192.168.20.1: icmp_seq=1 ttl=64 time=2.01 ms
+From 192.168.20.99 icmp_seq=2 Destination Host Unreachable
+64 bytes from 192.168.20.1: icmp_seq=3 ttl=64 time=2.05 ms
+From 192.168.20.99 icmp_seq=4 Destination Host Unreachable
+From 192.168.20.99 icmp_seq=5 Destination Host Unreachable
+From 192.168.20.99 icmp_seq=6 Destination Host Unreachable
+""".splitlines(True)
+
+MAC_RECOVERY = """PING 192.168.20.1 (192.168.20.1): 56 data bytes
+Request timeout for icmp_seq 0
+64 bytes from 192.168.20.1: icmp_seq=1 ttl=64 time=3.412 ms
+64 bytes from 192.168.20.1: icmp_seq=2 ttl=64 time=3.118 ms
+""".splitlines(True)
+
+WINDOWS_RECOVERY = """
+Pinging 192.168.10.1 with 32 bytes of data:
+Request timed out.
+Reply from 192.168.10.1: bytes=32 time=1ms TTL=255
+Reply from 192.168.10.1: bytes=32 time<1ms TTL=255
+
+Ping statistics for 192.168.10.1:
+    Packets: Sent = 3, Received = 2, Lost = 1 (33% loss),
+""".splitlines(True)
+
+Parameters = namedtuple("Parameters", "nodes target interval")
+Parameter = namedtuple("Parameter", "parameters")
+
+
+class TestPingProber(TestCase):
+    def setUp(self):
+        self.connection = MagicMock()
+        self.connection.operating_system = OperatingSystem.linux
+        self.prober = PingProber(connection=self.connection, target="192.168.20.1")
+        self.probers = [self.prober]
+        return
+
+    def tearDown(self):
+        # a prober's thread left running dies noisily when the interpreter exits
+        for prober in self.probers:
+            prober.stop()
+            if prober.thread is not None:
+                prober.thread.join(5)
+                self.assertFalse(prober.thread.is_alive())
+        return
+
+    def make_prober(self, *args, **kwargs):
+        """
+        Builds a PingProber that tearDown will stop
+        """
+        prober = PingProber(*args, **kwargs)
+        self.probers.append(prober)
+        return prober
+
+    def stream(self, lines, count=10):
+        """
+        Reads the lines as one ping process (without the prober's thread)
+        """
+        self.connection.ping.return_value = lines, StringIO("")
+        self.prober.probe(base=0, count=count)
+        self.prober.queue.put(StreamEvent(StreamEventEnum.end, count, time(), None))
+        return
+
+    def test_arguments(self):
+        self.assertEqual(" -i 0.2 -W 1 -c 10 192.168.20.1", self.prober.arguments(10))
+        self.connection.operating_system = OperatingSystem.windows
+        prober = self.make_prober(connection=self.connection, target="igor", interval=0.2)
+        self.assertEqual(1, prober.interval)
+        self.assertEqual("-n 5 -w 1000 igor", prober.arguments(5))
+        return
+
+    def test_recovery(self):
+        self.stream(LINUX_RECOVERY)
+        first = self.prober.wait_for(success=True, threshold=3)
+        self.assertEqual(2, first.sequence)
+        self.assertEqual("2.01", first.rtt)
+        self.connection.ping.assert_called_with(" -i 0.2 -W 1 -c 10 192.168.20.1",
+                                                timeout=1)
+        return
+
+    def test_gaps(self):
+        self.stream(LINUX_RECOVERY)
+        replies = list(self.prober.replies())
+        self.assertEqual(range(6), [reply.sequence for reply in replies])
+        self.assertEqual([False, False, True, True, True, True],
+                         [reply.success for reply in replies])
+        # the lost pings' send-times come from the interval
+        self.assertAlmostEqual(replies[2].sent - 0.4, replies[0].sent, places=2)
+        return
+
+    def test_failure(self):
+        self.stream(LINUX_FAILURE)
+        first = self.prober.wait_for(success=False, threshold=3)
+        self.assertEqual(3, first.sequence)
+        return
+
+    def test_mac(self):
+        self.connection.operating_system = OperatingSystem.mac
+        self.prober = self.make_prober(connection=self.connection, target="192.168.20.1")
+        self.stream(MAC_RECOVERY)
+        first = self.prober.wait_for(success=True, threshold=2)
+        self.assertEqual(1, first.sequence)
+        return
+
+    def test_windows(self):
+        self.connection.operating_system = OperatingSystem.windows
+        self.prober = self.make_prober(connection=self.connection, target="192.168.10.1")
+        self.stream(WINDOWS_RECOVERY)
+        replies = list(self.prober.replies())
+        self.assertEqual([(0, None), (1, '1'), (2, '1')],
+                         [(reply.sequence, reply.rtt) for reply in replies])
+        return
+
+    def test_wait(self):
+        # nothing comes back so the pings are declared lost after the wait
+        self.prober.queue.put(StreamEvent(StreamEventEnum.start, 0, time() - 2, None))
+        first = self.prober.wait_for(success=False, threshold=3, deadline=time() + 0.5)
+        self.assertEqual(0, first.sequence)
+        return
+
+    def test_unknown_host(self):
+        self.stream(["ping: unknown host igor\n"])
+        with self.assertRaises(ConfigurationError):
+            list(self.prober.replies())
+        return
+
+    def test_stop(self):
+        output = MagicMock()
+        self.prober.output = output
+        self.prober.stop()
+        self.assertTrue(self.prober.stopped)
+        output.lines.channel.close.assert_called_with()
+        return
+
+    def test_time_to_recovery(self):
+        self.connection.ping.side_effect = lambda *args, **kwargs: (iter(LINUX_RECOVERY),
+                                                                    StringIO(""))
+        device = MagicMock()
+        device.connection = self.connection
+        tool = TimeToRecovery(nodes={"igor": device}, timeout=5, threshold=3)
+        parameters = Parameters(Parameter("igor"), Parameter("192.168.20.1"),
+                                Parameter(0.2))
+        with patch('apetools.tools.timetorecovery.PingProber', side_effect=self.make_prober):
+            ttr = tool.run(parameters, self.connection)
+        self.assertEqual(2, len(self.probers))
+        self.assertEqual("2.01", ttr.rtt)
+        self.assertLess(ttr.ttr, 1)
+        return
+# end class TestPingProber
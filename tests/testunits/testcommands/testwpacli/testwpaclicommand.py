@@ -9,7 +9,7 @@ from apetools.commons import errors
 
 CommandError = errors.CommandError
 
-import wpa_cli_error, wpa_cli_interface_list, wpa_cli_status
+import wpa_cli_error, wpa_cli_interface_list, wpa_cli_status, wpa_cli_signal_poll
 
 class WpaCliCommandTest(TestCase):
     def setUp(self):
@@ -30,7 +30,7 @@ class WpaCliCommandTest(TestCase):
         error = StringIO('')
         self.connection.wpa_cli.return_value = output, error
         self.assertEqual(wpa_cli_status.ip, self.command.ip_address)
-        self.connection.wpa_cli.assert_called_with("status")
+        self.connection.wpa_cli.assert_any_call("status")
         return
 
     def test_mac(self):
@@ -46,7 +46,7 @@ class WpaCliCommandTest(TestCase):
         error = StringIO('')
         self.connection.wpa_cli.return_value = output, error
         self.assertEqual(wpa_cli_status.ssid, self.command.ssid)
-        self.connection.wpa_cli.assert_called_with('status')
+        self.connection.wpa_cli.assert_any_call('status')
         return
     
     def test_status(self):
@@ -57,6 +57,18 @@ class WpaCliCommandTest(TestCase):
         self.connection.wpa_cli.assert_called_with("status")
         
         
+    def test_snapshot(self):
+        self.connection.wpa_cli.side_effect = [(StringIO(wpa_cli_status.output), StringIO('')),
+                                               (StringIO(wpa_cli_signal_poll.output), StringIO(''))]
+        snapshot = self.command.snapshot
+        self.assertEqual(wpa_cli_status.ssid, snapshot.ssid)
+        self.assertEqual(wpa_cli_status.mac, snapshot.mac_address)
+        self.assertEqual("COMPLETED", self.command.supplicant_state)
+        self.assertEqual(wpa_cli_signal_poll.rssi, self.command.rssi)
+        self.assertEqual(wpa_cli_signal_poll.bitrate, self.command.bitrate)
+        self.assertEqual(2, self.connection.wpa_cli.call_count)
+        return
+        
     @raises(CommandError)
     def test_error(self):
         output = StringIO('')
@@ -0,0 +1,10 @@
+output = '''
+Using interface 'wlan0'
+RSSI=-52
+LINKSPEED=65
+NOISE=9999
+FREQUENCY=2437
+'''
+
+rssi = "-52"
+bitrate = "65"
@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+import numpy
+
+from apetools.commons.centraltendency import CentralTendency
+
+
+class TestCentralTendency(TestCase):
+    def setUp(self):
+        self.tendency = CentralTendency(bootstraps=50, seed=1)
+        return
+
+    def test_median(self):
+        for value in (5, 1, 4, 2, 3):
+            self.tendency(value)
+        self.assertEqual(3, self.tendency.median)
+        self.tendency(6)
+        self.assertEqual(3.5, self.tendency.median)
+        return
+
+    def test_percentile_rows(self):
+        data = numpy.array([[3, 1, 2], [9, 7, 8]])
+        self.assertEqual([2, 8], list(self.tendency.percentile(data)))
+        return
+
+    def test_deviation(self):
+        data = [2, 4, 4, 4, 5, 5, 7, 9]
+        for value in data:
+            self.tendency.add(value)
+        self.assertEqual(5, self.tendency.mean)
+        self.assertAlmostEqual(numpy.std(data, ddof=1),
+                               self.tendency.sample_deviation)
+        return
+
+    def test_median_error(self):
+        for value in numpy.random.RandomState(0).normal(size=100):
+            self.tendency(value)
+        error = self.tendency.median_error
+        self.assertTrue(error > 0)
+
+        # the same seed (with tiny chunks) gives the same error
+        tendency = CentralTendency(bootstraps=50, seed=1, chunk_size=1)
+        for value in self.tendency.data:
+            tendency(value)
+        self.assertAlmostEqual(error, tendency.median_error)
+        return
+# end class TestCentralTendency
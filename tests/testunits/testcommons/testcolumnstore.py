@@ -0,0 +1,103 @@
+from unittest import TestCase
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from apetools.commons.columnstore import ColumnStore, ColumnReader
+from apetools.commons.centraltendency import CentralTendency
+from apetools.commons.errors import StorageError
+from apetools.commons.storageoutput import flusher
+from apetools.pipes.storagepipe import StoragePipe, StoragePipeEnum
+
+
+class TestColumnStore(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "columns")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        return
+
+    def test_round_trip(self):
+        store = ColumnStore(self.path, buffer_size=3)
+        for index in range(5):
+            store.append(1000 + index, index * 1.5, node="igor",
+                         parameter="run_{0}".format(index % 2))
+        # the first three rows are written, the other two are still buffered
+        self.assertEqual(3, ColumnReader(self.path).schema['rows'])
+        store.close()
+
+        reader = ColumnReader(self.path)
+        values = reader.column("value")
+        self.assertIsInstance(values, numpy.memmap)
+        self.assertEqual([0, 1.5, 3, 4.5, 6], values.tolist())
+        self.assertEqual(["igor"], reader.nodes)
+        self.assertEqual(["run_0", "run_1"], reader.parameters)
+        self.assertEqual([1.5, 4.5], reader.values(parameter="run_1").tolist())
+        self.assertEqual(0, len(reader.values(node="inga")))
+        self.assertRaises(StorageError, reader.column, "rssi")
+        return
+
+    def test_reopen(self):
+        store = ColumnStore(self.path)
+        store.append(1, 2.0, node="igor", parameter="run_0")
+        store.close()
+        # a partly-written row is cut off when the store is re-opened
+        with open(os.path.join(self.path, "value.bin"), "ab") as column:
+            column.write("\x00" * 3)
+
+        store = ColumnStore(self.path)
+        store.append(2, 3.0, node="inga", parameter="run_0")
+        store.close()
+        reader = ColumnReader(self.path)
+        self.assertEqual([2.0, 3.0], reader.column("value").tolist())
+        self.assertEqual([0, 1], reader.column("node").tolist())
+        self.assertEqual(16, os.path.getsize(os.path.join(self.path, "value.bin")))
+        return
+
+    def test_sync_if_due(self):
+        store = ColumnStore(self.path, sync_interval=0)
+        store.append(1, 2.0)
+        self.assertIn(store, flusher.outputs)
+        self.assertEqual(0, ColumnReader(self.path).schema['rows'])
+        store.sync_if_due()
+        self.assertEqual(1, ColumnReader(self.path).schema['rows'])
+        self.assertNotIn(store, flusher.outputs)
+        return
+
+    def test_central_tendency(self):
+        store = ColumnStore(self.path)
+        for value in (3, 1, 2, 5, 4):
+            store.append(0, value)
+        store.close()
+        values = ColumnReader(self.path).column("value")
+        tendency = CentralTendency()
+        tendency.load(values)
+        self.assertTrue(numpy.may_share_memory(values, tendency.array))
+        self.assertEqual(3, tendency.median)
+        self.assertEqual(3, tendency.mean)
+        tendency(9)
+        self.assertEqual(6, len(tendency.array))
+        return
+
+    def test_storage_pipe(self):
+        store = ColumnStore()
+        pipe = StoragePipe(path=self.folder, role=StoragePipeEnum.sink,
+                           add_timestamp=False, columns=store, node="igor")
+        sink = pipe.open("upstream_tx_tcp_igor_1.iperf")
+        for line in ("93.2", "not a number", "94.8"):
+            sink.send(line)
+        try:
+            sink.send("")
+        except StopIteration:
+            pass
+        reader = ColumnReader(os.path.join(self.folder, "columns"))
+        self.assertEqual([93.2, 94.8], reader.values().tolist())
+        self.assertEqual(["upstream_tx_tcp_igor_1"], reader.parameters)
+        self.assertEqual(["igor"], reader.nodes)
+        return
+# end class TestColumnStore
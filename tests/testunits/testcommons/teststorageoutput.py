@@ -0,0 +1,157 @@
+from unittest import TestCase
+import errno
+import os
+import shutil
+import tempfile
+import time
+
+from mock import MagicMock, patch
+
+from apetools.commons.storageoutput import StorageOutput, DurabilityPolicy, StorageFlusher
+from apetools.commons.storageoutput import output_record
+from apetools.commons import storageoutput
+
+
+class TestStorageOutputDurability(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.storage = StorageOutput(self.folder, sync_lines=3,
+                                     sync_interval=1000)
+        self.fsync = MagicMock()
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        return
+
+    def write_lines(self, policy, count):
+        with patch("os.fsync", self.fsync):
+            output = self.storage.open("test.csv", durability=policy)
+            for index in range(count):
+                output.writeline(str(index))
+        return output
+
+    def test_line(self):
+        self.write_lines(DurabilityPolicy.line, 5)
+        self.assertEqual(5, self.fsync.call_count)
+        return
+
+    def test_lines(self):
+        output = self.write_lines(DurabilityPolicy.lines, 7)
+        self.assertEqual(2, self.fsync.call_count)
+        self.assertEqual(1, output._pending)
+        with patch("os.fsync", self.fsync):
+            output.close()
+        self.assertEqual(3, self.fsync.call_count)
+        return
+
+    def test_close(self):
+        output = self.write_lines(DurabilityPolicy.close, 10)
+        self.assertEqual(0, self.fsync.call_count)
+        with patch("os.fsync", self.fsync):
+            output.close()
+        self.assertEqual(1, self.fsync.call_count)
+        with open(output.filename) as lines:
+            self.assertEqual(10, len(lines.readlines()))
+        return
+
+    def test_group(self):
+        output = self.write_lines(DurabilityPolicy.group, 4)
+        self.assertIn(output, storageoutput.flusher.outputs)
+        self.assertEqual(1, self.fsync.call_count)
+
+        # the interval hasn't expired so the flusher leaves it alone
+        with patch("os.fsync", self.fsync):
+            output.sync_if_due()
+            self.assertEqual(1, self.fsync.call_count)
+            output.sync_interval = 0
+            output.sync_if_due()
+            self.assertEqual(2, self.fsync.call_count)
+            self.assertEqual(0, output._pending)
+            output.close()
+        self.assertNotIn(output, storageoutput.flusher.outputs)
+        return
+
+    def test_interval(self):
+        self.storage.sync_interval = 0
+        self.write_lines(DurabilityPolicy.interval, 2)
+        self.assertEqual(2, self.fsync.call_count)
+        return
+# end class TestStorageOutputDurability
+
+
+class Syncable(object):
+    def __init__(self, error=None):
+        self.error = error
+        self.syncs = 0
+        return
+
+    def sync_if_due(self):
+        self.syncs += 1
+        if self.error is not None:
+            raise self.error
+        return
+# end class Syncable
+
+
+class TestStorageFlusher(TestCase):
+    def wait(self, condition, timeout=5):
+        end = time.time() + timeout
+        while not condition() and time.time() < end:
+            time.sleep(0.01)
+        return condition()
+
+    def test_error(self):
+        flusher = StorageFlusher(tick=0.01)
+        full = Syncable(OSError(errno.ENOSPC, "No space left on device"))
+        healthy = Syncable()
+        flusher.register(full)
+        flusher.register(healthy)
+
+        # the full disk doesn't stop the other output from being synced
+        self.assertTrue(self.wait(lambda: full.syncs > 1 and healthy.syncs > 1))
+        self.assertIsNotNone(flusher.thread)
+
+        flusher.unregister(full)
+        flusher.unregister(healthy)
+        self.assertTrue(self.wait(lambda: flusher.thread is None))
+
+        # the flusher starts again for the next output
+        flusher.register(healthy)
+        syncs = healthy.syncs
+        self.assertTrue(self.wait(lambda: healthy.syncs > syncs))
+        flusher.unregister(healthy)
+        return
+# end class TestStorageFlusher
+
+
+class TestOutputRecord(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.storage = StorageOutput(self.folder)
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        return
+
+    def test_watch(self):
+        self.storage.open("before.csv").close()
+        created = output_record.watch()
+        try:
+            # the clones and the other StorageOutputs are recorded too
+            self.storage.open("rssi.csv", subdir="logs").close()
+            other = StorageOutput(self.folder)
+            name = other.get_filename("test.iperf")
+            descriptor, source = tempfile.mkstemp(suffix=".log")
+            os.close(descriptor)
+            other.move(source)
+        finally:
+            output_record.unwatch(created)
+        self.storage.open("after.csv").close()
+        self.assertEqual([os.path.join(self.folder, "logs", "rssi.csv"),
+                          name,
+                          os.path.join(self.folder, os.path.basename(source))],
+                         created)
+        return
+# end class TestOutputRecord
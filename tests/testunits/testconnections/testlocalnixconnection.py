@@ -14,6 +14,14 @@ class TestLocalNixConnection(TestCase):
         self.connection._queue = MagicMock()
         return
 
+    def test_run(self):
+        self.connection._queue = None
+        output, error = self.connection.run("echo", "alpha beta")
+        self.assertEqual("alpha beta", output.read(timeout=5).strip())
+        self.assertEqual("", error.read())
+        self.assertIs(output, self.connection.queue.get(timeout=1).output)
+        return
+
     #def test_add_to_path(self):
     #    output = MagicMock()
     #    output.readline.return_value = DEFAULT_PATH
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from mock import MagicMock
+
+from apetools.connections.persistentshell import PersistentShell
+
+
+class TestPersistentShell(TestCase):
+    def setUp(self):
+        self.connection = MagicMock()
+        self.connection.command_prefix = ''
+        self.shell = PersistentShell(self.connection, timeout=5)
+        return
+
+    def tearDown(self):
+        self.shell.close()
+        return
+
+    def test_shell_command(self):
+        self.assertEqual('sh', self.shell.shell_command)
+        self.connection.command_prefix = 'adb -s 1234 shell'
+        self.shell._shell_command = None
+        self.assertEqual('adb -s 1234 shell', self.shell.shell_command)
+        return
+
+    def test_batch(self):
+        outputs = self.shell.batch(["echo a", "printf 'b\\nc\\n'", "true"])
+        self.assertEqual([["a\n"], ["b\n", "c\n"], []], outputs)
+
+        # the same shell is re-used for the next batch
+        process = self.shell.process
+        outputs = self.shell.batch(["echo d"])
+        self.assertEqual([["d\n"]], outputs)
+        self.assertIs(process, self.shell.process)
+        return
+
+    def test_no_newline(self):
+        # output that doesn't end with a newline runs into the next marker
+        outputs = self.shell.batch(["printf a", "printf 'b\\nc'", "printf d"])
+        self.assertEqual([["a"], ["b\n", "c"], ["d"]], outputs)
+        outputs = self.shell.batch(["echo e"])
+        self.assertEqual([["e\n"]], outputs)
+        return
+# end class TestPersistentShell
@@ -0,0 +1,99 @@
+from unittest import TestCase
+import os
+import Queue
+from time import sleep
+
+from apetools.connections.pipereader import PipeReader, LineQueue
+
+
+class TestPipeReader(TestCase):
+    def setUp(self):
+        self.reader = PipeReader(chunk_size=4)
+        read, write = os.pipe()
+        self.read_file = os.fdopen(read, 'r')
+        self.write = write
+        self.queue = Queue.Queue()
+        return
+
+    def tearDown(self):
+        self.read_file.close()
+        return
+
+    def lines(self):
+        lines = []
+        line = None
+        while line != '':
+            line = self.queue.get(timeout=2)
+            lines.append(line)
+        return lines
+
+    def test_lines(self):
+        self.reader.register(self.read_file, self.queue)
+        thread = self.reader.thread
+        os.write(self.write, "alpha\nbe")
+        os.write(self.write, "ta\ngamma")
+        os.close(self.write)
+        self.assertEqual(["alpha\n", "beta\n", "gamma", ""], self.lines())
+        if thread is not None:
+            thread.join(1)
+        self.assertIsNone(self.reader.thread)
+        self.assertEqual({}, self.reader.pipes)
+        return
+
+    def test_unregister(self):
+        self.reader.register(self.read_file, self.queue)
+        self.reader.unregister(self.read_file)
+        os.write(self.write, "alpha\n")
+        os.close(self.write)
+        self.assertRaises(Queue.Empty, self.queue.get, timeout=0.2)
+        return
+    def test_bounded(self):
+        self.queue = LineQueue(maxsize=2)
+        self.reader.register(self.read_file, self.queue)
+        os.write(self.write, "".join("line {0}\n".format(index) for index in range(10)))
+        os.close(self.write)
+        sleep(0.2)
+        # the reader holds the rest of the lines (and the EOF) until there's room
+        self.assertEqual(2, self.queue.qsize())
+        self.assertTrue(self.reader.paused)
+        lines = self.lines()
+        self.assertEqual(["line {0}\n".format(index) for index in range(10)] + [""],
+                         lines)
+        return
+
+    def test_plain_queue(self):
+        # a full Queue.Queue can't wake the reader so it's retried
+        self.queue = Queue.Queue(maxsize=1)
+        self.reader.register(self.read_file, self.queue)
+        os.write(self.write, "alpha\nbeta\n")
+        os.close(self.write)
+        self.assertEqual(["alpha\n", "beta\n", ""], self.lines())
+        return
+
+    def test_error(self):
+        read = self.reader.read
+        errors = []
+        def fail_once(descriptor):
+            if not errors:
+                errors.append(descriptor)
+                raise KeyError(descriptor)
+            return read(descriptor)
+        self.reader.read = fail_once
+        self.reader.register(self.read_file, self.queue)
+        thread = self.reader.thread
+        os.write(self.write, "alpha\n")
+        thread.join(1)
+        # the dead reader isn't left registered so the next pipe starts a new one
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(self.reader.thread)
+        read_descriptor, write_descriptor = os.pipe()
+        other = os.fdopen(read_descriptor, 'r')
+        other_queue = Queue.Queue()
+        self.reader.register(other, other_queue)
+        os.close(write_descriptor)
+        os.close(self.write)
+        self.assertEqual(["alpha\n", ""], self.lines())
+        self.assertEqual("", other_queue.get(timeout=2))
+        other.close()
+        return
+# end class TestPipeReader
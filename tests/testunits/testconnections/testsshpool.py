@@ -0,0 +1,124 @@
+from unittest import TestCase
+import threading
+from time import time, sleep
+
+from mock import MagicMock
+import paramiko
+
+from apetools.connections.sshpool import SSHPool, pool_for, release, pools
+from apetools.commons.errors import ConnectionError
+
+
+class FakeChannel(object):
+    def __init__(self):
+        self.closed = False
+        return
+
+
+class FakeClient(MagicMock):
+    def exec_command(self, command, timeout=None):
+        stdout = MagicMock()
+        stdout.channel = FakeChannel()
+        return MagicMock(), stdout, MagicMock()
+
+    def open_sftp(self):
+        sftp = MagicMock()
+        sftp.get_channel.return_value = FakeChannel()
+        return sftp
+
+
+class SlowClient(FakeClient):
+    handshake = threading.Event()
+
+    def connect(self, **kwargs):
+        self.handshake.wait(5)
+
+
+class TestSSHPool(TestCase):
+    def setUp(self):
+        self.pool = SSHPool("localhost", "cowman", max_sessions=2,
+                            max_transports=2, wait=0, client_class=FakeClient)
+        return
+
+    def test_multiplex(self):
+        outputs = [self.pool.exec_command("ls")[1] for index in range(4)]
+        statistics = self.pool.statistics
+        self.assertEqual(2, statistics.transports)
+        self.assertEqual(4, statistics.channels)
+        self.assertEqual(4, statistics.opened)
+
+        # all the sessions are busy
+        self.assertRaises(ConnectionError, self.pool.exec_command, "ls")
+
+        # a closed channel frees its session
+        outputs[0].channel.closed = True
+        self.pool.exec_command("ls")
+        self.assertEqual(2, self.pool.statistics.transports)
+        self.assertEqual(5, self.pool.statistics.opened)
+        return
+
+    def test_keepalive(self):
+        transport = self.pool.acquire()
+        transport.client.get_transport().set_keepalive.assert_called_with(self.pool.keepalive)
+        return
+
+    def test_refused(self):
+        transport = self.pool.acquire()
+        transport.reserved -= 1
+        # hold the output so the weakly-held channel stays open
+        output = self.pool.exec_command("ls")[1]
+        transport.client.exec_command = MagicMock(side_effect=paramiko.ChannelException(1, "Administratively prohibited"))
+        self.pool.exec_command("ls")
+        self.assertEqual(1, transport.max_sessions)
+        self.assertEqual(2, len(self.pool.transports))
+        return
+
+    def test_connect_unlocked(self):
+        transport = self.pool.acquire()
+        self.pool.acquire()
+        self.pool.client_class = SlowClient
+        SlowClient.handshake.clear()
+        connecting = threading.Thread(target=self.pool.acquire)
+        connecting.start()
+        try:
+            deadline = time() + 5
+            while not self.pool.connecting and time() < deadline:
+                sleep(0.01)
+            # the handshake for the second transport doesn't block the first one's callers
+            with self.pool.condition:
+                transport.reserved -= 1
+            start = time()
+            self.assertIs(transport, self.pool.acquire())
+            self.assertLess(time() - start, 1)
+            self.assertEqual(1, self.pool.connecting)
+        finally:
+            SlowClient.handshake.set()
+            connecting.join()
+        self.assertEqual((0, 2), (self.pool.connecting, len(self.pool.transports)))
+        return
+
+    def test_open_sftp(self):
+        sftp = self.pool.open_sftp()
+        statistics = self.pool.statistics
+        self.assertEqual((1, 1), (statistics.channels, statistics.opened))
+        sftp.get_channel.return_value.closed = True
+        self.assertEqual(0, self.pool.statistics.channels)
+        return
+
+    def test_release(self):
+        first = pool_for("ummagumma", "cowman", client_class=FakeClient)
+        second = pool_for("ummagumma", "cowman", client_class=FakeClient)
+        self.assertIs(first, second)
+        output = first.exec_command("ls")[1]
+
+        # another user of the host is still using the pool
+        release(first)
+        self.assertFalse(first.closed)
+        self.assertEqual(1, first.statistics.channels)
+
+        release(second)
+        self.assertTrue(first.closed)
+        self.assertNotIn(("ummagumma", 22, "cowman"), pools)
+        self.assertIsNot(first, pool_for("ummagumma", "cowman", client_class=FakeClient))
+        return
+# end class TestSSHPool
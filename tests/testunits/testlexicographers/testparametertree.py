@@ -29,6 +29,33 @@ class TestParameterTree(TestCase):
                 if key != "total_count":
                     self.assertEqual(paths[index][key], getattr(getattr(path, key), "parameters"))
         return
+
+    def test_total_count(self):
+        self.assertEqual(4, self.tree.total_count)
+        self.assertEqual(4, len(self.tree))
+        for path in self.tree.paths:
+            self.assertEqual(4, path.total_count)
+        return
+
+    def test_shared_type(self):
+        types = set(type(path) for path in self.tree.paths)
+        self.assertEqual(1, len(types))
+        return
+
+    def test_random_access(self):
+        for index in range(len(paths)):
+            path = self.tree[index]
+            for key in "abc":
+                self.assertEqual(paths[index][key], getattr(path, key).parameters)
+        self.assertEqual(self.tree[3], self.tree[-1])
+        self.assertRaises(IndexError, self.tree.path, 4)
+        return
+
+    def test_resume(self):
+        resumed = list(self.tree.paths_from(2))
+        self.assertEqual(2, len(resumed))
+        self.assertEqual(list(self.tree.paths)[2:], resumed)
+        return
 # end class TestParameterTree
     
 if __name__ == "__main__":
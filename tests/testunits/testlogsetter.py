@@ -0,0 +1,92 @@
+# python standard library
+from unittest import TestCase
+from Queue import Queue
+import logging
+
+from apetools.log_setter import QueueHandler, QueueListener
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.DEBUG):
+        logging.Handler.__init__(self, level)
+        self.messages = []
+        self.flushes = 0
+        return
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        return
+
+    def flush(self):
+        if not getattr(self, 'batching', False):
+            self.flushes += 1
+        return
+# end class ListHandler
+
+
+class TestQueueLogging(TestCase):
+    def setUp(self):
+        self.handler = QueueHandler(Queue(maxsize=3))
+        self.logger = logging.getLogger("testlogsetter")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+        return
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        return
+
+    def test_drop(self):
+        values = [1]
+        for index in range(5):
+            self.logger.debug("debug %s", values)
+        statistics = self.handler.statistics
+        self.assertEqual(5, statistics.received)
+        self.assertEqual(2, statistics.dropped)
+
+        # the message was built when it was logged
+        values.append(2)
+        debug, info = ListHandler(), ListHandler(logging.INFO)
+        listener = QueueListener(self.handler.queue, [debug, info])
+        listener.start()
+        # the queue is full so the warning waits for the listener
+        self.logger.warning("stopping")
+        listener.stop()
+        self.assertEqual(["debug [1]"] * 3 + ["stopping"], debug.messages)
+        self.assertEqual(["stopping"], info.messages)
+        self.assertTrue(1 <= debug.flushes <= 2)
+        return
+
+    def test_exception(self):
+        try:
+            raise RuntimeError("oops")
+        except RuntimeError:
+            self.logger.exception("failed")
+        record = self.handler.queue.get()
+        self.assertIsNone(record.exc_info)
+        self.assertIn("RuntimeError: oops", record.exc_text)
+        return
+
+    def test_stop(self):
+        for index in range(5):
+            self.logger.debug("debug")
+        handler = ListHandler()
+        self.handler.listener = QueueListener(self.handler.queue, [handler])
+        self.handler.listener.start()
+        # the statistics are logged to the package's logger
+        package_logger = logging.getLogger("apetools")
+        package_logger.addHandler(self.handler)
+        try:
+            self.handler.stop()
+        finally:
+            package_logger.removeHandler(self.handler)
+        self.assertEqual(["debug"] * 3, handler.messages[:3])
+        self.assertEqual(4, len(handler.messages))
+        self.assertIn("5 records received, 2 dropped", handler.messages[-1])
+        self.assertIsNone(self.handler.listener)
+        # the second stop (at exit) does nothing
+        self.handler.stop()
+        self.assertEqual(4, len(handler.messages))
+        return
+# end class TestQueueLogging
@@ -0,0 +1,69 @@
+from unittest import TestCase
+import os
+
+from apetools.parsers.iperfexpressions import ParserKeys
+from apetools.parsers.iperftokenizer import tokenize_human, tokenize_csv
+from apetools.parsers.iperfparser import IperfParser
+from apetools.parsers.sumparser import SumParser
+
+FOLDER = os.path.dirname(__file__)
+HUMAN = "[SUM]  0.0- 1.0 sec   114 MBytes   957 Mbits/sec"
+CSV = "20120720091543,192.168.20.62,0,192.168.20.50,5001,-1,0.0-1.0,786432,6291456"
+HEADER = "[  3] local 192.168.20.62 port 33593 connected with 192.168.20.50 port 5001"
+
+
+class TestIperfTokenizer(TestCase):
+    def compare(self, filename, format, tokenize):
+        # the expressions only match the lines the parser accepts
+        for parser in (IperfParser(), SumParser(threads=4)):
+            regex = parser.regex[format]
+            tokenized = 0
+            for line in open(os.path.join(FOLDER, filename)):
+                match = regex.search(line)
+                tokens = tokenize(line)
+                if tokens is not None and parser.accepts(tokens[ParserKeys.thread], format):
+                    tokenized += 1
+                    # the sum expression matches '[SUM]' without a thread-group
+                    groups = match.groupdict()
+                    self.assertEqual(groups, dict((key, tokens[key]) for key in groups))
+                else:
+                    self.assertIsNone(match)
+            self.assertGreater(tokenized, 0)
+        return
+
+    def test_human_files(self):
+        for filename in ("igor_human.iperf", "threads.iperf", "edge.iperf"):
+            self.compare(filename, ParserKeys.human, tokenize_human)
+        return
+
+    def test_csv_file(self):
+        self.compare("igor_csv.iperf", ParserKeys.csv, tokenize_csv)
+        return
+
+    def test_tokens(self):
+        tokens = tokenize_human(HUMAN)
+        self.assertEqual(("SUM", "0.0", "1.0", "114", "957", "Mbits"),
+                         tuple(tokens[key] for key in (ParserKeys.thread, ParserKeys.start,
+                                                       ParserKeys.end, ParserKeys.transfer,
+                                                       ParserKeys.bandwidth, ParserKeys.units)))
+        self.assertIsNone(tokenize_human(HEADER))
+        self.assertIsNone(tokenize_csv(HUMAN))
+        self.assertIsNone(tokenize_human(CSV))
+        # a timestamp added in front of the line is skipped
+        self.assertEqual(tokenize_csv(CSV), tokenize_csv("1349280000.5," + CSV))
+        return
+
+    def test_search(self):
+        parser = SumParser(threads=4)
+        self.assertIsNone(parser.search(HEADER))
+        self.assertIsNone(parser.search(HUMAN.replace("SUM", "  3")))
+        self.assertEqual("SUM", parser.search(HUMAN)[ParserKeys.thread])
+        self.assertEqual(ParserKeys.human, parser.format)
+        self.assertEqual("-1", parser.search(CSV)[ParserKeys.thread])
+        self.assertEqual(ParserKeys.csv, parser.format)
+        self.assertIsNone(parser.search(CSV.replace(",-1,", ",3,")))
+
+        parser = SumParser(threads=1)
+        self.assertEqual("3", parser.search(CSV.replace(",-1,", ",3,"))[ParserKeys.thread])
+        return
+# end class TestIperfTokenizer
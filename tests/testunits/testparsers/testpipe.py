@@ -59,6 +59,24 @@ class TestPipe(TestCase):
         actual = float(args[0])
         self.assertAlmostEqual(expected, actual)
         return
+
+    def test_dead_thread(self):
+        line = "[  {0}] {1:.1f}-{2:.1f} sec   768 KBytes  1.00 Mbits/sec"
+        self.parser.threads = 2
+        self.parser.watermark = 2
+        target = MagicMock()
+        pipe = self.parser.pipe(target)
+        pipe.send(line.format(3, 0, 1))
+        pipe.send(line.format(4, 0, 1))
+        # thread 4 dies
+        for start in range(1, 6):
+            pipe.send(line.format(3, start, start + 1))
+        actual = [args[0] for name, args, kwargs in target.send.mock_calls]
+        self.assertEqual([2, 1, 1, 1, 1, 1], actual)
+        # late reports are ignored
+        pipe.send(line.format(4, 1, 2))
+        self.assertEqual(6, len(target.send.mock_calls))
+        return
 # end class TestPipe
         
 class TestSumParser(TestCase):
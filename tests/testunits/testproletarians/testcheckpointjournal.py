@@ -0,0 +1,97 @@
+from unittest import TestCase
+import os
+import shutil
+import tempfile
+import time
+
+from apetools.proletarians.checkpointjournal import CheckpointJournal, journal_name, find_resumable
+from apetools.lexicographers.parametergenerator import ParameterGenerator
+from apetools.builders.subbuilders.basetoolbuilder import Parameters
+
+
+FINGERPRINT = [("repetition", 3), ("nodes", 2)]
+
+
+class TestCheckpointJournal(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, journal_name("/ape/configs/soak.ini"))
+        self.journal = CheckpointJournal(self.path, "soak.ini")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        return
+
+    def test_journal_name(self):
+        self.assertEqual("soak.journal", journal_name("/ape/configs/soak.ini"))
+        return
+
+    def test_resume(self):
+        self.assertEqual(set(), self.journal.start(FINGERPRINT, resume=True))
+        self.journal.record(0, "igor", ["iperf_0.iperf"], True)
+        self.journal.record(1, "inga", ["iperf_1.iperf"], False)
+
+        journal = CheckpointJournal(self.path, "soak.ini")
+        self.assertEqual(set([0, 1]), journal.start(FINGERPRINT, resume=True))
+        self.assertEqual(["iperf_1.iperf"], journal.completed[1]["files"])
+        self.assertEqual("False", journal.completed[1]["result"])
+
+        # without resume the journal starts over
+        journal = CheckpointJournal(self.path, "soak.ini")
+        self.assertEqual(set(), journal.start(FINGERPRINT))
+        journal.load()
+        self.assertEqual({}, journal.completed)
+        return
+
+    def test_changed_parameters(self):
+        self.journal.start(FINGERPRINT)
+        self.journal.record(0, "igor")
+        journal = CheckpointJournal(self.path, "soak.ini")
+        self.assertEqual(set(), journal.start([("repetition", 4), ("nodes", 2)],
+                                              resume=True))
+        return
+
+    def test_partial_line(self):
+        self.journal.start(FINGERPRINT)
+        self.journal.record(0, "igor")
+        with open(self.path, "a") as journal:
+            journal.write('{"index": 1, "param')
+        journal = CheckpointJournal(self.path, "soak.ini")
+        self.assertEqual(set([0]), journal.start(FINGERPRINT, resume=True))
+        return
+
+    def test_list_files(self):
+        self.journal.start(FINGERPRINT)
+        names = ("iperf.iperf", os.path.join("logs", "ping.log"), "iperf.iperf")
+        paths = [os.path.join(self.folder, name) for name in names]
+        # the journal and the files outside of the output folder are left out
+        paths += [self.path, os.path.join(os.path.dirname(self.folder), "other.log")]
+        self.assertEqual(set(["iperf.iperf", os.path.join("logs", "ping.log")]),
+                         self.journal.list_files(self.folder, paths))
+        return
+
+    def test_find_resumable(self):
+        older = os.path.join(self.folder, "soak_2013_01_01")
+        newer = os.path.join(self.folder, "soak_2013_01_02")
+        for folder in (older, newer):
+            os.makedirs(folder)
+            journal = CheckpointJournal(os.path.join(folder, "soak.journal"))
+            journal.start(FINGERPRINT)
+            time.sleep(0.01)
+        pattern = os.path.join(self.folder, "soak_{t}")
+        self.assertEqual(newer, find_resumable(pattern, "soak.ini"))
+
+        CheckpointJournal(os.path.join(newer, "soak.journal")).finish()
+        self.assertEqual(older, find_resumable(pattern, "soak.ini"))
+        self.assertIsNone(find_resumable(pattern, "other.ini"))
+        return
+
+    def test_fingerprint(self):
+        parameters = [Parameters(name="repetition", parameters=range(3)),
+                      Parameters(name="nodes", parameters="igor inga".split())]
+        generator = ParameterGenerator(parameters)
+        self.assertEqual(FINGERPRINT, generator.fingerprint)
+        self.assertEqual(6, len(list(generator)))
+        return
+# end class TestCheckpointJournal
@@ -0,0 +1,89 @@
+# python standard library
+from unittest import TestCase
+from collections import namedtuple
+from datetime import timedelta
+import random
+
+# third party
+from mock import patch
+
+from apetools.proletarians.countdown import CountDown, StreamingQuantile
+from apetools.proletarians.countdown import MovingAverage, EstimatorEnum
+from apetools.lexicographers.parametertree import Parameters
+
+
+Paths = namedtuple("Paths", "total_count attenuation repetition")
+
+
+class TestStreamingQuantile(TestCase):
+    def test_exact(self):
+        quantile = StreamingQuantile()
+        self.assertIsNone(quantile.value)
+        for sample in (5, 1, 4, 2):
+            quantile.add(sample)
+        self.assertEqual(3, quantile.value)
+        return
+
+    def test_median(self):
+        generator = random.Random(1)
+        quantile = StreamingQuantile()
+        samples = [generator.uniform(0, 100) for sample in range(10000)]
+        for sample in samples:
+            quantile.add(sample)
+        samples.sort()
+        self.assertAlmostEqual(samples[len(samples)/2], quantile.value, delta=1)
+        self.assertEqual(5, len(quantile.heights))
+        return
+
+    def test_sorted(self):
+        quantile = StreamingQuantile(0.9)
+        for sample in range(1001):
+            quantile.add(sample)
+        self.assertAlmostEqual(900, quantile.value, delta=2)
+        return
+# end class TestStreamingQuantile
+
+
+class TestMovingAverage(TestCase):
+    def test_add(self):
+        average = MovingAverage(0.5)
+        average.add(10)
+        self.assertEqual(10, average.value)
+        average.add(20)
+        self.assertEqual(15, average.value)
+        return
+# end class TestMovingAverage
+
+
+class TestCountDown(TestCase):
+    def setUp(self):
+        self.countdown = CountDown(total_repetitions=11, alpha=0.5)
+        return
+
+    def add(self, seconds, parameters=None):
+        start = self.countdown.now
+        with patch.object(CountDown, 'now', start + timedelta(seconds=seconds)):
+            return self.countdown.add(start, parameters)
+
+    def test_remaining(self):
+        for seconds in (60, 60, 3600):
+            self.add(seconds)
+        # 8 left at a median of a minute
+        self.assertEqual((0, 0, 8, 0), tuple(self.countdown.remaining(2)))
+        # the moving average is (60 + 3600)/2 = 1830 seconds
+        self.assertEqual((0, 4, 4, 0),
+                         tuple(self.countdown.remaining(2, EstimatorEnum.ewma)))
+        self.assertIsNone(self.countdown.remaining(10))
+        return
+
+    def test_levels(self):
+        for attenuation, seconds in ((10, 5), (20, 30), (10, 7)):
+            self.add(seconds, Paths(total_count=3,
+                                    attenuation=Parameters('attenuation', attenuation),
+                                    repetition=Parameters('repetition', 1)))
+        levels = self.countdown.level_times
+        self.assertEqual(('attenuation', '20', 1, 30), tuple(levels[0]))
+        self.assertEqual(('attenuation', '10', 2, 6), tuple(levels[-1]))
+        self.assertEqual(3, len(levels))
+        return
+# end class TestCountDown
@@ -0,0 +1,114 @@
+from unittest import TestCase
+import os
+import tempfile
+from time import sleep, time
+
+from mock import MagicMock
+
+from apetools.proletarians.scheduler import OperatorScheduler, ResourceClaim, ScheduledOperation
+from apetools.proletarians.scheduler import claim_resources, identifiers
+from apetools.proletarians.hortator import Hortator
+from apetools.lexicographers.configurationmap import ConfigurationMap
+
+
+CONFIG = """
+[TEST]
+output_folder = soak_{t}
+
+[OSCILLATE]
+hostname = Phoridfly
+
+[NODES]
+tate = hostname:humpbackfly,login:root,connection:adbshellssh
+
+[TRAFFIC_PC]
+tpc = operating_system:linux,connection:ssh,hostname:lancet
+"""
+
+LOCAL_NODE = """
+[NODES]
+tate = connection:adblocal
+"""
+
+
+class Operations(object):
+    def __init__(self, generator, count):
+        self.generator = generator
+        self.count = count
+
+    def __iter__(self):
+        return self.generator
+
+
+class TestScheduler(TestCase):
+    def config_map(self, text):
+        handle, filename = tempfile.mkstemp(suffix=".ini")
+        with os.fdopen(handle, "w") as config:
+            config.write(text)
+        self.addCleanup(os.remove, filename)
+        return ConfigurationMap(filename)
+
+    def test_claim_resources(self):
+        self.assertEqual(set(["igor"]), identifiers("hostname", " Igor "))
+        self.assertEqual(set(["igor", "192.168.10.2"]),
+                         identifiers("tate", "hostname:igor,login:root, test_ip:192.168.10.2"))
+        claim = claim_resources(self.config_map(CONFIG))
+        self.assertEqual(frozenset("phoridfly humpbackfly lancet".split()), claim.resources)
+        self.assertIsNone(claim_resources(self.config_map(LOCAL_NODE)).resources)
+        return
+
+    def test_conflicts(self):
+        igor = ResourceClaim("igor.ini", frozenset(["igor", "lancet"]))
+        inga = ResourceClaim("inga.ini", frozenset(["inga"]))
+        local = ResourceClaim("local.ini", None)
+        self.assertTrue(igor.conflicts(ResourceClaim("frau.ini", frozenset(["lancet"]))))
+        self.assertFalse(igor.conflicts(inga))
+        self.assertTrue(inga.conflicts(local))
+        return
+
+    def test_reserve(self):
+        scheduler = OperatorScheduler(lanes=2)
+        igor = ResourceClaim("igor.ini", frozenset(["igor"]))
+        scheduler.reserve(igor)
+        scheduler.reserve(ResourceClaim("inga.ini", frozenset(["inga"])))
+        self.assertEqual(2, len(scheduler.claims))
+
+        # the conflicting claim waits for the first one to be let go
+        scheduler.lanes = 3
+        operation = ScheduledOperation(operator=lambda: sleep(0.2), claim=igor,
+                                       release=MagicMock())
+        begin = time()
+        scheduler.start(operation, lambda operation: operation())
+        scheduler.reserve(ResourceClaim("eyegore.ini", frozenset(["igor"])))
+        self.assertGreater(time() - begin, 0.15)
+        operation.release.assert_called_with()
+        return
+
+    def test_eta(self):
+        scheduler = OperatorScheduler(lanes=2)
+        self.assertEqual(0, scheduler.eta(10, 0))
+        self.assertEqual(20, scheduler.eta(10, 3))
+        scheduler.started[ResourceClaim("igor.ini", None)] = time() - 4
+        self.assertAlmostEqual(16, scheduler.eta(10, 2), places=1)
+        return
+
+    def test_hortator(self):
+        scheduler = OperatorScheduler(lanes=4)
+        claims = [ResourceClaim("{0}.ini".format(name), frozenset([name]))
+                  for name in "igor inga frankenstein".split()]
+
+        def operations():
+            for claim in claims:
+                scheduler.reserve(claim)
+                yield ScheduledOperation(operator=lambda: sleep(0.3), claim=claim,
+                                         release=MagicMock())
+        hortator = Hortator(operations=Operations(operations(), len(claims)),
+                            scheduler=scheduler)
+        begin = time()
+        hortator()
+        # three 0.3 second operations at once rather than one after the other
+        self.assertLess(time() - begin, 0.8)
+        self.assertEqual(3, hortator.completed)
+        self.assertEqual([], scheduler.claims)
+        return
+# end class TestScheduler
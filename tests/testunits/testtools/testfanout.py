@@ -0,0 +1,108 @@
+from unittest import TestCase
+from collections import namedtuple
+from StringIO import StringIO
+from time import sleep, time
+
+from mock import MagicMock
+
+from apetools.tools.fanout import FanOut, TABLE_HEADER
+from apetools.tools.timetorecovery import TimeToRecovery, TTRData
+from apetools.tools.timetofailure import TimeToFailure
+from apetools.commons.enumerations import OperatingSystem
+from apetools.commons.errors import CommandError
+
+
+Parameters = namedtuple("Parameters", "nodes target")
+Parameter = namedtuple("Parameter", "parameters")
+
+LINUX_OUTPUT = """PING 192.168.20.1 (192.168.20.1) 56(84) bytes of data.
+64 bytes from 192.168.20.1: icmp_seq=1 ttl=64 time=2.01 ms
+""".splitlines(True)
+
+
+class TestFanOut(TestCase):
+    def setUp(self):
+        self.nodes = {}
+        for name in "igor eyegore frankenstein inga".split():
+            node = MagicMock()
+            node.connection.name = name
+            self.nodes[name] = node
+        self.table = StringIO()
+        self.summary = StringIO()
+        self.fan_out = FanOut(self.nodes, table=self.table, summary=self.summary)
+        return
+
+    def test_concurrent(self):
+        starts = []
+        def measure(connection, start):
+            starts.append(start)
+            sleep(0.3)
+            return TTRData(ttr=len(connection.name), rtt='2')
+        begin = time()
+        results, summary = self.fan_out.run(measure)
+        # four 0.3 second measurements at once rather than one after the other
+        self.assertLess(time() - begin, 1)
+        self.assertEqual(1, len(set(starts)))
+        self.assertEqual(sorted(self.nodes), [result.node for result in results])
+        self.assertEqual([7, 12, 4, 4], [result.elapsed for result in results])
+        self.assertEqual(4, summary.events)
+        self.assertEqual(4, summary.minimum)
+        self.assertEqual(5.5, summary.median)
+        self.assertEqual(6.75, summary.mean)
+        self.assertEqual(12, summary.percentile_90)
+        self.assertEqual(12, summary.maximum)
+        return
+
+    def test_save(self):
+        def measure(connection, start):
+            if connection.name == "igor":
+                raise CommandError("no route, to host")
+            if connection.name == "inga":
+                return
+            return 1.5
+        results, summary = self.fan_out.run(measure)
+        self.assertEqual(2, summary.events)
+        self.assertIsInstance(results[2].error, CommandError)
+        lines = self.table.getvalue().splitlines(True)
+        self.assertEqual(TABLE_HEADER, lines[0])
+        self.assertEqual(["eyegore", "1.5", "NA", "NA"], lines[1].strip().split(",")[1:])
+        self.assertEqual(["igor", "NA", "NA", "no route; to host"],
+                         lines[3].strip().split(",")[1:])
+        self.assertEqual(["4", "2"], self.summary.getvalue().splitlines()[1].split(",")[1:3])
+
+        # the headers are only written once
+        self.fan_out.run(measure)
+        self.assertEqual(1, self.table.getvalue().count(TABLE_HEADER))
+        return
+
+    def test_time_to_recovery(self):
+        for node in self.nodes.itervalues():
+            node.connection.operating_system = OperatingSystem.linux
+            node.connection.ping.return_value = LINUX_OUTPUT, StringIO("")
+        tool = TimeToRecovery(nodes=self.nodes, threshold=1, fan_out=True,
+                              table=self.table, summary=self.summary)
+        parameters = Parameters(Parameter("all"), Parameter("192.168.20.1"))
+        results, summary = tool.run_all(parameters)
+        self.assertEqual(4, summary.events)
+        self.assertTrue(all(result.rtt == "2.01" for result in results))
+        for node in self.nodes.itervalues():
+            node.connection.ping.assert_called_with(" -c 1 -w 1 192.168.20.1", timeout=5)
+
+        self.nodes["igor"].connection.ping.return_value = [""], StringIO("")
+        tool.timeout = 0.1
+        with self.assertRaises(CommandError):
+            tool(parameters)
+        return
+
+    def test_time_to_failure(self):
+        tool = TimeToFailure(nodes=self.nodes, fan_out=True, table=self.table,
+                             summary=self.summary)
+        tool.run = MagicMock(return_value=1.5)
+        tool(None)
+        tool(None)
+        self.assertEqual(8, tool.run.call_count)
+        # the headers are only written once
+        self.assertEqual(1, self.table.getvalue().count(TABLE_HEADER))
+        self.assertEqual(3, len(self.summary.getvalue().splitlines()))
+        return
+# end class TestFanOut
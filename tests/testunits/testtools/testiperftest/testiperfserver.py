@@ -0,0 +1,89 @@
+# python
+from unittest import TestCase
+
+# third party
+from mock import MagicMock
+
+from apetools.tools.iperfserver import IperfServer
+from apetools.tools.iperftest import IperfTest
+from apetools.tools.iperfsession import IperfSession
+from apetools.operations.executetest import ExecuteTest
+from apetools.proletarians import testoperator
+
+
+FIRST = """------------------------------------------------------------
+Server listening on TCP port 5001
+TCP window size: 85.3 KByte (default)
+------------------------------------------------------------
+[  4] local 192.168.20.99 port 5001 connected with 192.168.20.50 port 57069
+[  5] local 192.168.20.99 port 5001 connected with 192.168.20.50 port 57070
+[  4]  0.0- 1.0 sec   896 KBytes  7.34 Mbits/sec
+[  5]  0.0- 1.0 sec   768 KBytes  6.29 Mbits/sec
+[SUM]  0.0- 1.0 sec  1.62 MBytes  13.6 Mbits/sec
+[  4]  0.0- 2.0 sec  1.62 MBytes  6.80 Mbits/sec""".split("\n")
+
+SECOND = """[  4] local 192.168.20.99 port 5001 connected with 192.168.20.50 port 57071
+[  5]  0.0- 2.0 sec  1.50 MBytes  6.29 Mbits/sec
+[  4]  0.0- 1.0 sec   896 KBytes  7.34 Mbits/sec""".split("\n")
+
+
+class TestIperfServer(TestCase):
+    def setUp(self):
+        self.command = MagicMock()
+        self.command.parameters.interval = "--interval 1"
+        self.files = [MagicMock(), MagicMock()]
+        self.command.output.open.side_effect = self.files
+        self.server = IperfServer(self.command)
+        self.server.device = MagicMock()
+        return
+
+    def lines(self, index):
+        return [args[1] for name, args, kwargs in self.command.send_line.mock_calls
+                if args[0] is self.files[index]]
+
+    def test_split(self):
+        self.server.begin("test")
+        for line in FIRST:
+            self.server.route(line)
+        self.assertTrue(self.server.ready.is_set())
+        self.assertEqual(set(['4']), self.server.current.finished)
+        self.assertFalse(self.server.current.done)
+
+        # the next run starts before connection 5 reports its summary
+        first = self.server.current
+        self.server.current = None
+        self.server.begin("test")
+        for line in SECOND:
+            self.server.route(line)
+        self.assertTrue(first.done)
+
+        self.assertEqual(FIRST + SECOND[1:2], self.lines(0))
+        self.assertEqual([SECOND[0], SECOND[2]], self.lines(1))
+        return
+# end class TestIperfServer
+
+
+class TestPersistentTeardown(TestCase):
+    def test_close(self):
+        connection = MagicMock()
+        test = IperfTest(receiver_command=MagicMock(), persistent=True)
+        test._kill = MagicMock()
+        test.servers[(connection, 5001)] = MagicMock()
+        operator = testoperator.TestOperator(test_parameters=[],
+                                             operation_setup=MagicMock(return_value=None),
+                                             operation_teardown=MagicMock(),
+                                             test_setup=MagicMock(),
+                                             tests=ExecuteTest([IperfSession(test, nodes={}, tpc=None)]),
+                                             test_teardown=MagicMock(), nodes={},
+                                             no_cleanup=False, storage=MagicMock(),
+                                             countdown_timer=MagicMock(), sleep=MagicMock())
+        operator._sub_logger = MagicMock()
+        operator()
+
+        # the servers are killed when the operation is torn down
+        self.assertIs(connection, test.kill.connection)
+        self.assertTrue(test.kill.called)
+        self.assertEqual({}, test.servers)
+        operator.operation_teardown.assert_called_with()
+        return
+# end class TestPersistentTeardown
@@ -0,0 +1,132 @@
+from unittest import TestCase
+import BaseHTTPServer
+import threading
+from StringIO import StringIO
+
+from mock import MagicMock
+
+from apetools.tools.wgetsession import LatencyHistogram, BusyboxFetcher, HttpFetcher
+from apetools.tools.wgetsession import WgetLoadSession, FetchResult, NA
+
+
+HEADERS = """Connecting to 192.168.20.50:8000 (192.168.20.50:8000)
+  HTTP/1.0 200 OK
+  Server: SimpleHTTP/0.6 Python/2.7.3
+  Content-Length: 65536
+null                 100% |*******************************| 65536  0:00:00 ETA
+"""
+
+ERROR = """Connecting to 192.168.20.51:8000 (192.168.20.51:8000)
+wget: can't connect to remote host (192.168.20.51): No route to host
+"""
+
+BODY = "x" * 100000
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        return
+
+
+class Storage(object):
+    def __init__(self):
+        self.files = {}
+
+    def open(self, name):
+        self.files[name] = StringIO()
+        return self.files[name]
+
+
+class TestWgetSession(TestCase):
+    def test_histogram(self):
+        histogram = LatencyHistogram(buckets=(10, 100, 1000))
+        self.assertEqual(NA, histogram.percentile(0.5))
+        for seconds in (0.001, 0.005, 0.05, 0.5, 5):
+            histogram.add(seconds)
+        self.assertEqual([2, 1, 1, 1], histogram.counts)
+        self.assertEqual(100, histogram.percentile(0.5))
+        self.assertEqual(1000, histogram.percentile(0.8))
+        self.assertEqual(NA, histogram.percentile(0.95))
+        return
+
+    def test_busybox_fetcher(self):
+        connection = MagicMock()
+        connection.busybox.return_value = StringIO(HEADERS), StringIO('')
+        fetcher = BusyboxFetcher("http://192.168.20.50:8000/null", connection, timeout=5)
+        result = fetcher()
+        connection.busybox.assert_called_with("wget -S http://192.168.20.50:8000/null "
+                                              "-O /dev/null -T 5 2>&1", timeout=5)
+        self.assertIsNotNone(result.ttfb)
+        self.assertEqual(65536, result.size)
+        self.assertEqual('', result.error)
+
+        connection.busybox.return_value = StringIO(ERROR), StringIO('')
+        result = fetcher()
+        self.assertIsNone(result.ttfb)
+        self.assertEqual("No route to host", result.error)
+        return
+
+    def test_http_fetcher(self):
+        server = BaseHTTPServer.HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.handle_request)
+        thread.daemon = True
+        thread.start()
+        url = "http://127.0.0.1:{0}/file?size=1".format(server.server_port)
+        result = HttpFetcher(url, timeout=5)()
+        thread.join()
+        server.server_close()
+        self.assertEqual('', result.error)
+        self.assertEqual(len(BODY), result.size)
+        self.assertLessEqual(result.ttfb, result.total)
+
+        result = HttpFetcher("http://127.0.0.1:{0}/".format(server.server_port),
+                             timeout=1)()
+        self.assertNotEqual('', result.error)
+        return
+
+    def test_load_session(self):
+        storage = Storage()
+        fetcher = MagicMock(return_value=FetchResult(ttfb=0.003, total=0.04,
+                                                     size=1000, error=''))
+        session = WgetLoadSession("http://igor/null", connections=[MagicMock()] * 2,
+                                  storage=storage, workers=3, repetitions=20,
+                                  data_file="load.csv")
+        self.assertEqual(6, len(session.fetchers))
+        session._fetchers = [fetcher] * 6
+        session()
+        self.assertEqual(20, fetcher.call_count)
+        self.assertEqual((20, 0, 20000), (session.requests, session.errors, session.bytes))
+
+        histogram = storage.files["load.csv"].getvalue().splitlines()
+        self.assertEqual("Upper Bound(ms),TTFB,Total", histogram[0])
+        self.assertIn("5,20,0", histogram)
+        self.assertIn("50,0,20", histogram)
+        summary = storage.files["load_summary.csv"].getvalue().splitlines()
+        self.assertEqual(2, len(summary))
+        fields = summary[1].split(",")
+        self.assertEqual(["6", "20", "0", "20000"], fields[:4])
+        self.assertEqual(["5", "5", "50", "50"], fields[-4:])
+
+        # the next call reports only its own fetches
+        session()
+        self.assertEqual(40, fetcher.call_count)
+        self.assertEqual((20, 0, 20000), (session.requests, session.errors, session.bytes))
+        self.assertIn("5,20,0", storage.files["load.csv"].getvalue().splitlines())
+        fields = storage.files["load_summary.csv"].getvalue().splitlines()[1].split(",")
+        self.assertEqual(["6", "20", "0", "20000"], fields[:4])
+        return
+
+    def test_local(self):
+        session = WgetLoadSession("http://igor/null", connections=[MagicMock()] * 2,
+                                  storage=Storage(), workers=3, local=True, max_time=1)
+        self.assertEqual(3, len(session.fetchers))
+        self.assertIsInstance(session.fetchers[0], HttpFetcher)
+        self.assertEqual("wget_summary.csv", session.summary_file)
+        return
+# end class TestWgetSession
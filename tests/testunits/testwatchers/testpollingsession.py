@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from mock import MagicMock
+
+from apetools.watchers.pollingsession import PollingSession, session_for
+
+
+class TestPollingSession(TestCase):
+    def setUp(self):
+        self.shell = MagicMock()
+        # a mock scheduler keeps the ticks from starting
+        self.scheduler = MagicMock()
+        self.session = PollingSession(connection=MagicMock(), shell=self.shell,
+                                      scheduler=self.scheduler)
+        return
+
+    def pollster(self, name):
+        pollster = MagicMock()
+        pollster.name = name
+        pollster.stopped = False
+        return pollster
+
+    def test_poll(self):
+        stat = self.pollster("/proc/stat")
+        dev_1 = self.pollster("/proc/net/dev")
+        dev_2 = self.pollster("/proc/net/dev")
+        for pollster in (stat, dev_1, dev_2):
+            self.session.register(pollster)
+        self.shell.batch.return_value = [["cpu 1 2 3 4\n"], ["wlan0: 1 2\n"]]
+
+        self.session.poll()
+        self.shell.batch.assert_called_with(["cat /proc/stat", "cat /proc/net/dev"])
+        stat.sample.assert_called_with(["cpu 1 2 3 4\n"])
+        dev_1.sample.assert_called_with(["wlan0: 1 2\n"])
+        dev_2.sample.assert_called_with(["wlan0: 1 2\n"])
+        return
+
+    def test_unregister(self):
+        stat = self.pollster("/proc/stat")
+        self.session.register(stat)
+        self.assertFalse(self.session.stopped)
+        stat.stopped = True
+        self.shell.batch.return_value = [[]]
+        self.session.poll()
+        self.assertFalse(stat.sample.called)
+        self.assertEqual({}, self.session.pollsters)
+        self.assertTrue(self.session.stopped)
+
+        # the next tick unschedules the session
+        sampler = self.session.sampler
+        self.session.tick()
+        self.scheduler.remove.assert_called_with(sampler)
+        self.assertIsNone(self.session.sampler)
+        self.assertTrue(self.shell.close.called)
+        return
+
+    def test_session_for(self):
+        connection = MagicMock()
+        session = session_for(connection, 1)
+        self.assertIs(session, session_for(connection, 1))
+        self.assertIsNot(session, session_for(connection, 0.5))
+        return
+# end class TestPollingSession
@@ -0,0 +1,154 @@
+from unittest import TestCase
+from StringIO import StringIO
+from time import sleep, time
+import threading
+
+from mock import MagicMock
+
+from apetools.watchers.samplingscheduler import SamplingScheduler, ScheduledSampler, SampleTable
+
+
+class TestScheduledSampler(TestCase):
+    def test_next_deadline(self):
+        sampler = ScheduledSampler("rssi", MagicMock(), 0.5)
+        self.assertEqual(10.5, sampler.next_deadline(0, 10.2))
+        self.assertEqual(11, sampler.next_deadline(0, 10.5))
+        self.assertEqual(10.75, sampler.next_deadline(0.25, 10.3))
+        return
+# end class TestScheduledSampler
+
+
+class TestSampleTable(TestCase):
+    def setUp(self):
+        self.output = StringIO()
+        timestamp = MagicMock()
+        timestamp.convert.side_effect = lambda seconds: "t{0}".format(int(seconds))
+        self.table = SampleTable(self.output, timestamp=timestamp)
+        self.rssi = ScheduledSampler("rssi_tate", None, 1, columns=['rssi'])
+        self.cpu = ScheduledSampler("cpu_tate", None, 1, columns=['cpu_percent'])
+        return
+
+    def test_rows(self):
+        self.table.add(self.rssi)
+        self.table.add(self.cpu)
+        self.table.expect(1.0, self.rssi)
+        self.table.expect(1.0, self.cpu)
+        self.table.expect(2.0, self.rssi)
+        self.table.record(2.0, self.rssi, [-50])
+        # the later row waits for the earlier one
+        self.assertEqual("", self.output.getvalue())
+        self.table.record(1.0, self.cpu, None)
+        self.table.record(1.0, self.rssi, [-45])
+        expected = ("timestamp,seconds,rssi_tate:rssi,cpu_tate:cpu_percent\n"
+                    "t1,1.000,-45,NA\n"
+                    "t2,2.000,-50,NA\n")
+        self.assertEqual(expected, self.output.getvalue())
+        return
+
+    def test_late_sampler(self):
+        self.table.add(self.rssi)
+        self.table.expect(1.0, self.rssi)
+        self.table.record(1.0, self.rssi, [-45])
+        # a sampler added after the first row gets a new header
+        self.table.add(self.cpu)
+        self.table.expect(2.0, self.rssi)
+        self.table.expect(2.0, self.cpu)
+        self.table.record(2.0, self.rssi, [-50])
+        self.table.record(2.0, self.cpu, [12])
+        expected = ("timestamp,seconds,rssi_tate:rssi\n"
+                    "t1,1.000,-45\n"
+                    "timestamp,seconds,rssi_tate:rssi,cpu_tate:cpu_percent\n"
+                    "t2,2.000,-50,12\n")
+        self.assertEqual(expected, self.output.getvalue())
+        return
+# end class TestSampleTable
+
+
+class TestSamplingScheduler(TestCase):
+    def setUp(self):
+        self.scheduler = SamplingScheduler(workers=2)
+        return
+
+    def tearDown(self):
+        for sampler in self.scheduler.samplers[:]:
+            self.scheduler.remove(sampler)
+        # let the thread see that the samplers are gone
+        deadline = time() + 1
+        while self.scheduler.thread is not None and time() < deadline:
+            sleep(0.01)
+        return
+
+    def test_schedule(self):
+        times = []
+        sampler = self.scheduler.add("rssi", lambda: times.append(time()), 0.05)
+        sleep(0.32)
+        self.scheduler.remove(sampler)
+        count = len(times)
+        sleep(0.1)
+        self.assertEqual(count, len(times))
+        # the first sample right away, then on the 0.05 second grid
+        self.assertGreaterEqual(count, 5)
+        for sample_time in times[1:]:
+            offset = sample_time % 0.05
+            self.assertLess(min(offset, 0.05 - offset), 0.03)
+        statistics = sampler.statistics
+        self.assertEqual(count, statistics.samples)
+        self.assertGreaterEqual(statistics.max_drift, statistics.mean_drift)
+        self.assertEqual([], self.scheduler.statistics)
+        return
+
+    def test_missed(self):
+        release = threading.Event()
+        sampler = self.scheduler.add("slow", lambda: release.wait(1), 0.05)
+        sleep(0.3)
+        release.set()
+        sleep(0.1)
+        self.assertGreater(sampler.missed, 2)
+        return
+
+    def test_table(self):
+        output = StringIO()
+        self.scheduler.table = SampleTable(output)
+        self.scheduler.add("igor", lambda: [1], 0.05, columns=['rssi'])
+        self.scheduler.add("eyegore", lambda: [2], 0.05, columns=['rssi'])
+        sleep(0.3)
+        self.scheduler.table = None
+        lines = output.getvalue().splitlines()
+        self.assertEqual("timestamp,seconds,igor:rssi,eyegore:rssi", lines[0])
+        self.assertGreater(len(lines), 3)
+        for line in lines[1:]:
+            self.assertTrue(line.endswith(",1,2"), line)
+        return
+
+    def test_mixed_intervals(self):
+        output = StringIO()
+        self.scheduler.table = SampleTable(output)
+        self.scheduler.add("fast", lambda: [1], 0.05, columns=['rssi'])
+        self.scheduler.add("slow", lambda: [2], 0.2, columns=['rssi'])
+        sleep(0.5)
+        self.scheduler.table = None
+        lines = output.getvalue().splitlines()
+        # the slow sampler's first deadline comes after the first row
+        self.assertEqual("timestamp,seconds,fast:rssi,slow:rssi", lines[0])
+        self.assertEqual(1, lines.count(lines[0]))
+        rows = [line.split(",")[-2:] for line in lines[1:]]
+        self.assertIn(["1", "NA"], rows)
+        self.assertIn(["1", "2"], rows)
+        return
+
+    def test_error(self):
+        table = MagicMock()
+        table.expect.side_effect = KeyError("gone")
+        self.scheduler.add("first", lambda: None, 0.05, table=table)
+        thread = self.scheduler.thread
+        thread.join(1)
+        # the dead thread is cleared so the next add starts a new one
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(self.scheduler.thread)
+        times = []
+        self.scheduler.add("second", lambda: times.append(time()), 0.05)
+        sleep(0.2)
+        self.assertIsNot(thread, self.scheduler.thread)
+        self.assertGreater(len(times), 1)
+        return
+# end class TestSamplingScheduler
@@ -0,0 +1,69 @@
+from unittest import TestCase
+from StringIO import StringIO
+from time import sleep, time
+
+from apetools.watchers.basepollster import BasePollster
+from apetools.watchers.samplingscheduler import SamplingScheduler, SampleTable
+from apetools.watchers.thewatcher import TheWatcher
+
+
+class FakePollster(BasePollster):
+    def __init__(self, name, value, scheduler):
+        super(FakePollster, self).__init__(device=None, output=StringIO(), interval=0.05,
+                                           name=name, scheduler=scheduler)
+        self.value = value
+        return
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def expression(self):
+        return ''
+
+    @property
+    def columns(self):
+        return ['rssi']
+
+    def tick(self):
+        return [self.value]
+# end class FakePollster
+
+
+class TestTheWatcher(TestCase):
+    def setUp(self):
+        self.scheduler = SamplingScheduler(workers=2)
+        return
+
+    def tearDown(self):
+        for sampler in self.scheduler.samplers[:]:
+            self.scheduler.remove(sampler)
+        deadline = time() + 1
+        while self.scheduler.thread is not None and time() < deadline:
+            sleep(0.01)
+        return
+
+    def test_concurrent_tables(self):
+        outputs = StringIO(), StringIO()
+        watchers = [TheWatcher(watchers=[FakePollster(name, value, self.scheduler)],
+                               table=SampleTable(output))
+                    for name, value, output in zip(("igor", "eyegore"), (1, 2), outputs)]
+        for watcher in watchers:
+            watcher.start()
+        sleep(0.3)
+        for watcher in watchers:
+            for pollster in watcher.watchers:
+                pollster.stop()
+            watcher.stop()
+
+        # each operator's samples only go to its own table
+        for name, value, output in zip(("igor", "eyegore"), (1, 2), outputs):
+            lines = output.getvalue().splitlines()
+            self.assertEqual("timestamp,seconds,{0}:rssi".format(name), lines[0])
+            self.assertGreater(len(lines), 2)
+            for line in lines[1:]:
+                self.assertTrue(line.endswith(",{0}".format(value)), line)
+        self.assertIsNone(self.scheduler.table)
+        return
+# end class TestTheWatcher